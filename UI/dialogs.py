@@ -1,6 +1,5 @@
 # UI/dialogs.py
 import datetime
-import re
 import webbrowser
 import tkinter as tk
 import tkinter.font as tkfont
@@ -8,10 +7,16 @@ from tkinter import filedialog, messagebox, simpledialog, ttk
 
 from UI.date_picker import DatePicker
 
+import clients
+from bookings import get_index as get_bookings_index
+from directory import get_directory
+from geo import nearby_ids
 from utils import make_preview
 from db import (
     conn,
-    update_statusuri_din_rezervari,
+    RentalError,
+    bulk_rent,
+    find_conflicts,
     create_user,
     get_location_by_id,
     add_client_contact,
@@ -21,10 +26,8 @@ from db import (
     table_has_column,
 )
 
-
-def _safe_filename(name: str) -> str:
-    """Return *name* sanitized for filesystem usage."""
-    return re.sub(r"[\\/*?:\"<>|]", "_", name)
+# Pauza în tastare (ms) după care fereastra clienților pornește căutarea
+SEARCH_DELAY_MS = 250
 
 
 def choose_report_year(parent=None):
@@ -234,15 +237,11 @@ def open_detail_window(tree, event):
         period = f"{ds} → {de}" if ds and de else "-"
         add_field(r, "Perioadă", ttk.Label(frm, text=period))
         r += 1
-        if ds and de:
-            row_info = cur.execute(
-                "SELECT created_by, suma, campaign FROM rezervari WHERE loc_id=? AND data_start=? AND data_end=? ORDER BY data_start DESC LIMIT 1",
-                (loc_id, ds, de),
-            ).fetchone()
-        else:
-            row_info = None
+        row_info = get_bookings_index().find(loc_id, ds, de) if ds and de else None
         if row_info:
-            created_by, suma_val, campaign_val = row_info
+            created_by, suma_val, campaign_val = (
+                row_info.created_by, row_info.suma, row_info.campaign
+            )
             if suma_val is not None:
                 add_field(r, "Sumă închiriere", ttk.Label(frm, text=str(suma_val)))
                 r += 1
@@ -471,18 +470,17 @@ def cancel_reservation(root, loc_id, load_cb):
         (loc_id,),
     )
 
-    # Ștergem decorările legate de rezervările acestei locații
-    rez_ids = [r[0] for r in cur.execute(
-        "SELECT id FROM rezervari WHERE loc_id=?",
+    # Ștergem decorările legate de rezervările acestei locații, inclusiv cele
+    # adăugate de alți utilizatori după ultima citire a rezervărilor
+    cur.execute(
+        "DELETE FROM decorari WHERE rez_id IN (SELECT id FROM rezervari WHERE loc_id=?)",
         (loc_id,),
-    ).fetchall()]
-    for rid in rez_ids:
-        cur.execute("DELETE FROM decorari WHERE rez_id=?", (rid,))
+    )
 
     # Ștergem și intrările din tabelul rezervari
     cur.execute("DELETE FROM rezervari WHERE loc_id=?", (loc_id,))
 
-    conn.commit()
+    conn.commit(loc_ids=[loc_id])
 
     load_cb()
 
@@ -527,20 +525,37 @@ def open_reserve_window(root, loc_ids, load_cb, user):
         end = start + datetime.timedelta(days=4)
         cur = conn.cursor()
         created_on = datetime.date.today().isoformat()
-        for lid in ids:
-            cur.execute(
-                "INSERT INTO rezervari (loc_id, client, data_start, data_end, created_by, created_on) VALUES (?, ?, ?, ?, ?, ?)",
-                (
-                    lid,
-                    name,
-                    start.isoformat(),
-                    end.isoformat(),
-                    user["username"],
-                    created_on,
-                ),
+        # Verificarea și rezervarea se fac în aceeași tranzacție
+        try:
+            conflicts = find_conflicts(ids, start, end, for_update=True, cur=cur)
+            if not conflicts:
+                cur.executemany(
+                    "INSERT INTO rezervari (loc_id, client, data_start, data_end, created_by, created_on) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            lid,
+                            name,
+                            start.isoformat(),
+                            end.isoformat(),
+                            user["username"],
+                            created_on,
+                        )
+                        for lid in ids
+                    ],
+                )
+        except Exception:
+            conn.rollback()
+            raise
+        if conflicts:
+            conn.rollback()
+            busy = len({r["loc_id"] for r in conflicts})
+            messagebox.showerror(
+                "Perioadă ocupată",
+                f"{busy} din locațiile alese sunt deja rezervate sau închiriate "
+                "în următoarele 5 zile.",
             )
-        conn.commit()
-        update_statusuri_din_rezervari()
+            return
+        conn.commit(loc_ids=ids)
         load_cb()
         win.destroy()
 
@@ -553,8 +568,9 @@ def open_rent_window(root, loc_ids, load_cb, user):
     """Dialog pentru adăugarea unei închirieri în tabelul ``rezervari`` pentru una sau mai multe locații.
 
     Perioada aleasă trebuie să nu se suprapună peste o rezervare sau o
-    închiriere existentă pentru aceeași locație. După salvare statusurile sunt
-    recalculate prin ``update_statusuri_din_rezervari``.
+    închiriere existentă pentru aceeași locație. Salvarea trece prin
+    ``bulk_rent``, al cărui ``conn.commit(loc_ids=...)`` recalculează
+    statusurile și cache-ul doar pentru locațiile închiriate.
     """
 
     if isinstance(loc_ids, (list, tuple, set)):
@@ -573,35 +589,50 @@ def open_rent_window(root, loc_ids, load_cb, user):
 
     ttk.Label(win, text="Client:").grid(row=0, column=0, sticky="e", padx=5, pady=5)
 
-    def client_list():
-        return [
-            r[0]
-            for r in conn.cursor()
-            .execute("SELECT nume FROM clienti ORDER BY nume")
-            .fetchall()
-        ]
+    def bind_search(cb, names, search):
+        """Restrânge lista combobox-ului la numele care încep cu textul scris."""
+        cb.configure(values=names())
+
+        def on_key(event):
+            if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+                return
+            cb.configure(values=search(cb.get()))
 
-    cb_client = ttk.Combobox(win, values=client_list(), width=27)
+        cb.bind("<KeyRelease>", on_key)
+
+    cb_client = ttk.Combobox(win, width=27)
     cb_client.grid(row=0, column=1, padx=5, pady=5)
+    bind_search(
+        cb_client,
+        lambda: get_directory().client_names,
+        lambda text: get_directory().search_clients(text),
+    )
     ttk.Button(
         win,
         text="+",
         command=lambda: (
             open_add_client_window(
-                win, lambda: cb_client.configure(values=client_list())
+                win,
+                lambda: cb_client.configure(values=get_directory().client_names),
             )
         ),
     ).grid(row=0, column=2, padx=2, pady=5)
 
     ttk.Label(win, text="Societate:").grid(row=1, column=0, sticky="e", padx=5, pady=5)
-    def firma_list():
-        return [r[0] for r in conn.cursor().execute("SELECT nume FROM firme ORDER BY nume").fetchall()]
-    cb_firma = ttk.Combobox(win, values=firma_list(), width=27)
+    cb_firma = ttk.Combobox(win, width=27)
     cb_firma.grid(row=1, column=1, padx=5, pady=5)
+    bind_search(
+        cb_firma,
+        lambda: get_directory().firm_names,
+        lambda text: get_directory().search_firms(text),
+    )
     ttk.Button(
         win,
         text="+",
-        command=lambda: (open_firme_window(win), cb_firma.configure(values=firma_list()))
+        command=lambda: (
+            open_firme_window(win),
+            cb_firma.configure(values=get_directory().firm_names),
+        ),
     ).grid(row=1, column=2, padx=2, pady=5)
     labels = ["Data start", "Data end", "Sumă finală"]
     entries = {}
@@ -645,9 +676,8 @@ def open_rent_window(root, loc_ids, load_cb, user):
     entry_camp.grid_remove()
 
     def toggle_campaign(_=None):
-        name = cb_client.get().strip()
-        r = conn.cursor().execute("SELECT tip FROM clienti WHERE nume=?", (name,)).fetchone()
-        if r and r[0] == "agency":
+        found = get_directory().client(cb_client.get())
+        if found and found[1] == "agency":
             lbl_camp.grid()
             entry_camp.grid()
         else:
@@ -683,25 +713,7 @@ def open_rent_window(root, loc_ids, load_cb, user):
             messagebox.showwarning("Lipsește client", "Completează client.")
             return
 
-        cur = conn.cursor()
-        row = cur.execute("SELECT id, tip FROM clienti WHERE nume=?", (client,)).fetchone()
-        if row:
-            client_id, tip = row
-        else:
-            cur.execute("INSERT INTO clienti (nume) VALUES (?)", (client,))
-            conn.commit()
-            client_id = cur.lastrowid
-            tip = "direct"
-
         campaign_val = entry_camp.get().strip() if lbl_camp.winfo_ismapped() else ""
-        client_display = client
-        if tip == "agency":
-            if not campaign_val:
-                messagebox.showwarning(
-                    "Lipsește campania", "Completează denumirea campaniei."
-                )
-                return
-            client_display = f"{client} - {campaign_val}"
 
         start = entries["Data start"].get_date()
         end = entries["Data end"].get_date()
@@ -736,170 +748,29 @@ def open_rent_window(root, loc_ids, load_cb, user):
         else:
             prod_val = 0.0
 
-        firma_name = cb_firma.get().strip()
-        cur = conn.cursor()
-        if firma_name:
-            row_f = cur.execute("SELECT id FROM firme WHERE nume=?", (firma_name,)).fetchone()
-            if row_f:
-                firma_id = row_f[0]
-            else:
-                cur.execute("INSERT INTO firme (nume) VALUES (?)", (firma_name,))
-                conn.commit()
-                firma_id = cur.lastrowid
-        else:
-            firma_id = None
-
         addr_val = entry_addr.get().strip() if entry_addr else ""
         gps_val = entry_gps.get().strip() if entry_gps else ""
 
-        for loc_id in ids:
-            cur = conn.cursor()
-            loc_data = get_location_by_id(loc_id)
-            is_mobile_l = loc_data.get("is_mobile") if loc_data else 0
-            is_base_mobile_l = is_mobile_l and not loc_data.get("parent_id")
-
-            rows = cur.execute(
-                "SELECT suma FROM rezervari WHERE loc_id=? AND NOT (data_end < ? OR data_start > ?)",
-                (loc_id, start.isoformat(), end.isoformat()),
-            ).fetchall()
-            for (suma,) in rows:
-                if suma is None or suma > 0:
-                    messagebox.showerror(
-                        "Perioadă ocupată",
-                        "Locația este deja rezervată sau închiriată în intervalul ales.",
-                    )
-                    return
-
-            if is_base_mobile_l:
-                cnt = cur.execute(
-                    "SELECT COUNT(*) FROM rezervari WHERE loc_id IN (SELECT id FROM locatii WHERE parent_id=?) AND NOT (data_end < ? OR data_start > ?) AND suma IS NOT NULL",
-                    (loc_id, start.isoformat(), end.isoformat()),
-                ).fetchone()[0]
-                if cnt >= 20:
-                    messagebox.showerror(
-                        "Limită depășită",
-                        "Nu poți închiria mai mult de 20 de prisme simultan.",
-                    )
-                    return
-
-                if not addr_val or not gps_val:
-                    messagebox.showwarning(
-                        "Lipsește adresa", "Completează adresa și GPS-ul.",
-                    )
-                    return
-
-                base = get_location_by_id(loc_id)
-                cur.execute(
-                    "INSERT INTO locatii (city, county, address, type, gps, code, size, photo_link, sqm, illumination, ratecard, pret_vanzare, pret_flotant, decoration_cost, observatii, grup, face, is_mobile, parent_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?)",
-                    [
-                        base.get("city"),
-                        base.get("county"),
-                        addr_val,
-                        base.get("type"),
-                        gps_val,
-                        base.get("code"),
-                        base.get("size"),
-                        base.get("photo_link"),
-                        base.get("sqm"),
-                        base.get("illumination"),
-                        base.get("ratecard"),
-                        base.get("pret_vanzare"),
-                        base.get("pret_flotant"),
-                        base.get("decoration_cost"),
-                        base.get("observatii"),
-                        base.get("grup"),
-                        base.get("face"),
-                        loc_id,
-                    ],
-                )
-                new_loc_id = cur.lastrowid
-                created_on = datetime.date.today().isoformat()
-                cur.execute(
-                    "INSERT INTO rezervari (loc_id, client, client_id, firma_id, data_start, data_end, suma, created_by, created_on, campaign, decor_cost, prod_cost) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        new_loc_id,
-                        client_display,
-                        client_id,
-                        firma_id,
-                        start.isoformat(),
-                        end.isoformat(),
-                        fee_val,
-                        user["username"],
-                        created_on,
-                        campaign_val or client_display,
-                        deco_val,
-                        prod_val,
-                    ),
-                )
-                rez_id = cur.lastrowid
-                cur.execute(
-                    "INSERT INTO rezervari (loc_id, client, client_id, firma_id, data_start, data_end, suma, created_by, created_on, campaign, decor_cost, prod_cost) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        loc_id,
-                        client_display,
-                        client_id,
-                        firma_id,
-                        start.isoformat(),
-                        end.isoformat(),
-                        0.0,
-                        user["username"],
-                        created_on,
-                        campaign_val or client_display,
-                        0.0,
-                        0.0,
-                    ),
-                )
-            else:
-                created_on = datetime.date.today().isoformat()
-                cur.execute(
-                    "INSERT INTO rezervari (loc_id, client, client_id, firma_id, data_start, data_end, suma, created_by, created_on, campaign, decor_cost, prod_cost) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        loc_id,
-                        client_display,
-                        client_id,
-                        firma_id,
-                        start.isoformat(),
-                        end.isoformat(),
-                        fee_val,
-                        user["username"],
-                        created_on,
-                        campaign_val or client_display,
-                        deco_val,
-                        prod_val,
-                    ),
-                )
-                rez_id = cur.lastrowid
-            conn.commit()
-
-            if deco_val or prod_val:
-                dec_date = start.isoformat()
-                target_loc = new_loc_id if is_base_mobile_l else loc_id
-                if table_has_column("decorari", "rez_id"):
-                    cur.execute(
-                        "INSERT INTO decorari (loc_id, rez_id, data, decor_cost, prod_cost, created_by) VALUES (?,?,?,?,?,?)",
-                        (
-                            target_loc,
-                            rez_id,
-                            dec_date,
-                            deco_val,
-                            prod_val,
-                            user.get("username"),
-                        ),
-                    )
-                else:
-                    cur.execute(
-                        "INSERT INTO decorari (loc_id, data, decor_cost, prod_cost, created_by) VALUES (?,?,?,?,?)",
-                        (
-                            target_loc,
-                            dec_date,
-                            deco_val,
-                            prod_val,
-                            user.get("username"),
-                        ),
-                    )
-                conn.commit()
+        # Verificarea și scrierea se fac pentru toate locațiile într-o singură tranzacție
+        try:
+            bulk_rent(
+                ids,
+                client,
+                start,
+                end,
+                fee_val,
+                firma=cb_firma.get(),
+                campaign=campaign_val,
+                decor_cost=deco_val,
+                prod_cost=prod_val,
+                address=addr_val,
+                gps=gps_val,
+                user=user["username"],
+            )
+        except RentalError as exc:
+            messagebox.showerror(exc.title, str(exc))
+            return
 
-        update_statusuri_din_rezervari()
         load_cb()
         win.destroy()
     ttk.Button(win, text="Confirmă închiriere", command=save_rent).grid(
@@ -915,12 +786,12 @@ def open_edit_rent_window(root, rid, load_cb, parent=None):
     """
     cur = conn.cursor()
     row = cur.execute(
-        "SELECT data_start, data_end, suma FROM rezervari WHERE id=?", (rid,)
+        "SELECT loc_id, data_start, data_end, suma FROM rezervari WHERE id=?", (rid,)
     ).fetchone()
     if not row:
         return
 
-    ds, de, suma = row
+    loc_id, ds, de, suma = row
     win = tk.Toplevel(root)
     win.title(f"Modifică închirierea #{rid}")
 
@@ -957,18 +828,32 @@ def open_edit_rent_window(root, rid, load_cb, parent=None):
             messagebox.showwarning("Sumă invalidă", "Introdu o sumă numerică.")
             return
 
-        cur.execute(
-            "UPDATE rezervari SET data_start=?, data_end=?, suma=? WHERE id=?",
-            (start.isoformat(), end.isoformat(), fee_val, rid),
-        )
-        if parent:
-            pid, ods, ode = parent
-            cur.execute(
-                "UPDATE rezervari SET data_start=?, data_end=? WHERE loc_id=? AND data_start=? AND data_end=? AND suma=0",
-                (start.isoformat(), end.isoformat(), pid, ods, ode),
+        try:
+            conflicts = find_conflicts(
+                [loc_id], start, end, exclude=[rid], for_update=True, cur=cur
             )
-        conn.commit()
-        update_statusuri_din_rezervari()
+            if not conflicts:
+                cur.execute(
+                    "UPDATE rezervari SET data_start=?, data_end=?, suma=? WHERE id=?",
+                    (start.isoformat(), end.isoformat(), fee_val, rid),
+                )
+                if parent:
+                    pid, ods, ode = parent
+                    cur.execute(
+                        "UPDATE rezervari SET data_start=?, data_end=? WHERE loc_id=? AND data_start=? AND data_end=? AND suma=0",
+                        (start.isoformat(), end.isoformat(), pid, ods, ode),
+                    )
+        except Exception:
+            conn.rollback()
+            raise
+        if conflicts:
+            conn.rollback()
+            messagebox.showerror(
+                "Perioadă ocupată",
+                "Locația este deja rezervată sau închiriată în intervalul ales.",
+            )
+            return
+        conn.commit(loc_ids=[loc_id] + ([parent[0]] if parent else []))
         load_cb()
         win.destroy()
 
@@ -984,16 +869,13 @@ def open_release_window(root, loc_id, load_cb, user):
     trei zile pentru a nu aglomera dialogul cu închirieri vechi.
     """
     cur = conn.cursor()
-    cutoff = (datetime.date.today() - datetime.timedelta(days=3)).isoformat()
-    rows = cur.execute(
-        """
-        SELECT id, client, data_start, data_end
-          FROM rezervari
-         WHERE loc_id=? AND suma IS NOT NULL AND data_end>=?
-         ORDER BY data_start
-        """,
-        (loc_id, cutoff),
-    ).fetchall()
+    cutoff = datetime.date.today() - datetime.timedelta(days=3)
+    rows = [
+        (b.id, b.client, b.data_start, b.data_end)
+        for b in get_bookings_index().overlapping(
+            loc_id, cutoff, datetime.date.max, rented=True
+        )
+    ]
 
     if not rows:
         messagebox.showinfo(
@@ -1040,8 +922,9 @@ def open_release_window(root, loc_id, load_cb, user):
                     (parent_id[0], ds, de),
                 )
                 cur.execute("DELETE FROM locatii WHERE id=?", (loc_id,))
-            conn.commit()
-            update_statusuri_din_rezervari()
+            conn.commit(
+                loc_ids=[loc_id] + ([parent_id[0]] if parent_id and parent_id[0] else [])
+            )
             load_cb()
             win.destroy()
         else:
@@ -1267,120 +1150,9 @@ def open_manage_decor_window(root, loc_id=None, load_cb=None):
 def export_available_excel(
     grup_filter, status_filter, search_term, ignore_dates, start_date, end_date
 ):
-    import datetime
-    import pandas as pd
     from tkinter import messagebox, filedialog
-    from db import read_sql_query, cursor
-
-    # 1) Construim WHERE identic cu load_locations()
-    cond, params = [], []
-    if grup_filter and grup_filter != "Toate":
-        cond.append("grup = ?")
-        params.append(grup_filter)
-    if status_filter and status_filter != "Toate":
-        cond.append("status = ?")
-        params.append(status_filter)
-    if search_term:
-        cond.append("(city LIKE ? OR county LIKE ? OR address LIKE ?)")
-        params += [f"%{search_term}%"] * 3
-    # Availability is determined separately using the ``rezervari`` table so
-    # we don't filter on the current ``data_start``/``data_end`` columns here.
-
-    where = ("WHERE " + " AND ".join(cond)) if cond else ""
-    sql = f"""
-        SELECT
-          id,
-          city, county, address, type,
-          gps, photo_link,
-          size, sqm, illumination,
-          ratecard, decoration_cost,
-          data_start, data_end,
-          grup, status
-        FROM locatii
-        {where}
-        ORDER BY grup, city, id
-    """
+    from UI.jobs_panel import run_report
 
-    # 2) Citim datele
-    df = read_sql_query(sql, params=params, parse_dates=["data_start", "data_end"])
-    if df.empty:
-        messagebox.showinfo(
-            "Export Excel", "Nu există locații pentru criteriile alese."
-        )
-        return
-
-    # 3) Preluăm rezervările relevante pentru calculul disponibilității
-    reservations_by_loc: dict[int, list[tuple[datetime.date, datetime.date]]] = {}
-    if not ignore_dates:
-        rows_res = cursor.execute(
-            "SELECT loc_id, data_start, data_end FROM rezervari "
-            "WHERE NOT (data_end < ? OR data_start > ?) ORDER BY data_start",
-            (start_date.isoformat(), end_date.isoformat()),
-        ).fetchall()
-        for loc_id_r, ds, de in rows_res:
-            reservations_by_loc.setdefault(loc_id_r, []).append(
-                (datetime.date.fromisoformat(ds), datetime.date.fromisoformat(de))
-            )
-
-    # 4) Calculăm mesajul de Availability
-    today = datetime.datetime.now().date()
-
-    def avail_msg(r):
-        loc_id = r["id"]
-        ds, de = r["data_start"], r["data_end"]
-        if ignore_dates:
-            if pd.notna(ds) and ds.date() > today:
-                until = (ds.date() - datetime.timedelta(days=1)).strftime("%d.%m.%Y")
-                return f"Disponibil până la {until}"
-            if pd.notna(de) and de.date() >= today:
-                frm = (de.date() + datetime.timedelta(days=1)).strftime("%d.%m.%Y")
-                return f"Disponibil din {frm}"
-            if r["status"] != "Disponibil" and pd.notna(de) and de.date() < today:
-                frm = (de.date() + datetime.timedelta(days=1)).strftime("%d.%m.%Y")
-                return f"Disponibil din {frm}"
-            return "Disponibil"
-        else:
-
-            periods = reservations_by_loc.get(loc_id, [])
-            if not periods:
-                return "Disponibil"
-            overl = [(s, e) for s, e in periods if not (e < start_date or s > end_date)]
-            if not overl:
-                return "Disponibil"
-            first_ds = overl[0][0]
-            if first_ds > start_date:
-                until = (first_ds - datetime.timedelta(days=1)).strftime("%d.%m.%Y")
-                return f"Disponibil până la {until}"
-            last_de = overl[-1][1]
-            if last_de < end_date:
-                frm = (last_de + datetime.timedelta(days=1)).strftime("%d.%m.%Y")
-                return f"Disponibil din {frm}"
-            return ""
-
-
-    df["Availability"] = df.apply(avail_msg, axis=1)
-    if not ignore_dates:
-        df = df[df["Availability"] != ""].copy()
-
-    df.drop(columns=["id"], inplace=True)
-
-    # 4) Coloane de export
-    write_cols = [
-        "city",
-        "county",
-        "address",
-        "type",
-        "gps",
-        "photo_link",
-        "size",
-        "sqm",
-        "illumination",
-        "ratecard",
-        "decoration_cost",
-        "Availability",
-    ]
-
-    # 5) Alege fișierul de salvat
     fp = filedialog.asksaveasfilename(
         defaultextension=".xlsx",
         filetypes=[("Excel files", "*.xlsx")],
@@ -1389,156 +1161,31 @@ def export_available_excel(
     if not fp:
         return
 
-    # 6) Scriem Excel: câte o foaie per grup
-    with pd.ExcelWriter(fp, engine="xlsxwriter") as writer:
-        wb = writer.book
-        center_fmt = wb.add_format(
-            {"align": "center", "valign": "vcenter", "border": 1}
-        )
-        money_fmt = wb.add_format(
-            {
-                "num_format": "€#,##0.00",
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-        link_fmt = wb.add_format(
-            {
-                "font_color": "blue",
-                "underline": True,
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-        title_fmt = wb.add_format(
-            {"bold": True, "font_size": 14, "align": "center", "valign": "vcenter"}
-        )
-        hdr_fmt = wb.add_format(
-            {
-                "bold": True,
-                "bg_color": "#4F81BD",
-                "font_color": "white",
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-
-        for grup, sub in df.groupby("grup"):
-            grp_name = (grup or "").strip() or "FaraGrup"
-            sheet = grp_name[:31]
-            title = f"Locații {grp_name}"
-
-            sub_df = sub.loc[:, write_cols].copy()
-            sub_df.columns = [
-                "City",
-                "County",
-                "Address",
-                "Type",
-                "GPS",
-                "Photo Link",
-                "Size",
-                "SQM",
-                "Illum",
-                "Rate Card",
-                "Installation & Removal",
-                "Availability",
-            ]
-            sub_df.insert(0, "Nr", range(1, len(sub_df) + 1))
-
-            startrow = 1
-            ws = writer.book.add_worksheet(sheet)
-            writer.sheets[sheet] = ws
-
-            last_col = len(sub_df.columns) - 1
-            ws.merge_range(0, 0, 0, last_col, title, title_fmt)
-
-            for col_idx, name in enumerate(sub_df.columns):
-                ws.write(startrow, col_idx, name, hdr_fmt)
-
-            for row_idx, row in enumerate(
-                sub_df.itertuples(index=False), start=startrow + 1
-            ):
-                for col_idx, value in enumerate(row):
-                    col_name = sub_df.columns[col_idx]
-                    if pd.isna(value):
-                        value = ""
-                    if col_name in ("Rate Card", "Installation & Removal"):
-                        fmt = money_fmt
-                    else:
-                        fmt = center_fmt
-                    ws.write(row_idx, col_idx, value, fmt)
-
-            for idx, col_name in enumerate(sub_df.columns):
-                if col_name in ("Rate Card", "Installation & Removal"):
-                    vals = pd.to_numeric(sub_df[col_name], errors="coerce").fillna(0)
-                    formatted = [f"€{v:,.2f}" for v in vals]
-                    max_len = max(len(col_name), *(len(v) for v in formatted))
-                elif col_name == "GPS":
-                    max_len = max(len(col_name), len("Maps"))
-                elif col_name == "Photo Link":
-                    max_len = max(len(col_name), len("Photo"))
-                else:
-                    max_len = max(
-                        len(col_name), sub_df[col_name].astype(str).map(len).max()
-                    )
-                ws.set_column(idx, idx, max_len + 2)
-
-            gi = sub_df.columns.get_loc("GPS")
-            for r, coord in enumerate(sub["gps"], start=startrow + 1):
-                if coord:
-                    url = f"https://www.google.com/maps/search/?api=1&query={coord}"
-                    ws.write_url(r, gi, url, link_fmt, string="Maps")
-
-            pi = sub_df.columns.get_loc("Photo Link")
-            for r, u in enumerate(sub["photo_link"], start=startrow + 1):
-                if u and u.strip():
-                    url = u.strip()
-                    if not url.lower().startswith(("http://", "https://")):
-                        url = "https://" + url
-                    ws.write_url(r, pi, url, link_fmt, string="Photo")
-                else:
-                    ws.write(r, pi, "", center_fmt)
-
-    messagebox.showinfo("Export Excel", f"Am salvat locațiile în:\n{fp}")
+    run_report(
+        "Export disponibil",
+        "reports.availability:export_available",
+        {
+            "path": fp,
+            "grup_filter": grup_filter,
+            "status_filter": status_filter,
+            "search_term": search_term,
+            "ignore_dates": ignore_dates,
+            "start_date": start_date,
+            "end_date": end_date,
+        },
+        lambda job: messagebox.showinfo("Export Excel", f"Am salvat locațiile în:\n{fp}"),
+    )
 
 
 def export_sales_report():
     """Exportă un raport structurat pe luni cu informații despre vânzări."""
-    import pandas as pd
-    import datetime
     from tkinter import messagebox, filedialog
-    from db import read_sql_query, update_statusuri_din_rezervari
-
-    update_statusuri_din_rezervari()
+    from UI.jobs_panel import run_report
 
     year = choose_report_year()
     if year is None:
         return
 
-    df_loc_all = read_sql_query(
-        """
-        SELECT id, city, county, address, type, size, sqm, illumination,
-               ratecard, pret_vanzare, grup, status, is_mobile, parent_id
-          FROM locatii
-         ORDER BY county, city, id
-        """,
-    )
-    # ``df_loc`` is used for the monthly sheets where the base record for mobile
-    # prisms would only duplicate the actual rented units.  Keep the full
-    # dataframe separate so the "Total" sheet can include mobile bases as well.
-    df_loc = df_loc_all[
-        ~((df_loc_all["is_mobile"] == 1) & (df_loc_all["parent_id"].isna()))
-    ]
-
-    df_total_base = df_loc_all[df_loc_all["parent_id"].isna()].copy()
-
-    if df_loc.empty:
-        messagebox.showinfo("Export Excel", "Nu există locații în baza de date.")
-        return
-
     path = filedialog.asksaveasfilename(
         defaultextension=".xlsx",
         filetypes=[("Excel", "*.xlsx")],
@@ -1547,652 +1194,23 @@ def export_sales_report():
     if not path:
         return
 
-    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
-        wb = writer.book
-        stats_ranges = {}
-        hdr_fmt = wb.add_format(
-            {
-                "bold": True,
-                "bg_color": "#4F81BD",
-                "font_color": "white",
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-        text_fmt = wb.add_format({"align": "center", "valign": "vcenter", "border": 1})
-        money_fmt = wb.add_format(
-            {
-                "num_format": "€#,##0.00",
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-        sold_text_fmt = wb.add_format(
-            {"align": "center", "valign": "vcenter", "border": 1, "bg_color": "#D9E1F2"}
-        )
-        sold_money_fmt = wb.add_format(
-            {
-                "num_format": "€#,##0.00",
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-                "bg_color": "#D9E1F2",
-            }
-        )
-        percent_fmt = wb.add_format(
-            {"num_format": "0.00%", "align": "center", "valign": "vcenter", "border": 1}
-        )
-
-        stat_lbl_fmt = wb.add_format(
-            {
-                "bold": True,
-                "bg_color": "white",
-                "font_size": 14,
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-        stat_money_fmt = wb.add_format(
-            {
-                "num_format": "€#,##0.00",
-                "bold": True,
-                "bg_color": "white",
-                "font_size": 14,
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-        stat_money_pos_fmt = wb.add_format(
-            {
-                "num_format": "€#,##0.00",
-                "bold": True,
-                "bg_color": "white",
-                "font_size": 14,
-                "font_color": "green",
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-        stat_money_neg_fmt = wb.add_format(
-            {
-                "num_format": "€#,##0.00",
-                "bold": True,
-                "bg_color": "white",
-                "font_size": 14,
-                "font_color": "red",
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-        stat_percent_fmt = wb.add_format(
-            {
-                "num_format": "0.00%",
-                "bold": True,
-                "bg_color": "white",
-                "font_size": 14,
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-        stat_int_fmt = wb.add_format(
-            {
-                "bold": True,
-                "bg_color": "white",
-                "font_size": 14,
-                "align": "center",
-                "valign": "vcenter",
-                "border": 1,
-            }
-        )
-
-        money_cols = {
-            "Ratecard/month",
-            "PRET DE VANZARE",
-            "PRET DE INCHIRIERE",
-            "SUMĂ AN",
-        }
-
-        def write_sheet(name, df_sheet):
-            df_sheet = df_sheet.copy()
-            df_sheet["data_start"] = pd.to_datetime(df_sheet["data_start"], errors="coerce")
-            df_sheet["data_end"] = pd.to_datetime(df_sheet["data_end"], errors="coerce")
-            df_sheet["Perioada"] = ""
-            mask = df_sheet["data_start"].notna() & df_sheet["data_end"].notna()
-            if mask.any():
-                df_sheet.loc[mask, "Perioada"] = (
-                    df_sheet.loc[mask, "data_start"].dt.strftime("%d.%m.%Y")
-                    + " → "
-                    + df_sheet.loc[mask, "data_end"].dt.strftime("%d.%m.%Y")
-                )
-            df_sheet = df_sheet[
-                [
-                    "city",
-                    "county",
-                    "address",
-                    "type",
-                    "size",
-                    "sqm",
-                    "illumination",
-                    "ratecard",
-                    "pret_vanzare",
-                    "suma",
-                    "client",
-                    "Perioada",
-                    "status",
-                ]
-            ]
-            df_sheet.columns = [
-                "City",
-                "County",
-                "Address",
-                "Type",
-                "Size",
-                "SQM",
-                "Illum",
-                "Ratecard/month",
-                "PRET DE VANZARE",
-                "PRET DE INCHIRIERE",
-                "Client",
-                "Perioada",
-                "status",
-            ]
-            df_sheet.insert(0, "Nr", range(1, len(df_sheet) + 1))
-
-            ws = wb.add_worksheet(name)
-            writer.sheets[name] = ws
-
-            for col_idx, col_name in enumerate(df_sheet.columns[:-1]):
-                ws.write(0, col_idx, col_name, hdr_fmt)
-
-            for row_idx, row in enumerate(df_sheet.itertuples(index=False), start=1):
-                sold = row.status == "Închiriat"
-                for col_idx, value in enumerate(row[:-1]):
-                    col_name = df_sheet.columns[col_idx]
-                    if pd.isna(value):
-                        value = ""
-                    if col_name in money_cols:
-                        fmt = sold_money_fmt if sold else money_fmt
-                    else:
-                        fmt = sold_text_fmt if sold else text_fmt
-                    ws.write(row_idx, col_idx, value, fmt)
-
-            for idx, col_name in enumerate(df_sheet.columns[:-1]):
-                if col_name in money_cols:
-                    vals = pd.to_numeric(df_sheet[col_name], errors="coerce").fillna(0)
-                    formatted = [f"€{v:,.2f}" for v in vals]
-                    max_len = max(len(col_name), *(len(v) for v in formatted))
-                else:
-                    max_len = max(
-                        len(col_name), df_sheet[col_name].astype(str).map(len).max()
-                    )
-                ws.set_column(idx, idx, max_len + 2)
-
-            sold_mask = df_sheet["status"] == "Închiriat"
-            pct_sold = sold_mask.mean()
-            pct_free = 1 - pct_sold
-            count_sold = int(sold_mask.sum())
-            count_free = int(len(df_sheet) - count_sold)
-            sale_total = (
-                pd.to_numeric(df_sheet["PRET DE VANZARE"], errors="coerce")
-                .fillna(0)
-                .sum()
-            )
-            sold_income = (
-                pd.to_numeric(
-                    df_sheet.loc[sold_mask, "PRET DE INCHIRIERE"], errors="coerce"
-                )
-                .fillna(0)
-                .sum()
-            )
-            # Value of the unsold locations based on their sale price
-            sale_free = (
-                pd.to_numeric(
-                    df_sheet.loc[~sold_mask, "PRET DE VANZARE"], errors="coerce"
-                )
-                .fillna(0)
-                .sum()
-            )
-
-            # shift the monthly totals block one column to the left by
-            # ignoring the final "status" column when computing the end index
-            stats_end = len(df_sheet.columns) - 2
-            value_col = max(stats_end - 2, 0)
-            merge_end = value_col - 1
-            merge_start = max(merge_end - 3, 0)
-            start = len(df_sheet) + 2
-            ws.merge_range(start, merge_start, start, merge_end, "Locații vândute", stat_lbl_fmt)
-            ws.merge_range(
-                start,
-                value_col,
-                start,
-                stats_end,
-                f"{count_sold} ({pct_sold:.2%})",
-                stat_int_fmt,
-            )
-            ws.merge_range(
-                start + 1, merge_start, start + 1, merge_end, "Locații nevândute", stat_lbl_fmt
-            )
-            ws.merge_range(
-                start + 1,
-                value_col,
-                start + 1,
-                stats_end,
-                f"{count_free} ({pct_free:.2%})",
-                stat_int_fmt,
-            )
-            ws.merge_range(
-                start + 2, merge_start, start + 2, merge_end, "Preț vânzare total", stat_lbl_fmt
-            )
-            ws.merge_range(
-                start + 2,
-                value_col,
-                start + 2,
-                stats_end,
-                sale_total,
-                stat_money_fmt,
-            )
-            pct_sale_sold = sold_income / sale_total if sale_total else 0
-            pct_sale_free = sale_free / sale_total if sale_total else 0
-            ws.merge_range(
-                start + 3, merge_start, start + 3, merge_end, "Sumă locații vândute", stat_lbl_fmt
-            )
-            ws.merge_range(
-                start + 3,
-                value_col,
-                start + 3,
-                stats_end,
-                f"€{sold_income:,.2f} ({pct_sale_sold:.2%})",
-                stat_money_pos_fmt,
-            )
-            ws.merge_range(
-                start + 4,
-                merge_start,
-                start + 4,
-                merge_end,
-                "Sumă locații nevândute",
-                stat_lbl_fmt,
-            )
-            ws.merge_range(
-                start + 4,
-                value_col,
-                start + 4,
-                stats_end,
-                f"€{sale_free:,.2f} ({pct_sale_free:.2%})",
-                stat_money_neg_fmt,
-            )
-            stats_ranges[name] = (start, start + 4, merge_start, stats_end)
-            # The "Raport sume vândute/nevândute" statistic is no longer shown
-            # in the monthly sheets as it was not considered relevant.
-
-        year_start = datetime.date(year, 1, 1)
-        year_end = datetime.date(year, 12, 31)
-        df_rez = read_sql_query(
-            """
-            SELECT l.id, l.grup, l.city, l.county, l.address, l.type, l.size, l.sqm, l.illumination,
-                   l.ratecard, l.pret_vanzare, l.is_mobile, l.parent_id,
-                   r.client, r.data_start, r.data_end, r.suma
-              FROM rezervari r
-              JOIN locatii l ON r.loc_id = l.id
-             WHERE r.suma IS NOT NULL AND r.suma > 0
-               AND NOT (r.data_end < ? OR r.data_start > ?)
-             ORDER BY r.data_start
-            """,
-            params=[year_start.isoformat(), year_end.isoformat()],
-            parse_dates=["data_start", "data_end"],
-        )
-        df_rez = df_rez[~((df_rez["is_mobile"] == 1) & (df_rez["parent_id"].isna()))]
-
-        df_all = df_loc[
-            [
-                "id",
-                "city",
-                "county",
-                "address",
-                "type",
-                "size",
-                "sqm",
-                "illumination",
-                "ratecard",
-                "pret_vanzare",
-                "grup",
-                "status",
-                "is_mobile",
-                "parent_id",
-            ]
-        ].copy()
-        df_base = df_total_base.copy()
-
-        # Calculăm numărul total de zile vândute și valoarea reală pentru fiecare locație
-        import calendar
-
-        records = []
-        for row in df_rez.itertuples(index=False):
-            base_id = row.parent_id if pd.notna(row.parent_id) else row.id
-            start = max(row.data_start.date(), year_start)
-            end = min(row.data_end.date(), year_end)
-            cur = start
-            while cur <= end:
-                dim = calendar.monthrange(cur.year, cur.month)[1]
-                month_end = datetime.date(cur.year, cur.month, dim)
-                ov_end = min(end, month_end)
-                days = (ov_end - cur).days + 1
-                frac = days / dim
-                records.append(
-                    {
-                        "id": base_id,
-                        "days": days,
-                        "months": frac,
-                        "val_real": row.suma * frac,
-                    }
-                )
-                cur = ov_end + datetime.timedelta(days=1)
-
-        df_rec = pd.DataFrame(records)
-        if df_rec.empty:
-            df_rec = pd.DataFrame(columns=["id", "days", "months", "val_real"])
-        agg = df_rec.groupby("id").agg(
-            {"days": "sum", "months": "sum", "val_real": "sum"}
-        )
-
-        parent_ids = df_rez["parent_id"].fillna(df_rez["id"]).astype("Int64")
-        units_sold = df_rez.groupby(parent_ids)["id"].nunique()
-
-        # Sheet summarizing the entire year
-        df_total = df_base.copy()
-        df_total["Sold Days"] = df_total["id"].map(agg["days"]).fillna(0)
-        df_total["Sold Months"] = df_total["id"].map(agg["months"]).fillna(0)
-        df_total["Units Sold"] = (
-            df_total["id"].map(units_sold).fillna(0).astype(int)
-        )
-        df_total["pret_vanzare"] = pd.to_numeric(
-            df_total["pret_vanzare"], errors="coerce"
-        ).fillna(0)
-        df_total["Total Sum"] = df_total["id"].map(agg["val_real"]).fillna(0)
-        mob_mask = df_total["is_mobile"] == 1
-        df_total.loc[mob_mask & (df_total["Units Sold"] > 0), "address"] = (
-            df_total.loc[mob_mask & (df_total["Units Sold"] > 0), "address"]
-            + " "
-            + df_total.loc[mob_mask & (df_total["Units Sold"] > 0), "Units Sold"].astype(str)
-            + "X"
-        )
-        df_total = df_total.drop(columns="Units Sold")
-        df_total["% Year Sold"] = df_total.apply(
-            lambda r: (
-                r["Sold Months"] / (20 * 12)
-                if r["is_mobile"]
-                else (r["Sold Months"] / 12)
-            ),
-            axis=1,
-        )
-        grp_order = (
-            df_total.groupby("grup")["pret_vanzare"]
-            .max()
-            .sort_values(ascending=False)
-            .index
-        )
-        order_map = {g: i for i, g in enumerate(grp_order)}
-        df_total["__grp"] = df_total["grup"].map(order_map)
-        df_total = df_total.sort_values(
-            ["__grp", "pret_vanzare"], ascending=[True, False]
-        ).drop(columns="__grp")
-
-        def write_total_sheet(df_sheet):
-            df_sheet = df_sheet[
-                [
-                    "city",
-                    "county",
-                    "address",
-                    "type",
-                    "size",
-                    "sqm",
-                    "illumination",
-                    "ratecard",
-                    "pret_vanzare",
-                    "Sold Months",
-                    "% Year Sold",
-                    "Total Sum",
-                ]
-            ].copy()
-            df_sheet.columns = [
-                "City",
-                "County",
-                "Address",
-                "Type",
-                "Size",
-                "SQM",
-                "Illum",
-                "Ratecard/month",
-                "PRET DE VANZARE",
-                "Luni vândută",
-                "% An vândut",
-                "SUMĂ AN",
-            ]
-            df_sheet.insert(0, "Nr", range(1, len(df_sheet) + 1))
-            ws = wb.add_worksheet("Total")
-            writer.sheets["Total"] = ws
-            for col_idx, col_name in enumerate(df_sheet.columns):
-                ws.write(0, col_idx, col_name, hdr_fmt)
-            for row_idx, row in enumerate(df_sheet.itertuples(index=False), start=1):
-                for col_idx, value in enumerate(row):
-                    col_name = df_sheet.columns[col_idx]
-                    if col_name in {"PRET DE VANZARE", "SUMĂ AN"}:
-                        fmt = money_fmt
-                    else:
-                        fmt = text_fmt
-                    if col_name == "% An vândut":
-                        ws.write(row_idx, col_idx, value, percent_fmt)
-                    else:
-                        ws.write(row_idx, col_idx, value, fmt)
-            for idx, col in enumerate(df_sheet.columns):
-                if col in {"PRET DE VANZARE", "SUMĂ AN"}:
-                    vals = pd.to_numeric(df_sheet[col], errors="coerce").fillna(0)
-                    formatted = [f"€{v:,.2f}" for v in vals]
-                    width = max(len(col), *(len(v) for v in formatted)) + 2
-                else:
-                    width = max(len(col), df_sheet[col].astype(str).map(len).max()) + 2
-                ws.set_column(idx, idx, width)
-            pct_months_sold = (
-                pd.to_numeric(df_sheet["Luni vândută"], errors="coerce").fillna(0).sum()
-                / (len(df_sheet) * 12)
-            )
-            pct_months_free = 1 - pct_months_sold
-            sale_total = (
-                pd.to_numeric(df_sheet["PRET DE VANZARE"], errors="coerce").fillna(0) * 12
-            ).sum()
-            sold_income = (
-                pd.to_numeric(df_sheet["SUMĂ AN"], errors="coerce").fillna(0).sum()
-            )
-            sale_free = sale_total - sold_income
-            pct_sale_sold = sold_income / sale_total if sale_total else 0
-            pct_sale_free = sale_free / sale_total if sale_total else 0
-
-            stats_end = len(df_sheet.columns) - 1
-            value_col = max(stats_end - 2, 0)
-            merge_end = value_col - 1
-            merge_start = max(merge_end - 3, 0)
-            start = len(df_sheet) + 2
-            ws.merge_range(
-                start,
-                merge_start,
-                start,
-                merge_end,
-                f"Locații vândute în anul {year}",
-                stat_lbl_fmt,
-            )
-            ws.merge_range(
-                start,
-                value_col,
-                start,
-                stats_end,
-                pct_months_sold,
-                stat_percent_fmt,
-            )
-            ws.merge_range(
-                start + 1, merge_start, start + 1, merge_end, "Locații nevândute", stat_lbl_fmt
-            )
-            ws.merge_range(
-                start + 1,
-                value_col,
-                start + 1,
-                stats_end,
-                pct_months_free,
-                stat_percent_fmt,
-            )
-            ws.merge_range(
-                start + 2, merge_start, start + 2, merge_end, "Preț vânzare total", stat_lbl_fmt
-            )
-            ws.merge_range(
-                start + 2,
-                value_col,
-                start + 2,
-                stats_end,
-                sale_total,
-                stat_money_fmt,
-            )
-            ws.merge_range(
-                start + 3, merge_start, start + 3, merge_end, "Sumă locații vândute", stat_lbl_fmt
-            )
-            ws.merge_range(
-                start + 3,
-                value_col,
-                start + 3,
-                stats_end,
-                f"€{sold_income:,.2f} ({pct_sale_sold:.2%})",
-                stat_money_pos_fmt,
-            )
-            ws.merge_range(
-                start + 4, merge_start, start + 4, merge_end, "Sumă locații nevândute", stat_lbl_fmt
-            )
-            ws.merge_range(
-                start + 4,
-                value_col,
-                start + 4,
-                stats_end,
-                f"€{sale_free:,.2f} ({pct_sale_free:.2%})",
-                stat_money_neg_fmt,
-            )
-            stats_ranges["Total"] = (start, start + 4, merge_start, stats_end)
-
-        write_total_sheet(df_total)
-
-        for month in range(1, 13):
-            start_m = pd.Timestamp(year, month, 1)
-            end_m = start_m + pd.offsets.MonthEnd(0)
-            mask = (df_rez["data_end"] >= start_m) & (df_rez["data_start"] <= end_m)
-            sub = df_rez.loc[mask].copy()
-            if not sub.empty:
-                mdays = calendar.monthrange(start_m.year, start_m.month)[1]
-                sub["overlap_start"] = sub["data_start"].clip(lower=start_m)
-                sub["overlap_end"] = sub["data_end"].clip(upper=end_m)
-                sub["suma"] = sub.apply(
-                    lambda r: r.suma
-                    * ((r.overlap_end - r.overlap_start).days + 1)
-                    / mdays,
-                    axis=1,
-                )
-                grouped = (
-                    sub.groupby("id")
-                    .agg(
-                        {
-                            "client": "first",
-                            "overlap_start": "min",
-                            "overlap_end": "max",
-                            "suma": "sum",
-                        }
-                    )
-                    .reset_index()
-                    .rename(
-                        columns={
-                            "overlap_start": "data_start",
-                            "overlap_end": "data_end",
-                        }
-                    )
-                )
-            else:
-                grouped = pd.DataFrame(
-                    columns=["id", "client", "data_start", "data_end", "suma"]
-                )
-            df_month = df_all.merge(grouped, on="id", how="left")
-            df_month["status"] = df_month["client"].apply(
-                lambda x: "Închiriat" if pd.notna(x) else "Disponibil"
-            )
-            df_month["pret_vanzare"] = pd.to_numeric(
-                df_month["pret_vanzare"], errors="coerce"
-            ).fillna(0)
-            grp_order = (
-                df_month.groupby("grup")["pret_vanzare"]
-                .max()
-                .sort_values(ascending=False)
-                .index
-            )
-            order_map = {g: i for i, g in enumerate(grp_order)}
-            df_month["__grp"] = df_month["grup"].map(order_map)
-            df_month = df_month.sort_values(
-                ["__grp", "pret_vanzare"], ascending=[True, False]
-            ).drop(columns="__grp")
-            name = start_m.strftime("%B")
-            write_sheet(name, df_month)
-
-    from openpyxl import load_workbook
-    from openpyxl.styles import Border, Side
-
-    wb = load_workbook(path)
-    thin = Side(style="thin")
-    thick = Side(style="thick")
-    for sheet_name, (r1, r2, c1, c2) in stats_ranges.items():
-        ws = wb[sheet_name]
-        start_row, end_row = r1 + 1, r2 + 1
-        start_col, end_col = c1 + 1, c2 + 1
-        for r in range(start_row, end_row + 1):
-            for c in range(start_col, end_col + 1):
-                cell = ws.cell(row=r, column=c)
-                border = cell.border
-                left = thick if c == start_col else border.left
-                right = thick if c == end_col else border.right
-                top = thick if r == start_row else border.top
-                bottom = thick if r == end_row else border.bottom
-                cell.border = Border(left=left, right=right, top=top, bottom=bottom)
-    wb.save(path)
-
-    messagebox.showinfo("Export Excel", f"Raport salvat:\n{path}")
+    run_report(
+        f"Raport vânzări {year}",
+        "reports.sales:export_sales",
+        {"year": year, "path": path},
+        lambda job: messagebox.showinfo("Export Excel", f"Raport salvat:\n{path}"),
+    )
 
 
 def export_decor_report():
     """Export a simple Excel report with all decorations for a year."""
-    import pandas as pd
     from tkinter import filedialog, messagebox
-    from db import read_sql_query
+    from UI.jobs_panel import run_report
 
     year = choose_report_year()
     if year is None:
         return
 
-    start = f"{year}-01-01"
-    end = f"{year}-12-31"
-    df = read_sql_query(
-        """
-        SELECT d.data, l.city, l.county, l.address, l.code,
-               d.decor_cost, d.prod_cost, d.created_by
-          FROM decorari d
-          JOIN locatii l ON d.loc_id = l.id
-         WHERE d.data BETWEEN ? AND ?
-         ORDER BY d.data
-        """,
-        params=[start, end],
-        parse_dates=["data"],
-    )
-
-    if df.empty:
-        messagebox.showinfo("Raport", "Nu există decorări pentru anul selectat.")
-        return
-
     path = filedialog.asksaveasfilename(
         defaultextension=".xlsx",
         filetypes=[("Excel", "*.xlsx")],
@@ -2201,23 +1219,12 @@ def export_decor_report():
     if not path:
         return
 
-    df.rename(
-        columns={
-            "data": "Data",
-            "city": "Oraș",
-            "county": "Județ",
-            "address": "Adresă",
-            "code": "Cod",
-            "decor_cost": "Cost Decor",
-            "prod_cost": "Cost Producție",
-            "created_by": "Adăugat de",
-        },
-        inplace=True,
+    run_report(
+        f"Raport decorări {year}",
+        "reports.decor:export_decor",
+        {"year": year, "path": path},
+        lambda job: messagebox.showinfo("Raport", f"Raport salvat:\n{path}"),
     )
-    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="Decorări")
-
-    messagebox.showinfo("Raport", f"Raport salvat:\n{path}")
 
 
 def open_offer_window(tree):
@@ -2226,6 +1233,7 @@ def open_offer_window(tree):
     import tkinter as tk
     from tkinter import ttk, messagebox, filedialog
     from db import read_sql_query
+    from reports.excel import Column, ExcelExport
 
     # 1. Preluare selecție
     sel = tree.selection()
@@ -2275,6 +1283,13 @@ def open_offer_window(tree):
     )
     chk_personal.grid(row=4, column=0, columnspan=2, pady=5)
 
+    # 2d. Locațiile din jurul celor selectate
+    ttk.Label(win, text="Include locațiile pe o rază de (km):").grid(
+        row=5, column=0, sticky="e", padx=5, pady=3
+    )
+    entry_radius = ttk.Entry(win, width=10)
+    entry_radius.grid(row=5, column=1, sticky="w", padx=5, pady=3)
+
     def export():
         # 3. Validare input
         try:
@@ -2284,16 +1299,22 @@ def open_offer_window(tree):
         except ValueError:
             messagebox.showerror("Date invalide", "Introdu valori numerice valide.")
             return
+        try:
+            radius = float(entry_radius.get().replace(",", ".") or 0)
+        except ValueError:
+            messagebox.showerror("Date invalide", "Raza trebuie să fie un număr (km).")
+            return
+        offer_ids = nearby_ids(ids, radius) if radius > 0 else ids
 
         # 4. Citire date din DB (adăugăm address + pret_vanzare)
         sql = (
             f"SELECT id, city, county, address, gps, code, photo_link, sqm, type, "
             f"ratecard, pret_vanzare, data_start, data_end, is_mobile, parent_id "
-            f"FROM locatii WHERE id IN ({','.join(['?']*len(ids))})"
+            f"FROM locatii WHERE id IN ({','.join(['?']*len(offer_ids))})"
         )
         df = read_sql_query(
             sql,
-            params=ids,
+            params=offer_ids,
             parse_dates=["data_start", "data_end"],
         )
 
@@ -2349,118 +1370,27 @@ def open_offer_window(tree):
             if not fp:
                 return
 
-            with pd.ExcelWriter(fp, engine="xlsxwriter") as writer:
-                sheet = "Ofertă"
-                wb = writer.book
-                ws = wb.add_worksheet(sheet)
-                writer.sheets[sheet] = ws
-
-                title_fmt = wb.add_format(
-                    {
-                        "align": "center",
-                        "valign": "vcenter",
-                        "bold": True,
-                        "font_size": 14,
-                    }
-                )
-                hdr_fmt = wb.add_format(
-                    {
-                        "align": "center",
-                        "valign": "vcenter",
-                        "bold": True,
-                        "bg_color": "#4F81BD",
-                        "font_color": "white",
-                        "border": 1,
-                    }
-                )
-                txt_fmt = wb.add_format(
-                    {"align": "center", "valign": "vcenter", "border": 1}
-                )
-                money_fmt = wb.add_format(
-                    {
-                        "align": "center",
-                        "valign": "vcenter",
-                        "num_format": "€#,##0.00",
-                        "border": 1,
-                    }
-                )
-                link_fmt = wb.add_format(
-                    {
-                        "font_color": "blue",
-                        "underline": True,
-                        "align": "center",
-                        "valign": "vcenter",
-                        "border": 1,
-                    }
-                )
-                percent_fmt = wb.add_format(
-                    {
-                        "align": "center",
-                        "valign": "vcenter",
-                        "num_format": "0.00%",
-                        "border": 1,
-                    }
-                )
-
-                last_col = len(df_export.columns) - 1
-                ws.merge_range(0, 0, 0, last_col, "OFERTĂ PERSONALIZATĂ", title_fmt)
-
-                for col_idx, hdr in enumerate(df_export.columns):
-                    ws.write(1, col_idx, hdr, hdr_fmt)
-
-                money_cols = {
-                    "Base Price",
-                    "Final Price",
-                    "Installation & Removal",
-                    "Production",
-                }
-                percent_cols = {"% Discount"}
-
-                for row_idx, row in enumerate(
-                    df_export.itertuples(index=False), start=2
-                ):
-                    for col_idx, value in enumerate(row):
-                        col_name = df_export.columns[col_idx]
-                        if col_name in money_cols:
-                            fmt = money_fmt
-                        elif col_name in percent_cols:
-                            fmt = percent_fmt
-                        else:
-                            fmt = txt_fmt
-                        ws.write(row_idx, col_idx, value, fmt)
-
-                for idx, col in enumerate(df_export.columns):
-                    if col in money_cols:
-                        vals = pd.to_numeric(df_export[col], errors="coerce").fillna(0)
-                        width = max(len(col), *(len(f"€{v:,.2f}") for v in vals)) + 2
-                    elif col == "GPS":
-                        width = max(len(col), len("Maps")) + 2
-                    elif col == "Photo Link":
-                        width = max(len(col), len("Photo")) + 2
-                    else:
-                        width = (
-                            max(len(col), df_export[col].astype(str).map(len).max()) + 2
-                        )
-                    ws.set_column(idx, idx, width)
-
-                gps_idx = df_export.columns.get_loc("GPS")
-                for r, coord in enumerate(df_export["GPS"], start=2):
-                    if isinstance(coord, str) and coord.strip():
-                        ws.write_url(
-                            r,
-                            gps_idx,
-                            f"https://www.google.com/maps/search/?api=1&query={coord.strip()}",
-                            link_fmt,
-                            string="Maps",
-                        )
+            kinds = {
+                "Base Price": "money",
+                "Final Price": "money",
+                "Installation & Removal": "money",
+                "Production": "money",
+                "% Discount": "percent",
+            }
+            columns = []
+            for col in df_export.columns:
+                if col == "GPS":
+                    columns.append(Column(col, "maps", "Maps"))
+                elif col == "Photo Link":
+                    columns.append(Column(col, "url", "Photo"))
+                else:
+                    columns.append(Column(col, kinds.get(col, "text")))
 
-                photo_idx = df_export.columns.get_loc("Photo Link")
-                for r, url in enumerate(df_export["Photo Link"], start=2):
-                    if isinstance(url, str) and url.strip():
-                        link = url.strip()
-                        if not link.lower().startswith(("http://", "https://")):
-                            link = "https://" + link
-                        ws.write_url(r, photo_idx, link, link_fmt, string="Photo")
+            with ExcelExport(fp) as export:
+                sheet = export.add_sheet(
+                    "Ofertă", columns, title="OFERTĂ PERSONALIZATĂ"
+                )
+                sheet.write_frame(df_export)
 
             messagebox.showinfo("Succes", f"Fișierul a fost salvat:\n{fp}")
             win.destroy()
@@ -2576,7 +1506,7 @@ def open_offer_window(tree):
 
     # 9. Butonul de export (am mutat rândul la 5 pentru UI)
     ttk.Button(win, text="Generează Excel", command=export).grid(
-        row=5, column=0, columnspan=2, pady=10
+        row=6, column=0, columnspan=2, pady=10
     )
 
 
@@ -2863,553 +1793,58 @@ def open_client_detail(tree, event):
 
 
 
-def _write_backup_excel(rows, start_m: datetime.date, end_m: datetime.date, path: str) -> None:
-    """Write an Excel backup file using ``openpyxl``."""
-    from openpyxl import Workbook
-    from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
-
-    if not rows:
-        return
+def _backups_saved(job):
+    """Report the outcome of a backup job to the user."""
+    result = job.result
+    if result.failed:
+        details = "\n".join(f"{path}: {err}" for path, err in result.failed[:10])
+        total = len(result.failed) + len(result.written)
+        messagebox.showwarning(
+            "Export",
+            f"{len(result.failed)} din {total} backupuri nu au putut fi "
+            f"generate:\n{details}",
+        )
+    if result.written:
+        messagebox.showinfo(
+            "Export", f"Backupurile au fost salvate în:\n{result.location}"
+        )
 
-    days_in_month = (end_m - start_m).days + 1
-
-    data_rows = []
-    header_info = None
-    header_start = None
-    header_end = None
-    idx = 1
-    for (
-        client_name,
-        client_cui,
-        client_addr,
-        firma_name,
-        firma_cui,
-        firma_addr,
-        campaign,
-        city,
-        addr,
-        code,
-        face,
-        typ,
-        size,
-        sqm,
-        ds,
-        de,
-        price,
-        deco_cost_loc,
-        cid,
-        deco_r,
-        prod_r,
-    ) in rows:
-        ds_dt = datetime.date.fromisoformat(ds)
-        de_dt = datetime.date.fromisoformat(de)
-        if header_start is None or ds_dt < header_start:
-            header_start = ds_dt
-        if header_end is None or de_dt > header_end:
-            header_end = de_dt
-        if header_info is None:
-            header_info = (
-                firma_name,
-                firma_cui,
-                firma_addr,
-                client_name,
-                client_cui,
-                client_addr,
-                campaign,
-            )
-        ov_start = max(ds_dt, start_m)
-        ov_end = min(de_dt, end_m)
-        days = (ov_end - ov_start).days + 1
-        frac = days / days_in_month
-        amount = price * frac
-        deco = deco_r if deco_r is not None else (deco_cost_loc or 0.0)
-        try:
-            prod_default = round(float(sqm or 0) * 7, 2)
-        except Exception:
-            prod_default = 0.0
-        prod = prod_r if prod_r is not None else prod_default
-        data_rows.append([
-            idx,
-            city,
-            addr,
-            code,
-            face,
-            1,
-            typ,
-            size,
-            ov_start,
-            ov_end,
-            round(frac, 2),
-            "EUR",
-            price,
-            amount,
-            deco,
-            prod,
-        ])
-        idx += 1
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Backup"
-
-    dark_blue = PatternFill(fill_type="solid", fgColor="305496")
-    white_bold = Font(color="FFFFFF", bold=True)
-
-    if header_info:
-        f_name, f_cui, f_addr, c_name, c_cui, c_addr, camp = header_info
-    else:
-        f_name = f_cui = f_addr = c_name = c_cui = c_addr = camp = ""
-
-    ws.merge_cells("A1:P1")
-    title_cell = ws["A1"]
-    title_cell.value = f"BKP {f_name} x {c_name} - {camp or c_name} - {start_m:%B}"
-    title_cell.fill = dark_blue
-    title_cell.font = Font(color="FFFFFF", bold=True, size=14)
-    title_cell.alignment = Alignment(horizontal="center", vertical="center")
-
-    for r in range(2, 6):
-        for c in range(1, 17):
-            cell = ws.cell(row=r, column=c)
-            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    ws.merge_cells("A2:E2"); ws["A2"].value = f"Societatea care facturează: {f_name}"
-    ws.merge_cells("A3:E3"); ws["A3"].value = f"CUI: {f_cui}"
-    ws.merge_cells("A4:E4"); ws["A4"].value = f"Adresă: {f_addr}"
-
-    ws.merge_cells("F2:J2"); ws["F2"].value = f"Client: {c_name}"
-    ws.merge_cells("F3:J3"); ws["F3"].value = f"CUI client: {c_cui}"
-    ws.merge_cells("F4:J4"); ws["F4"].value = f"Adresă client: {c_addr}"
-
-    if header_start is None:
-        header_start = start_m
-    if header_end is None:
-        header_end = end_m
-    ws.merge_cells("K2:P2"); ws["K2"].value = f"Perioada campanie: {header_start:%d.%m.%Y} - {header_end:%d.%m.%Y}"
-    ws.merge_cells("K3:P3"); ws["K3"].value = f"Denumire campanie: {camp or c_name}"
-
-    headers = [
-        "Nr. Crt",
-        "Oraș",
-        "Adresă",
-        "Cod",
-        "Cod Față",
-        "Număr bucăți",
-        "Tip Suport",
-        "Dimensiune",
-        "Data Început",
-        "Data Sfârșit",
-        "Perioada (luni)",
-        "Valută",
-        "Preț chirie/lună",
-        "Chirie NET",
-        "Preț Decorare",
-        "Preț Producție",
-    ]
 
-    header_row = 5
-    for idx_col, header in enumerate(headers, start=1):
-        cell = ws.cell(row=header_row, column=idx_col, value=header)
-        cell.fill = PatternFill(fill_type="solid", fgColor="1F4E79")
-        cell.font = white_bold
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-
-    data_start = header_row + 1
-    currency_cols = {13, 14, 15, 16}
-    for r_off, row_vals in enumerate(data_rows):
-        r = data_start + r_off
-        for c_off, val in enumerate(row_vals, start=1):
-            cell = ws.cell(row=r, column=c_off, value=val)
-            if isinstance(val, datetime.date):
-                cell.number_format = "DD.MM.YYYY"
-                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            elif isinstance(val, (int, float)):
-                if c_off == 1:
-                    cell.number_format = "0"
-                elif c_off in currency_cols:
-                    cell.number_format = "\u20ac#,##0.00"
-                else:
-                    cell.number_format = "#,##0.00"
-                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            else:
-                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    last_data_row = data_start + len(data_rows) - 1
-    total_start = last_data_row + 1
-
-    # total lines for each cost column
-    deco_total = ws.cell(row=total_start, column=15, value=f"=SUM(O{data_start}:O{last_data_row})")
-    deco_total.font = Font(bold=True)
-    deco_total.number_format = "\u20ac#,##0.00"
-    deco_total.alignment = Alignment(horizontal="center", vertical="center")
-
-    prod_total = ws.cell(row=total_start, column=16, value=f"=SUM(P{data_start}:P{last_data_row})")
-    prod_total.font = Font(bold=True)
-    prod_total.number_format = "\u20ac#,##0.00"
-    prod_total.alignment = Alignment(horizontal="center", vertical="center")
-
-    chirie_total = ws.cell(row=total_start, column=14, value=f"=SUM(N{data_start}:N{last_data_row})")
-    chirie_total.font = Font(bold=True)
-    chirie_total.number_format = "\u20ac#,##0.00"
-    chirie_total.alignment = Alignment(horizontal="center", vertical="center")
-
-    grand_row = total_start + 1
-    # move the total label one column to the right so it sits next to the
-    # computed sum value
-    lbl = ws.cell(row=grand_row, column=15, value="Total")
-    # do not merge the label cell so it occupies a single box
-    lbl.font = Font(bold=True)
-    lbl.alignment = Alignment(horizontal="center", vertical="center")
-    val = ws.cell(
-        row=grand_row,
-        column=16,
-        value=f"=SUM(N{data_start}:N{last_data_row})+SUM(O{data_start}:O{last_data_row})+SUM(P{data_start}:P{last_data_row})",
-    )
-    val.font = Font(bold=True)
-    val.number_format = "\u20ac#,##0.00"
-    val.alignment = Alignment(horizontal="center", vertical="center")
-
-    thin = Side(border_style="thin")
-    border = Border(top=thin, bottom=thin, left=thin, right=thin)
-
-    last_total_row = grand_row
-    for r in range(1, last_total_row + 1):
-        for c in range(1, 17):
-            cell = ws.cell(row=r, column=c)
-            if cell.value is not None or cell.coordinate in ws.merged_cells:
-                cell.border = border
-
-    # apply a thicker border only to the "Total" label and final sum cells
-    thick = Side(border_style="thick")
-    start_col, end_col = 15, 16
-    for c in range(start_col, end_col + 1):
-        cell = ws.cell(row=grand_row, column=c)
-        left = thick if c == start_col else thin
-        right = thick if c == end_col else thin
-        cell.border = Border(top=thick, bottom=thick, left=left, right=right)
-
-    from openpyxl.utils import get_column_letter
-    extra_height_needed = False
-    for col_idx in range(1, 17):
-        max_len = 0
-        start_row = 2 if col_idx == 1 else 1
-        for row in range(start_row, last_total_row + 1):
-            cell = ws.cell(row=row, column=col_idx)
-            if cell.value is not None:
-                max_len = max(max_len, len(str(cell.value)))
-        width = min(max_len + 2, 25)
-        if width > 20:
-            width = 20
-            extra_height_needed = True
-        ws.column_dimensions[get_column_letter(col_idx)].width = width
-
-    data_height = 35 if extra_height_needed else 30
-    for r in range(data_start, last_data_row + 1):
-        ws.row_dimensions[r].height = data_height
-    for r in range(last_data_row + 1, last_total_row + 1):
-        ws.row_dimensions[r].height = 22 if not extra_height_needed else 26
-
-    for r in range(1, header_row + 1):
-        ws.row_dimensions[r].height = 32 if extra_height_needed else 30
-
-    wb.save(path)
-def export_client_backup(month, year, client_id=None, firma_id=None, campaign=None, directory=None):
+def export_client_backup(month, year, client_id=None, firma_id=None, campaign=None, directory=None, archive=False):
     """Exportă un backup de facturare pentru luna dată, formatat în Excel."""
-    import calendar
-    import os
-
-    days_in_month = calendar.monthrange(year, month)[1]
-    start_m = datetime.date(year, month, 1)
-    end_m = datetime.date(year, month, days_in_month)
-
-    cur = conn.cursor()
-    sql = (
-        "SELECT c.nume, c.cui, c.adresa, "
-        "       f.nume, f.cui, f.adresa, r.campaign, "
-        "       l.city, l.address, l.code, l.face, l.type, l.size, l.sqm, "
-        "       r.data_start, r.data_end, r.suma, l.decoration_cost, r.client_id, "
-        "       r.decor_cost, r.prod_cost, r.id, r.loc_id "
-        "FROM rezervari r "
-        "JOIN locatii l ON r.loc_id = l.id "
-        "JOIN clienti c ON r.client_id = c.id "
-        "LEFT JOIN firme f ON r.firma_id = f.id "
-        "WHERE r.suma IS NOT NULL AND r.suma > 0"
-        " AND NOT (r.data_end < ? OR r.data_start > ?)"
-    )
-    params = [start_m.isoformat(), end_m.isoformat()]
-    if client_id:
-        sql += " AND r.client_id=?"
-        params.append(client_id)
-    if firma_id:
-        sql += " AND r.firma_id=?"
-        params.append(firma_id)
-    if campaign:
-        sql += " AND IFNULL(r.campaign, '')=?"
-        params.append(campaign or "")
-
-    rows = cur.execute(sql, params).fetchall()
-    if not rows:
-        messagebox.showinfo("Export", "Nu există închirieri pentru perioada aleasă.")
-        return
-
-    processed = []
-    for row in rows:
-        (
-            client_name,
-            client_cui,
-            client_addr,
-            firma_name,
-            firma_cui,
-            firma_addr,
-            campaign,
-            city,
-            addr,
-            code,
-            face,
-            typ,
-            size,
-            sqm,
-            ds,
-            de,
-            price,
-            deco_cost_loc,
-            cid,
-            deco_r,
-            prod_r,
-            rez_id,
-            loc_id,
-        ) = row
-
-        ds_dt = datetime.date.fromisoformat(ds)
-        de_dt = datetime.date.fromisoformat(de)
-        deco = prod = 0.0
-        if start_m <= ds_dt <= end_m:
-            deco = deco_r if deco_r is not None else (deco_cost_loc or 0.0)
-            try:
-                prod_default = round(float(sqm or 0) * 7, 2)
-            except Exception:
-                prod_default = 0.0
-            prod = prod_r if prod_r is not None else prod_default
-
-        # Sum decorations recorded separately and ignore the base
-        # entry added when the reservation was created.
-        cur.execute(
-            """
-            SELECT COALESCE(SUM(decor_cost),0), COALESCE(SUM(prod_cost),0)
-              FROM decorari
-             WHERE loc_id=? AND data BETWEEN ? AND ?
-               AND data BETWEEN ? AND ?
-               AND (
-                    rez_id IS NULL
-                    OR (rez_id=? AND data<>?)
-               )
-            """,
-            (
-                loc_id,
-                start_m.isoformat(),
-                end_m.isoformat(),
-                ds,
-                de,
-                rez_id,
-                ds,
-            ),
-        )
-        extra_deco, extra_prod = cur.fetchone() or (0.0, 0.0)
-        deco += extra_deco or 0.0
-        prod += extra_prod or 0.0
-
-        processed.append(
-            (
-                client_name,
-                client_cui,
-                client_addr,
-                firma_name,
-                firma_cui,
-                firma_addr,
-                campaign,
-                city,
-                addr,
-                code,
-                face,
-                typ,
-                size,
-                sqm,
-                ds,
-                de,
-                price,
-                deco_cost_loc,
-                cid,
-                deco,
-                prod,
-            )
-        )
+    from UI.jobs_panel import run_report
 
     if directory is None:
         directory = filedialog.askdirectory()
         if not directory:
             return
 
-    month_dir = os.path.join(directory, f"BKP {start_m:%B %Y}")
-    os.makedirs(month_dir, exist_ok=True)
-
-    groups = {}
-    for row in processed:
-        f_name = row[3] or "FaraFirma"
-        c_name = row[0] or ""
-        camp = row[6] or c_name
-        key = (f_name, c_name, camp)
-        groups.setdefault(key, []).append(row)
-
-    for (f_name, c_name, camp), grp_rows in groups.items():
-        sub = os.path.join(month_dir, _safe_filename(f_name))
-        os.makedirs(sub, exist_ok=True)
-        fname = _safe_filename(f"BKP {f_name} x {c_name} - {camp} - {start_m:%B}.xlsx")
-        path = os.path.join(sub, fname)
-        _write_backup_excel(grp_rows, start_m, end_m, path)
-
-    messagebox.showinfo("Export", f"Backupurile au fost salvate în:\n{month_dir}")
-
-
-def export_all_backups(month, year):
-    """Generează backupuri pentru toți clienții cu închiriere activă."""
-    import calendar
-    import os
-
-    days_in_month = calendar.monthrange(year, month)[1]
-    start_m = datetime.date(year, month, 1)
-    end_m = datetime.date(year, month, days_in_month)
-
-    cur = conn.cursor()
-    sql = (
-        "SELECT c.nume, c.cui, c.adresa, "
-        "       f.nume, f.cui, f.adresa, r.campaign, "
-        "       l.city, l.address, l.code, l.face, l.type, l.size, l.sqm, "
-        "       r.data_start, r.data_end, r.suma, l.decoration_cost, r.client_id, "
-        "       r.decor_cost, r.prod_cost, r.id, r.loc_id "
-        "FROM rezervari r "
-        "JOIN locatii l ON r.loc_id = l.id "
-        "JOIN clienti c ON r.client_id = c.id "
-        "LEFT JOIN firme f ON r.firma_id = f.id "
-        "WHERE r.suma IS NOT NULL AND r.suma > 0"
-        " AND NOT (r.data_end < ? OR r.data_start > ?)"
+    title = f"Backup {month:02d}.{year}"
+    if client_id is not None:
+        title += f" client {client_id}"
+    run_report(
+        title,
+        "reports.backup:export_backups",
+        {
+            "month": month,
+            "year": year,
+            "directory": directory,
+            "client_id": client_id,
+            "firma_id": firma_id,
+            "campaign": campaign,
+            "archive": archive,
+        },
+        _backups_saved,
     )
-    rows = cur.execute(sql, (start_m.isoformat(), end_m.isoformat())).fetchall()
-    if not rows:
-        messagebox.showinfo("Export", "Nu există închirieri pentru perioada aleasă.")
-        return
-
-    processed = []
-    for row in rows:
-        (
-            client_name,
-            client_cui,
-            client_addr,
-            firma_name,
-            firma_cui,
-            firma_addr,
-            campaign,
-            city,
-            addr,
-            code,
-            face,
-            typ,
-            size,
-            sqm,
-            ds,
-            de,
-            price,
-            deco_cost_loc,
-            cid,
-            deco_r,
-            prod_r,
-            rez_id,
-            loc_id,
-        ) = row
-
-        ds_dt = datetime.date.fromisoformat(ds)
-        de_dt = datetime.date.fromisoformat(de)
-        deco = prod = 0.0
-        if start_m <= ds_dt <= end_m:
-            deco = deco_r if deco_r is not None else (deco_cost_loc or 0.0)
-            try:
-                prod_default = round(float(sqm or 0) * 7, 2)
-            except Exception:
-                prod_default = 0.0
-            prod = prod_r if prod_r is not None else prod_default
-
-        cur.execute(
-            """
-            SELECT COALESCE(SUM(decor_cost),0), COALESCE(SUM(prod_cost),0)
-              FROM decorari
-             WHERE loc_id=? AND data BETWEEN ? AND ?
-               AND data BETWEEN ? AND ?
-               AND (
-                    rez_id IS NULL
-                    OR (rez_id=? AND data<>?)
-               )
-            """,
-            (
-                loc_id,
-                start_m.isoformat(),
-                end_m.isoformat(),
-                ds,
-                de,
-                rez_id,
-                ds,
-            ),
-        )
-        extra_deco, extra_prod = cur.fetchone() or (0.0, 0.0)
-        deco += extra_deco or 0.0
-        prod += extra_prod or 0.0
-
-        processed.append(
-            (
-                client_name,
-                client_cui,
-                client_addr,
-                firma_name,
-                firma_cui,
-                firma_addr,
-                campaign,
-                city,
-                addr,
-                code,
-                face,
-                typ,
-                size,
-                sqm,
-                ds,
-                de,
-                price,
-                deco_cost_loc,
-                cid,
-                deco,
-                prod,
-            )
-        )
 
-    base_dir = filedialog.askdirectory()
-    if not base_dir:
-        return
-
-    month_dir = os.path.join(base_dir, f"BKP {start_m:%B %Y}")
-    os.makedirs(month_dir, exist_ok=True)
 
-    groups = {}
-    for row in processed:
-        f_name = row[3] or "FaraFirma"
-        c_name = row[0] or ""
-        camp = row[6] or c_name
-        key = (f_name, c_name, camp)
-        groups.setdefault(key, []).append(row)
+def export_all_backups(month, year, archive=False):
+    """Generează backupuri pentru toți clienții cu închiriere activă.
 
-    for (f_name, c_name, camp), grp_rows in groups.items():
-        sub = os.path.join(month_dir, _safe_filename(f_name))
-        os.makedirs(sub, exist_ok=True)
-        fname = _safe_filename(f"BKP {f_name} x {c_name} - {camp} - {start_m:%B}.xlsx")
-        path = os.path.join(sub, fname)
-        _write_backup_excel(grp_rows, start_m, end_m, path)
-
-    messagebox.showinfo("Export", f"Backupurile au fost salvate în:\n{month_dir}")
+    Fișierele sunt generate în paralel; cu ``archive`` sunt salvate într-o
+    singură arhivă ``.zip`` în locul directorului lunii.
+    """
+    export_client_backup(month, year, archive=archive)
 
 
 def open_clients_window(root, user=None):
@@ -3440,43 +1875,42 @@ def open_clients_window(root, user=None):
     win.columnconfigure(1, weight=1)
     win.rowconfigure(1, weight=1)
 
+    # Paginare: clienții sunt citiți din baza de date câte o pagină
+    page = {"nr": 0, "total": 0}
+    frm_pages = ttk.Frame(win)
+    frm_pages.grid(row=3, column=0, columnspan=5, sticky="ew", padx=5)
+    btn_prev = ttk.Button(frm_pages, text="\u25C0", width=3, command=lambda: go_page(-1))
+    lbl_page = ttk.Label(frm_pages, text="")
+    btn_next = ttk.Button(frm_pages, text="\u25B6", width=3, command=lambda: go_page(1))
+    btn_prev.pack(side="left")
+    lbl_page.pack(side="left", padx=10)
+    btn_next.pack(side="left")
+
     def refresh():
         tree.delete(*tree.get_children())
-        term = search_var.get().strip().lower()
-        rows = (
-            conn.cursor()
-            .execute(
-                """
-                SELECT c.id, c.nume, c.tip,
-                       COALESCE(cc.nume, c.contact) AS contact,
-                       COALESCE(cc.email, c.email) AS email,
-                       COALESCE(cc.phone, c.phone) AS phone,
-                       c.cui, c.adresa, c.observatii
-                  FROM clienti c
-             LEFT JOIN client_contacts cc
-                    ON cc.client_id = c.id AND cc.id = (
-                        SELECT id FROM client_contacts c2
-                         WHERE c2.client_id = c.id
-                         ORDER BY c2.id LIMIT 1
-                    )
-              ORDER BY c.nume
-                """
-            )
-            .fetchall()
+        rows, total = clients.search(
+            conn.cursor(), search_var.get(), page["nr"], clients.PAGE_SIZE
         )
+        pages = max(1, -(-total // clients.PAGE_SIZE))
+        if page["nr"] >= pages:
+            # după o ștergere sau o căutare nouă pagina curentă poate dispărea
+            page["nr"] = pages - 1
+            return refresh()
+        page["total"] = total
         for cid, nume, tip, contact, email, phone, cui, addr, obs in rows:
-            if term and not (
-                term in (nume or "").lower()
-                or term in (contact or "").lower()
-                or term in (email or "").lower()
-            ):
-                continue
             tree.insert(
                 "",
                 "end",
                 iid=str(cid),
                 values=(nume, tip or "direct", contact, email, phone, cui or "", addr or "", obs or ""),
             )
+        lbl_page.config(text=f"Pagina {page['nr'] + 1} din {pages} ({total} clienți)")
+        btn_prev.config(state="normal" if page["nr"] > 0 else "disabled")
+        btn_next.config(state="normal" if page["nr"] < pages - 1 else "disabled")
+
+    def go_page(step):
+        page["nr"] += step
+        refresh()
 
     def add_client():
         open_add_client_window(win, refresh)
@@ -3549,7 +1983,10 @@ def open_clients_window(root, user=None):
         )
         if month is None:
             return
-        export_all_backups(month, year)
+        archive = messagebox.askyesno(
+            "Export", "Salvezi backupurile într-o singură arhivă .zip?", parent=win
+        )
+        export_all_backups(month, year, archive=archive)
 
     btn_add = ttk.Button(win, text="Adaugă", command=add_client)
     btn_edit = ttk.Button(win, text="Editează", command=lambda: open_edit_client_window(win, int(tree.selection()[0]), refresh))
@@ -3570,8 +2007,19 @@ def open_clients_window(root, user=None):
 
     tree.bind("<Double-1>", lambda e: open_client_detail(tree, e))
 
+    # căutarea pornește doar după o scurtă pauză în tastare
+    pending = {"id": None}
+
     def on_search_change(*args):
-        refresh()
+        if pending["id"] is not None:
+            win.after_cancel(pending["id"])
+
+        def run():
+            pending["id"] = None
+            page["nr"] = 0
+            refresh()
+
+        pending["id"] = win.after(SEARCH_DELAY_MS, run)
 
     search_var.trace_add("write", on_search_change)
 
@@ -3584,9 +2032,8 @@ def export_vendor_report(month=None, year=None):
     Parametrii ``month`` și ``year`` indică luna pentru care se generează
     raportul. Dacă nu sunt precizați, se folosește luna și anul curent.
     """
-    import pandas as pd
     from tkinter import filedialog, messagebox
-    from db import read_sql_query
+    from UI.jobs_panel import run_report
 
     today = datetime.date.today()
     if year is None:
@@ -3594,45 +2041,6 @@ def export_vendor_report(month=None, year=None):
     if month is None:
         month = today.month
 
-    report_date = datetime.date(year, month, 1)
-    current_month = report_date.strftime("%B")
-    special_june = (month == 6 and year == 2025)
-
-    users = read_sql_query(
-        "SELECT username, comune FROM users WHERE role='seller'",
-    )
-    if users.empty:
-        messagebox.showinfo("Raport", "Nu există vânzători.")
-        return
-
-    df = read_sql_query(
-        """
-        SELECT r.created_by, r.created_on, r.client, r.suma, r.data_start, r.data_end,
-               l.city, l.county, l.address
-          FROM rezervari r
-          JOIN locatii l ON r.loc_id = l.id
-         WHERE r.suma IS NOT NULL AND r.suma > 0
-        """,
-        parse_dates=["created_on", "data_start", "data_end"],
-    )
-
-    if df.empty:
-        messagebox.showinfo("Raport", "Nu există închirieri.")
-        return
-
-    import calendar
-    month_end = datetime.date(year, month, calendar.monthrange(year, month)[1])
-    df = df[
-        (df["created_on"].dt.date >= report_date)
-        & (df["created_on"].dt.date <= month_end)
-        & (df["data_start"] >= df["created_on"])
-    ]
-
-    if df.empty:
-        messagebox.showinfo(
-            "Raport", "Nu există închirieri active în perioada aleasă.")
-        return
-
     path = filedialog.asksaveasfilename(
         defaultextension=".xlsx",
         filetypes=[("Excel", "*.xlsx")],
@@ -3641,110 +2049,12 @@ def export_vendor_report(month=None, year=None):
     if not path:
         return
 
-    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
-        wb = writer.book
-        hdr_fmt = wb.add_format(
-            {
-                "bold": True,
-                "bg_color": "#4F81BD",
-                "font_color": "white",
-                "align": "center",
-            }
-        )
-        money_fmt = wb.add_format({"num_format": "€#,##0.00", "align": "center"})
-        center_fmt = wb.add_format({"align": "center"})
-
-        if special_june:
-            month_end_date = datetime.date(year, month, calendar.monthrange(year, month)[1])
-
-        def contract_months(ds: datetime.date, de: datetime.date) -> float:
-            cur = ds
-            total = 0.0
-            while cur <= de:
-                dim = calendar.monthrange(cur.year, cur.month)[1]
-                month_end = datetime.date(cur.year, cur.month, dim)
-                ov_end = min(de, month_end)
-                total += ((ov_end - cur).days + 1) / dim
-                cur = ov_end + datetime.timedelta(days=1)
-            return total
-
-        def split_by_month(
-            ds: datetime.date, de: datetime.date, price_per_month: float
-        ):
-            cur = ds
-            while cur <= de:
-                dim = calendar.monthrange(cur.year, cur.month)[1]
-                month_end = datetime.date(cur.year, cur.month, dim)
-                ov_end = min(de, month_end)
-                frac = ((ov_end - cur).days + 1) / dim
-                yield cur.strftime("%B"), price_per_month * frac
-                cur = ov_end + datetime.timedelta(days=1)
-
-        for _, row in users.iterrows():
-            uname = row["username"]
-            comune = {c for c in (row["comune"] or "").split(",") if c}
-            sub = df[df["created_by"] == uname]
-            if comune:
-                sub = sub[sub["county"].isin(comune)]
-            if sub.empty:
-                continue
-
-            sub = sub.copy()
-            sub["Luni"] = sub.apply(
-                lambda r: contract_months(r["data_start"].date(), r["data_end"].date()),
-                axis=1,
-            )
-            sub["Chirie/lună"] = sub["suma"]
-            sub["Valoare"] = sub["suma"] * sub["Luni"]
-            sub["Perioadă"] = sub.apply(
-                lambda r: f"{r['data_start'].date()} → {r['data_end'].date()}",
-                axis=1,
-            )
-
-            df_det = sub[
-                [
-                    "city",
-                    "county",
-                    "address",
-                    "client",
-                    "Perioadă",
-                    "Luni",
-                    "Chirie/lună",
-                    "Valoare",
-                ]
-            ].copy()
-            df_det.columns = [
-                "Oraș",
-                "Județ",
-                "Adresă",
-                "Client",
-                "Perioadă",
-                "Luni",
-                "Chirie/lună",
-                "Valoare",
-            ]
-            df_det.insert(0, "Nr.crt", range(1, len(df_det) + 1))
-
-            sheet = uname[:31]
-            df_det.to_excel(writer, sheet_name=sheet, index=False, startrow=0)
-
-            ws = writer.sheets[sheet]
-            for col_idx, col in enumerate(df_det.columns):
-                width = max(len(str(col)), df_det[col].astype(str).map(len).max()) + 2
-                fmt = money_fmt if col in {"Chirie/lună", "Valoare"} else center_fmt
-                ws.set_column(col_idx, col_idx, width, fmt)
-                ws.write(0, col_idx, col, hdr_fmt)
-
-            total_row = len(df_det) + 1
-            ws.write(total_row, df_det.columns.get_loc("Client"), "Total", hdr_fmt)
-            ws.write(
-                total_row,
-                df_det.columns.get_loc("Valoare"),
-                df_det["Valoare"].sum(),
-                money_fmt,
-            )
-
-    messagebox.showinfo("Raport", f"Raport salvat:\n{path}")
+    run_report(
+        f"Raport vânzători {month:02d}.{year}",
+        "reports.vendor:export_vendor",
+        {"year": year, "month": month, "path": path},
+        lambda job: messagebox.showinfo("Raport", f"Raport salvat:\n{path}"),
+    )
 
 
 def open_users_window(root):
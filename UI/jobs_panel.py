@@ -0,0 +1,134 @@
+"""Fereastra cu rapoartele generate în fundal (vezi ``jobs.py``)."""
+
+import atexit
+import tkinter as tk
+from tkinter import messagebox, ttk
+
+import jobs
+
+# Milliseconds between two checks of the running jobs
+POLL_MS = 250
+
+STATUS_TEXT = {
+    jobs.QUEUED: "În așteptare",
+    jobs.RUNNING: "Rulează",
+    jobs.DONE: "Finalizat",
+    jobs.NO_DATA: "Fără date",
+    jobs.FAILED: "Eșuat",
+    jobs.CANCELLED: "Anulat",
+}
+
+_manager = None
+_panel = None
+
+
+def get_manager(root) -> jobs.JobManager:
+    """Return the job manager of the application, polled from *root*."""
+    global _manager
+    if _manager is None:
+        _manager = jobs.JobManager()
+        atexit.register(_manager.shutdown)
+
+        def tick():
+            _manager.poll()
+            if _panel is not None and _panel.winfo_exists():
+                _panel.refresh()
+            # rescheduled only now so a notification never polls re-entrantly
+            root.after(POLL_MS, tick)
+
+        root.after(POLL_MS, tick)
+    return _manager
+
+
+def _notify(job, on_success):
+    if job.status == jobs.DONE:
+        on_success(job)
+    elif job.status == jobs.NO_DATA:
+        messagebox.showinfo(job.title, job.error)
+    elif job.status == jobs.FAILED:
+        messagebox.showerror(job.title, job.error.splitlines()[0])
+
+
+def run_report(title: str, target: str, kwargs: dict, on_success) -> jobs.Job:
+    """Generează un raport în fundal și anunță rezultatul.
+
+    *on_success(job)* is called in the Tk thread once the report is written;
+    "no data" and errors are shown here.  Without a Tk root (scripts, tests)
+    the report runs inline.
+    """
+    root = getattr(tk, "_default_root", None)
+    if root is None:
+        return jobs.run_inline(
+            title, target, kwargs, lambda job: _notify(job, on_success)
+        )
+    job = get_manager(root).submit(
+        title, target, kwargs, lambda job: _notify(job, on_success)
+    )
+    open_jobs_panel(root)
+    return job
+
+
+class JobsPanel(tk.Toplevel):
+    """Lista rapoartelor în lucru, cu progres și anulare."""
+
+    COLUMNS = ("Raport", "Stare", "Foi", "Rânduri", "Foaia curentă")
+
+    def __init__(self, root, manager):
+        super().__init__(root)
+        self.manager = manager
+        self.title("Rapoarte în lucru")
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings", height=8)
+        for col, width in zip(self.COLUMNS, (220, 100, 50, 70, 180)):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=width, anchor="w" if col == "Raport" else "center")
+        self.tree.grid(row=0, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        ttk.Button(self, text="Anulează", command=self.cancel_selected).grid(
+            row=1, column=0, padx=5, pady=5, sticky="w"
+        )
+        ttk.Button(self, text="Șterge finalizate", command=self.clear_finished).grid(
+            row=1, column=1, padx=5, pady=5, sticky="e"
+        )
+        self.refresh()
+
+    def refresh(self):
+        selected = self.tree.selection()
+        self.tree.delete(*self.tree.get_children())
+        for job in self.manager.jobs:
+            self.tree.insert(
+                "",
+                "end",
+                iid=str(job.id),
+                values=(
+                    job.title,
+                    STATUS_TEXT.get(job.status, job.status),
+                    job.sheets,
+                    job.rows,
+                    job.current if job.status == jobs.RUNNING else "",
+                ),
+            )
+        keep = [iid for iid in selected if self.tree.exists(iid)]
+        if keep:
+            self.tree.selection_set(keep)
+
+    def cancel_selected(self):
+        for iid in self.tree.selection():
+            self.manager.cancel(int(iid))
+        self.refresh()
+
+    def clear_finished(self):
+        self.manager.clear_finished()
+        self.refresh()
+
+
+def open_jobs_panel(root):
+    """Deschide (sau aduce în față) fereastra rapoartelor în lucru."""
+    global _panel
+    if _panel is not None and _panel.winfo_exists():
+        _panel.lift()
+        return _panel
+    _panel = JobsPanel(root, get_manager(root))
+    return _panel
@@ -1,6 +1,45 @@
+import importlib
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-import db
+
+# Intervalul (în milisecunde) la care dialogul verifică dacă operațiile
+# pornite în fundal s-au încheiat.
+POLL_INTERVAL = 100
+
+
+def _warm_up(state: dict) -> None:
+    """Connect to the database and preload the caches in the background.
+
+    Importing :mod:`db` opens the connection, checks the schema and loads the
+    location cache.  The statuses are refreshed as well; ``start_app`` still
+    calls ``update_statusuri_din_rezervari`` from ``load_locations``, but with
+    the default TTL, so that first call finds them fresh and returns at once.
+    """
+    try:
+        db = importlib.import_module("db")
+        db.update_statusuri_din_rezervari()
+        state["db"] = db
+    except Exception as exc:  # pragma: no cover - depends on the server
+        state["error"] = exc
+    finally:
+        state["ready"].set()
+
+
+def start_warm_up() -> dict:
+    """Start :func:`_warm_up` on a daemon thread and return its state."""
+    state = {"ready": threading.Event(), "db": None, "error": None}
+    threading.Thread(target=_warm_up, args=(state,), daemon=True).start()
+    return state
+
+
+def _verify(state: dict, username: str, password: str):
+    """Return the user matching the credentials once the warm-up finished."""
+    state["ready"].wait()
+    if state["error"] is not None:
+        raise state["error"]
+    return state["db"].check_login(username, password)
 
 
 def show_login(root=None):
@@ -10,8 +49,14 @@ def show_login(root=None):
     function will return once the dialog is closed.  Otherwise a temporary
     ``Tk`` instance is created and destroyed when finished, preserving the
     previous behaviour.
+
+    The database connection is established in the background while the form
+    is shown and the password check runs on a worker thread, so the window
+    stays responsive during both.
     """
 
+    warm = {"state": start_warm_up()}
+
     owns_root = root is None
     if owns_root:
         root = tk.Tk()
@@ -29,21 +74,67 @@ def show_login(root=None):
     pass_entry = ttk.Entry(win, show="*", width=30)
     pass_entry.grid(row=1, column=1, padx=5, pady=5)
 
+    spinner = ttk.Progressbar(win, mode="indeterminate", length=200)
+    lbl_status = ttk.Label(win, text="")
+
     result = {"user": None}
+    results: queue.Queue = queue.Queue()
 
-    def attempt():
-        u = user_entry.get().strip()
-        p = pass_entry.get().strip()
-        user = db.check_login(u, p)
-        if user:
-            result["user"] = user
+    def set_busy(busy: bool, text: str = ""):
+        lbl_status.config(text=text)
+        if busy:
+            btn_login.config(state="disabled")
+            spinner.grid(row=3, column=0, columnspan=2, padx=5, pady=(0, 5))
+            lbl_status.grid(row=4, column=0, columnspan=2, padx=5, pady=(0, 5))
+            spinner.start(10)
+        else:
+            spinner.stop()
+            spinner.grid_remove()
+            lbl_status.grid_remove()
+            btn_login.config(state="normal")
+
+    def worker(u, p):
+        try:
+            results.put(("ok", _verify(warm["state"], u, p)))
+        except Exception as exc:
+            results.put(("error", exc))
+
+    def poll():
+        try:
+            kind, value = results.get_nowait()
+        except queue.Empty:
+            if not warm["state"]["ready"].is_set():
+                lbl_status.config(text="Se conectează la baza de date...")
+            else:
+                lbl_status.config(text="Se verifică datele...")
+            win.after(POLL_INTERVAL, poll)
+            return
+        set_busy(False)
+        if kind == "error":
+            # permitem o nouă încercare cu o conexiune nouă
+            warm["state"] = start_warm_up()
+            messagebox.showerror(
+                "Login", f"Nu s-a putut conecta la baza de date:\n{value}", parent=win
+            )
+        elif value:
+            result["user"] = value
             win.destroy()
         else:
-            messagebox.showerror("Login", "Credențiale invalide")
+            messagebox.showerror("Login", "Credențiale invalide", parent=win)
+
+    def attempt(event=None):
+        if str(btn_login.cget("state")) == "disabled":
+            return
+        u = user_entry.get().strip()
+        p = pass_entry.get().strip()
+        set_busy(True, "Se verifică datele...")
+        threading.Thread(target=worker, args=(u, p), daemon=True).start()
+        win.after(POLL_INTERVAL, poll)
 
-    ttk.Button(win, text="Login", command=attempt).grid(
-        row=2, column=0, columnspan=2, pady=10
-    )
+    btn_login = ttk.Button(win, text="Login", command=attempt)
+    btn_login.grid(row=2, column=0, columnspan=2, pady=10)
+    pass_entry.bind("<Return>", attempt)
+    user_entry.focus()
 
     if owns_root:
         win.mainloop()
@@ -1,6 +1,7 @@
 import os
 import shutil
 import datetime
+import threading
 import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk, messagebox, filedialog, simpledialog
@@ -72,13 +73,22 @@ from db import (
     conn,
     cursor,
     update_statusuri_din_rezervari,
-    get_location_cache,
     maybe_refresh_location_cache,
     get_location_by_id,
     refresh_location_cache,
     reconnect,
     is_online,
+    server_reachable,
+    go_online,
+    replay_offline_writes,
+    pending_offline_writes,
+    maybe_sync_replica,
+    data_version,
 )
+from bookings import get_index as get_bookings_index
+from geo import get_index as get_geo_index, parse_gps
+from locations import ResultMemo, get_snapshot as get_location_snapshot
+from occupancy import get_index as get_occupancy_index
 from utils import make_preview, get_schita_path
 from UI.dialogs import (
     open_detail_window,
@@ -102,6 +112,7 @@ from UI.dialogs import (
     open_decor_window,
     open_manage_decor_window,
 )
+from UI.jobs_panel import open_jobs_panel
 
 
 def start_app(user, root=None):
@@ -252,6 +263,52 @@ def start_app(user, root=None):
         frm_top, text="Toate datele", variable=var_ignore, command=lambda: load_locations()
     ).pack(side="left", padx=(20, 0))
 
+    ttk.Label(frm_top, text="Zile libere min.:").pack(side="left", padx=(20, 5))
+    min_days_var = tk.IntVar(value=0)
+    ttk.Spinbox(
+        frm_top,
+        from_=0,
+        to=365,
+        width=5,
+        textvariable=min_days_var,
+        command=lambda: load_locations(),
+    ).pack(side="left", padx=5)
+
+    # {loc_id: km} al filtrului "În apropiere" sau None când e dezactivat
+    near = {"dist": None, "key": None}
+
+    def toggle_near():
+        if near["dist"] is not None:
+            near["dist"] = near["key"] = None
+            btn_near.config(text="În apropiere...")
+            load_locations()
+            return
+        index = get_geo_index()
+        sel = tree.selection()
+        center = index.point(int(sel[0])) if sel else None
+        if center is None:
+            text = simpledialog.askstring(
+                "În apropiere", "Coordonate GPS (lat, lon):", parent=root
+            )
+            if text is None:
+                return
+            center = parse_gps(text)
+            if center is None:
+                messagebox.showerror("În apropiere", "Coordonate GPS invalide.")
+                return
+        km = simpledialog.askfloat(
+            "În apropiere", "Raza (km):", initialvalue=2, minvalue=0, parent=root
+        )
+        if km is None:
+            return
+        near["dist"] = dict(index.within(*center, km))
+        near["key"] = (center, km)
+        btn_near.config(text=f"Rază {km:g} km \u2715")
+        load_locations()
+
+    btn_near = ttk.Button(frm_top, text="În apropiere...", command=toggle_near)
+    btn_near.pack(side="left", padx=(20, 0))
+
     # --- Middle: TreeView + Detalii ---
     frm_mid = ttk.Frame(root, padding=10)
     frm_mid.pack(fill="both", expand=True)
@@ -467,12 +524,16 @@ def start_app(user, root=None):
         text="Raport Vânzători",
         command=_export_vendor,
     )
+    btn_jobs = ttk.Button(
+        export_frame, text="Rapoarte în lucru", command=lambda: open_jobs_panel(root)
+    )
     btn_update = ttk.Button(export_frame, text="Update Database", command=lambda: manual_refresh())
     btn_xlsx.pack(side="left", padx=5, pady=5)
     btn_offer.pack(side="left", padx=5, pady=5)
     btn_report.pack(side="left", padx=5, pady=5)
     if role in ("admin", "manager"):
         btn_vendor.pack(side="left", padx=5, pady=5)
+    btn_jobs.pack(side="left", padx=5, pady=5)
     btn_update.pack(side="left", padx=5, pady=5)
 
     conn_status = ttk.Label(export_frame, text="Online \u25CF", foreground="green")
@@ -490,117 +551,56 @@ def start_app(user, root=None):
         if combo_group.get() not in vals:
             combo_group.current(0)
 
-    def load_locations():
-        # 1) Actualizează statusurile locațiilor pe baza rezervărilor
-        update_statusuri_din_rezervari()
-
-        # 2) Golește TreeView
-        items = tree.get_children()
-        if items:
-            tree.delete(*items)
+    # Ultimele liste calculate, refolosite cât timp datele nu s-au schimbat
+    list_memo = ResultMemo()
 
-        # 3) Construiește condițiile de filtrare pe Grup, Status și Căutare
-        params, cond = [], []
-        g = combo_group.get()
-        if g and g != "Toate":
-            cond.append("grup = ?")
-            params.append(g)
-        s = combo_status.get()
-        if s and s != "Toate":
-            cond.append("status = ?")
-            params.append(s)
-        term = search_var.get().strip()
-        if term:
-            cond.append("(city LIKE ? OR county LIKE ? OR address LIKE ?)")
-            params += [f"%{term}%"] * 3
-
-        # 4) Citește intervalul Din–Până și normalizează-l
-        start_dt = filter_start.get_date()
-        end_dt = filter_end.get_date()
-        if end_dt < start_dt:
-            end_dt = start_dt
-        # îl folosim doar în availability()
-
-        # 5) Pornim de la versiunea în memorie a tabelului ``locatii``
-        rows = get_location_cache()
-
-        if cond:
-
-            def match(row: dict) -> bool:
-                for c, p in zip(cond, params):
-                    if c == "grup = ?" and row.get("grup") != p:
-                        return False
-                    if c == "status = ?" and row.get("status") != p:
-                        return False
-                    if c.startswith("(city LIKE"):
-                        term_lower = p.strip("%").lower()
-                        if not (
-                            term_lower in (row.get("city") or "").lower()
-                            or term_lower in (row.get("county") or "").lower()
-                            or term_lower in (row.get("address") or "").lower()
-                        ):
-                            return False
-                return True
-
-            rows = [r for r in rows if match(r)]
-
-        rows.sort(
-            key=lambda r: (
-                {
-                    "Bucuresti Sectorul 1": 1,
-                    "Bucuresti Sectorul 2": 2,
-                    "Bucuresti Sectorul 3": 3,
-                    "Bucuresti Sectorul 4": 4,
-                    "Bucuresti Sectorul 5": 5,
-                    "Bucuresti Sectorul 6": 6,
-                    "Ilfov": 7,
-                    "Prahova": 8,
-                }.get(r.get("county"), 9),
-                r.get("county"),
-                r.get("city"),
-            )
+    def list_entries(start_dt, end_dt, min_days):
+        """Return the ``(iid, values, tags)`` of the rows matching the filters."""
+        # 1) Filtrăm pe Grup, Status și Căutare în snapshot-ul pe coloane al
+        #    cache-ului; rândurile vin deja în ordinea de afișare
+        rows = get_location_snapshot().select(
+            combo_group.get(), combo_status.get(), search_var.get()
         )
 
-        # 6) Preîncărcăm rezervările pentru perioada selectată
-        reservations_by_loc: dict[int, list[tuple[datetime.date, datetime.date]]] = {}
+        # 2) Filtrul "În apropiere": doar locațiile din rază, cele mai apropiate întâi
+        dist = near["dist"]
+        if dist is not None:
+            rows = sorted((r for r in rows if r["id"] in dist), key=lambda r: dist[r["id"]])
+
+        # 3) Ocuparea din indexul de zile (vezi ``occupancy.py``)
+        bounds: dict[int, tuple] = {}
+        long_enough = None
         if not var_ignore.get():
-            rows_res = cursor.execute(
-                "SELECT loc_id, data_start, data_end FROM rezervari WHERE NOT (data_end < ? OR data_start > ?) ORDER BY data_start",
-                (start_dt.isoformat(), end_dt.isoformat()),
-            ).fetchall()
-            for loc_id_r, ds, de in rows_res:
-                reservations_by_loc.setdefault(loc_id_r, []).append(
-                    (datetime.date.fromisoformat(ds), datetime.date.fromisoformat(de))
+            index = get_occupancy_index(start_dt, end_dt)
+            ids, first, last = index.busy_bounds(
+                start_dt, end_dt, [r["id"] for r in rows]
+            )
+            bounds = {
+                int(i): (f, l) for i, f, l in zip(ids, first, last) if f is not None
+            }
+            if min_days > 0:
+                long_enough = set(
+                    index.free_at_least(start_dt, end_dt, min_days, ids).tolist()
                 )
 
         def availability(loc_id):
-            periods = reservations_by_loc.get(loc_id, [])
-            if not periods:
-                return "Disponibil"
-            overl = [(ds, de) for ds, de in periods if not (de < start_dt or ds > end_dt)]
-            if not overl:
+            if long_enough is not None and loc_id not in long_enough:
+                return ""
+            if loc_id not in bounds:
                 return "Disponibil"
-            first_ds = overl[0][0]
+            first_ds, last_de = bounds[loc_id]
             if first_ds > start_dt:
                 until = (first_ds - datetime.timedelta(days=1)).strftime("%d.%m.%Y")
                 return f"Disponibil până la {until}"
-            last_de = overl[-1][1]
             if last_de < end_dt:
                 frm = (last_de + datetime.timedelta(days=1)).strftime("%d.%m.%Y")
                 return f"Disponibil din {frm}"
             return ""
 
-        # 7) Populează TreeView, aplicând filtrul de date doar când "Toate datele" NU e bifat
-        display_index = 0
+        # 4) Rândurile de afișat, cu filtrul de date doar când "Toate datele" NU e bifat
+        entries = []
         for row in rows:
-            if row.get("parent_id") and row.get("status") == "Expirat":
-                continue
             loc_id = row["id"]
-            city = row["city"]
-            county = row["county"]
-            addr = row["address"]
-            typ = row["type"]
-            rate = row["ratecard"]
             status = row["status"]
             if not var_ignore.get():
                 avail = availability(loc_id)
@@ -620,16 +620,64 @@ def start_app(user, root=None):
                     else ""
                 )
 
-            zebra = "evenrow" if display_index % 2 == 0 else "oddrow"
-            display_index += 1
+            zebra = "evenrow" if len(entries) % 2 == 0 else "oddrow"
+            entries.append(
+                (
+                    str(loc_id),
+                    (
+                        len(entries) + 1,
+                        row["city"],
+                        row["county"],
+                        row["address"],
+                        row["type"],
+                        status_text,
+                        row["ratecard"],
+                    ),
+                    (tag, zebra),
+                )
+            )
+        return entries
+
+    def load_locations():
+        # 1) Actualizează statusurile locațiilor pe baza rezervărilor
+        update_statusuri_din_rezervari()
+
+        # 2) Golește TreeView
+        items = tree.get_children()
+        if items:
+            tree.delete(*items)
 
-            tree.insert(
-                "",
-                "end",
-                iid=str(loc_id),
-                values=(display_index, city, county, addr, typ, status_text, rate),
-                tags=(tag, zebra),
+        # 3) Citește intervalul Din–Până și normalizează-l
+        start_dt = filter_start.get_date()
+        end_dt = filter_end.get_date()
+        if end_dt < start_dt:
+            end_dt = start_dt
+        try:
+            min_days = min_days_var.get()
+        except tk.TclError:
+            min_days = 0
+
+        # 4) Lista e refolosită cât timp filtrele și versiunile datelor sunt aceleași
+        version = data_version(("locatii", "rezervari"))
+        key = None
+        if version is not None:
+            key = (
+                version,
+                get_location_snapshot().version,
+                combo_group.get(),
+                combo_status.get(),
+                search_var.get().strip().lower(),
+                None if var_ignore.get() else (start_dt, end_dt, min_days),
+                near["key"],
             )
+        entries = list_memo.get(key)
+        if entries is None:
+            entries = list_entries(start_dt, end_dt, min_days)
+            list_memo.put(key, entries)
+
+        # 5) Populează TreeView
+        for iid, values, tags in entries:
+            tree.insert("", "end", iid=iid, values=values, tags=tags)
 
     def on_tree_select():
         # ascundem toate etichetele
@@ -708,13 +756,9 @@ def start_app(user, root=None):
         pret_vanz = data.get("pret_vanzare")
         pret_flot = data.get("pret_flotant")
 
-        rent_row = None
-        if ds and de:
-            rent_row = cursor.execute(
-                "SELECT suma FROM rezervari WHERE loc_id=? AND data_start=? AND data_end=? ORDER BY id DESC LIMIT 1",
-                (loc_id, ds, de),
-            ).fetchone()
-        rent_price = rent_row[0] if rent_row else None
+        booking_index = get_bookings_index()
+        rent_row = booking_index.find(loc_id, ds, de) if ds and de else None
+        rent_price = rent_row.suma if rent_row else None
 
         # actualizare valori
         lbl_client_value.config(text=client or "-")
@@ -737,22 +781,11 @@ def start_app(user, root=None):
         status = tree.item(sel[0])["values"][5]
         reserved_info = None
         rented_info = None
+        today = datetime.date.today()
         if status == "Rezervat":
-            today = datetime.date.today().isoformat()
-            reserved_info = cursor.execute(
-                "SELECT created_by, data_end FROM rezervari "
-                "WHERE loc_id=? AND ? BETWEEN data_start AND data_end "
-                "AND suma IS NULL ORDER BY data_start DESC LIMIT 1",
-                (loc_id, today),
-            ).fetchone()
+            reserved_info = booking_index.covering(loc_id, today, rented=False)
         if status == "Închiriat":
-            today = datetime.date.today().isoformat()
-            rented_info = cursor.execute(
-                "SELECT created_by FROM rezervari "
-                "WHERE loc_id=? AND ? BETWEEN data_start AND data_end "
-                "AND suma IS NOT NULL ORDER BY data_start DESC LIMIT 1",
-                (loc_id, today),
-            ).fetchone()
+            rented_info = booking_index.covering(loc_id, today, rented=True)
 
         if status == "Închiriat":
             lbl_client_label.pack(anchor="center", pady=2)
@@ -764,8 +797,8 @@ def start_app(user, root=None):
             lbl_pret_inch_value.pack(anchor="center", pady=2)
             lbl_pret_vanz_label.pack(anchor="center", pady=2)
             lbl_pret_vanz_value.pack(anchor="center", pady=2)
-            if rented_info and rented_info[0]:
-                lbl_rent_by_value.config(text=str(rented_info[0]))
+            if rented_info and rented_info.created_by:
+                lbl_rent_by_value.config(text=str(rented_info.created_by))
                 lbl_rent_by_label.pack(anchor="center", pady=2)
                 lbl_rent_by_value.pack(anchor="center", pady=2)
         else:
@@ -776,22 +809,16 @@ def start_app(user, root=None):
             lbl_pret_flot_label.pack(anchor="center", pady=2)
             lbl_pret_flot_value.pack(anchor="center", pady=2)
             if reserved_info:
-                creator, end_d = reserved_info
-                days_left = (datetime.date.fromisoformat(end_d) - datetime.date.today()).days + 1
-                lbl_res_by_value.config(text=f"{creator} ({days_left} zile)")
+                days_left = (datetime.date.fromisoformat(reserved_info.data_end) - today).days + 1
+                lbl_res_by_value.config(text=f"{reserved_info.created_by} ({days_left} zile)")
                 lbl_res_by_label.pack(anchor="center", pady=2)
                 lbl_res_by_value.pack(anchor="center", pady=2)
             else:
-                today = datetime.date.today().isoformat()
-                next_rent = cursor.execute(
-                    "SELECT client, data_start, data_end FROM rezervari "
-                    "WHERE loc_id=? AND data_start>? AND suma IS NOT NULL "
-                    "ORDER BY data_start LIMIT 1",
-                    (loc_id, today),
-                ).fetchone()
+                next_rent = booking_index.next_after(loc_id, today, rented=True)
                 if next_rent:
-                    n_client, n_start, n_end = next_rent
-                    lbl_next_rent_value.config(text=f"{n_client}: {n_start} → {n_end}")
+                    lbl_next_rent_value.config(
+                        text=f"{next_rent.client}: {next_rent.data_start} → {next_rent.data_end}"
+                    )
                     lbl_next_rent_label.pack(anchor="center", pady=2)
                     lbl_next_rent_value.pack(anchor="center", pady=2)
 
@@ -818,15 +845,10 @@ def start_app(user, root=None):
             btn_decor.config(state="disabled", command=lambda: None)
             btn_manage_decor.config(state="disabled", command=lambda: None)
 
-        cutoff = (datetime.date.today() - datetime.timedelta(days=3)).isoformat()
-        has_rentals = cursor.execute(
-            """
-            SELECT 1 FROM rezervari
-             WHERE loc_id=? AND suma IS NOT NULL AND data_end>=?
-             LIMIT 1
-            """,
-            (loc_id, cutoff),
-        ).fetchone()
+        cutoff = today - datetime.timedelta(days=3)
+        has_rentals = booking_index.overlapping(
+            loc_id, cutoff, datetime.date.max, rented=True
+        )
         if role != "manager":
             if has_rentals:
                 btn_release.config(
@@ -842,12 +864,9 @@ def start_app(user, root=None):
             if data.get("is_mobile") and data.get("parent_id"):
                 if not btn_extend.winfo_ismapped():
                     btn_extend.pack(side="left", padx=5, pady=5)
-                rid_row = cursor.execute(
-                    "SELECT id FROM rezervari WHERE loc_id=? AND ? BETWEEN data_start AND data_end AND suma IS NOT NULL ORDER BY id DESC LIMIT 1",
-                    (loc_id, datetime.date.today().isoformat()),
-                ).fetchone()
-                if rid_row:
-                    rid = rid_row[0]
+                current = booking_index.overlapping(loc_id, today, today, rented=True)
+                if current:
+                    rid = max(b.id for b in current)
                     btn_extend.config(
                         state="normal",
                         command=lambda r=rid, ds=data.get("data_start"), de=data.get(
@@ -918,11 +937,44 @@ def start_app(user, root=None):
 
     DB_STATUS_INTERVAL = 5000  # ms
 
+    # verificarea serverului și trimiterea modificărilor offline rulează în
+    # fundal ca fereastra să nu se blocheze
+    probe = {"thread": None, "ok": False, "summary": None}
+
+    def run_probe():
+        if server_reachable():
+            probe["summary"] = replay_offline_writes()
+            probe["ok"] = probe["summary"] is not None
+
+    def try_go_online():
+        if probe["ok"]:
+            probe["ok"] = False
+            summary = go_online(probe["summary"])
+            if summary is not None:
+                load_locations()
+                if summary["conflicts"]:
+                    messagebox.showwarning(
+                        "Sincronizare",
+                        f"{summary['applied']} modificări trimise, "
+                        f"{len(summary['conflicts'])} respinse:\n"
+                        + "\n".join(summary["conflicts"][:10]),
+                    )
+            return
+        if probe["thread"] is None or not probe["thread"].is_alive():
+            probe["thread"] = threading.Thread(target=run_probe, daemon=True)
+            probe["thread"].start()
+
     def update_db_status():
         if is_online():
             conn_status.config(text="Online \u25CF", foreground="green")
+            maybe_sync_replica()
         else:
-            conn_status.config(text="Offline \u25CF", foreground="red")
+            pending = pending_offline_writes()
+            text = "Offline \u25CF"
+            if pending:
+                text += f" ({pending} în așteptare)"
+            conn_status.config(text=text, foreground="red")
+            try_go_online()
         root.after(DB_STATUS_INTERVAL, update_db_status)
 
     def check_alerts():
@@ -0,0 +1,63 @@
+"""Compare the billing backup renderers of ``reports.backup``.
+
+Renders the same backup with ``--lines`` rentals with every backend and
+prints the best time out of ``--repeat`` runs:
+
+* ``openpyxl``   - styles applied cell by cell on an in-memory workbook
+* ``xlsxwriter`` - prebuilt formats, rows streamed in ``constant_memory`` mode
+
+Run from the repository root::
+
+    python benchmarks/bench_backup.py --lines 500 --repeat 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import datetime
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reports.backup import RENDERERS, prepare_sheet  # noqa: E402
+
+
+def make_rows(lines):
+    rows = []
+    for i in range(lines):
+        ds = datetime.date(2024, 5, 1) + datetime.timedelta(days=i % 20)
+        rows.append((
+            "Client SRL", "RO123456", "Str. Clientului 1, Iasi",
+            "Firma SRL", "RO654321", "Str. Firmei 2, Iasi", "Campanie vara",
+            f"Oras {i % 40}", f"Strada {i}, nr. {i % 90}", f"IS{i:04d}", "F1",
+            "Billboard", "4x3", 12 + i % 10, ds.isoformat(), "2024-07-31",
+            300.0 + i, 50.0, 1, 75.0, None,
+        ))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    sheet = prepare_sheet(
+        make_rows(args.lines), datetime.date(2024, 5, 1), datetime.date(2024, 5, 31)
+    )
+    print(f"{args.lines} lines, best of {args.repeat}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, render in RENDERERS.items():
+            path = os.path.join(tmp, f"{name}.xlsx")
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                render(sheet, path)
+                best = min(best, time.perf_counter() - start)
+            size = os.path.getsize(path) // 1024
+            print(f"{name:>10}: {best:7.3f} s  ({size} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Compare the load strategies of ``migrate_to_mysql`` on a SQLite stand-in.
+
+The destination is a temporary SQLite file and every statement sent to it
+sleeps ``--latency`` milliseconds to imitate the round trip to a remote MySQL
+host, which is what dominates a real migration:
+
+* ``row``      - one statement per row (``executemany`` with ``REPLACE``)
+* ``multirow`` - one multi-row statement per chunk (bulk fallback)
+* ``tsv``      - rows written to a TSV file and loaded in one statement, the
+  stand-in for ``LOAD DATA LOCAL INFILE``
+
+Run from the repository root::
+
+    python benchmarks/bench_migrate.py --rows 20000 --latency 0.5
+"""
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrate_to_mysql import multirow_insert_sql, write_tsv  # noqa: E402
+
+COLUMNS = ["id", "city", "county", "address", "sqm", "ratecard"]
+
+
+def make_source(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE locatii (id INTEGER PRIMARY KEY, city TEXT, county TEXT,"
+        " address TEXT, sqm REAL, ratecard REAL)"
+    )
+    conn.executemany(
+        "INSERT INTO locatii VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (i, f"Oras {i % 300}", f"Judet {i % 41}", f"Strada {i}\tnr. {i}", i * 1.5, 100.0 + i)
+            for i in range(1, rows + 1)
+        ),
+    )
+    conn.commit()
+    return conn
+
+
+def make_destination(path):
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE IF EXISTS locatii")
+    conn.execute(
+        "CREATE TABLE locatii (id INTEGER PRIMARY KEY, city TEXT, county TEXT,"
+        " address TEXT, sqm REAL, ratecard REAL)"
+    )
+    conn.execute("CREATE INDEX idx_city ON locatii(city)")
+    conn.commit()
+    return conn
+
+
+_UNESCAPES = {"t": "\t", "n": "\n", "r": "\r", "0": "\0"}
+
+
+def _unescape(field):
+    if field == "\\N":
+        return None
+    return re.sub(r"\\(.)", lambda m: _UNESCAPES.get(m.group(1), m.group(1)), field)
+
+
+def _select(src):
+    cur = src.cursor()
+    cur.execute(f"SELECT rowid, {', '.join(COLUMNS)} FROM locatii ORDER BY rowid")
+    return cur
+
+
+def run_row(src, dst, chunk, latency):
+    sql = multirow_insert_sql("locatii", COLUMNS, 1, placeholder="?")
+    cur = _select(src)
+    while rows := cur.fetchmany(chunk):
+        for row in rows:
+            time.sleep(latency)
+            dst.execute(sql, row[1:])
+        dst.commit()
+
+
+def run_multirow(src, dst, chunk, latency):
+    cur = _select(src)
+    while rows := cur.fetchmany(chunk):
+        time.sleep(latency)
+        params = [v for row in rows for v in row[1:]]
+        dst.execute(multirow_insert_sql("locatii", COLUMNS, len(rows), placeholder="?"), params)
+        dst.commit()
+
+
+def run_tsv(src, dst, chunk, latency):
+    fd, path = tempfile.mkstemp(suffix=".tsv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            write_tsv(_select(src), fh, chunk)
+        dst.execute("DROP INDEX idx_city")
+        time.sleep(latency)
+        # server side: parse the file and insert without further round trips
+        with open(path, encoding="utf-8", newline="") as fh:
+            rows = (
+                [_unescape(f) for f in line.rstrip("\n").split("\t")]
+                for line in fh
+            )
+            dst.executemany(
+                multirow_insert_sql("locatii", COLUMNS, 1, placeholder="?"), rows
+            )
+        dst.execute("CREATE INDEX idx_city ON locatii(city)")
+        dst.commit()
+    finally:
+        os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.5, help="ms per statement")
+    args = parser.parse_args(argv)
+    latency = args.latency / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = make_source(os.path.join(tmp, "src.db"), args.rows)
+        print(f"{args.rows} rows, chunk {args.chunk_size}, latency {args.latency} ms")
+        for name, func in (("row", run_row), ("multirow", run_multirow), ("tsv", run_tsv)):
+            dst = make_destination(os.path.join(tmp, "dst.db"))
+            start = time.perf_counter()
+            func(src, dst, args.chunk_size, latency)
+            elapsed = time.perf_counter() - start
+            count = dst.execute("SELECT COUNT(*) FROM locatii").fetchone()[0]
+            dst.close()
+            print(f"{name:>9}: {elapsed:7.3f} s  ({count} rows)")
+        src.close()
+
+
+if __name__ == "__main__":
+    main()
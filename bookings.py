@@ -0,0 +1,211 @@
+"""Reservations of every location as sorted interval lists, kept in memory.
+
+:class:`BookingIndex` holds, per location, its reservations sorted by start
+date together with the running maximum of their end dates.  "What covers
+day D", "next rental after D" and the other lookups of the dialogs are then
+a binary search and a short walk instead of a query per click.
+
+:func:`get_index` rebuilds the index when the version of ``rezervari`` in
+``data_versions`` changes.  A commit of this client that names the
+locations it wrote (``conn.commit(loc_ids=...)``) calls :func:`patch`, which
+reads those locations again instead of the whole table.
+"""
+
+import bisect
+import datetime
+from itertools import accumulate
+from typing import NamedTuple
+
+COLUMNS = (
+    "id", "loc_id", "client", "data_start", "data_end", "suma", "created_by", "campaign",
+)
+
+
+class Booking(NamedTuple):
+    """One row of ``rezervari``; ``suma`` is ``None`` for a reservation."""
+
+    id: int
+    loc_id: int
+    client: str | None
+    data_start: str
+    data_end: str
+    suma: float | None
+    created_by: str | None
+    campaign: str | None
+
+
+def _iso(day) -> str:
+    return day.isoformat() if isinstance(day, datetime.date) else str(day)
+
+
+def _matches(booking: Booking, rented) -> bool:
+    """``rented`` is ``None`` for any booking, else whether ``suma`` is set."""
+    return rented is None or (booking.suma is not None) == rented
+
+
+class BookingIndex:
+    """Per-location interval lists of the reservations."""
+
+    def __init__(self, rows, version=None):
+        """Build the index from rows with the values of :data:`COLUMNS`."""
+        self.version = version
+        self._locations = {}
+        grouped = {}
+        for row in rows:
+            booking = Booking(*row)
+            grouped.setdefault(booking.loc_id, []).append(booking)
+        for loc_id, bookings in grouped.items():
+            self._set(loc_id, bookings)
+
+    def _set(self, loc_id, bookings) -> None:
+        if not bookings:
+            self._locations.pop(loc_id, None)
+            return
+        bookings.sort(key=lambda b: (b.data_start, b.id))
+        starts = [b.data_start for b in bookings]
+        # reach[i]: the latest end among bookings[:i + 1]
+        reach = list(accumulate((b.data_end for b in bookings), max))
+        self._locations[loc_id] = (starts, bookings, reach)
+
+    def replace(self, loc_ids, rows) -> None:
+        """Swap the bookings of *loc_ids* for *rows* (all of their rows)."""
+        grouped = {loc_id: [] for loc_id in loc_ids}
+        for row in rows:
+            booking = Booking(*row)
+            grouped.setdefault(booking.loc_id, []).append(booking)
+        for loc_id, bookings in grouped.items():
+            self._set(loc_id, bookings)
+
+    def __len__(self) -> int:
+        return sum(len(entry[1]) for entry in self._locations.values())
+
+    def bookings(self, loc_id) -> list[Booking]:
+        """Return the bookings of *loc_id* ordered by start date."""
+        entry = self._locations.get(loc_id)
+        return list(entry[1]) if entry else []
+
+    def _before(self, loc_id, day, inclusive: bool):
+        """Yield the bookings starting before *day* that end on or after it, latest first."""
+        entry = self._locations.get(loc_id)
+        if not entry:
+            return
+        starts, bookings, reach = entry
+        cut = bisect.bisect_right if inclusive else bisect.bisect_left
+        for i in range(cut(starts, day) - 1, -1, -1):
+            if reach[i] < day:
+                return
+            if bookings[i].data_end >= day:
+                yield bookings[i]
+
+    def covering(self, loc_id, day, rented=None) -> Booking | None:
+        """Return the latest-starting booking of *loc_id* that covers *day*."""
+        for booking in self._before(loc_id, _iso(day), True):
+            if _matches(booking, rented):
+                return booking
+        return None
+
+    def overlapping(self, loc_id, start, end, rented=None) -> list[Booking]:
+        """Return the bookings of *loc_id* overlapping *start*–*end*, by start date."""
+        start, end = _iso(start), _iso(end)
+        found = [
+            b
+            for b in self._before(loc_id, start, True)
+            if _matches(b, rented)
+        ]
+        found.reverse()
+        entry = self._locations.get(loc_id)
+        if entry:
+            starts, bookings, _ = entry
+            lo = bisect.bisect_right(starts, start)
+            hi = bisect.bisect_right(starts, end)
+            found.extend(b for b in bookings[lo:hi] if _matches(b, rented))
+        return found
+
+    def next_after(self, loc_id, day, rented=None) -> Booking | None:
+        """Return the first booking of *loc_id* starting after *day*."""
+        entry = self._locations.get(loc_id)
+        if entry:
+            starts, bookings, _ = entry
+            for booking in bookings[bisect.bisect_right(starts, _iso(day)):]:
+                if _matches(booking, rented):
+                    return booking
+        return None
+
+    def previous_before(self, loc_id, day, rented=None) -> Booking | None:
+        """Return the latest-starting booking of *loc_id* that ended before *day*."""
+        entry = self._locations.get(loc_id)
+        if entry:
+            day = _iso(day)
+            starts, bookings, _ = entry
+            for i in range(bisect.bisect_left(starts, day) - 1, -1, -1):
+                booking = bookings[i]
+                if booking.data_end < day and _matches(booking, rented):
+                    return booking
+        return None
+
+    def find(self, loc_id, data_start, data_end, rented=None) -> Booking | None:
+        """Return the newest booking of *loc_id* for exactly this period."""
+        entry = self._locations.get(loc_id)
+        if not entry:
+            return None
+        data_start, data_end = _iso(data_start), _iso(data_end)
+        starts, bookings, _ = entry
+        lo = bisect.bisect_left(starts, data_start)
+        hi = bisect.bisect_right(starts, data_start)
+        same = [
+            b for b in bookings[lo:hi] if b.data_end == data_end and _matches(b, rented)
+        ]
+        return max(same, key=lambda b: b.id) if same else None
+
+
+def _select(where: str = "") -> str:
+    return f"SELECT {', '.join(COLUMNS)} FROM rezervari{where}"
+
+
+def load(cur, version=None) -> BookingIndex:
+    return BookingIndex(cur.execute(_select()).fetchall(), version)
+
+
+_index: BookingIndex | None = None
+
+
+def get_index() -> BookingIndex:
+    """Return the index of the reservations, rebuilt after writes by others."""
+    global _index
+    import db
+
+    version = db.data_version(("rezervari",))
+    if _index is None or version is None or _index.version != version:
+        cur = db.read_connection(tables=("rezervari",)).cursor()
+        # the version of the rows read, which a lagging replica keeps older
+        _index = load(cur, db.data_version(("rezervari",), cur))
+    return _index
+
+
+def patch(loc_ids, before) -> bool:
+    """Re-read the bookings of *loc_ids* after this client committed them.
+
+    *before* is the ``rezervari`` version read inside the transaction.  The
+    index is patched only if it was built at that version and the commit was
+    the only write since; otherwise :func:`get_index` rebuilds it.
+    """
+    import db
+
+    after = db.data_version(("rezervari",))
+    index = _index
+    if (
+        index is None
+        or before is None
+        or after is None
+        or index.version != before
+        or db.version_step(after, "rezervari") != db.version_step(before, "rezervari") + 1
+    ):
+        return False
+    ids = sorted(set(loc_ids))
+    cur = db.conn.cursor()
+    rows = []
+    for marks, chunk in db._id_chunks(ids):
+        rows.extend(cur.execute(_select(f" WHERE loc_id IN ({marks})"), chunk).fetchall())
+    index.replace(ids, rows)
+    index.version = after
+    return True
@@ -0,0 +1,156 @@
+"""Search columns of ``clienti`` and the paged query of the clients window.
+
+Every client row carries two derived columns: ``primary_contact_id`` (its
+first contact in ``client_contacts``) and ``search_key``, the name, contact
+and e-mail folded to lower case without diacritics.  :func:`refresh`
+recomputes them for the clients a commit wrote (every client when the
+database is upgraded) and rewrites only the rows that changed, so
+:func:`search` is a single query on ``clienti`` with a primary-key join
+instead of a correlated subquery.
+"""
+
+import unicodedata
+
+# Tables whose writes change the derived columns
+SOURCE_TABLES = ("clienti", "client_contacts")
+
+# Clients shown per page of the clients window
+PAGE_SIZE = 200
+
+# Ids per ``IN (...)`` list of a partial refresh
+CHUNK = 500
+
+COLUMNS = {
+    "primary_contact_id": "INTEGER",
+    "search_key": "TEXT",
+}
+
+
+def normalize(text) -> str:
+    """Return *text* lower-cased, without diacritics and extra spaces."""
+    text = unicodedata.normalize("NFKD", str(text or "").casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.split())
+
+
+def search_key(nume, contact, email) -> str:
+    return "\n".join(normalize(v) for v in (nume, contact, email))
+
+
+def _chunks(ids):
+    ids = sorted(set(ids))
+    for start in range(0, len(ids), CHUNK):
+        chunk = ids[start:start + CHUNK]
+        yield ", ".join("?" * len(chunk)), chunk
+
+
+def owners(cur, contact_ids) -> set:
+    """Return the clients whose derived columns may depend on *contact_ids*.
+
+    These are the owners of the contacts still present and the clients
+    showing one of them as primary contact, e.g. one just deleted.
+    """
+    found = set()
+    for marks, chunk in _chunks(contact_ids):
+        found.update(
+            row[0]
+            for row in cur.execute(
+                f"SELECT client_id FROM client_contacts WHERE id IN ({marks})", chunk
+            ).fetchall()
+        )
+        found.update(
+            row[0]
+            for row in cur.execute(
+                f"SELECT id FROM clienti WHERE primary_contact_id IN ({marks})", chunk
+            ).fetchall()
+        )
+    found.discard(None)
+    return found
+
+
+def refresh(cur, client_ids=None) -> int:
+    """Update the derived columns that are out of date; return how many.
+
+    With *client_ids* only those clients are recomputed, otherwise all of
+    them.  The caller commits.
+    """
+    if client_ids is None:
+        return _refresh(cur, "", "", [])
+    count = 0
+    for marks, chunk in _chunks(client_ids):
+        count += _refresh(
+            cur, f" WHERE client_id IN ({marks})", f" WHERE id IN ({marks})", chunk
+        )
+    return count
+
+
+def _refresh(cur, contacts_where: str, clients_where: str, params) -> int:
+    first = dict(
+        cur.execute(
+            "SELECT client_id, MIN(id) FROM client_contacts"
+            f"{contacts_where} GROUP BY client_id",
+            params,
+        ).fetchall()
+    )
+    wanted = set(first.values())
+    contacts = {
+        row[0]: row[1:]
+        for row in cur.execute(
+            f"SELECT id, nume, email FROM client_contacts{contacts_where}", params
+        ).fetchall()
+        if row[0] in wanted
+    }
+    changed = []
+    for cid, nume, contact, email, primary, key in cur.execute(
+        "SELECT id, nume, contact, email, primary_contact_id, search_key "
+        f"FROM clienti{clients_where}",
+        params,
+    ).fetchall():
+        new_primary = first.get(cid)
+        if new_primary is not None:
+            cc_nume, cc_email = contacts[new_primary]
+            # same fallback as the window: the contact fields of the client row
+            contact = cc_nume if cc_nume is not None else contact
+            email = cc_email if cc_email is not None else email
+        new_key = search_key(nume, contact, email)
+        if new_primary != primary or new_key != key:
+            changed.append((new_primary, new_key, cid))
+    if changed:
+        cur.executemany(
+            "UPDATE clienti SET primary_contact_id=?, search_key=? WHERE id=?", changed
+        )
+    return len(changed)
+
+
+def _where(term: str) -> tuple[str, list]:
+    term = normalize(term)
+    if not term:
+        return "", []
+    escaped = term.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return " WHERE c.search_key LIKE ? ESCAPE '!'", [f"%{escaped}%"]
+
+
+def search(cur, term: str = "", page: int = 0, page_size: int = PAGE_SIZE):
+    """Return ``(rows, total)`` of the clients matching *term* on *page*.
+
+    Rows are ``(id, nume, tip, contact, email, phone, cui, adresa,
+    observatii)`` ordered by name; *total* counts every match.
+    """
+    where, params = _where(term)
+    total = cur.execute(f"SELECT COUNT(*) FROM clienti c{where}", params).fetchone()[0]
+    rows = cur.execute(
+        f"""
+        SELECT c.id, c.nume, c.tip,
+               COALESCE(cc.nume, c.contact) AS contact,
+               COALESCE(cc.email, c.email) AS email,
+               COALESCE(cc.phone, c.phone) AS phone,
+               c.cui, c.adresa, c.observatii
+          FROM clienti c
+     LEFT JOIN client_contacts cc ON cc.id = c.primary_contact_id
+        {where}
+      ORDER BY c.nume
+         LIMIT ? OFFSET ?
+        """,
+        params + [page_size, page * page_size],
+    ).fetchall()
+    return rows, total
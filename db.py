@@ -1,10 +1,20 @@
 import os
+import re
 import time
 import datetime
 import hashlib
 import hmac
 import sqlite3
 import logging
+import sys
+import threading
+from collections.abc import Mapping
+
+import bookings
+import clients
+import directory
+import offline
+import stats
 
 try:
     from dotenv import load_dotenv  # type: ignore
@@ -26,6 +36,23 @@ except Exception:  # pragma: no cover - optional dep
     sqlalchemy = None
 
 
+# ``True`` while the local replica is used because MySQL is unreachable.
+_replica_mode = False
+# Cleared while writes derived from other tables run (status refresh, schema
+# upgrades) so they are not replayed on the server.
+_record_writes = True
+# ``False`` when the ``loc_month_stats`` triggers could not be created; the
+# table is then rebuilt after commits writing ``rezervari``/``decorari``.
+_stats_triggers = True
+_stats_stale = False
+# Set once ``init_db`` created the aggregate tables
+_stats_ready = False
+# Set once ``init_db`` created ``data_versions`` on SQLite
+_versions_ready = False
+# Set once ``init_db`` created the tables the commit refresh reads
+_schema_ready = False
+
+
 class _CursorWrapper:
     """Cursor wrapper translating ``?`` placeholders for MySQL."""
 
@@ -33,7 +60,19 @@ class _CursorWrapper:
         self._cur = cur
         self._mysql = mysql_mode
 
+    def _execute_offline(self, sql, params):
+        """Run *sql* on the replica and queue it for replay if it is a write."""
+        entry = offline.capture(self._cur, sql, params)
+        self._cur.execute(sql, params or ())
+        if entry is not None:
+            offline.record(self._cur, entry, self._cur.lastrowid)
+        _mark_dirty(sql, self._cur)
+        _note_client_write(sql, params, self._cur)
+        return self
+
     def execute(self, sql, params=None):
+        if not self._mysql and _replica_mode and _record_writes:
+            return self._execute_offline(sql, params)
         if self._mysql:
             sql = sql.replace("?", "%s")
         try:
@@ -52,9 +91,16 @@ class _CursorWrapper:
                 self._cur.execute(sql, params or ())
             else:
                 raise
+        _mark_dirty(sql, self._cur)
+        _note_client_write(sql, params, self._cur)
         return self
 
     def executemany(self, sql, params):
+        params = list(params)
+        if not self._mysql and _replica_mode and _record_writes:
+            for row in params:
+                self._execute_offline(sql, row)
+            return self
         if self._mysql:
             sql = sql.replace("?", "%s")
         try:
@@ -70,6 +116,10 @@ class _CursorWrapper:
                 self._cur.executemany(sql, params)
             else:
                 raise
+        _mark_dirty(sql, self._cur)
+        if getattr(self._cur, "rowcount", -1) != 0:
+            for row in params:
+                _note_client_write(sql, row)
         return self
 
     def __getattr__(self, name):
@@ -97,7 +147,22 @@ class _ConnWrapper:
     def mysql(self):
         return self._mysql
 
-    def commit(self):
+    def commit(self, loc_ids=None):
+        """Commit and refresh the derived data.
+
+        Pass *loc_ids* when only those locations were written: the statuses,
+        the location cache and the bookings index (``bookings.py``) are then
+        refreshed for them alone.
+        """
+        global _stats_stale
+        if self._mysql and not _stats_triggers and _dirty_tables & set(stats.SOURCE_TABLES):
+            _stats_stale = True
+        clients_written = bool(_dirty_tables & set(clients.SOURCE_TABLES))
+        written_clients = _take_client_writes()
+        bookings_before = None
+        if loc_ids is not None and not self._in_commit and "rezervari" in _dirty_tables:
+            bookings_before = data_version(("rezervari",))
+        _bump_versions(self._conn, self._mysql)
         if self._in_commit:
             self._conn.commit()
             return
@@ -113,20 +178,47 @@ class _ConnWrapper:
             else:
                 self._in_commit = False
                 raise
+        if not _schema_ready:
+            self._in_commit = False
+            return
         try:
-            update_statusuri_din_rezervari(ttl=0)
-            refresh_location_cache()
+            update_statusuri_din_rezervari(ttl=0, loc_ids=loc_ids)
+            try:
+                refresh_loc_month_stats()
+            except Exception as exc:  # pragma: no cover - best effort
+                logging.warning("Failed to refresh %s: %s", stats.STATS_TABLE, exc)
+            if clients_written:
+                try:
+                    refresh_client_search(written_clients)
+                except Exception as exc:  # pragma: no cover - best effort
+                    logging.warning("Failed to refresh the client search: %s", exc)
+            refresh_location_cache(loc_ids)
+            if bookings_before is not None:
+                bookings.patch(loc_ids, bookings_before)
         except Exception as exc:  # pragma: no cover - best effort
             logging.warning("Failed to refresh location cache: %s", exc)
         finally:
             self._in_commit = False
 
+    def rollback(self):
+        """Roll back and forget the writes noted since the last commit."""
+        global _client_writes
+        _dirty_tables.clear()
+        _client_writes = set()
+        self._conn.rollback()
+
     def __getattr__(self, name):
         return getattr(self._conn, name)
 
 
 def get_db_path() -> str:
-    """Return the absolute path to the bundled ``locatii.db`` database."""
+    """Return the path of the SQLite database.
+
+    ``LOCATII_DB_PATH`` overrides the bundled ``locatii.db``.
+    """
+    override = os.environ.get("LOCATII_DB_PATH")
+    if override:
+        return os.path.abspath(override)
     base_dir = os.path.dirname(__file__)
     return os.path.join(base_dir, "locatii.db")
 
@@ -146,41 +238,77 @@ def _parse_port(value: str | None) -> int | None:
     raise ValueError(f"Invalid MYSQL_PORT value: {value!r}")
 
 
-def _create_connection():
+def _sqlite_connect(path: str):
+    """Open *path* so the connection can be shared with worker threads.
+
+    The login dialog warms up the database on a background thread while the
+    rest of the application keeps using the same connection from the Tk
+    thread, so ``sqlite3``'s same-thread check has to be disabled.
+    """
+    return sqlite3.connect(path, check_same_thread=False)
+
+
+def _mysql_params() -> dict | None:
+    """Return connection parameters for MySQL or ``None`` if not usable."""
     host = os.environ.get("MYSQL_HOST")
-    if host and mysql is not None:
-        try:
-            port = _parse_port(os.environ.get("MYSQL_PORT"))
-        except Exception:
-            # invalid port configured; ignore and fall back to SQLite
-            return _ConnWrapper(sqlite3.connect(get_db_path()), False)
-
-        # Allow specifying the port as part of the host, e.g. ``HOST=example:3306``
-        if ":" in host:
-            host_part, host_port = host.rsplit(":", 1)
-            if host_port.isdigit():
-                host = host_part
-                if not port:
-                    try:
-                        port = _parse_port(host_port)
-                    except Exception:
-                        return _ConnWrapper(sqlite3.connect(get_db_path()), False)
-
-        params = {
-            "host": host,
-            "user": os.environ.get("MYSQL_USER"),
-            "password": os.environ.get("MYSQL_PASSWORD"),
-            "database": os.environ.get("MYSQL_DATABASE"),
-        }
-        if port:
-            params["port"] = port
-        # mysql.connector uses port 3306 by default when not provided.
+    if not host or mysql is None:
+        return None
+    try:
+        port = _parse_port(os.environ.get("MYSQL_PORT"))
+    except Exception:
+        # invalid port configured; ignore and fall back to SQLite
+        return None
+
+    # Allow specifying the port as part of the host, e.g. ``HOST=example:3306``
+    if ":" in host:
+        host_part, host_port = host.rsplit(":", 1)
+        if host_port.isdigit():
+            host = host_part
+            if not port:
+                try:
+                    port = _parse_port(host_port)
+                except Exception:
+                    return None
+
+    params = {
+        "host": host,
+        "user": os.environ.get("MYSQL_USER"),
+        "password": os.environ.get("MYSQL_PASSWORD"),
+        "database": os.environ.get("MYSQL_DATABASE"),
+    }
+    if port:
+        params["port"] = port
+    # mysql.connector uses port 3306 by default when not provided.
+    return params
+
+
+def _open_replica():
+    """Return a connection to the local replica or ``None`` if there is none."""
+    global _replica_mode
+    path = offline.replica_path()
+    if not os.path.exists(path):
+        return None
+    raw = _sqlite_connect(path)
+    offline.prepare_replica(raw)
+    _replica_mode = True
+    logging.warning("MySQL unreachable, working on the local replica %s", path)
+    return _ConnWrapper(raw, False)
+
+
+def _create_connection():
+    global _replica_mode
+    params = _mysql_params()
+    if params is not None:
         try:
             conn = mysql.connector.connect(**params)
+            _replica_mode = False
             return _ConnWrapper(conn, True)
         except Exception:
-            pass  # fall back to bundled SQLite database
-    return _ConnWrapper(sqlite3.connect(get_db_path()), False)
+            replica = _open_replica()
+            if replica is not None:
+                return replica
+            # fall back to bundled SQLite database
+    return _ConnWrapper(_sqlite_connect(get_db_path()), False)
 
 
 def _needs_reconnect(exc: Exception) -> bool:
@@ -199,6 +327,10 @@ def _needs_reconnect(exc: Exception) -> bool:
 def reconnect() -> None:
     """Recreate the global connection and cursor."""
     global conn, cursor
+    if _replica_mode:
+        # the queued writes must reach the server before switching back
+        go_online()
+        return
     conn = _create_connection()
     cursor = conn.cursor()
     try:
@@ -212,35 +344,680 @@ cursor = conn.cursor()
 
 
 def is_online() -> bool:
-    """Return ``True`` if the database connection is alive."""
+    """Return ``True`` if the database connection is alive.
+
+    Working on the local replica counts as offline.
+    """
+    if _replica_mode:
+        return False
     try:
         cursor.execute("SELECT 1").fetchone()
         return True
     except Exception:
         return False
 
+
+def pending_offline_writes() -> int:
+    """Return the number of writes made offline and not yet replayed."""
+    if not _replica_mode:
+        return 0
+    return offline.pending_count(conn._conn)
+
+
+def server_reachable() -> bool:
+    """Return ``True`` if a new MySQL connection can be opened."""
+    params = _mysql_params()
+    if params is None:
+        return False
+    try:
+        mysql.connector.connect(**params).close()
+        return True
+    except Exception:
+        return False
+
+
+def replay_offline_writes() -> dict | None:
+    """Replay the offline writes on MySQL from connections of its own.
+
+    Meant for a worker thread: the application keeps working on the replica
+    meanwhile, and writes queued after the replay started are left for
+    :func:`go_online`.  Returns the replay summary (``applied`` count and
+    ``conflicts`` messages) or ``None`` if the server is unreachable.
+    """
+    if not _replica_mode:
+        return None
+    params = _mysql_params()
+    if params is None:
+        return None
+    try:
+        remote = mysql.connector.connect(**params)
+    except Exception:
+        return None
+    local = _sqlite_connect(offline.replica_path())
+    try:
+        return offline.replay(local, remote)
+    finally:
+        local.close()
+        remote.close()
+
+
+def go_online(summary: dict | None = None) -> dict | None:
+    """Replay the remaining offline writes and switch back to the server.
+
+    *summary* is the result of :func:`replay_offline_writes`, run before on
+    a worker thread; the writes queued since then (usually none) are
+    replayed here and added to it.  Returns the summary or ``None`` if the
+    server is still unreachable.  The existing connection and cursor objects
+    are reused because the UI modules keep references to them; the replica
+    is refreshed afterwards in the background.
+    """
+    global _replica_mode
+    if not _replica_mode:
+        return None
+    params = _mysql_params()
+    if params is None:
+        return None
+    try:
+        remote = mysql.connector.connect(**params)
+    except Exception:
+        return None
+    local = conn._conn
+    rest = offline.replay(local, remote)
+    if summary is None:
+        summary = rest
+    else:
+        summary = {
+            "applied": summary["applied"] + rest["applied"],
+            "conflicts": summary["conflicts"] + rest["conflicts"],
+        }
+    _replica_mode = False
+    conn._conn, conn._mysql = remote, True
+    cursor._cur, cursor._mysql = remote.cursor(), True
+    local.close()
+    update_statusuri_din_rezervari(ttl=0)
+    refresh_location_cache()
+    maybe_sync_replica(ttl=0)
+    return summary
+
+
+_replica_sync_lock = threading.Lock()
+_replica_sync_timestamp: float = 0.0
+
+
+def _sync_replica_worker() -> None:
+    try:
+        remote = mysql.connector.connect(**_mysql_params())
+        local = _sqlite_connect(offline.replica_path())
+        try:
+            offline.sync_replica(remote, local)
+            if _offline_login is not None:
+                offline.remember_login(local, *_offline_login)
+        finally:
+            local.close()
+            remote.close()
+    except Exception as exc:  # pragma: no cover - depends on the server
+        logging.warning("Failed to refresh the local replica: %s", exc)
+    finally:
+        _replica_sync_lock.release()
+
+
+def maybe_sync_replica(ttl: int = 600) -> bool:
+    """Refresh the local replica in the background every ``ttl`` seconds.
+
+    Only runs while connected to MySQL and only when called, i.e. by the
+    main window after login; importing :mod:`db` never starts a copy.
+    Returns ``True`` if a refresh was started.
+    """
+    global _replica_sync_timestamp
+    if _replica_mode or not getattr(conn, "mysql", False) or _mysql_params() is None:
+        return False
+    if time.time() - _replica_sync_timestamp < ttl:
+        return False
+    if not _replica_sync_lock.acquire(blocking=False):
+        return False
+    _replica_sync_timestamp = time.time()
+    threading.Thread(target=_sync_replica_worker, daemon=True).start()
+    return True
+
+
+# --- read replica routing ---
+#
+# Every committed write bumps the row of the written table in
+# ``data_versions`` inside the same transaction (on SQLite too, where the
+# versions only key the report cache, see :func:`data_version`).  A read may
+# use the replica only if the replica already has the versions this process
+# wrote itself (read-your-writes) and is not lagging behind the primary for
+# longer than ``REPLICA_MAX_LAG`` seconds.
+
+# Seconds a replica may stay behind the primary before reads avoid it.
+REPLICA_MAX_LAG = float(os.environ.get("MYSQL_REPLICA_MAX_LAG", "30"))
+# Seconds between two lag checks against the primary.
+REPLICA_CHECK_INTERVAL = 10
+# Seconds the replica's ``data_versions`` are reused between reads; they are
+# read again sooner when a write of this process is not in them yet.
+REPLICA_VERSIONS_TTL = 2
+# Seconds to wait before retrying a replica that failed.
+REPLICA_RETRY = 60
+
+_WRITE_TABLE_RE = re.compile(
+    r"^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+`?(\w+)",
+    re.I,
+)
+_READ_TABLES_RE = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)", re.I)
+_CLIENT_WRITE_RE = re.compile(
+    r"^\s*(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+`?(clienti|client_contacts)\b`?(.*)$",
+    re.I | re.S,
+)
+_INSERT_COLUMNS_RE = re.compile(r"^\s*\(([^)]*)\)\s*VALUES\b", re.I)
+_WHERE_ID_RE = re.compile(r"\bWHERE\s+(client_id|id)\s*=\s*(?:\?|%s)\s*$", re.I)
+
+# Tables written since the last commit and versions written by this process.
+_dirty_tables: set[str] = set()
+# ``(table, id)`` of the ``clienti``/``client_contacts`` rows written since
+# the last commit; ``None`` once a write could not be attributed to a row
+_client_writes: set | None = set()
+_written_versions: dict[str, int] = {}
+_replica_state = {
+    "conn": None,
+    "down_until": 0.0,
+    "checked": 0.0,
+    "lagging": False,
+    "versions": None,
+    "versions_at": 0.0,
+}
+
+
+def _mark_dirty(sql: str, cur) -> None:
+    """Remember the table written by *sql* if it changed any row."""
+    match = _WRITE_TABLE_RE.match(sql)
+    if match and match.group(1) != "data_versions":
+        if getattr(cur, "rowcount", -1) != 0:
+            _dirty_tables.add(match.group(1))
+
+
+def _note_client_write(sql: str, params, cur=None) -> None:
+    """Remember the client row written by *sql* for :func:`refresh_client_search`.
+
+    Inserts into ``clienti`` need *cur* for the new id.  A write whose row
+    cannot be told from the statement makes the next refresh a full one.
+    """
+    global _client_writes
+    match = _CLIENT_WRITE_RE.match(sql)
+    if match is None or _client_writes is None:
+        return
+    if cur is not None and getattr(cur, "rowcount", -1) == 0:
+        return
+    verb, table, rest = match.group(1)[0].upper(), match.group(2).lower(), match.group(3)
+    params = list(params or ())
+    row = None
+    if verb == "I" and table == "clienti":
+        row = (table, getattr(cur, "lastrowid", None))
+    elif verb == "I":
+        columns = _INSERT_COLUMNS_RE.match(rest)
+        names = [c.strip(" `").lower() for c in columns.group(1).split(",")] if columns else []
+        if "client_id" in names and len(names) == len(params):
+            row = ("clienti", params[names.index("client_id")])
+    else:
+        where = _WHERE_ID_RE.search(rest)
+        if where and params:
+            by_client = table == "clienti" or where.group(1).lower() == "client_id"
+            row = ("clienti" if by_client else "client_contacts", params[-1])
+    if row is None or row[1] is None:
+        _client_writes = None
+    else:
+        _client_writes.add(row)
+
+
+def _take_client_writes() -> set | None:
+    """Return the client rows written since the last commit and forget them."""
+    global _client_writes
+    written, _client_writes = _client_writes, set()
+    return written
+
+
+def _bump_versions(raw_conn, mysql_mode: bool = True) -> None:
+    """Increase the version of the tables written in this transaction."""
+    if not _dirty_tables:
+        return
+    tables = sorted(_dirty_tables)
+    _dirty_tables.clear()
+    try:
+        cur = raw_conn.cursor()
+        now = time.time()
+        if not mysql_mode:
+            if not _versions_ready:
+                return
+            cur.executemany(
+                "INSERT INTO data_versions (tbl, version, updated_on) VALUES (?, 1, ?) "
+                "ON CONFLICT(tbl) DO UPDATE SET version=version+1, "
+                "updated_on=excluded.updated_on",
+                [(table, now) for table in tables],
+            )
+            return
+        for table in tables:
+            cur.execute(
+                "INSERT INTO data_versions (tbl, version, updated_on) VALUES (%s, 1, %s) "
+                "ON DUPLICATE KEY UPDATE version=version+1, updated_on=VALUES(updated_on)",
+                (table, now),
+            )
+        cur.execute(
+            "SELECT tbl, version FROM data_versions WHERE tbl IN ("
+            + ", ".join(["%s"] * len(tables)) + ")",
+            tables,
+        )
+        _written_versions.update({t: int(v) for t, v in cur.fetchall()})
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("Failed to update data versions: %s", exc)
+
+
+def _replica_params() -> dict | None:
+    """Return connection parameters for the read replica or ``None``."""
+    host = os.environ.get("MYSQL_REPLICA_HOST")
+    if not host or mysql is None:
+        return None
+    try:
+        port = _parse_port(os.environ.get("MYSQL_REPLICA_PORT"))
+    except Exception:
+        return None
+    if ":" in host:
+        host_part, host_port = host.rsplit(":", 1)
+        if host_port.isdigit():
+            host = host_part
+            if not port:
+                try:
+                    port = _parse_port(host_port)
+                except Exception:
+                    return None
+    params = {
+        "host": host,
+        "user": os.environ.get("MYSQL_REPLICA_USER") or os.environ.get("MYSQL_USER"),
+        "password": os.environ.get("MYSQL_REPLICA_PASSWORD")
+        or os.environ.get("MYSQL_PASSWORD"),
+        "database": os.environ.get("MYSQL_REPLICA_DATABASE")
+        or os.environ.get("MYSQL_DATABASE"),
+    }
+    if port:
+        params["port"] = port
+    return params
+
+
+def _replica_failed(exc: Exception) -> None:
+    """Stop using the replica for ``REPLICA_RETRY`` seconds."""
+    logging.warning("Read replica unavailable, using the primary: %s", exc)
+    old = _replica_state["conn"]
+    _replica_state["conn"] = None
+    _replica_state["versions"] = None
+    _replica_state["down_until"] = time.time() + REPLICA_RETRY
+    try:
+        if old is not None:
+            old.close()
+    except Exception:
+        pass
+
+
+def _replica_connection():
+    """Return the raw replica connection, connecting on first use."""
+    if _replica_state["conn"] is None:
+        _replica_state["conn"] = mysql.connector.connect(**_replica_params())
+        _replica_state["conn"].autocommit = True
+    return _replica_state["conn"]
+
+
+def _fetch_versions(raw_conn) -> dict[str, tuple[int, float]]:
+    return _read_versions(raw_conn.cursor())
+
+
+def _read_versions(cur) -> dict[str, tuple[int, float]]:
+    cur.execute("SELECT tbl, version, updated_on FROM data_versions")
+    return {t: (int(v), float(u or 0)) for t, v, u in cur.fetchall()}
+
+
+def data_version(tables, cur=None) -> str | None:
+    """Return a token that changes whenever one of *tables* is written.
+
+    The token names the database in use (MySQL server, local replica or the
+    bundled SQLite file) and the ``data_versions`` rows of *tables*, so it
+    stays valid across restarts.  Returns ``None`` if the versions cannot be
+    read; callers must not cache anything then.
+
+    The versions are read from the primary, or through *cur*: pass the
+    :func:`read_connection` cursor that then reads the cached rows, so a
+    lagging replica never stamps old rows with the primary's version.
+    """
+    if _replica_mode:
+        source = "replica:" + offline.replica_path()
+    elif getattr(conn, "mysql", False):
+        params = _mysql_params() or {}
+        source = "mysql:{}:{}".format(params.get("host"), params.get("database"))
+    else:
+        source = "sqlite:" + get_db_path()
+    try:
+        versions = _fetch_versions(conn._conn) if cur is None else _read_versions(cur)
+    except Exception as exc:
+        logging.warning("Cannot read data versions: %s", exc)
+        return None
+    parts = [
+        "{}={}@{}".format(t, *versions.get(t, (0, 0.0))) for t in sorted(set(tables))
+    ]
+    return source + "|" + ",".join(parts)
+
+
+def version_step(token: str, table: str) -> int:
+    """Return the version of *table* recorded in a :func:`data_version` token."""
+    for part in token.split("|", 1)[-1].split(","):
+        name, _, rest = part.partition("=")
+        if name == table:
+            return int(rest.split("@", 1)[0])
+    return 0
+
+
+def _replica_lagging(replica_versions) -> bool:
+    """Return ``True`` if the replica is too far behind the primary."""
+    now = time.time()
+    if now - _replica_state["checked"] >= REPLICA_CHECK_INTERVAL:
+        primary = _fetch_versions(conn._conn)
+        behind = [
+            t for t, (v, _) in primary.items() if replica_versions.get(t, (0, 0))[0] < v
+        ]
+        lag = 0.0
+        if behind:
+            newest = max((u for _, u in replica_versions.values()), default=0.0)
+            lag = max(primary[t][1] for t in behind) - newest
+        _replica_state["lagging"] = lag > REPLICA_MAX_LAG
+        _replica_state["checked"] = now
+    return _replica_state["lagging"]
+
+
+def _replica_for(tables) -> object | None:
+    """Return the raw replica connection if it can serve a read of *tables*."""
+    if (
+        _replica_mode
+        or not getattr(conn, "mysql", False)
+        or _replica_params() is None
+        or time.time() < _replica_state["down_until"]
+    ):
+        return None
+    try:
+        replica = _replica_connection()
+        needed = _written_versions if tables is None else {
+            t: _written_versions[t] for t in tables if t in _written_versions
+        }
+
+        def behind(versions):
+            return any(versions.get(t, (0, 0))[0] < v for t, v in needed.items())
+
+        versions = _replica_state.get("versions")
+        if (
+            versions is None
+            or time.time() - _replica_state.get("versions_at", 0.0) >= REPLICA_VERSIONS_TTL
+            or behind(versions)
+        ):
+            versions = _fetch_versions(replica)
+            _replica_state["versions"] = versions
+            _replica_state["versions_at"] = time.time()
+        if behind(versions):
+            return None
+        if _replica_lagging(versions):
+            return None
+        return replica
+    except Exception as exc:
+        _replica_failed(exc)
+        return None
+
+
+class _ReadCursor:
+    """Cursor running a query on the replica, retried on the primary on error."""
+
+    def __init__(self, replica, fallback):
+        self._replica = replica
+        self._fallback = fallback
+        self._cur = None
+
+    def execute(self, sql, params=None):
+        if self._replica is not None:
+            try:
+                cur = self._replica.cursor(buffered=True)
+                cur.execute(sql.replace("?", "%s"), params or ())
+                self._cur = cur
+                return self
+            except Exception as exc:
+                _replica_failed(exc)
+                self._replica = None
+        self._cur = self._fallback.cursor()
+        self._cur.execute(sql, params or ())
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class _ReadConnection:
+    def __init__(self, replica, fallback):
+        self._replica = replica
+        self._fallback = fallback
+
+    def cursor(self):
+        return _ReadCursor(self._replica, self._fallback)
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+
+def read_connection(fallback=None, tables=None):
+    """Return a connection for read-only queries on *tables*.
+
+    Queries go to the read replica configured with ``MYSQL_REPLICA_HOST``
+    when it is reachable, has the writes made by this process and is not
+    lagging; otherwise *fallback* (the primary connection by default) is
+    returned.  Writes must never use the returned connection.
+    """
+    fallback = conn if fallback is None else fallback
+    replica = _replica_for(tables)
+    if replica is None:
+        return fallback
+    return _ReadConnection(replica, fallback)
+
+
 # --- simple in-memory cache for the locatii table ---
-_location_cache: list[dict] | None = None
+# Long text columns read from the database only when a row asks for them
+LAZY_COLUMNS = ("observatii", "photo_link", "illumination", "size")
+# Short values repeated across many rows, shared instead of copied per row
+INTERNED_COLUMNS = ("city", "county", "grup", "status", "type", "face", "client")
+
+
+class _RowLayout:
+    """Column positions shared by every cached row of one refresh."""
+
+    __slots__ = ("columns", "lazy", "pos")
+
+    def __init__(self, columns, lazy):
+        self.columns = tuple(columns)
+        self.lazy = tuple(lazy)
+        self.pos = {c: i for i, c in enumerate(self.columns)}
+        self.pos.update({c: -1 - i for i, c in enumerate(self.lazy)})
+
+
+class LocationRow(Mapping):
+    """One cached ``locatii`` row, read like a read-only ``dict``.
+
+    The values are kept in a tuple; :data:`LAZY_COLUMNS` are fetched with a
+    single query the first time one of them is read.
+    """
+
+    __slots__ = ("_layout", "_values", "_lazy")
+
+    def __init__(self, layout: _RowLayout, values):
+        self._layout = layout
+        self._values = tuple(values)
+        self._lazy = None
+
+    def __getitem__(self, key):
+        i = self._layout.pos[key]
+        if i >= 0:
+            return self._values[i]
+        if self._lazy is None:
+            self._lazy = self._load_lazy()
+        return self._lazy[-1 - i]
+
+    def __iter__(self):
+        yield from self._layout.columns
+        yield from self._layout.lazy
+
+    def __len__(self):
+        return len(self._layout.pos)
+
+    def __contains__(self, key):
+        return key in self._layout.pos
+
+    def __repr__(self):
+        return f"LocationRow(id={self.get('id')!r})"
+
+    def _load_lazy(self) -> tuple:
+        lazy = self._layout.lazy
+        if not lazy:
+            return ()
+        cur = read_connection(tables=("locatii",)).cursor()
+        cur.execute(
+            f"SELECT {', '.join(lazy)} FROM locatii WHERE id = ?", (self["id"],)
+        )
+        row = cur.fetchone()
+        return tuple(row) if row else (None,) * len(lazy)
+
+
+_location_cache: tuple[LocationRow, ...] | None = None
+_location_by_id: dict[int, LocationRow] = {}
+_location_layout: _RowLayout | None = None
 _cache_timestamp: float = 0.0
 # Timestamp of the last status refresh from ``update_statusuri_din_rezervari``.
 _status_timestamp: float = 0.0
 
 
-def refresh_location_cache() -> None:
-    """Load all rows from ``locatii`` into memory."""
-    global _location_cache, _cache_timestamp
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM locatii")
-    cols = [d[0] for d in cur.description]
-    _location_cache = [dict(zip(cols, row)) for row in cur.fetchall()]
+def refresh_loc_month_stats(rebuild: bool = False) -> int:
+    """Bring ``loc_month_stats`` up to date and return the locations refreshed.
+
+    Only the locations queued by the triggers since the last refresh are
+    recomputed unless *rebuild* is set (or the triggers are missing and the
+    source tables changed), in which case the whole table is rebuilt.
+    """
+    global _record_writes, _stats_stale
+
+    if not _stats_ready:
+        return 0
+    # every client derives the aggregates itself; never queue them offline
+    previous, _record_writes = _record_writes, False
+    try:
+        cur = conn.cursor()
+        if rebuild or _stats_stale:
+            _stats_stale = False
+            cur.execute(f"DELETE FROM {stats.DIRTY_TABLE}")
+            count = stats.refresh(cur)
+        else:
+            count = stats.process_dirty(cur)
+        if count:
+            conn.commit()
+    finally:
+        _record_writes = previous
+    return count
+
+
+def refresh_client_search(written=None) -> int:
+    """Update ``primary_contact_id``/``search_key`` of ``clienti`` (see ``clients.py``).
+
+    *written* holds the ``(table, id)`` rows a commit wrote and only their
+    clients are recomputed; ``None`` (the upgrade in :func:`init_db`, or
+    writes that could not be attributed) recomputes every client.
+    """
+    global _record_writes
+
+    # every client derives the columns itself; never queue them offline
+    previous, _record_writes = _record_writes, False
+    try:
+        cur = conn.cursor()
+        if written is None:
+            count = clients.refresh(cur)
+        else:
+            ids = {row_id for table, row_id in written if table == "clienti"}
+            ids |= clients.owners(
+                cur, [row_id for table, row_id in written if table == "client_contacts"]
+            )
+            count = clients.refresh(cur, ids) if ids else 0
+        if count:
+            conn.commit()
+    finally:
+        _record_writes = previous
+    return count
+
+
+def _id_chunks(ids, size: int = 500):
+    """Yield ``(placeholders, ids)`` for ``IN (...)`` clauses of at most *size* ids."""
+    ids = list(ids)
+    for i in range(0, len(ids), size):
+        chunk = ids[i : i + size]
+        yield ", ".join("?" * len(chunk)), chunk
+
+
+def _cache_rows(layout: _RowLayout, records) -> list[LocationRow]:
+    interned = [layout.pos[c] for c in INTERNED_COLUMNS if c in layout.pos]
+    rows = []
+    for values in records:
+        values = list(values)
+        for i in interned:
+            if isinstance(values[i], str):
+                values[i] = sys.intern(values[i])
+        rows.append(LocationRow(layout, values))
+    return rows
+
+
+def refresh_location_cache(loc_ids=None) -> None:
+    """Load the rows of ``locatii`` into memory, without :data:`LAZY_COLUMNS`.
+
+    With *loc_ids* only those rows are read again: new ids are appended and
+    ids no longer in the table are dropped from the cache.
+    """
+    global _location_cache, _location_by_id, _location_layout, _cache_timestamp
+    cur = read_connection(tables=("locatii",)).cursor()
+    if loc_ids is not None and _location_cache is not None:
+        layout = _location_layout
+        fresh = {}
+        for marks, chunk in _id_chunks(sorted(set(loc_ids))):
+            cur.execute(
+                f"SELECT {', '.join(layout.columns)} FROM locatii WHERE id IN ({marks})",
+                chunk,
+            )
+            fresh.update((row["id"], row) for row in _cache_rows(layout, cur.fetchall()))
+        wanted = set(loc_ids)
+        rows = []
+        for row in _location_cache:
+            if row["id"] in wanted:
+                row = fresh.pop(row["id"], None)
+                if row is None:
+                    continue
+            rows.append(row)
+        rows.extend(fresh.values())
+    else:
+        cur.execute("SELECT * FROM locatii WHERE 1 = 0")
+        cols = [d[0] for d in cur.description]
+        cur.fetchall()
+        layout = _RowLayout(
+            [c for c in cols if c not in LAZY_COLUMNS],
+            [c for c in cols if c in LAZY_COLUMNS],
+        )
+        cur.execute(f"SELECT {', '.join(layout.columns)} FROM locatii")
+        rows = _cache_rows(layout, cur.fetchall())
+    _location_cache = tuple(rows)
+    _location_by_id = {row["id"]: row for row in rows}
+    _location_layout = layout
     _cache_timestamp = time.time()
 
 
-def get_location_cache() -> list[dict]:
-    """Return the cached locations, loading them on first use."""
+def get_location_cache() -> tuple[LocationRow, ...]:
+    """Return the cached locations, loading them on first use.
+
+    The rows are shared and read-only; build a ``dict`` to change one.
+    """
     if _location_cache is None:
         refresh_location_cache()
-    return list(_location_cache)
+    return _location_cache
 
 
 def maybe_refresh_location_cache(ttl: int = 300) -> bool:
@@ -251,12 +1028,15 @@ def maybe_refresh_location_cache(ttl: int = 300) -> bool:
     return False
 
 
-def get_location_by_id(loc_id: int) -> dict | None:
-    """Return location data from cache for the given ``loc_id``."""
-    for row in get_location_cache():
-        if row.get("id") == loc_id:
-            return dict(row)
-    return None
+def get_location_by_id(loc_id: int) -> "LocationRow | None":
+    """Return the cached row of ``loc_id``, read like a read-only ``dict``.
+
+    The row itself is returned rather than a copy, so a lookup does not
+    fetch its :data:`LAZY_COLUMNS` until one of them is read.
+    """
+    if _location_cache is None:
+        refresh_location_cache()
+    return _location_by_id.get(loc_id)
 
 
 def table_has_column(table: str, column: str) -> bool:
@@ -269,29 +1049,26 @@ def table_has_column(table: str, column: str) -> bool:
     return any(row[1] == column for row in cur.fetchall())
 
 
-def pandas_conn():
-    """Return a connection/engine suitable for ``pandas.read_sql_query``."""
-    if getattr(conn, "mysql", False):
-        host = os.environ.get("MYSQL_HOST")
-        port = _parse_port(os.environ.get("MYSQL_PORT"))
-        if host and ":" in host and not port:
-            host, host_port = host.rsplit(":", 1)
-            if host_port.isdigit():
-                port = _parse_port(host_port)
+def _mysql_url(params: dict) -> str:
+    url = f"mysql+mysqlconnector://{params['user'] or ''}:{params['password'] or ''}@{params['host']}"
+    if params.get("port"):
+        url += f":{params['port']}"
+    return url + f"/{params['database'] or ''}"
+
 
-        user = os.environ.get("MYSQL_USER", "")
-        password = os.environ.get("MYSQL_PASSWORD", "")
-        db_name = os.environ.get("MYSQL_DATABASE", "")
+def pandas_conn(replica: bool = False):
+    """Return a connection/engine suitable for ``pandas.read_sql_query``.
 
-        url = f"mysql+mysqlconnector://{user}:{password}@{host}"
-        if port:
-            url += f":{port}"
-        url += f"/{db_name}"
+    With *replica* the engine points to the read replica.
+    """
+    if getattr(conn, "mysql", False):
+        url = _mysql_url(_replica_params() if replica else _mysql_params())
+        attr = "_replica_engine" if replica else "_engine"
 
         if sqlalchemy is not None:
-            if not hasattr(pandas_conn, "_engine"):
-                pandas_conn._engine = sqlalchemy.create_engine(url)
-            return pandas_conn._engine
+            if not hasattr(pandas_conn, attr):
+                setattr(pandas_conn, attr, sqlalchemy.create_engine(url))
+            return getattr(pandas_conn, attr)
 
         # ``pandas.read_sql_query`` also accepts an SQLAlchemy URL string
         # and will create the engine on demand if SQLAlchemy is available.
@@ -306,6 +1083,27 @@ def pandas_conn():
     return conn
 
 
+def _read_mysql(pd, sql, params, kwargs, replica=None):
+    """Run *sql* on MySQL, on the raw *replica* connection when given."""
+    kwargs = dict(kwargs)
+    # Avoid ``UserWarning`` when ``sqlalchemy`` is missing by falling back
+    # to manual fetches instead of passing the raw DB-API connection.
+    if sqlalchemy is None:
+        cur = replica.cursor() if replica is not None else conn.cursor()
+        cur.execute(sql, params or ())
+        cols = [d[0] for d in cur.description]
+        df = pd.DataFrame(cur.fetchall(), columns=cols)
+
+        parse_dates = kwargs.pop("parse_dates", None)
+        if parse_dates:
+            for col in parse_dates:
+                df[col] = pd.to_datetime(df[col])
+        return df
+    return pd.read_sql_query(
+        sql, pandas_conn(replica=replica is not None), params=params, **kwargs
+    )
+
+
 def read_sql_query(sql: str, params=None, **kwargs):
     """Return a DataFrame using ``pandas.read_sql_query`` with adapted placeholders.
 
@@ -313,51 +1111,66 @@ def read_sql_query(sql: str, params=None, **kwargs):
     regardless of whether an SQLAlchemy engine or a raw ``mysql.connector``
     connection is used.  Replace the ``?`` placeholders accordingly so queries
     work with both backends.
+
+    With MySQL the query runs on the read replica when one is usable (see
+    :func:`read_connection`) and on the primary otherwise.  Chunked reads
+    (``chunksize``) from the replica are fetched before returning, so an
+    error halfway is retried on the primary instead of reaching the caller.
     """
     import pandas as pd
 
     if getattr(conn, "mysql", False):
         sql = sql.replace("?", "%s")
-
-        # Avoid ``UserWarning`` when ``sqlalchemy`` is missing by falling back
-        # to manual fetches instead of passing the raw DB-API connection.
-        if sqlalchemy is None:
-            cur = conn.cursor()
-            cur.execute(sql, params or ())
-            cols = [d[0] for d in cur.description]
-            df = pd.DataFrame(cur.fetchall(), columns=cols)
-
-            parse_dates = kwargs.pop("parse_dates", None)
-            if parse_dates:
-                for col in parse_dates:
-                    df[col] = pd.to_datetime(df[col])
-            return df
+        replica = _replica_for(set(_READ_TABLES_RE.findall(sql)))
+        if replica is not None:
+            try:
+                result = _read_mysql(pd, sql, params, kwargs, replica)
+                if kwargs.get("chunksize") and not isinstance(result, pd.DataFrame):
+                    result = iter(list(result))
+                return result
+            except Exception as exc:
+                _replica_failed(exc)
+        return _read_mysql(pd, sql, params, kwargs)
 
     return pd.read_sql_query(sql, pandas_conn(), params=params, **kwargs)
 
 
-def ensure_index(table: str, index_name: str, column: str) -> None:
-    """Create *index_name* on *table* if it is missing."""
+def ensure_index(table: str, index_name: str, *columns: str) -> None:
+    """Create *index_name* on the *columns* of *table* if it is missing."""
     if getattr(conn, "mysql", False):
         cur = conn.cursor()
         cur.execute(f"SHOW INDEX FROM {table} WHERE Key_name=?", (index_name,))
         if not cur.fetchone():
-            length = ""
-            cur.execute(f"SHOW FIELDS FROM {table} WHERE Field=?", (column,))
-            field = cur.fetchone()
-            if field:
-                ctype = str(field[1]).lower()
-                if "text" in ctype or "blob" in ctype:
-                    length = "(255)"
-                cur.execute(
-                    f"CREATE INDEX {index_name} ON {table}({column}{length})"
-                )
+            parts = []
+            for column in columns:
+                length = ""
+                cur.execute(f"SHOW FIELDS FROM {table} WHERE Field=?", (column,))
+                field = cur.fetchone()
+                if field:
+                    ctype = str(field[1]).lower()
+                    if "text" in ctype or "blob" in ctype:
+                        length = "(255)"
+                parts.append(f"{column}{length}")
+            cur.execute(f"CREATE INDEX {index_name} ON {table}({', '.join(parts)})")
     else:
-        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({column})")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({', '.join(columns)})"
+        )
 
 
 def init_db():
+    global _schema_ready
+    _schema_ready = False
     if getattr(conn, "mysql", False):
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS data_versions (
+                tbl VARCHAR(64) PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                updated_on DOUBLE
+            )
+            """
+        )
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS locatii (
@@ -397,6 +1210,17 @@ def init_db():
         init_users_table()
         conn.commit()
     else:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS data_versions (
+                tbl TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                updated_on REAL
+            )
+            """
+        )
+        global _versions_ready
+        _versions_ready = True
         # (1) Creăm tabelul cu toate coloanele, inclusiv noile preturi
         cursor.execute(
             """
@@ -436,13 +1260,31 @@ def init_db():
         init_decorari_table()
         init_users_table()
         conn.commit()
+    _schema_ready = True
 
     # Indexuri pentru o interogare mai rapidă
     ensure_index("locatii", "idx_locatii_grup", "grup")
     ensure_index("locatii", "idx_locatii_status", "status")
     ensure_index("rezervari", "idx_rezervari_loc", "loc_id")
+    ensure_index("rezervari", "idx_rezervari_start", "data_start")
+    ensure_index("rezervari", "idx_rezervari_end", "data_end")
+    # overlap checks: one range scan of data_end per location
+    ensure_index(
+        "rezervari", "idx_rezervari_loc_period", "loc_id", "data_end", "data_start"
+    )
+    ensure_index("rezervari", "idx_rezervari_created", "created_on")
     ensure_index("decorari", "idx_decorari_loc", "loc_id")
+    ensure_index("client_contacts", "idx_client_contacts_client", "client_id")
+    conn.commit()
+
+    # Agregate lunare pe locație, reconstruite la prima rulare
+    global _stats_triggers, _stats_ready
+    _stats_triggers = stats.create_schema(cursor, getattr(conn, "mysql", False))
+    _stats_ready = True
+    if stats.is_empty(cursor):
+        refresh_loc_month_stats(rebuild=True)
     conn.commit()
+    refresh_client_search()
     if not getattr(conn, "mysql", False):
         existing = {
             col[1] for col in cursor.execute("PRAGMA table_info(locatii)").fetchall()
@@ -534,6 +1376,7 @@ def init_clienti_table():
             "tip": "TEXT DEFAULT 'direct'",
             "cui": "TEXT",
             "adresa": "TEXT",
+            **clients.COLUMNS,
         }
         for col, definition in to_add.items():
             if col not in cols:
@@ -552,6 +1395,8 @@ def init_clienti_table():
             "phone": "TEXT",
             "observatii": "TEXT",
             "tip": "VARCHAR(32) DEFAULT 'direct'",
+            "primary_contact_id": "INT",
+            "search_key": "TEXT",
         }
         for col, definition in to_add.items():
             if col not in existing:
@@ -809,9 +1654,10 @@ def init_users_table():
         )
         """
         )
-    # create default admin if table empty
+    # create default admin if table empty; an empty replica only means that
+    # nobody logged in on this computer yet
     cursor.execute("SELECT COUNT(*) FROM users")
-    if not cursor.fetchone()[0]:
+    if not cursor.fetchone()[0] and not _replica_mode:
         cursor.execute(
             "INSERT INTO users (username, password, role) VALUES (?, ?, 'admin')",
             ("admin", _hash_password("admin")),
@@ -819,151 +1665,352 @@ def init_users_table():
     conn.commit()
 
 
-def update_statusuri_din_rezervari(ttl: int = 300) -> None:
+def update_statusuri_din_rezervari(ttl: int = 300, loc_ids=None) -> None:
     """Refresh location statuses based on current reservations.
 
     If ``ttl`` is greater than zero the refresh is skipped when the
     function was executed less than ``ttl`` seconds ago.  This avoids
     running expensive UPDATE queries repeatedly when ``load_locations``
     is triggered often (for example while typing in the search field).
-    Pass ``ttl=0`` to force an update.
+    Pass ``ttl=0`` to force an update.  With *loc_ids* only those
+    locations are recomputed, always, and the full refresh stays due.
     """
 
-    global _status_timestamp
+    global _status_timestamp, _record_writes
 
-    if ttl > 0 and time.time() - _status_timestamp < ttl:
+    if loc_ids is None and ttl > 0 and time.time() - _status_timestamp < ttl:
         return
 
+    # the server recomputes the statuses itself; never queue them offline
+    previous, _record_writes = _record_writes, False
+    try:
+        _update_statusuri(loc_ids)
+    finally:
+        _record_writes = previous
+    if loc_ids is None:
+        _status_timestamp = time.time()
+
+
+def _update_statusuri(loc_ids=None) -> None:
+    """Run the queries behind :func:`update_statusuri_din_rezervari`.
+
+    The status of each location (of *loc_ids*, or all of them) is derived
+    from the bookings covering today and only the rows that differ are
+    written, so a refresh finding nothing new leaves ``locatii`` and its
+    version untouched.  Expired reservations are only purged by the full
+    refresh.
+    """
     today = datetime.date.today().isoformat()
     cur = conn.cursor()
 
-    # Ștergem rezervările expirate (fără sumă) care nu au fost anulate
-    cur.execute(
-        "DELETE FROM rezervari WHERE data_end < ? AND suma IS NULL",
-        (today,),
-    )
-    cur.execute(
-        "DELETE FROM decorari WHERE rez_id IS NOT NULL "
-        "AND rez_id NOT IN (SELECT id FROM rezervari)"
-    )
+    if loc_ids is None:
+        # Ștergem rezervările expirate (fără sumă) care nu au fost anulate
+        cur.execute(
+            "DELETE FROM rezervari WHERE data_end < ? AND suma IS NULL",
+            (today,),
+        )
+        cur.execute(
+            "DELETE FROM decorari WHERE rez_id IS NOT NULL "
+            "AND rez_id NOT IN (SELECT id FROM rezervari)"
+        )
+        chunks = [("", [])]
+    else:
+        chunks = list(_id_chunks(sorted(set(loc_ids))))
+
+    changes = []
+    for marks, chunk in chunks:
+        loc_where = f" WHERE id IN ({marks})" if marks else ""
+        rez_and = f" AND loc_id IN ({marks})" if marks else ""
+        # Rezervarea/închirierea curentă a fiecărei locații: închirierile
+        # (sumă > 0) au prioritate, apoi cea care începe cel mai târziu
+        current = {}
+        for row in cur.execute(
+            "SELECT id, loc_id, client, client_id, data_start, data_end, suma "
+            "FROM rezervari WHERE ? BETWEEN data_start AND data_end "
+            "AND (suma IS NULL OR suma > 0)" + rez_and,
+            [today] + chunk,
+        ).fetchall():
+            rank = (row[6] is not None, row[4], row[0])
+            if row[1] not in current or rank > current[row[1]][0]:
+                current[row[1]] = (rank, row)
+
+        for loc_id, *old, is_mobile, parent_id in cur.execute(
+            "SELECT id, status, client, client_id, data_start, data_end, "
+            "is_mobile, parent_id FROM locatii" + loc_where,
+            chunk,
+        ).fetchall():
+            booking = current.get(loc_id)
+            if booking is None:
+                new = ["Disponibil", None, None, None, None]
+            else:
+                _, client, client_id, start, end, suma = booking[1][1:]
+                if suma is None:
+                    new = ["Rezervat", client, None, start, end]
+                else:
+                    new = ["Închiriat", client, client_id, start, end]
+            # Instanțele mobile expirate sunt ascunse
+            if (
+                is_mobile == 1
+                and parent_id is not None
+                and new[4] is not None
+                and _iso(new[4]) < today
+            ):
+                new[0] = "Expirat"
+            if new != old:
+                changes.append(new + [loc_id])
+
+    if changes:
+        cur.executemany(
+            "UPDATE locatii SET status=?, client=?, client_id=?, data_start=?, "
+            "data_end=? WHERE id=?",
+            changes,
+        )
+    conn.commit()
 
-    # 1) Resetăm totul la Disponibil
-    cur.execute(
-        """
-        UPDATE locatii
-        SET status='Disponibil',
-            client=NULL,
-            client_id=NULL,
-            data_start=NULL,
-            data_end=NULL
+
+def _iso(day) -> str:
+    return day if isinstance(day, str) else day.isoformat()
+
+
+def find_conflicts(
+    loc_ids, start, end, *, exclude=(), for_update: bool = False, cur=None
+) -> list[dict]:
+    """Return the bookings of *loc_ids* overlapping *start*–*end*.
+
+    A booking is a reservation (``suma`` ``NULL``) or a rental with a fee;
+    the zero-fee rows kept on mobile locations do not block a period.  The
+    reservation ids in *exclude* are ignored, e.g. the rental being edited.
+    Rows are dicts ordered by location and start date.
+
+    Pass *cur* and ``for_update=True`` when the check precedes writes in the
+    same transaction: MySQL then locks the index range read and SQLite takes
+    its write lock, so no other seller can book the period in between.  The
+    caller commits or rolls back.
     """
-    )
+    ids = sorted(set(loc_ids))
+    if cur is None:
+        cur = conn.cursor()
+    if for_update and not conn.mysql and not conn.in_transaction:
+        cur.execute("BEGIN IMMEDIATE")
+    exclude = list(exclude)
+    extra = f" AND id NOT IN ({', '.join('?' * len(exclude))})" if exclude else ""
+    lock = " FOR UPDATE" if for_update and conn.mysql else ""
+    cols = ("id", "loc_id", "client", "data_start", "data_end", "suma")
+    found = []
+    for marks, chunk in _id_chunks(ids):
+        cur.execute(
+            f"SELECT {', '.join(cols)} FROM rezervari WHERE loc_id IN ({marks}) "
+            "AND data_end >= ? AND data_start <= ? "
+            f"AND (suma IS NULL OR suma > 0){extra}{lock}",
+            chunk + [_iso(start), _iso(end)] + exclude,
+        )
+        found.extend(dict(zip(cols, row)) for row in cur.fetchall())
+    found.sort(key=lambda r: (r["loc_id"], r["data_start"]))
+    return found
 
-    # 2) Marcăm rezervările curente fără sumă ca 'Rezervat'
-    cur.execute(
-        """
-        UPDATE locatii
-        SET status     = 'Rezervat',
-            client     = (
-                SELECT client
-                  FROM rezervari
-                 WHERE rezervari.loc_id = locatii.id
-                   AND ? BETWEEN data_start AND data_end
-                   AND suma IS NULL
-                 ORDER BY data_start DESC
-                 LIMIT 1
-            ),
-            data_start = (
-                SELECT data_start FROM rezervari
-                 WHERE rezervari.loc_id = locatii.id
-                   AND ? BETWEEN data_start AND data_end
-                   AND suma IS NULL
-                 ORDER BY data_start DESC
-                 LIMIT 1
-            ),
-            data_end   = (
-                SELECT data_end FROM rezervari
-                 WHERE rezervari.loc_id = locatii.id
-                   AND ? BETWEEN data_start AND data_end
-                   AND suma IS NULL
-                 ORDER BY data_start DESC
-                 LIMIT 1
-            )
-        WHERE EXISTS (
-            SELECT 1 FROM rezervari
-             WHERE rezervari.loc_id = locatii.id
-               AND ? BETWEEN data_start AND data_end
-               AND suma IS NULL
+
+# Prisme închiriate simultan din aceeași locație mobilă
+MAX_MOBILE_UNITS = 20
+
+_REZ_INSERT = (
+    "INSERT INTO rezervari (loc_id, client, client_id, firma_id, data_start, data_end, "
+    "suma, created_by, created_on, campaign, decor_cost, prod_cost) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Columns copied from a mobile location to the unit rented from it
+_MOBILE_COPY = (
+    "city", "county", "type", "code", "size", "photo_link", "sqm", "illumination",
+    "ratecard", "pret_vanzare", "pret_flotant", "decoration_cost", "observatii",
+    "grup", "face",
+)
+
+
+class RentalError(ValueError):
+    """A rental failed validation; nothing was written.
+
+    ``title`` and the message are meant for a dialog, ``loc_ids`` are the
+    locations at fault.
+    """
+
+    def __init__(self, title: str, message: str, loc_ids=()):
+        super().__init__(message)
+        self.title = title
+        self.loc_ids = list(loc_ids)
+
+
+def _describe(loc_ids, limit: int = 10) -> str:
+    names = []
+    for loc_id in loc_ids[:limit]:
+        row = _location_by_id.get(loc_id)
+        names.append(
+            f"{row.get('city') or ''}, {row.get('address') or ''}" if row else f"#{loc_id}"
         )
-    """,
-        (today, today, today, today),
-    )
+    if len(loc_ids) > limit:
+        names.append(f"... și încă {len(loc_ids) - limit}")
+    return "\n".join(names)
+
+
+def bulk_rent(
+    loc_ids,
+    client: str,
+    start: datetime.date,
+    end: datetime.date,
+    suma: float,
+    *,
+    firma: str = "",
+    campaign: str = "",
+    decor_cost: float = 0.0,
+    prod_cost: float = 0.0,
+    address: str = "",
+    gps: str = "",
+    user: str | None = None,
+) -> list[int]:
+    """Rent *loc_ids* to *client* from *start* to *end* in one transaction.
+
+    Every location is checked before anything is written, with one query for
+    the overlapping bookings of the whole set (:func:`find_conflicts`, which
+    keeps the period locked until the commit) and one for the units already
+    rented from mobile locations, counted after their rows are locked; a
+    failed check raises :class:`RentalError`.  Renting a mobile location
+    creates a unit at *address*/*gps* that carries the rental, while the
+    mobile location gets a reservation without a fee.  The client and firm are created when
+    missing.  Only the locations touched are refreshed after the commit.
+
+    Return the ids of the rented locations, in the order of *loc_ids*.
+    """
+    ids = list(dict.fromkeys(loc_ids))
+    if not ids:
+        return []
+    if start > end:
+        raise RentalError(
+            "Interval incorect", "«Data start» trebuie înainte de «Data end»."
+        )
+    start_iso, end_iso = start.isoformat(), end.isoformat()
+    period = [start_iso, end_iso]
+    get_location_cache()
+    bases = [
+        loc_id
+        for loc_id in ids
+        if (row := _location_by_id.get(loc_id)) is not None
+        and row.get("is_mobile")
+        and not row.get("parent_id")
+    ]
+    if bases and (not address or not gps):
+        raise RentalError("Lipsește adresa", "Completează adresa și GPS-ul.", bases)
 
-    # 3) Marcăm închirierile curente ca 'Închiriat'
-    cur.execute(
-        """
-        UPDATE locatii
-        SET status      = 'Închiriat',
-            client      = (
-                SELECT client
-                FROM rezervari
-                WHERE rezervari.loc_id = locatii.id
-                  AND ? BETWEEN data_start AND data_end
-                  AND suma IS NOT NULL AND suma > 0
-                ORDER BY data_start DESC
-                LIMIT 1
-            ),
-            client_id   = (
-                SELECT client_id
-                FROM rezervari
-                WHERE rezervari.loc_id = locatii.id
-                  AND ? BETWEEN data_start AND data_end
-                  AND suma IS NOT NULL AND suma > 0
-                ORDER BY data_start DESC
-                LIMIT 1
-            ),
-            data_start  = (
-                SELECT data_start
-                FROM rezervari
-                WHERE rezervari.loc_id = locatii.id
-                  AND ? BETWEEN data_start AND data_end
-                  AND suma IS NOT NULL AND suma > 0
-                ORDER BY data_start DESC
-                LIMIT 1
-            ),
-            data_end    = (
-                SELECT data_end
-                FROM rezervari
-                WHERE rezervari.loc_id = locatii.id
-                  AND ? BETWEEN data_start AND data_end
-                  AND suma IS NOT NULL AND suma > 0
-                ORDER BY data_start DESC
-                LIMIT 1
+    cur = conn.cursor()
+    units = {}
+    try:
+        conflicts = find_conflicts(ids, start, end, for_update=True, cur=cur)
+        if conflicts:
+            busy = list(dict.fromkeys(r["loc_id"] for r in conflicts))
+            raise RentalError(
+                "Perioadă ocupată",
+                "Locațiile sunt deja rezervate sau închiriate în intervalul ales:\n"
+                + _describe(busy),
+                busy,
+            )
+        # the rows of the mobile locations stay locked until the commit, so
+        # two sellers cannot both take the last free unit
+        lock = " FOR UPDATE" if conn.mysql else ""
+        copies = []
+        for marks, chunk in _id_chunks(bases):
+            cur.execute(
+                f"SELECT id, {', '.join(_MOBILE_COPY)} FROM locatii "
+                f"WHERE id IN ({marks}){lock}",
+                chunk,
+            )
+            copies.extend(cur.fetchall())
+        full = []
+        for marks, chunk in _id_chunks(bases):
+            cur.execute(
+                "SELECT l.parent_id, COUNT(*) FROM rezervari r "
+                "JOIN locatii l ON l.id = r.loc_id "
+                f"WHERE l.parent_id IN ({marks}) "
+                "AND NOT (r.data_end < ? OR r.data_start > ?) AND r.suma IS NOT NULL "
+                "GROUP BY l.parent_id",
+                chunk + period,
+            )
+            full.extend(pid for pid, cnt in cur.fetchall() if cnt >= MAX_MOBILE_UNITS)
+        if full:
+            raise RentalError(
+                "Limită depășită",
+                f"Nu poți închiria mai mult de {MAX_MOBILE_UNITS} de prisme simultan.",
+                full,
             )
-        WHERE EXISTS (
-            SELECT 1
-            FROM rezervari
-            WHERE rezervari.loc_id = locatii.id
-              AND ? BETWEEN data_start AND data_end
-              AND suma IS NOT NULL AND suma > 0
-        )
-    """,
-        (today, today, today, today, today),
-    )
 
-    # Mark expired mobile instances as hidden
-    cur.execute(
-        """
-        UPDATE locatii
-           SET status='Expirat'
-         WHERE is_mobile=1 AND parent_id IS NOT NULL
-           AND data_end IS NOT NULL AND data_end < ?
-        """,
-        (today,),
-    )
+        today = datetime.date.today().isoformat()
+        names = directory.get_directory()
+        client_id, tip = names.ensure_client(cur, client)
+        firma_id = names.ensure_firm(cur, firma)
+        display = client.strip()
+        if tip == "agency":
+            if not campaign:
+                raise RentalError(
+                    "Lipsește campania", "Completează denumirea campaniei."
+                )
+            display = f"{display} - {campaign}"
+
+        # one insert per unit (at most MAX_MOBILE_UNITS per location) for its id
+        for row in copies:
+            cur.execute(
+                f"INSERT INTO locatii ({', '.join(_MOBILE_COPY)}, address, gps, "
+                f"is_mobile, parent_id) VALUES "
+                f"({', '.join('?' * (len(_MOBILE_COPY) + 4))})",
+                list(row[1:]) + [address, gps, 1, row[0]],
+            )
+            units[row[0]] = cur.lastrowid
+
+        rented = [units.get(loc_id, loc_id) for loc_id in ids]
+        common = [display, client_id, firma_id, start_iso, end_iso]
+        label = campaign or display
+        rentals = [
+            [loc_id] + common + [suma, user, today, label, decor_cost, prod_cost]
+            for loc_id in rented
+        ]
+        decor = bool(decor_cost or prod_cost)
+        with_rez = decor and table_has_column("decorari", "rez_id")
+        rez_ids = {}
+        if with_rez:
+            # the decorations need the id of each rental
+            for row in rentals:
+                cur.execute(_REZ_INSERT, row)
+                rez_ids[row[0]] = cur.lastrowid
+        else:
+            cur.executemany(_REZ_INSERT, rentals)
+        if bases:
+            cur.executemany(
+                _REZ_INSERT,
+                [
+                    [loc_id] + common + [0.0, user, today, label, 0.0, 0.0]
+                    for loc_id in bases
+                ],
+            )
 
-    conn.commit()
-    _status_timestamp = time.time()
+        if decor:
+            if with_rez:
+                cur.executemany(
+                    "INSERT INTO decorari (loc_id, rez_id, data, decor_cost, prod_cost, "
+                    "created_by) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (loc_id, rez_ids[loc_id], start_iso, decor_cost, prod_cost, user)
+                        for loc_id in rented
+                    ],
+                )
+            else:
+                cur.executemany(
+                    "INSERT INTO decorari (loc_id, data, decor_cost, prod_cost, "
+                    "created_by) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (loc_id, start_iso, decor_cost, prod_cost, user)
+                        for loc_id in rented
+                    ],
+                )
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit(loc_ids=ids + list(units.values()))
+    return rented
 
 
 def _hash_password(pw: str, *, _salt: bytes | None = None) -> str:
@@ -1016,10 +2063,37 @@ def check_login(username: str, password: str):
     if not user:
         return None
     if _verify_password(user["password"], password):
+        if getattr(conn, "mysql", False) and not _replica_mode:
+            _remember_login(user, password)
         return user
     return None
 
 
+# Account that logged in online, with a hash made on this computer; written
+# to the replica so the same account can log in while the server is down.
+_offline_login: tuple[dict, str] | None = None
+
+
+def _remember_login(user: dict, password: str) -> None:
+    global _offline_login
+    _offline_login = (
+        {k: user[k] for k in ("username", "role", "comune")},
+        _hash_password(password),
+    )
+    if not os.path.exists(offline.replica_path()):
+        # the first replica sync writes it
+        return
+    try:
+        local = _sqlite_connect(offline.replica_path())
+        try:
+            offline.prepare_replica(local)
+            offline.remember_login(local, *_offline_login)
+        finally:
+            local.close()
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("Failed to keep the login for offline use: %s", exc)
+
+
 def add_client_contact(client_id: int, nume: str, rol: str, email: str, phone: str) -> None:
     cur = conn.cursor()
     cur.execute(
@@ -1061,5 +2135,9 @@ def delete_client_contact(contact_id: int) -> None:
 
 
 # Initialize DB on import
-init_db()
+_record_writes = False
+try:
+    init_db()
+finally:
+    _record_writes = True
 refresh_location_cache()
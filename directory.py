@@ -0,0 +1,102 @@
+"""Clients and firms by name, for the comboboxes of the rental dialogs.
+
+:func:`get_directory` keeps the names with their ids in memory and reloads
+them only when the version of ``clienti`` or ``firme`` in ``data_versions``
+changes.  :meth:`Directory.ensure_client` and :meth:`Directory.ensure_firm`
+create a missing entry on the caller's cursor without committing, so it is
+saved in the same transaction as the rental that needs it.
+"""
+
+import bisect
+
+# Names offered by the comboboxes while typing
+SEARCH_LIMIT = 50
+
+
+def _names(names) -> tuple[list[str], list[str]]:
+    """Return the names sorted case-insensitively and their folded keys."""
+    ordered = sorted(names, key=str.casefold)
+    return ordered, [n.casefold() for n in ordered]
+
+
+def _search(names, keys, prefix: str, limit: int) -> list[str]:
+    prefix = (prefix or "").strip().casefold()
+    if not prefix:
+        return names[:limit] if limit else list(names)
+    found = []
+    for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+        if not keys[i].startswith(prefix) or (limit and len(found) >= limit):
+            break
+        found.append(names[i])
+    return found
+
+
+class Directory:
+    """Name → id (and type) maps of ``clienti`` and ``firme``."""
+
+    def __init__(self, clients, firms, version=None):
+        """Build the maps from ``(id, nume, tip)`` *clients* and ``(id, nume)`` *firms*."""
+        self.version = version
+        self.clients = {
+            name: (cid, tip or "direct") for cid, name, tip in clients if name
+        }
+        self.firms = {name: fid for fid, name in firms if name}
+        self.client_names, self._client_keys = _names(self.clients)
+        self.firm_names, self._firm_keys = _names(self.firms)
+
+    def client(self, name: str) -> tuple[int, str] | None:
+        """Return ``(id, tip)`` of the client called *name*."""
+        return self.clients.get((name or "").strip())
+
+    def firm_id(self, name: str) -> int | None:
+        return self.firms.get((name or "").strip())
+
+    def search_clients(self, prefix: str, limit: int = SEARCH_LIMIT) -> list[str]:
+        """Return the client names starting with *prefix*, ignoring case."""
+        return _search(self.client_names, self._client_keys, prefix, limit)
+
+    def search_firms(self, prefix: str, limit: int = SEARCH_LIMIT) -> list[str]:
+        return _search(self.firm_names, self._firm_keys, prefix, limit)
+
+    def ensure_client(self, cur, name: str) -> tuple[int, str]:
+        """Return ``(id, tip)`` of *name*, inserting it with *cur* if missing."""
+        name = name.strip()
+        found = self.client(name)
+        if found is not None:
+            return found
+        cur.execute("INSERT INTO clienti (nume) VALUES (?)", (name,))
+        return cur.lastrowid, "direct"
+
+    def ensure_firm(self, cur, name: str) -> int | None:
+        """Return the id of firm *name*, inserting it with *cur* if missing."""
+        name = (name or "").strip()
+        if not name:
+            return None
+        found = self.firm_id(name)
+        if found is not None:
+            return found
+        cur.execute("INSERT INTO firme (nume) VALUES (?)", (name,))
+        return cur.lastrowid
+
+
+def load(cur, version=None) -> Directory:
+    clients = cur.execute("SELECT id, nume, tip FROM clienti").fetchall()
+    firms = cur.execute("SELECT id, nume FROM firme").fetchall()
+    return Directory(clients, firms, version)
+
+
+_directory: Directory | None = None
+
+
+def get_directory() -> Directory:
+    """Return the clients and firms, reloaded after any change to them."""
+    global _directory
+    import db
+
+    tables = ("clienti", "firme")
+    version = db.data_version(tables)
+    if _directory is None or version is None or _directory.version != version:
+        cur = db.read_connection(tables=tables).cursor()
+        # the version of the rows read, which a lagging replica keeps older
+        _directory = load(cur, db.data_version(tables, cur))
+    return _directory
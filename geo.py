@@ -0,0 +1,152 @@
+"""GPS coordinates of the locations and "within X km" queries.
+
+``locatii.gps`` is free text ("44.48, 26.07", a Google Maps link, ...).
+:func:`parse_gps` turns it into ``(lat, lon)`` once per refresh of the
+location cache and :class:`GridIndex` buckets the points into cells of
+roughly :data:`CELL_KM`, so a radius query only measures the distance to the
+points of the few cells around the centre.
+"""
+
+import math
+import re
+
+import numpy as np
+
+EARTH_KM = 6371.0088
+CELL_KM = 2.0
+_KM_PER_DEG = math.pi * EARTH_KM / 180
+
+_PAIR = re.compile(r"(-?\d{1,3}\.\d+)\s*[,;\s]\s*(-?\d{1,3}\.\d+)")
+
+
+def parse_gps(text) -> tuple[float, float] | None:
+    """Return ``(lat, lon)`` from *text* or ``None`` if it has no coordinates.
+
+    Accepts "lat, lon", "lat lon" and Google Maps links with ``@lat,lon``
+    or ``query=lat,lon``.
+    """
+    if not text:
+        return None
+    text = str(text)
+    at = text.find("@")
+    for match in _PAIR.finditer(text, at + 1 if at >= 0 else 0):
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if -90 <= lat <= 90 and -180 <= lon <= 180 and (lat or lon):
+            return lat, lon
+    return None
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; the arguments may be NumPy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """Points bucketed in a lat/lon grid of about *cell_km* per cell."""
+
+    def __init__(self, points, cell_km: float = CELL_KM, version=None):
+        """Index ``(loc_id, lat, lon)`` *points*."""
+        self.version = version
+        self.cell = cell_km / _KM_PER_DEG
+        points = list(points)
+        self.ids = np.array([p[0] for p in points], dtype=np.int64)
+        self.lat = np.array([p[1] for p in points], dtype=float)
+        self.lon = np.array([p[2] for p in points], dtype=float)
+        self._where = {int(i): n for n, i in enumerate(self.ids)}
+
+        cells: dict[tuple[int, int], list[int]] = {}
+        for n, key in enumerate(zip(self._cell(self.lat), self._cell(self.lon))):
+            cells.setdefault(key, []).append(n)
+        self._cells = {k: np.array(v, dtype=np.int64) for k, v in cells.items()}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _cell(self, values):
+        return np.floor(np.asarray(values) / self.cell).astype(np.int64).tolist()
+
+    def point(self, loc_id: int) -> tuple[float, float] | None:
+        """Return the coordinates of *loc_id* or ``None`` if it has none."""
+        n = self._where.get(int(loc_id))
+        return None if n is None else (float(self.lat[n]), float(self.lon[n]))
+
+    def within(self, lat: float, lon: float, km: float) -> list[tuple[int, float]]:
+        """Return ``(loc_id, km)`` of the points within *km*, nearest first."""
+        if not len(self.ids) or km < 0:
+            return []
+        # the cells of a degree of longitude shrink towards the poles
+        dlat = km / _KM_PER_DEG
+        dlon = dlat / max(math.cos(math.radians(lat)), 0.01)
+        lat0, lat1 = self._cell([lat - dlat, lat + dlat])
+        lon0, lon1 = self._cell([lon - dlon, lon + dlon])
+        if (lat1 - lat0 + 1) * (lon1 - lon0 + 1) > len(self._cells):
+            # a radius wider than the inventory: scan every point instead
+            rows = np.arange(len(self.ids))
+        else:
+            parts = [
+                self._cells[(a, b)]
+                for a in range(lat0, lat1 + 1)
+                for b in range(lon0, lon1 + 1)
+                if (a, b) in self._cells
+            ]
+            if not parts:
+                return []
+            rows = np.concatenate(parts)
+        dist = distance_km(lat, lon, self.lat[rows], self.lon[rows])
+        keep = dist <= km
+        rows, dist = rows[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return [(int(self.ids[r]), float(d)) for r, d in zip(rows[order], dist[order])]
+
+    def near_location(self, loc_id: int, km: float) -> list[tuple[int, float]]:
+        """Like :meth:`within` around *loc_id*, which is left out."""
+        point = self.point(loc_id)
+        if point is None:
+            return []
+        return [(i, d) for i, d in self.within(*point, km) if i != int(loc_id)]
+
+
+def build(rows, cell_km: float = CELL_KM, version=None) -> GridIndex:
+    """Index the location *rows* (dicts with ``id`` and ``gps``)."""
+    points = []
+    for row in rows:
+        coords = parse_gps(row.get("gps"))
+        if coords is not None:
+            points.append((row["id"], *coords))
+    return GridIndex(points, cell_km, version)
+
+
+_index: GridIndex | None = None
+
+
+def get_index() -> GridIndex:
+    """Return the index of the cached locations, rebuilt after each refresh."""
+    global _index
+    import db
+
+    rows = db.get_location_cache()
+    version = db._cache_timestamp
+    if _index is None or _index.version != version:
+        _index = build(rows, version=version)
+    return _index
+
+
+def nearby_ids(loc_ids, km: float, index: GridIndex | None = None) -> list[int]:
+    """Return *loc_ids* followed by the locations within *km* of any of them.
+
+    The added ids are ordered by their distance to the closest of *loc_ids*.
+    """
+    index = index or get_index()
+    chosen = [int(i) for i in loc_ids]
+    best: dict[int, float] = {}
+    for loc_id in chosen:
+        for other, dist in index.near_location(loc_id, km):
+            if dist < best.get(other, math.inf):
+                best[other] = dist
+    taken = set(chosen)
+    return chosen + sorted((i for i in best if i not in taken), key=best.__getitem__)
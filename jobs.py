@@ -0,0 +1,294 @@
+"""Background queue for report exports.
+
+Every job runs a report function (``"module:function"`` with keyword
+arguments) in its own process, so exports neither freeze the Tk thread nor
+share its database connection.  The child sends ``progress(sheet, rows)``
+updates and its result back through a pipe.  Cancelling a running job
+sets an event the report can check with :func:`cancel_requested` (the
+backups stop their worker pool and delete what they wrote); a job still
+running after :data:`CANCEL_GRACE` seconds is killed together with its
+process group, and an output file it left behind is deleted.
+
+:class:`JobManager` has no thread of its own: :meth:`JobManager.poll` reads
+the pipes, starts queued jobs and returns the jobs that just finished.  The
+UI calls it from ``after``; scripts can use :meth:`JobManager.wait`.
+"""
+
+import importlib
+import itertools
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from dataclasses import dataclass, field
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+NO_DATA = "no_data"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (DONE, NO_DATA, FAILED, CANCELLED)
+
+# Exports running at the same time; the others wait in the queue
+MAX_RUNNING = 2
+# Seconds a cancelled job gets to stop by itself before it is killed
+CANCEL_GRACE = 2.0
+
+_ids = itertools.count(1)
+# Cancel event of the job running in this process (set in the children)
+_cancel = None
+
+
+class Cancelled(Exception):
+    """Raised by a report that stopped because its job was cancelled."""
+
+
+def cancel_requested() -> bool:
+    """Return whether the job running in this process was cancelled."""
+    return _cancel is not None and _cancel.is_set()
+
+
+@dataclass
+class Job:
+    """One queued report export."""
+
+    title: str
+    target: str
+    kwargs: dict
+    on_done: object = None
+    id: int = field(default_factory=lambda: next(_ids))
+    status: str = QUEUED
+    sheets: int = 0
+    rows: int = 0
+    current: str = ""
+    result: object = None
+    error: str = ""
+    queued_on: float = field(default_factory=time.time)
+    finished_on: float | None = None
+    _process: object = field(default=None, repr=False)
+    _pipe: object = field(default=None, repr=False)
+    _cancel: object = field(default=None, repr=False)
+    _kill_on: float = field(default=0.0, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+
+def resolve(target: str):
+    """Return the function named by ``"module:function"``."""
+    module, _, name = target.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def run_job(target: str, kwargs: dict, send) -> None:
+    """Run *target* and report through ``send(message)``.
+
+    Messages are ``("progress", sheet, rows)`` followed by one of
+    ``("done", result)``, ``("no_data", text)``, ``("failed", text)`` or
+    ``("cancelled", text)``.
+    """
+    from reports.data import NoData
+
+    def progress(sheet, rows):
+        send(("progress", str(sheet), int(rows)))
+
+    try:
+        result = resolve(target)(**kwargs, progress=progress)
+    except NoData as exc:
+        send((NO_DATA, str(exc)))
+    except Cancelled as exc:
+        send((CANCELLED, str(exc)))
+    except Exception as exc:
+        send((FAILED, f"{type(exc).__name__}: {exc}\n{traceback.format_exc()}"))
+    else:
+        send((DONE, result))
+
+
+def _apply(job: Job, message) -> None:
+    """Update *job* with one message sent by :func:`run_job`."""
+    kind = message[0]
+    if kind == "progress":
+        job.current = message[1]
+        job.sheets += 1
+        job.rows += message[2]
+    elif kind == DONE:
+        job.status, job.result = DONE, message[1]
+    elif kind in (NO_DATA, FAILED, CANCELLED):
+        job.status, job.error = kind, message[1]
+
+
+def run_inline(title: str, target: str, kwargs=None, on_done=None) -> Job:
+    """Run a job in this process and thread, e.g. when there is no UI."""
+    job = Job(title, target, dict(kwargs or {}), on_done)
+    job.status = RUNNING
+    run_job(target, job.kwargs, lambda message: _apply(job, message))
+    job.finished_on = time.time()
+    if on_done is not None:
+        on_done(job)
+    return job
+
+
+def _child(target, kwargs, pipe, cancel):
+    global _cancel
+    _cancel = cancel
+    if hasattr(os, "setpgrp"):
+        # own process group, so a kill reaches the worker pools too
+        os.setpgrp()
+    try:
+        run_job(target, kwargs, pipe.send)
+    finally:
+        pipe.close()
+
+
+class JobManager:
+    """Queue of report jobs run in child processes."""
+
+    def __init__(
+        self, max_running: int = MAX_RUNNING, context=None, cancel_grace=CANCEL_GRACE
+    ):
+        self.max_running = max_running
+        self.cancel_grace = cancel_grace
+        # ``spawn`` keeps the Tk and database threads out of the children
+        self._ctx = context or multiprocessing.get_context("spawn")
+        self.jobs: list[Job] = []
+
+    def submit(self, title: str, target: str, kwargs=None, on_done=None) -> Job:
+        """Queue ``target(**kwargs)``; *on_done(job)* runs when it finishes."""
+        job = Job(title, target, dict(kwargs or {}), on_done)
+        self.jobs.append(job)
+        self._start_queued()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a queued or running job; return ``False`` if it finished.
+
+        A running job is asked to stop and reaped by :meth:`poll`, which
+        kills it once :attr:`cancel_grace` seconds have passed.
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        if job._process is not None:
+            job._cancel.set()
+            job._kill_on = time.time() + self.cancel_grace
+        job.status = CANCELLED
+        job.finished_on = time.time()
+        return True
+
+    def shutdown(self) -> None:
+        """Cancel every job that has not finished (e.g. when the app exits)."""
+        for job in self.active():
+            self.cancel(job.id)
+        for job in self.jobs:
+            if job.status == CANCELLED and job._process is not None:
+                job._process.join(max(job._kill_on - time.time(), 0))
+                self._reap(job)
+
+    def get(self, job_id: int) -> Job | None:
+        return next((job for job in self.jobs if job.id == job_id), None)
+
+    def active(self) -> list[Job]:
+        return [job for job in self.jobs if not job.finished]
+
+    def clear_finished(self) -> None:
+        self.jobs = self.active()
+
+    def poll(self) -> list[Job]:
+        """Process the messages of the children and return finished jobs.
+
+        The ``on_done`` callbacks of those jobs run here, in the caller's
+        thread.  Cancelled jobs are not returned.
+        """
+        finished = []
+        for job in self.jobs:
+            if job.status == CANCELLED and job._process is not None:
+                self._reap(job)
+            if job.status != RUNNING:
+                continue
+            self._read(job)
+            if job.status == RUNNING and not job._process.is_alive():
+                # the child may have sent its result just before exiting
+                self._read(job)
+                if job.status == RUNNING:
+                    job.status = FAILED
+                    job.error = f"Procesul s-a oprit (cod {job._process.exitcode})"
+            if job.finished:
+                job._process.join()
+                self._close(job)
+                job.finished_on = time.time()
+                finished.append(job)
+        self._start_queued()
+        for job in finished:
+            if job.on_done is not None:
+                job.on_done(job)
+        return finished
+
+    def wait(self, interval: float = 0.1) -> None:
+        """Poll until every job finished (for scripts and tests)."""
+        while self.active():
+            self.poll()
+            time.sleep(interval)
+
+    def _read(self, job: Job) -> None:
+        try:
+            while job._pipe.poll():
+                _apply(job, job._pipe.recv())
+        except (EOFError, OSError):
+            pass
+
+    def _start_queued(self) -> None:
+        running = sum(job.status == RUNNING for job in self.jobs)
+        for job in self.jobs:
+            if running >= self.max_running:
+                break
+            if job.status != QUEUED:
+                continue
+            receiver, sender = self._ctx.Pipe(duplex=False)
+            cancel = self._ctx.Event()
+            # not a daemon: the backups start their own worker processes
+            process = self._ctx.Process(
+                target=_child, args=(job.target, job.kwargs, sender, cancel)
+            )
+            process.start()
+            sender.close()
+            job._process, job._pipe, job._cancel = process, receiver, cancel
+            job.status = RUNNING
+            running += 1
+
+    def _reap(self, job: Job) -> None:
+        """Collect a cancelled job once it stopped, killing it after the grace."""
+        process = job._process
+        if process.is_alive():
+            if time.time() < job._kill_on:
+                return
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                process.kill()
+        process.join()
+        self._close(job)
+        _remove_output(job)
+
+    @staticmethod
+    def _close(job: Job) -> None:
+        try:
+            job._pipe.close()
+        except OSError:
+            pass
+        job._pipe = None
+        job._process = None
+        job._cancel = None
+
+
+def _remove_output(job: Job) -> None:
+    """Delete the file a cancelled job was writing to its ``path`` argument."""
+    path = job.kwargs.get("path")
+    try:
+        if path and os.path.getmtime(path) >= job.queued_on:
+            os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,147 @@
+"""Column arrays of the cached locations for filtering and sorting the list.
+
+:class:`LocationSnapshot` turns the rows of ``db.get_location_cache`` into
+NumPy arrays once per cache refresh: categorical codes for ``grup``,
+``status`` and ``county``, the lower-cased search text and the display
+order.  Filtering the main list is then a boolean mask over the whole
+inventory followed by one fancy index into the precomputed order.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+# Counties listed first in the main list, in this order
+COUNTY_ORDER = {
+    "Bucuresti Sectorul 1": 1,
+    "Bucuresti Sectorul 2": 2,
+    "Bucuresti Sectorul 3": 3,
+    "Bucuresti Sectorul 4": 4,
+    "Bucuresti Sectorul 5": 5,
+    "Bucuresti Sectorul 6": 6,
+    "Ilfov": 7,
+    "Prahova": 8,
+}
+
+
+def _categorical(values) -> tuple[tuple, np.ndarray]:
+    """Return ``(categories, codes)``; categories are sorted, ``None`` as ""."""
+    categories, codes = np.unique(
+        np.array(["" if v is None else str(v) for v in values], dtype=object),
+        return_inverse=True,
+    )
+    return tuple(categories), codes.astype(np.int32)
+
+
+class LocationSnapshot:
+    """Columnar copy of the cached ``locatii`` rows."""
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.rows = tuple(rows)
+        n = len(self.rows)
+        self.ids = np.fromiter((r["id"] for r in self.rows), dtype=np.int64, count=n)
+        self.categories = {}
+        self.codes = {}
+        for col in ("grup", "status", "county", "city"):
+            self.categories[col], self.codes[col] = _categorical(
+                r.get(col) for r in self.rows
+            )
+        self.text = np.array(
+            [
+                "\n".join(str(r.get(c) or "") for c in ("city", "county", "address")).lower()
+                for r in self.rows
+            ],
+            dtype=str,
+        )
+        # sub-faces of mobile locations are hidden once they expire
+        self.listed = np.fromiter(
+            (not (r.get("parent_id") and r.get("status") == "Expirat") for r in self.rows),
+            dtype=bool,
+            count=n,
+        )
+        county_rank = np.array(
+            [COUNTY_ORDER.get(c, 9) for c in self.categories["county"]], dtype=np.int32
+        )
+        # the codes follow the sorted categories, so they sort like the names
+        self.order = np.lexsort(
+            (self.codes["city"], self.codes["county"], county_rank[self.codes["county"]])
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def mask(self, grup=None, status=None, term="") -> np.ndarray:
+        """Return the rows matching the filters of the main list.
+
+        ``None``, "" and "Toate" leave a filter out; *term* is searched
+        case-insensitively in the city, county and address.
+        """
+        keep = self.listed.copy()
+        for col, value in (("grup", grup), ("status", status)):
+            if value and value != "Toate":
+                try:
+                    code = self.categories[col].index(value)
+                except ValueError:
+                    return np.zeros(len(self.rows), dtype=bool)
+                keep &= self.codes[col] == code
+        term = (term or "").strip().lower()
+        if term and len(self.text):
+            keep &= np.char.find(self.text, term) >= 0
+        return keep
+
+    def select(self, grup=None, status=None, term="") -> list:
+        """Return the matching rows in display order (see :data:`COUNTY_ORDER`)."""
+        keep = self.mask(grup, status, term)
+        return [self.rows[i] for i in self.order[keep[self.order]]]
+
+
+_snapshot: LocationSnapshot | None = None
+
+
+def get_snapshot() -> LocationSnapshot:
+    """Return the snapshot of the location cache, rebuilt after each refresh."""
+    global _snapshot
+    import db
+
+    rows = db.get_location_cache()
+    version = db._cache_timestamp
+    if _snapshot is None or _snapshot.version != version:
+        _snapshot = LocationSnapshot(rows, version)
+    return _snapshot
+
+
+# Views of the main list remembered by :class:`ResultMemo`
+MEMO_ITEMS = 16
+
+
+class ResultMemo:
+    """Small LRU of computed list views.
+
+    Keys must contain the data versions the view was computed from, so a
+    write makes the old entries unreachable; a ``None`` key is never stored.
+    """
+
+    def __init__(self, max_items: int = MEMO_ITEMS):
+        self.max_items = max_items
+        self._items: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key):
+        if key is None or key not in self._items:
+            return None
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def put(self, key, value) -> None:
+        if key is None:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
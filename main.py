@@ -1,12 +1,18 @@
 # main.py
+import multiprocessing
 import tkinter as tk
-from UI.main_window import start_app
 from UI.login_window import show_login
 
 if __name__ == "__main__":
+    # Backupurile sunt generate în procese separate (și în executabilul împachetat)
+    multiprocessing.freeze_support()
     root = tk.Tk()
     root.withdraw()
+    # Conexiunea la baza de date este pornită în fundal de dialogul de login,
+    # așa că modulele care importă ``db`` sunt încărcate abia după autentificare.
     user = show_login(root)
     if user:
+        from UI.main_window import start_app
+
         root.deiconify()
         start_app(user, root)
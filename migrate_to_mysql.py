@@ -1,5 +1,14 @@
 import os
+import sys
+import json
 import sqlite3
+import hashlib
+import argparse
+import tempfile
+import time
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from db import get_db_path
 
 try:
@@ -17,7 +26,38 @@ except Exception:
     raise SystemExit("mysql-connector-python is required for migration")
 
 
-def connect_mysql():
+# Tables copied from SQLite.  Foreign key checks are disabled on every
+# connection used by the migration so the tables can be copied in any order
+# and in parallel.
+TABLES = [
+    "locatii",
+    "clienti",
+    "firme",
+    "rezervari",
+    "decorari",
+    "users",
+    "client_contacts",
+]
+
+# Rows fetched from SQLite and committed to MySQL at once.
+CHUNK_SIZE = 1000
+
+# Number of tables copied at the same time.
+WORKERS = 4
+
+# Rows are first copied into ``<table>__staging`` and moved into the real
+# tables only after every table was verified, so an interrupted run never
+# leaves the production database half empty.
+STAGING_SUFFIX = "__staging"
+
+CHECKPOINT_PATH = os.path.join(os.path.dirname(__file__), ".migrate_checkpoint.json")
+
+# MySQL error numbers meaning ``LOAD DATA LOCAL INFILE`` is disabled on the
+# client or on the server.  The bulk mode then falls back to multi-row INSERTs.
+LOCAL_INFILE_ERRORS = {1148, 2068, 3948, 3950}
+
+
+def connect_mysql(allow_local_infile=False):
     try:
         host = os.environ.get("MYSQL_HOST")
         port = os.environ.get("MYSQL_PORT")
@@ -34,6 +74,8 @@ def connect_mysql():
         }
         if port:
             params["port"] = int(port)
+        if allow_local_infile:
+            params["allow_local_infile"] = True
 
         return mysql.connector.connect(**params)
     except mysql.connector.Error as exc:
@@ -44,12 +86,6 @@ def connect_mysql():
         )
 
 
-def reset_tables(cur):
-    """Drop existing tables so the migration runs on a clean database."""
-    for table in ["rezervari", "locatii", "clienti", "users"]:
-        cur.execute(f"DROP TABLE IF EXISTS {table}")
-
-
 def create_tables(cur):
     cur.execute(
         """
@@ -97,6 +133,19 @@ def create_tables(cur):
         )
         """
     )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS client_contacts (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            client_id INT NOT NULL,
+            nume TEXT,
+            rol TEXT,
+            email TEXT,
+            phone TEXT,
+            FOREIGN KEY(client_id) REFERENCES clienti(id)
+        )
+        """
+    )
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS firme (
@@ -119,13 +168,31 @@ def create_tables(cur):
             data_end TEXT NOT NULL,
             suma DOUBLE,
             created_by TEXT,
+            created_on TEXT,
             campaign TEXT,
+            decor_cost DOUBLE,
+            prod_cost DOUBLE,
             FOREIGN KEY(loc_id) REFERENCES locatii(id),
             FOREIGN KEY(client_id) REFERENCES clienti(id),
             FOREIGN KEY(firma_id) REFERENCES firme(id)
         )
         """
     )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS decorari (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            loc_id INT NOT NULL,
+            rez_id INT,
+            data TEXT NOT NULL,
+            decor_cost DOUBLE,
+            prod_cost DOUBLE,
+            created_by TEXT,
+            FOREIGN KEY(loc_id) REFERENCES locatii(id),
+            FOREIGN KEY(rez_id) REFERENCES rezervari(id)
+        )
+        """
+    )
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS users (
@@ -137,71 +204,555 @@ def create_tables(cur):
         )
         """
     )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            tbl VARCHAR(64) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_on DOUBLE
+        )
+        """
+    )
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS meta (
-            key VARCHAR(255) PRIMARY KEY,
+            `key` VARCHAR(255) PRIMARY KEY,
             value TEXT
         )
         """
     )
-    cur.execute("SELECT value FROM meta WHERE key='locatii_version'")
+    cur.execute("SELECT value FROM meta WHERE `key`='locatii_version'")
     if cur.fetchone() is None:
         cur.execute(
-            "INSERT INTO meta (key, value) VALUES ('locatii_version', '0')"
+            "INSERT INTO meta (`key`, value) VALUES ('locatii_version', '0')"
         )
 
 
-def copy_table(src_cur, dst_cur, table):
-    """Copy rows from the SQLite *table* into the matching MySQL table."""
+class Checkpoint:
+    """Migration progress persisted as JSON so an interrupted run can resume.
+
+    For every table the file records the last SQLite ``rowid`` committed to
+    the staging table and whether the copy finished.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.tables: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                self.tables = json.load(fh).get("tables", {})
+
+    def has(self, table: str) -> bool:
+        return table in self.tables
+
+    def last_rowid(self, table: str) -> int:
+        return int(self.tables.get(table, {}).get("last_rowid", 0))
+
+    def done(self, table: str) -> bool:
+        return bool(self.tables.get(table, {}).get("done"))
+
+    def update(self, table: str, **values) -> None:
+        with self._lock:
+            self.tables.setdefault(table, {"last_rowid": 0, "copied": 0}).update(values)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({"tables": self.tables}, fh, indent=2)
+            os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.tables = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def source_columns(src_conn, table: str) -> list[str]:
+    """Return the columns of the SQLite *table* or an empty list if missing."""
+    try:
+        return [row[1] for row in src_conn.execute(f"PRAGMA table_info({table})")]
+    except sqlite3.OperationalError:
+        return []
+
+
+def mysql_type(sqlite_type: str) -> str:
+    """Return the MySQL column type used for a SQLite declared type."""
+    declared = (sqlite_type or "").upper()
+    if "INT" in declared:
+        return "BIGINT"
+    if any(t in declared for t in ("REAL", "FLOA", "DOUB", "NUMERIC", "DECIMAL")):
+        return "DOUBLE"
+    if "BLOB" in declared:
+        return "LONGBLOB"
+    return "TEXT"
+
+
+def add_missing_columns(src_conn, dst_conn, table: str) -> list[str]:
+    """Add to the MySQL *table* the SQLite columns it lacks; return their names.
+
+    ``CREATE TABLE IF NOT EXISTS`` leaves an older MySQL schema unchanged, so
+    without this the columns added since then would not be copied.
+    """
     try:
-        src_columns = [row[1] for row in src_cur.execute(f"PRAGMA table_info({table})")]
+        src = list(src_conn.execute(f"PRAGMA table_info({table})"))
     except sqlite3.OperationalError:
-        return
+        return []
+    if not src:
+        return []
+    cur = dst_conn.cursor()
+    cur.execute(f"SHOW COLUMNS FROM {table}")
+    present = {row[0] for row in cur.fetchall()}
+    missing = [(row[1], row[2]) for row in src if row[1] not in present]
+    if missing:
+        cur.execute(
+            f"ALTER TABLE {table} "
+            + ", ".join(f"ADD COLUMN `{name}` {mysql_type(decl)}" for name, decl in missing)
+        )
+    return [name for name, _ in missing]
+
+
+def common_columns(src_conn, dst_conn, table: str) -> list[str]:
+    """Return the columns present both in SQLite and in the MySQL *table*."""
+    src_columns = source_columns(src_conn, table)
+    if not src_columns:
+        return []
+    cur = dst_conn.cursor()
+    cur.execute(f"SHOW COLUMNS FROM {table}")
+    dst_columns = [row[0] for row in cur.fetchall()]
+    return [c for c in src_columns if c in dst_columns]
+
+
+def prepare_staging(dst_cur, table: str, fresh: bool) -> None:
+    """Create the staging copy of *table*, emptying it unless resuming."""
+    staging = table + STAGING_SUFFIX
+    dst_cur.execute(f"CREATE TABLE IF NOT EXISTS {staging} LIKE {table}")
+    if fresh:
+        dst_cur.execute(f"TRUNCATE TABLE {staging}")
+
+
+def copy_table(src_conn, dst_conn, table, columns, checkpoint, chunk_size=CHUNK_SIZE):
+    """Stream rows from the SQLite *table* into its MySQL staging table.
+
+    Rows are read with ``fetchmany`` in ``rowid`` order and every chunk is
+    committed before the checkpoint is advanced.  ``REPLACE`` makes a chunk
+    safe to copy again when a run stopped between the commit and the
+    checkpoint update.  Returns the number of rows copied by this call.
+    """
+    col_list = ", ".join(columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    insert = (
+        f"REPLACE INTO {table}{STAGING_SUFFIX} ({col_list}) VALUES ({placeholders})"
+    )
+
+    src_cur = src_conn.cursor()
+    src_cur.execute(
+        f"SELECT rowid, {col_list} FROM {table} WHERE rowid > ? ORDER BY rowid",
+        (checkpoint.last_rowid(table),),
+    )
+    dst_cur = dst_conn.cursor()
+    copied = 0
+    while True:
+        chunk = src_cur.fetchmany(chunk_size)
+        if not chunk:
+            break
+        dst_cur.executemany(insert, [row[1:] for row in chunk])
+        dst_conn.commit()
+        copied += len(chunk)
+        checkpoint.update(
+            table,
+            last_rowid=chunk[-1][0],
+            copied=checkpoint.tables.get(table, {}).get("copied", 0) + len(chunk),
+        )
+    checkpoint.update(table, done=True)
+    return copied
+
+
+def multirow_insert_sql(table, columns, nrows, verb="REPLACE", placeholder="%s"):
+    """Return a single ``INSERT``/``REPLACE`` statement for *nrows* rows."""
+    row = "(" + ", ".join([placeholder] * len(columns)) + ")"
+    return (
+        f"{verb} INTO {table} ({', '.join(columns)}) VALUES "
+        + ", ".join([row] * nrows)
+    )
 
-    dst_cur.execute(f"SHOW COLUMNS FROM {table}")
-    dst_columns = [row[0] for row in dst_cur.fetchall()]
 
-    common_cols = [c for c in src_columns if c in dst_columns]
-    if not common_cols:
-        return
+def copy_table_batched(src_conn, dst_conn, table, columns, checkpoint, chunk_size=CHUNK_SIZE):
+    """Like :func:`copy_table` but sends every chunk as one multi-row statement.
 
-    col_list = ", ".join(common_cols)
-    placeholders = ", ".join(["%s"] * len(common_cols))
-    rows = src_cur.execute(f"SELECT {col_list} FROM {table}").fetchall()
-    if rows:
-        dst_cur.executemany(
-            f"INSERT INTO {table} ({col_list}) VALUES ({placeholders})",
-            rows,
+    Used by the bulk mode when ``LOAD DATA LOCAL INFILE`` is not available;
+    one statement per chunk saves a round trip per row on remote servers.
+    """
+    col_list = ", ".join(columns)
+    src_cur = src_conn.cursor()
+    src_cur.execute(
+        f"SELECT rowid, {col_list} FROM {table} WHERE rowid > ? ORDER BY rowid",
+        (checkpoint.last_rowid(table),),
+    )
+    dst_cur = dst_conn.cursor()
+    staging = table + STAGING_SUFFIX
+    copied = 0
+    while True:
+        chunk = src_cur.fetchmany(chunk_size)
+        if not chunk:
+            break
+        params = [value for row in chunk for value in row[1:]]
+        dst_cur.execute(multirow_insert_sql(staging, columns, len(chunk)), params)
+        dst_conn.commit()
+        copied += len(chunk)
+        checkpoint.update(
+            table,
+            last_rowid=chunk[-1][0],
+            copied=checkpoint.tables.get(table, {}).get("copied", 0) + len(chunk),
         )
+    return copied
+
 
+_TSV_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"}
+)
 
-def main():
-    sqlite_conn = sqlite3.connect(get_db_path())
-    sqlite_cur = sqlite_conn.cursor()
 
-    mysql_conn = connect_mysql()
-    mysql_cur = mysql_conn.cursor()
+def tsv_field(value) -> str:
+    """Format *value* for ``LOAD DATA`` with the default escaping rules."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float):
+        return repr(value)
+    return str(value).translate(_TSV_ESCAPES)
 
-    # Disable foreign key checks during import to avoid issues with the
-    # order of inserted rows. They will be re-enabled at the end.
-    mysql_cur.execute("SET foreign_key_checks=0")
 
-    # Remove existing tables to avoid duplicate key errors when re-running the migration
-    reset_tables(mysql_cur)
-    create_tables(mysql_cur)
-    mysql_conn.commit()
+def write_tsv(src_cur, fh, chunk_size=CHUNK_SIZE):
+    """Stream ``(rowid, *values)`` rows from *src_cur* into *fh*.
+
+    Returns ``(row_count, last_rowid)``.
+    """
+    count = 0
+    last_rowid = None
+    while True:
+        chunk = src_cur.fetchmany(chunk_size)
+        if not chunk:
+            break
+        fh.writelines(
+            "\t".join(tsv_field(v) for v in row[1:]) + "\n" for row in chunk
+        )
+        count += len(chunk)
+        last_rowid = chunk[-1][0]
+    return count, last_rowid
+
+
+def load_data_infile(src_conn, dst_conn, table, columns, checkpoint, chunk_size=CHUNK_SIZE):
+    """Load the remaining rows of *table* through a temporary TSV file."""
+    col_list = ", ".join(columns)
+    src_cur = src_conn.cursor()
+    src_cur.execute(
+        f"SELECT rowid, {col_list} FROM {table} WHERE rowid > ? ORDER BY rowid",
+        (checkpoint.last_rowid(table),),
+    )
+    fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix=".tsv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            count, last_rowid = write_tsv(src_cur, fh, chunk_size)
+        if not count:
+            return 0
+        dst_cur = dst_conn.cursor()
+        dst_cur.execute(
+            f"LOAD DATA LOCAL INFILE %s REPLACE INTO TABLE {table}{STAGING_SUFFIX} "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' "
+            f"LINES TERMINATED BY '\\n' ({col_list})",
+            (path,),
+        )
+        dst_conn.commit()
+        checkpoint.update(
+            table,
+            last_rowid=last_rowid,
+            copied=checkpoint.tables.get(table, {}).get("copied", 0) + count,
+        )
+        return count
+    finally:
+        os.remove(path)
+
+
+def secondary_indexes(dst_cur, table: str) -> list[dict]:
+    """Return the non-primary indexes of *table* as ``SHOW INDEX`` reports them."""
+    dst_cur.execute(f"SHOW INDEX FROM {table}")
+    indexes: dict[str, dict] = {}
+    for row in dst_cur.fetchall():
+        # Table, Non_unique, Key_name, Seq_in_index, Column_name, Collation,
+        # Cardinality, Sub_part, ...
+        name = row[2]
+        if name == "PRIMARY":
+            continue
+        idx = indexes.setdefault(
+            name, {"name": name, "unique": not int(row[1]), "columns": []}
+        )
+        column = f"`{row[4]}`" + (f"({row[7]})" if row[7] else "")
+        idx["columns"].append((int(row[3]), column))
+    return [
+        {
+            "name": idx["name"],
+            "unique": idx["unique"],
+            "columns": [c for _, c in sorted(idx["columns"])],
+        }
+        for idx in indexes.values()
+    ]
+
+
+def drop_indexes(dst_cur, table: str, indexes: list[dict]) -> None:
+    """Drop *indexes* from *table*, ignoring those already dropped."""
+    present = {idx["name"] for idx in secondary_indexes(dst_cur, table)}
+    drops = [f"DROP INDEX `{i['name']}`" for i in indexes if i["name"] in present]
+    if drops:
+        dst_cur.execute(f"ALTER TABLE {table} " + ", ".join(drops))
+
+
+def rebuild_indexes(dst_cur, table: str, indexes: list[dict]) -> None:
+    """Recreate *indexes* on *table* with a single ``ALTER TABLE``."""
+    present = {idx["name"] for idx in secondary_indexes(dst_cur, table)}
+    adds = [
+        f"ADD {'UNIQUE ' if i['unique'] else ''}INDEX `{i['name']}` "
+        f"({', '.join(i['columns'])})"
+        for i in indexes
+        if i["name"] not in present
+    ]
+    if adds:
+        dst_cur.execute(f"ALTER TABLE {table} " + ", ".join(adds))
+
+
+def bulk_copy_table(src_conn, dst_conn, table, columns, checkpoint, chunk_size=CHUNK_SIZE):
+    """Copy *table* with ``LOAD DATA LOCAL INFILE`` and deferred indexes.
+
+    The secondary indexes of the staging table are dropped before the load
+    and rebuilt once afterwards.  Their definitions are kept in the
+    checkpoint so a resumed run can still restore them.  When the server or
+    the client refuse local files the rows are sent as multi-row statements.
+    """
+    staging = table + STAGING_SUFFIX
+    cur = dst_conn.cursor()
+    indexes = checkpoint.tables.get(table, {}).get("indexes")
+    if indexes is None:
+        indexes = secondary_indexes(cur, staging)
+        checkpoint.update(table, indexes=indexes)
+    drop_indexes(cur, staging, indexes)
+    cur.execute("SET unique_checks=0")
+    try:
+        try:
+            copied = load_data_infile(
+                src_conn, dst_conn, table, columns, checkpoint, chunk_size
+            )
+        except mysql.connector.Error as exc:
+            if getattr(exc, "errno", None) not in LOCAL_INFILE_ERRORS:
+                raise
+            copied = copy_table_batched(
+                src_conn, dst_conn, table, columns, checkpoint, chunk_size
+            )
+    finally:
+        cur.execute("SET unique_checks=1")
+    rebuild_indexes(cur, staging, indexes)
+    checkpoint.update(table, done=True)
+    return copied
+
 
-    for table in ["locatii", "clienti", "rezervari", "users"]:
-        copy_table(sqlite_cur, mysql_cur, table)
+def _canonical(value) -> str:
+    """Return a representation of *value* that is equal in SQLite and MySQL."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    if isinstance(value, (bool, int, float, Decimal)):
+        return repr(float(value))
+    return str(value)
 
-    mysql_conn.commit()
 
-    # Re-enable foreign key checks after all data is imported
-    mysql_cur.execute("SET foreign_key_checks=1")
-    mysql_conn.close()
-    sqlite_conn.close()
+def table_checksum(cur, sql: str, chunk_size: int = CHUNK_SIZE) -> tuple[int, str]:
+    """Return ``(row_count, checksum)`` for the rows returned by *sql*.
 
+    The checksum is the sum of per-row SHA-256 digests so it does not depend
+    on the order in which the two databases return the rows.
+    """
+    cur.execute(sql)
+    count = 0
+    total = 0
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            break
+        for row in rows:
+            digest = hashlib.sha256(
+                "\x1f".join(_canonical(v) for v in row).encode("utf-8")
+            ).digest()
+            total = (total + int.from_bytes(digest, "big")) % (1 << 256)
+        count += len(rows)
+    return count, f"{total:064x}"
+
+
+def verify_table(src_conn, dst_conn, table, columns, chunk_size=CHUNK_SIZE):
+    """Compare row count and checksum of *table* with its staging copy.
+
+    Returns ``(ok, message)``.
+    """
+    col_list = ", ".join(columns)
+    src = table_checksum(src_conn.cursor(), f"SELECT {col_list} FROM {table}", chunk_size)
+    dst = table_checksum(
+        dst_conn.cursor(),
+        f"SELECT {col_list} FROM {table}{STAGING_SUFFIX}",
+        chunk_size,
+    )
+    if src[0] != dst[0]:
+        return False, f"{table}: {src[0]} rows in SQLite, {dst[0]} in MySQL"
+    if src[1] != dst[1]:
+        return False, f"{table}: checksum mismatch over {src[0]} rows"
+    return True, f"{table}: {src[0]} rows verified"
+
+
+def swap_in(dst_conn, tables: dict[str, list[str]]) -> None:
+    """Replace the contents of the real tables with their staging copies.
+
+    All tables are replaced in a single transaction executed on the server,
+    together with a bump of their ``data_versions`` rows so the caches keyed
+    on them reload; then the staging tables are dropped.
+    """
+    cur = dst_conn.cursor()
+    cur.execute("SET foreign_key_checks=0")
+    for table, columns in tables.items():
+        col_list = ", ".join(columns)
+        cur.execute(f"DELETE FROM {table}")
+        cur.execute(
+            f"INSERT INTO {table} ({col_list}) "
+            f"SELECT {col_list} FROM {table}{STAGING_SUFFIX}"
+        )
+    now = time.time()
+    cur.executemany(
+        "INSERT INTO data_versions (tbl, version, updated_on) VALUES (%s, 1, %s) "
+        "ON DUPLICATE KEY UPDATE version=version+1, updated_on=VALUES(updated_on)",
+        [(table, now) for table in tables],
+    )
+    dst_conn.commit()
+    for table in tables:
+        cur.execute(f"DROP TABLE IF EXISTS {table}{STAGING_SUFFIX}")
+    cur.execute("SET foreign_key_checks=1")
+
+
+def _migrate_table(source_path, table, columns, checkpoint, chunk_size, bulk=False):
+    """Copy and verify one table using dedicated connections."""
+    src_conn = sqlite3.connect(source_path)
+    dst_conn = connect_mysql(allow_local_infile=bulk)
+    try:
+        dst_conn.cursor().execute("SET foreign_key_checks=0")
+        copied = 0
+        if not checkpoint.done(table):
+            copy = bulk_copy_table if bulk else copy_table
+            copied = copy(src_conn, dst_conn, table, columns, checkpoint, chunk_size)
+        ok, message = verify_table(src_conn, dst_conn, table, columns, chunk_size)
+        return copied, ok, message
+    finally:
+        dst_conn.close()
+        src_conn.close()
+
+
+def migrate(
+    source_path=None,
+    *,
+    chunk_size=CHUNK_SIZE,
+    workers=WORKERS,
+    resume=True,
+    bulk=False,
+    checkpoint_path=CHECKPOINT_PATH,
+    log=print,
+):
+    """Copy every table from SQLite to MySQL and return ``True`` on success."""
+    source_path = source_path or get_db_path()
+    checkpoint = Checkpoint(checkpoint_path)
+    if not resume:
+        checkpoint.clear()
+    elif checkpoint.tables:
+        log(f"Resuming migration from {checkpoint_path}")
+
+    src_conn = sqlite3.connect(source_path)
+    dst_conn = connect_mysql()
+    try:
+        cur = dst_conn.cursor()
+        cur.execute("SET foreign_key_checks=0")
+        create_tables(cur)
+        tables = {}
+        for table in TABLES:
+            added = add_missing_columns(src_conn, dst_conn, table)
+            if added:
+                log(f"{table}: added missing columns {', '.join(added)}")
+            columns = common_columns(src_conn, dst_conn, table)
+            if not columns:
+                log(f"{table}: missing in SQLite, skipped")
+                continue
+            prepare_staging(cur, table, fresh=not checkpoint.has(table))
+            tables[table] = columns
+        dst_conn.commit()
+    finally:
+        src_conn.close()
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(
+                _migrate_table, source_path, t, cols, checkpoint, chunk_size, bulk
+            ): t
+            for t, cols in tables.items()
+        }
+        for fut in as_completed(futures):
+            table = futures[fut]
+            try:
+                copied, ok, message = fut.result()
+            except Exception as exc:
+                failures.append(f"{table}: {exc}")
+                continue
+            log(f"{message} ({copied} copied in this run)")
+            if not ok:
+                failures.append(message)
+
+    if failures:
+        dst_conn.close()
+        for msg in failures:
+            log(f"FAILED {msg}")
+        log(
+            "The production tables were not modified. Re-run to resume or use "
+            "--restart to copy everything again."
+        )
+        return False
+
+    swap_in(dst_conn, tables)
+    dst_conn.close()
+    checkpoint.clear()
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate locatii.db to MySQL")
+    parser.add_argument("--source", default=None, help="SQLite database to copy")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="load tables with LOAD DATA LOCAL INFILE (multi-row INSERT fallback)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore an existing checkpoint and copy every table again",
+    )
+    args = parser.parse_args(argv)
+
+    ok = migrate(
+        args.source,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        resume=not args.restart,
+        bulk=args.bulk,
+        checkpoint_path=args.checkpoint,
+    )
+    if not ok:
+        sys.exit(1)
     print("Migrated data from SQLite to MySQL database.")
 
 
@@ -0,0 +1,214 @@
+"""Day-by-day occupancy of every location as a packed bit matrix.
+
+Row *i* of :attr:`OccupancyIndex.bits` holds one bit per day of the horizon
+for location ``loc_ids[i]``; a set bit means a reservation or rental covers
+that day.  Queries over thousands of locations are a handful of NumPy
+operations on that matrix instead of a Python loop over the reservations.
+
+The horizon rolls with the current date (:data:`PAST_DAYS` back,
+:data:`FUTURE_DAYS` ahead) and is widened on demand for older or later
+periods.  :func:`get_index` rebuilds the matrix whenever the version of
+``rezervari`` in ``data_versions`` changes, i.e. after any committed write
+by any client.
+"""
+
+import datetime
+
+import numpy as np
+
+PAST_DAYS = 365
+FUTURE_DAYS = 2 * 365
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+class OccupancyIndex:
+    """Occupancy bitmap of the locations over ``[origin, origin + days)``."""
+
+    def __init__(self, rows, origin: datetime.date, days: int, version=None):
+        """Build the index from ``(loc_id, data_start, data_end)`` *rows*."""
+        self.origin = origin
+        self.days = days
+        self.version = version
+
+        loc, first, last = [], [], []
+        for loc_id, ds, de in rows:
+            ds, de = _as_date(ds), _as_date(de)
+            if loc_id is None or ds is None or de is None:
+                continue
+            loc.append(int(loc_id))
+            first.append((ds - origin).days)
+            last.append((de - origin).days)
+        loc = np.asarray(loc, dtype=np.int64)
+        first = np.clip(np.asarray(first, dtype=np.int64), 0, days)
+        last = np.clip(np.asarray(last, dtype=np.int64) + 1, 0, days)
+        keep = first < last
+
+        self.loc_ids = np.unique(loc[keep])
+        rows_idx = np.searchsorted(self.loc_ids, loc[keep])
+        # +1 at the first day and -1 after the last one, summed along the row
+        diff = np.zeros((len(self.loc_ids), days + 1), dtype=np.int32)
+        np.add.at(diff, (rows_idx, first[keep]), 1)
+        np.add.at(diff, (rows_idx, last[keep]), -1)
+        busy = np.cumsum(diff, axis=1)[:, :days] > 0
+        self.bits = np.packbits(busy, axis=1)
+
+    def covers(self, start: datetime.date, end: datetime.date) -> bool:
+        return start >= self.origin and (end - self.origin).days < self.days
+
+    def _rows(self, loc_ids):
+        """Return ``(ids, row index or -1)`` for *loc_ids* (all if ``None``)."""
+        if loc_ids is None:
+            ids = self.loc_ids
+            return ids, np.arange(len(ids))
+        ids = np.asarray(list(loc_ids), dtype=np.int64)
+        rows = np.full(len(ids), -1, dtype=np.int64)
+        if len(self.loc_ids):
+            pos = np.searchsorted(self.loc_ids, ids)
+            pos = np.minimum(pos, len(self.loc_ids) - 1)
+            hit = self.loc_ids[pos] == ids
+            rows[hit] = pos[hit]
+        return ids, rows
+
+    def window(self, start: datetime.date, end: datetime.date, loc_ids=None):
+        """Return ``(ids, busy)`` with *busy* a bool matrix of the days of the period."""
+        if not self.covers(start, end):
+            raise ValueError(f"{start} - {end} is outside the occupancy horizon")
+        first = (start - self.origin).days
+        length = (end - start).days + 1
+        ids, rows = self._rows(loc_ids)
+        # unpack only the bytes spanning the period
+        lo, hi = first // 8, (first + length + 7) // 8
+        bits = np.zeros((len(ids), hi - lo), dtype=np.uint8)
+        known = rows >= 0
+        bits[known] = self.bits[rows[known], lo:hi]
+        busy = np.unpackbits(bits, axis=1)[:, first - lo * 8:first - lo * 8 + length]
+        return ids, busy.astype(bool)
+
+    def free_for_period(self, start, end, loc_ids=None) -> np.ndarray:
+        """Return the ids free on every day of ``[start, end]``."""
+        if not self.covers(start, end):
+            raise ValueError(f"{start} - {end} is outside the occupancy horizon")
+        ids, rows = self._rows(loc_ids)
+        first = (start - self.origin).days
+        length = (end - start).days + 1
+        mask = np.zeros(self.days, dtype=bool)
+        mask[first:first + length] = True
+        mask = np.packbits(mask)
+        known = rows >= 0
+        busy = np.zeros(len(ids), dtype=bool)
+        busy[known] = (self.bits[rows[known]] & mask).any(axis=1)
+        return ids[~busy]
+
+    def longest_free(self, start, end, loc_ids=None):
+        """Return ``(ids, days)``: the longest free run of each id in the period."""
+        ids, busy = self.window(start, end, loc_ids)
+        run = np.zeros(len(ids), dtype=np.int32)
+        best = np.zeros(len(ids), dtype=np.int32)
+        for day in (~busy).T:
+            run = (run + 1) * day
+            np.maximum(best, run, out=best)
+        return ids, best
+
+    def free_at_least(self, start, end, days: int, loc_ids=None) -> np.ndarray:
+        """Return the ids with at least *days* consecutive free days in the period."""
+        ids, best = self.longest_free(start, end, loc_ids)
+        return ids[best >= days]
+
+    def earliest_free(self, start, days: int = 1, end=None, loc_ids=None) -> dict:
+        """Return ``{loc_id: first date}`` of *days* free days from *start*.
+
+        The search stops at *end* (the horizon by default); ids without such
+        a run map to ``None``.
+        """
+        if end is None:
+            end = self.origin + datetime.timedelta(days=self.days - 1)
+        ids, busy = self.window(start, end, loc_ids)
+        run = np.zeros(len(ids), dtype=np.int32)
+        found = np.full(len(ids), -1, dtype=np.int64)
+        for offset, day in enumerate((~busy).T):
+            run = (run + 1) * day
+            hit = (run >= days) & (found < 0)
+            found[hit] = offset - days + 1
+            if (found >= 0).all():
+                break
+        return {
+            int(i): (start + datetime.timedelta(days=int(f)) if f >= 0 else None)
+            for i, f in zip(ids, found)
+        }
+
+    def busy_bounds(self, start, end, loc_ids=None):
+        """Return ``(ids, first, last)`` busy dates of each id within the period.
+
+        ``first``/``last`` hold ``None`` for ids free on the whole period.
+        """
+        ids, busy = self.window(start, end, loc_ids)
+        has = busy.any(axis=1)
+        first = busy.argmax(axis=1)
+        last = busy.shape[1] - 1 - busy[:, ::-1].argmax(axis=1)
+        day = datetime.timedelta(days=1)
+        return (
+            ids,
+            [start + day * int(f) if h else None for f, h in zip(first, has)],
+            [start + day * int(l) if h else None for l, h in zip(last, has)],
+        )
+
+
+def horizon(today=None, start=None, end=None) -> tuple[datetime.date, int]:
+    """Return ``(origin, days)`` of the rolling horizon, widened to cover a period."""
+    today = today or datetime.date.today()
+    origin = today - datetime.timedelta(days=PAST_DAYS)
+    last = today + datetime.timedelta(days=FUTURE_DAYS)
+    if start is not None and start < origin:
+        origin = start
+    if end is not None and end > last:
+        last = end
+    return origin, (last - origin).days + 1
+
+
+def build(cur, origin: datetime.date, days: int, version=None) -> OccupancyIndex:
+    """Read the reservations overlapping the horizon and index them."""
+    last = origin + datetime.timedelta(days=days - 1)
+    rows = cur.execute(
+        "SELECT loc_id, data_start, data_end FROM rezervari "
+        "WHERE data_end >= ? AND data_start <= ?",
+        (origin.isoformat(), last.isoformat()),
+    ).fetchall()
+    return OccupancyIndex(rows, origin, days, version)
+
+
+_index: OccupancyIndex | None = None
+
+
+def get_index(start=None, end=None) -> OccupancyIndex:
+    """Return the index of the current reservations covering ``[start, end]``.
+
+    The index is rebuilt when ``rezervari`` changed, when the day changed or
+    when the period is outside its horizon.
+    """
+    global _index
+    import db
+
+    version = db.data_version(("rezervari",))
+    origin, days = horizon(start=start, end=end)
+    index = _index
+    if (
+        index is None
+        or version is None
+        or index.version != version
+        or not index.covers(origin, origin + datetime.timedelta(days=days - 1))
+    ):
+        cur = db.read_connection(tables=("rezervari",)).cursor()
+        # the version of the rows read, which a lagging replica keeps older
+        version = db.data_version(("rezervari",), cur)
+        index = _index = build(cur, origin, days, version)
+    return index
@@ -0,0 +1,452 @@
+"""Local SQLite replica used while the MySQL server is unreachable.
+
+While the application is online the replica is refreshed from MySQL in the
+background.  When the server cannot be reached ``db`` opens the replica
+instead of the bundled ``locatii.db`` and every write is executed locally and
+recorded in the ``_outbox`` table in the same transaction.  Once the server is
+back the outbox is replayed in order:
+
+* ``UPDATE``/``DELETE`` statements are compared with the rows they saw
+  offline; if somebody else changed those rows in the meantime the statement
+  is not applied,
+* reservations are checked against overlapping reservations created online,
+* ids generated offline are replaced with the ids MySQL assigned.
+
+Rejected statements are moved to ``_conflicts`` for review.  This module only
+works with DB-API connections; :mod:`db` decides when to use it.
+"""
+
+import os
+import re
+import json
+import uuid
+import datetime
+
+# Tables mirrored in the replica.  ``users`` is not copied: the replica only
+# keeps the accounts that logged in on this computer (see remember_login).
+TABLES = [
+    "locatii",
+    "clienti",
+    "client_contacts",
+    "firme",
+    "rezervari",
+    "decorari",
+]
+
+# ``PRAGMA user_version`` of a replica whose ``users`` table holds only
+# remembered logins; older replicas had a copy of every account.
+REPLICA_VERSION = 1
+
+# Ids generated offline start here so they never clash with MySQL ids.  Every
+# table gets its own range so a local id identifies the row on its own.
+LOCAL_ID_BASE = 1_000_000_000
+LOCAL_ID_SPAN = 100_000_000
+
+# Columns recomputed by ``update_statusuri_din_rezervari``; they are ignored
+# when checking whether a row changed on the server.
+DERIVED_COLUMNS = {
+    "locatii": {"status", "client", "client_id", "data_start", "data_end"},
+}
+
+_WRITE_RE = re.compile(r"^\s*(INSERT|REPLACE|UPDATE|DELETE)\b", re.I)
+_INSERT_RE = re.compile(
+    r"^\s*(?:INSERT|REPLACE)\s+(?:OR\s+\w+\s+)?INTO\s+(\w+)\s*\(([^)]*)\)", re.I | re.S
+)
+_UPDATE_RE = re.compile(r"^\s*UPDATE\s+(\w+)\s+SET\s+(.*?)(?:\s+WHERE\s+(.*))?$", re.I | re.S)
+_DELETE_RE = re.compile(r"^\s*DELETE\s+FROM\s+(\w+)(?:\s+WHERE\s+(.*))?$", re.I | re.S)
+
+
+def replica_path() -> str:
+    """Return the path of the replica database file."""
+    return os.environ.get("LOCAL_REPLICA_PATH") or os.path.join(
+        os.path.dirname(__file__), "replica.db"
+    )
+
+
+def prepare_replica(local) -> None:
+    """Create the bookkeeping tables and move id sequences to the local range."""
+    local.execute(
+        """
+        CREATE TABLE IF NOT EXISTS _outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token TEXT NOT NULL,
+            created_on TEXT,
+            kind TEXT,
+            tbl TEXT,
+            sql TEXT NOT NULL,
+            params TEXT,
+            where_sql TEXT,
+            where_params TEXT,
+            pre_image TEXT,
+            local_id INTEGER
+        )
+        """
+    )
+    local.execute(
+        """
+        CREATE TABLE IF NOT EXISTS _conflicts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_on TEXT,
+            tbl TEXT,
+            sql TEXT,
+            params TEXT,
+            reason TEXT
+        )
+        """
+    )
+    local.execute(
+        "CREATE TABLE IF NOT EXISTS _id_map (local_id INTEGER PRIMARY KEY, remote_id INTEGER)"
+    )
+    if local.execute("PRAGMA user_version").fetchone()[0] < REPLICA_VERSION:
+        if local.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='users'"
+        ).fetchone():
+            local.execute("DELETE FROM users")
+        local.execute(f"PRAGMA user_version = {REPLICA_VERSION}")
+    for i, table in enumerate(TABLES):
+        base = LOCAL_ID_BASE + i * LOCAL_ID_SPAN
+        exists = local.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+        ).fetchone()
+        if not exists:
+            continue
+        row = local.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name=?", (table,)
+        ).fetchone()
+        if row is None:
+            local.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, base)
+            )
+        elif row[0] < base:
+            local.execute("UPDATE sqlite_sequence SET seq=? WHERE name=?", (base, table))
+    local.commit()
+
+
+def remember_login(local, user: dict, password_hash: str) -> None:
+    """Keep *user* in the replica so the account can log in offline.
+
+    *password_hash* is computed on this computer from the password typed at
+    login, with its own salt; the server hashes never leave MySQL.
+    """
+    local.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL,
+            comune TEXT
+        )
+        """
+    )
+    local.execute("DELETE FROM users WHERE username=?", (user["username"],))
+    local.execute(
+        "INSERT INTO users (username, password, role, comune) VALUES (?, ?, ?, ?)",
+        (user["username"], password_hash, user["role"], user.get("comune") or ""),
+    )
+    local.commit()
+
+
+def pending_count(local) -> int:
+    """Return the number of writes waiting to be replayed."""
+    try:
+        return local.execute("SELECT COUNT(*) FROM _outbox").fetchone()[0]
+    except Exception:
+        return 0
+
+
+def conflicts(local) -> list[dict]:
+    """Return the statements rejected by previous replays."""
+    rows = local.execute(
+        "SELECT id, created_on, tbl, sql, params, reason FROM _conflicts ORDER BY id"
+    ).fetchall()
+    return [
+        {
+            "id": r[0],
+            "created_on": r[1],
+            "tbl": r[2],
+            "sql": r[3],
+            "params": json.loads(r[4] or "[]"),
+            "reason": r[5],
+        }
+        for r in rows
+    ]
+
+
+def _rows(cur, table, where, params) -> list[dict]:
+    """Return the rows of *table* matching *where* without derived columns."""
+    cur.execute(f"SELECT * FROM {table} WHERE {where}", params)
+    cols = [d[0] for d in cur.description]
+    skip = DERIVED_COLUMNS.get(table, set())
+    return [
+        {c: v for c, v in zip(cols, row) if c not in skip} for row in cur.fetchall()
+    ]
+
+
+def capture(cur, sql, params=None) -> dict | None:
+    """Describe the write *sql* before it runs on the replica.
+
+    Returns ``None`` for statements that are not writes.  For ``UPDATE`` and
+    ``DELETE`` the rows matched by the ``WHERE`` clause are stored so replay
+    can tell whether they changed on the server.
+    """
+    match = _WRITE_RE.match(sql)
+    if not match:
+        return None
+    kind = match.group(1).upper()
+    params = list(params or ())
+    entry = {
+        "kind": kind,
+        "sql": sql,
+        "params": params,
+        "table": None,
+        "where": None,
+        "where_params": [],
+        "pre_image": None,
+    }
+    if kind in ("INSERT", "REPLACE"):
+        m = _INSERT_RE.match(sql)
+        if m:
+            entry["table"] = m.group(1)
+            entry["columns"] = [c.strip() for c in m.group(2).split(",")]
+    elif kind == "UPDATE":
+        m = _UPDATE_RE.match(sql)
+        if m:
+            entry["table"] = m.group(1)
+            entry["where"] = m.group(3)
+            entry["where_params"] = params[m.group(2).count("?"):]
+    else:
+        m = _DELETE_RE.match(sql)
+        if m:
+            entry["table"] = m.group(1)
+            entry["where"] = m.group(2)
+            entry["where_params"] = params
+    if entry["where"]:
+        entry["pre_image"] = _rows(
+            cur.connection.cursor(), entry["table"], entry["where"], entry["where_params"]
+        )
+    return entry
+
+
+def record(cur, entry: dict, lastrowid=None) -> None:
+    """Append *entry* to the outbox in the transaction of the local write."""
+    cur.connection.execute(
+        "INSERT INTO _outbox (token, created_on, kind, tbl, sql, params, where_sql, "
+        "where_params, pre_image, local_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            uuid.uuid4().hex,
+            datetime.datetime.now().isoformat(timespec="seconds"),
+            entry["kind"],
+            entry["table"],
+            entry["sql"],
+            json.dumps(entry["params"], default=str),
+            entry["where"],
+            json.dumps(entry["where_params"], default=str),
+            None if entry["pre_image"] is None
+            else json.dumps(entry["pre_image"], default=str),
+            lastrowid if entry["kind"] in ("INSERT", "REPLACE") else None,
+        ),
+    )
+
+
+class _Unresolved(Exception):
+    """A statement refers to a row created by a rejected offline write."""
+
+
+def _remap(value, id_map):
+    if isinstance(value, list):
+        return [_remap(v, id_map) for v in value]
+    if isinstance(value, dict):
+        return {k: _remap(v, id_map) for k, v in value.items()}
+    if isinstance(value, int) and not isinstance(value, bool) and value >= LOCAL_ID_BASE:
+        if value not in id_map:
+            raise _Unresolved(value)
+        return id_map[value]
+    return value
+
+
+def _canonical(rows) -> list[str]:
+    def norm(v):
+        if v is None:
+            return None
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            return float(v)
+        return str(v)
+
+    return sorted(
+        json.dumps({k: norm(v) for k, v in row.items()}, sort_keys=True) for row in rows
+    )
+
+
+def _conflict_reason(rcur, q, kind, table, sql, params, where, where_params, pre_image):
+    """Return why the statement cannot be replayed or ``None``."""
+    if pre_image is not None and where:
+        current = _rows(rcur, table, q(where), where_params)
+        if _canonical(current) != _canonical(pre_image):
+            return "rândurile au fost modificate între timp pe server"
+    if kind == "INSERT" and table == "rezervari":
+        m = _INSERT_RE.match(sql)
+        values = dict(zip([c.strip() for c in m.group(2).split(",")], params)) if m else {}
+        # the zero-fee rows a mobile location keeps for its units never block
+        # a period, as in ``db.find_conflicts``
+        suma = values.get("suma")
+        if {"loc_id", "data_start", "data_end"} <= values.keys() and (
+            suma is None or suma > 0
+        ):
+            rcur.execute(
+                q(
+                    "SELECT COUNT(*) FROM rezervari WHERE loc_id=? "
+                    "AND data_start<=? AND data_end>=? AND (suma IS NULL OR suma > 0)"
+                ),
+                (values["loc_id"], values["data_end"], values["data_start"]),
+            )
+            if rcur.fetchone()[0]:
+                return "locația are deja o rezervare în această perioadă"
+    return None
+
+
+def replay(local, remote, paramstyle: str = "format") -> dict:
+    """Apply the outbox of *local* on *remote* and return a summary.
+
+    Every statement is committed on the server together with its token in
+    ``outbox_applied`` so a replay interrupted halfway never applies a
+    statement twice.
+    """
+
+    def q(sql):
+        return sql.replace("?", "%s") if paramstyle == "format" else sql
+
+    rcur = remote.cursor()
+    rcur.execute(
+        "CREATE TABLE IF NOT EXISTS outbox_applied ("
+        "token VARCHAR(64) PRIMARY KEY, remote_id INTEGER, applied_on TEXT)"
+    )
+    remote.commit()
+
+    id_map = dict(local.execute("SELECT local_id, remote_id FROM _id_map").fetchall())
+    summary = {"applied": 0, "conflicts": []}
+    entries = local.execute(
+        "SELECT id, token, created_on, kind, tbl, sql, params, where_sql, where_params, "
+        "pre_image, local_id FROM _outbox ORDER BY id"
+    ).fetchall()
+    for (oid, token, created_on, kind, table, sql, params, where, where_params,
+         pre_image, local_id) in entries:
+        reason = None
+        remote_id = None
+        try:
+            params = _remap(json.loads(params or "[]"), id_map)
+            where_params = _remap(json.loads(where_params or "[]"), id_map)
+            pre_image = None if pre_image is None else _remap(json.loads(pre_image), id_map)
+            rcur.execute(q("SELECT remote_id FROM outbox_applied WHERE token=?"), (token,))
+            done = rcur.fetchone()
+            if done is not None:
+                remote_id = done[0]
+            else:
+                reason = _conflict_reason(
+                    rcur, q, kind, table, sql, params, where, where_params, pre_image
+                )
+                if reason is None:
+                    rcur.execute(q(sql), params)
+                    if kind in ("INSERT", "REPLACE"):
+                        remote_id = rcur.lastrowid
+                    rcur.execute(
+                        q("INSERT INTO outbox_applied (token, remote_id, applied_on) VALUES (?, ?, ?)"),
+                        (token, remote_id, datetime.datetime.now().isoformat(timespec="seconds")),
+                    )
+                    remote.commit()
+                else:
+                    remote.rollback()
+        except _Unresolved:
+            reason = "depinde de o operație respinsă"
+        except Exception as exc:
+            remote.rollback()
+            reason = f"eroare: {exc}"
+
+        if reason is None:
+            summary["applied"] += 1
+            if local_id and remote_id:
+                id_map[local_id] = remote_id
+                local.execute(
+                    "INSERT OR REPLACE INTO _id_map (local_id, remote_id) VALUES (?, ?)",
+                    (local_id, remote_id),
+                )
+        else:
+            summary["conflicts"].append(f"{table}: {reason}")
+            local.execute(
+                "INSERT INTO _conflicts (created_on, tbl, sql, params, reason) "
+                "SELECT created_on, tbl, sql, params, ? FROM _outbox WHERE id=?",
+                (reason, oid),
+            )
+        local.execute("DELETE FROM _outbox WHERE id=?", (oid,))
+        local.commit()
+    if not pending_count(local):
+        local.execute("DELETE FROM _id_map")
+        local.commit()
+    return summary
+
+
+_AFFINITY = (("int", "INTEGER"), ("double", "REAL"), ("float", "REAL"),
+             ("decimal", "REAL"), ("real", "REAL"))
+
+
+def _remote_columns(rcur, table, mysql: bool) -> list[tuple[str, str]]:
+    """Return ``(name, sqlite_type)`` pairs for the server *table*."""
+    if mysql:
+        rcur.execute(f"SHOW COLUMNS FROM {table}")
+        result = []
+        for field, ctype, *_ in rcur.fetchall():
+            ctype = str(ctype).lower()
+            affinity = next((a for k, a in _AFFINITY if k in ctype), "TEXT")
+            result.append((field, affinity))
+        return result
+    rcur.execute(f"PRAGMA table_info({table})")
+    return [(r[1], r[2] or "TEXT") for r in rcur.fetchall()]
+
+
+def sync_replica(remote, local, mysql: bool = True, tables=TABLES) -> bool:
+    """Copy *tables* from *remote* into the replica *local*.
+
+    Nothing is copied while offline writes are still waiting in the outbox.
+    All tables are replaced in one SQLite transaction so the replica is
+    always consistent.  Returns ``True`` when the replica was refreshed.
+    """
+    prepare_replica(local)
+    if pending_count(local):
+        return False
+    rcur = remote.cursor()
+    copies = {}
+    for table in tables:
+        try:
+            columns = _remote_columns(rcur, table, mysql)
+        except Exception:
+            continue
+        if not columns:
+            continue
+        names = [c for c, _ in columns]
+        rcur.execute(f"SELECT {', '.join(names)} FROM {table}")
+        copies[table] = (columns, rcur.fetchall())
+
+    local.execute("BEGIN")
+    try:
+        for table, (columns, rows) in copies.items():
+            defs = [
+                "id INTEGER PRIMARY KEY AUTOINCREMENT" if name == "id" else f"{name} {affinity}"
+                for name, affinity in columns
+            ]
+            local.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(defs)})")
+            existing = {r[1] for r in local.execute(f"PRAGMA table_info({table})")}
+            for name, affinity in columns:
+                if name not in existing:
+                    local.execute(f"ALTER TABLE {table} ADD COLUMN {name} {affinity}")
+            names = [c for c, _ in columns]
+            local.execute(f"DELETE FROM {table}")
+            local.executemany(
+                f"INSERT INTO {table} ({', '.join(names)}) "
+                f"VALUES ({', '.join(['?'] * len(names))})",
+                rows,
+            )
+        local.commit()
+    except Exception:
+        local.rollback()
+        raise
+    return True
@@ -0,0 +1,173 @@
+"""Export of the locations available in a period, one sheet per group.
+
+The filters are those of the location list; the availability message is
+computed from ``rezervari`` for the chosen period, or from the current
+``data_start``/``data_end`` of each location when dates are ignored.
+"""
+
+import datetime
+
+import pandas as pd
+
+from reports.data import NoData
+from reports.excel import Column, ExcelExport
+
+# Coloanele exportate, în ordinea din foaie
+WRITE_COLUMNS = [
+    "city",
+    "county",
+    "address",
+    "type",
+    "gps",
+    "photo_link",
+    "size",
+    "sqm",
+    "illumination",
+    "ratecard",
+    "decoration_cost",
+    "Availability",
+]
+
+
+def available_locations(
+    grup_filter, status_filter, search_term, ignore_dates, start_date, end_date
+) -> pd.DataFrame:
+    """Return the filtered locations with their ``Availability`` message.
+
+    Raises :class:`NoData` when no location matches the filters.
+    """
+    import db
+
+    # 1) Construim WHERE identic cu load_locations()
+    cond, params = [], []
+    if grup_filter and grup_filter != "Toate":
+        cond.append("grup = ?")
+        params.append(grup_filter)
+    if status_filter and status_filter != "Toate":
+        cond.append("status = ?")
+        params.append(status_filter)
+    if search_term:
+        cond.append("(city LIKE ? OR county LIKE ? OR address LIKE ?)")
+        params += [f"%{search_term}%"] * 3
+    # Availability is determined separately using the ``rezervari`` table so
+    # we don't filter on the current ``data_start``/``data_end`` columns here.
+
+    where = ("WHERE " + " AND ".join(cond)) if cond else ""
+    sql = f"""
+        SELECT
+          id,
+          city, county, address, type,
+          gps, photo_link,
+          size, sqm, illumination,
+          ratecard, decoration_cost,
+          data_start, data_end,
+          grup, status
+        FROM locatii
+        {where}
+        ORDER BY grup, city, id
+    """
+
+    # 2) Citim datele
+    df = db.read_sql_query(sql, params=params, parse_dates=["data_start", "data_end"])
+    if df.empty:
+        raise NoData("Nu există locații pentru criteriile alese.")
+
+    # 3) Preluăm rezervările relevante pentru calculul disponibilității
+    reservations_by_loc: dict[int, list[tuple[datetime.date, datetime.date]]] = {}
+    if not ignore_dates:
+        rows_res = db.cursor.execute(
+            "SELECT loc_id, data_start, data_end FROM rezervari "
+            "WHERE NOT (data_end < ? OR data_start > ?) ORDER BY data_start",
+            (start_date.isoformat(), end_date.isoformat()),
+        ).fetchall()
+        for loc_id_r, ds, de in rows_res:
+            reservations_by_loc.setdefault(loc_id_r, []).append(
+                (datetime.date.fromisoformat(ds), datetime.date.fromisoformat(de))
+            )
+
+    # 4) Calculăm mesajul de Availability
+    today = datetime.datetime.now().date()
+
+    def avail_msg(r):
+        loc_id = r["id"]
+        ds, de = r["data_start"], r["data_end"]
+        if ignore_dates:
+            if pd.notna(ds) and ds.date() > today:
+                until = (ds.date() - datetime.timedelta(days=1)).strftime("%d.%m.%Y")
+                return f"Disponibil până la {until}"
+            if pd.notna(de) and de.date() >= today:
+                frm = (de.date() + datetime.timedelta(days=1)).strftime("%d.%m.%Y")
+                return f"Disponibil din {frm}"
+            if r["status"] != "Disponibil" and pd.notna(de) and de.date() < today:
+                frm = (de.date() + datetime.timedelta(days=1)).strftime("%d.%m.%Y")
+                return f"Disponibil din {frm}"
+            return "Disponibil"
+        else:
+
+            periods = reservations_by_loc.get(loc_id, [])
+            if not periods:
+                return "Disponibil"
+            overl = [(s, e) for s, e in periods if not (e < start_date or s > end_date)]
+            if not overl:
+                return "Disponibil"
+            first_ds = overl[0][0]
+            if first_ds > start_date:
+                until = (first_ds - datetime.timedelta(days=1)).strftime("%d.%m.%Y")
+                return f"Disponibil până la {until}"
+            last_de = overl[-1][1]
+            if last_de < end_date:
+                frm = (last_de + datetime.timedelta(days=1)).strftime("%d.%m.%Y")
+                return f"Disponibil din {frm}"
+            return ""
+
+
+    df["Availability"] = df.apply(avail_msg, axis=1)
+    if not ignore_dates:
+        df = df[df["Availability"] != ""].copy()
+
+    df.drop(columns=["id"], inplace=True)
+    return df
+
+
+def write_available_excel(df: pd.DataFrame, path: str, progress=None) -> None:
+    """Write the locations returned by :func:`available_locations` to *path*.
+
+    *progress* is called as ``progress(sheet, rows)`` after each group.
+    """
+    # Câte o foaie per grup, scrisă rând cu rând
+    columns = [
+        Column("Nr"),
+        Column("City"),
+        Column("County"),
+        Column("Address"),
+        Column("Type"),
+        Column("GPS", "maps", "Maps"),
+        Column("Photo Link", "url", "Photo"),
+        Column("Size"),
+        Column("SQM"),
+        Column("Illum"),
+        Column("Rate Card", "money"),
+        Column("Installation & Removal", "money"),
+        Column("Availability"),
+    ]
+    with ExcelExport(path) as export:
+        for grup, sub in df.groupby("grup"):
+            grp_name = (grup or "").strip() or "FaraGrup"
+            sheet = export.add_sheet(grp_name, columns, title=f"Locații {grp_name}")
+            sub_df = sub.loc[:, WRITE_COLUMNS].copy()
+            sub_df.insert(0, "Nr", range(1, len(sub_df) + 1))
+            sheet.write_frame(sub_df)
+            if progress:
+                progress(grp_name, len(sub_df))
+
+
+def export_available(
+    path, grup_filter, status_filter, search_term, ignore_dates, start_date, end_date,
+    progress=None,
+) -> list[str]:
+    """Build the available-locations export into *path*."""
+    df = available_locations(
+        grup_filter, status_filter, search_term, ignore_dates, start_date, end_date
+    )
+    write_available_excel(df, path, progress)
+    return [path]
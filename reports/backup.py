@@ -0,0 +1,759 @@
+"""Monthly billing backups, one workbook per firm, client and campaign.
+
+Generation is split in two stages:
+
+* preparation (:func:`fetch_rows`, :func:`plan_backups`) runs in the UI
+  process against the database and turns the rentals of the month into
+  picklable :class:`BackupSheet` objects holding every value of a file;
+* rendering (:func:`render_sheet`) only needs a sheet, so
+  :func:`render_all` spreads it over a process pool, reports progress as
+  files complete and keeps going when a single file fails.  The files go to
+  a directory or stream into a single zip archive.  A cancelled job stops
+  the pool and removes what it wrote.
+
+Two renderers produce the same workbook: :func:`render_openpyxl` and the
+faster :func:`render_xlsxwriter`, used by default.
+"""
+
+import calendar
+import datetime
+import io
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import jobs
+
+HEADERS = [
+    "Nr. Crt",
+    "Oraș",
+    "Adresă",
+    "Cod",
+    "Cod Față",
+    "Număr bucăți",
+    "Tip Suport",
+    "Dimensiune",
+    "Data Început",
+    "Data Sfârșit",
+    "Perioada (luni)",
+    "Valută",
+    "Preț chirie/lună",
+    "Chirie NET",
+    "Preț Decorare",
+    "Preț Producție",
+]
+
+# Below this many files starting worker processes costs more than it saves
+PARALLEL_MIN_FILES = 4
+
+# Tables read by :func:`fetch_rows`, for routing the query to a replica
+TABLES = ("rezervari", "locatii", "clienti", "firme", "decorari")
+
+_SQL = (
+    "SELECT c.nume, c.cui, c.adresa, "
+    "       f.nume, f.cui, f.adresa, r.campaign, "
+    "       l.city, l.address, l.code, l.face, l.type, l.size, l.sqm, "
+    "       r.data_start, r.data_end, r.suma, l.decoration_cost, r.client_id, "
+    "       r.decor_cost, r.prod_cost, r.id, r.loc_id "
+    "FROM rezervari r "
+    "JOIN locatii l ON r.loc_id = l.id "
+    "JOIN clienti c ON r.client_id = c.id "
+    "LEFT JOIN firme f ON r.firma_id = f.id "
+    "WHERE r.suma IS NOT NULL AND r.suma > 0"
+    " AND NOT (r.data_end < ? OR r.data_start > ?)"
+)
+
+
+def safe_filename(name: str) -> str:
+    """Return *name* sanitized for filesystem usage."""
+    return re.sub(r"[\\/*?:\"<>|]", "_", name)
+
+
+def _default_prod(sqm) -> float:
+    try:
+        return round(float(sqm or 0) * 7, 2)
+    except Exception:
+        return 0.0
+
+
+def fetch_rows(cur, start_m, end_m, client_id=None, firma_id=None, campaign=None):
+    """Return the billed rentals of the month with their decoration costs.
+
+    Each row holds the client, firm, campaign and location columns of the
+    backup followed by the decoration and production costs of the month.
+    """
+    sql = _SQL
+    params = [start_m.isoformat(), end_m.isoformat()]
+    if client_id:
+        sql += " AND r.client_id=?"
+        params.append(client_id)
+    if firma_id:
+        sql += " AND r.firma_id=?"
+        params.append(firma_id)
+    if campaign:
+        sql += " AND IFNULL(r.campaign, '')=?"
+        params.append(campaign or "")
+
+    processed = []
+    for row in cur.execute(sql, params).fetchall():
+        (*info, sqm, ds, de, price, deco_cost_loc, cid, deco_r, prod_r, rez_id, loc_id) = row
+
+        ds_dt = datetime.date.fromisoformat(ds)
+        deco = prod = 0.0
+        if start_m <= ds_dt <= end_m:
+            deco = deco_r if deco_r is not None else (deco_cost_loc or 0.0)
+            prod = prod_r if prod_r is not None else _default_prod(sqm)
+
+        # Sum decorations recorded separately and ignore the base
+        # entry added when the reservation was created.
+        cur.execute(
+            """
+            SELECT COALESCE(SUM(decor_cost),0), COALESCE(SUM(prod_cost),0)
+              FROM decorari
+             WHERE loc_id=? AND data BETWEEN ? AND ?
+               AND data BETWEEN ? AND ?
+               AND (
+                    rez_id IS NULL
+                    OR (rez_id=? AND data<>?)
+               )
+            """,
+            (
+                loc_id,
+                start_m.isoformat(),
+                end_m.isoformat(),
+                ds,
+                de,
+                rez_id,
+                ds,
+            ),
+        )
+        extra_deco, extra_prod = cur.fetchone() or (0.0, 0.0)
+        deco += extra_deco or 0.0
+        prod += extra_prod or 0.0
+
+        processed.append((*info, sqm, ds, de, price, deco_cost_loc, cid, deco, prod))
+    return processed
+
+
+@dataclass
+class BackupSheet:
+    """Everything written to one backup workbook.
+
+    *path* is relative to the month directory (or archive); *rows* follow
+    :data:`HEADERS`.
+    """
+
+    path: str
+    title: str
+    firm: tuple
+    client: tuple
+    campaign: str
+    period: tuple
+    rows: list = field(default_factory=list)
+
+
+def prepare_sheet(rows, start_m: datetime.date, end_m: datetime.date, path: str = "") -> BackupSheet:
+    """Return the :class:`BackupSheet` for the rentals of one file."""
+    days_in_month = (end_m - start_m).days + 1
+
+    data_rows = []
+    header_info = None
+    header_start = None
+    header_end = None
+    for idx, (
+        client_name,
+        client_cui,
+        client_addr,
+        firma_name,
+        firma_cui,
+        firma_addr,
+        campaign,
+        city,
+        addr,
+        code,
+        face,
+        typ,
+        size,
+        sqm,
+        ds,
+        de,
+        price,
+        deco_cost_loc,
+        cid,
+        deco_r,
+        prod_r,
+    ) in enumerate(rows, start=1):
+        ds_dt = datetime.date.fromisoformat(ds)
+        de_dt = datetime.date.fromisoformat(de)
+        if header_start is None or ds_dt < header_start:
+            header_start = ds_dt
+        if header_end is None or de_dt > header_end:
+            header_end = de_dt
+        if header_info is None:
+            header_info = (
+                firma_name,
+                firma_cui,
+                firma_addr,
+                client_name,
+                client_cui,
+                client_addr,
+                campaign,
+            )
+        ov_start = max(ds_dt, start_m)
+        ov_end = min(de_dt, end_m)
+        days = (ov_end - ov_start).days + 1
+        frac = days / days_in_month
+        deco = deco_r if deco_r is not None else (deco_cost_loc or 0.0)
+        prod = prod_r if prod_r is not None else _default_prod(sqm)
+        data_rows.append([
+            idx,
+            city,
+            addr,
+            code,
+            face,
+            1,
+            typ,
+            size,
+            ov_start,
+            ov_end,
+            round(frac, 2),
+            "EUR",
+            price,
+            price * frac,
+            deco,
+            prod,
+        ])
+
+    if header_info:
+        f_name, f_cui, f_addr, c_name, c_cui, c_addr, camp = header_info
+    else:
+        f_name = f_cui = f_addr = c_name = c_cui = c_addr = camp = ""
+
+    return BackupSheet(
+        path=path,
+        title=f"BKP {f_name} x {c_name} - {camp or c_name} - {start_m:%B}",
+        firm=(f_name, f_cui, f_addr),
+        client=(c_name, c_cui, c_addr),
+        campaign=camp or c_name,
+        period=(header_start or start_m, header_end or end_m),
+        rows=data_rows,
+    )
+
+
+def plan_backups(rows, start_m: datetime.date, end_m: datetime.date) -> list[BackupSheet]:
+    """Group the rows of :func:`fetch_rows` into one sheet per file."""
+    groups = {}
+    for row in rows:
+        f_name = row[3] or "FaraFirma"
+        c_name = row[0] or ""
+        camp = row[6] or c_name
+        groups.setdefault((f_name, c_name, camp), []).append(row)
+
+    sheets = []
+    for (f_name, c_name, camp), grp_rows in groups.items():
+        fname = safe_filename(f"BKP {f_name} x {c_name} - {camp} - {start_m:%B}.xlsx")
+        path = os.path.join(safe_filename(f_name), fname)
+        sheets.append(prepare_sheet(grp_rows, start_m, end_m, path))
+    return sheets
+
+
+def month_backups(cur, month: int, year: int, client_id=None, firma_id=None, campaign=None):
+    """Return ``(folder, sheets)`` with the backups of *month* of *year*.
+
+    *folder* is the name of the directory grouping the month's files.
+    Raises :class:`reports.data.NoData` when nothing was rented.
+    """
+    start_m = datetime.date(year, month, 1)
+    end_m = datetime.date(year, month, calendar.monthrange(year, month)[1])
+    rows = fetch_rows(cur, start_m, end_m, client_id, firma_id, campaign)
+    if not rows:
+        from reports.data import NoData
+
+        raise NoData("Nu există închirieri pentru perioada aleasă.")
+    return f"BKP {start_m:%B %Y}", plan_backups(rows, start_m, end_m)
+
+
+def _info_cells(sheet: BackupSheet):
+    """Return the merged header cells as ``(row, first_col, last_col, text)``."""
+    f_name, f_cui, f_addr = sheet.firm
+    c_name, c_cui, c_addr = sheet.client
+    header_start, header_end = sheet.period
+    return [
+        (2, 1, 5, f"Societatea care facturează: {f_name}"),
+        (3, 1, 5, f"CUI: {f_cui}"),
+        (4, 1, 5, f"Adresă: {f_addr}"),
+        (2, 6, 10, f"Client: {c_name}"),
+        (3, 6, 10, f"CUI client: {c_cui}"),
+        (4, 6, 10, f"Adresă client: {c_addr}"),
+        (2, 11, 16, f"Perioada campanie: {header_start:%d.%m.%Y} - {header_end:%d.%m.%Y}"),
+        (3, 11, 16, f"Denumire campanie: {sheet.campaign}"),
+    ]
+
+
+def render_openpyxl(sheet: BackupSheet, target) -> None:
+    """Write *sheet* to *target* (a path or binary file) with ``openpyxl``."""
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Backup"
+
+    dark_blue = PatternFill(fill_type="solid", fgColor="305496")
+    white_bold = Font(color="FFFFFF", bold=True)
+
+    ws.merge_cells("A1:P1")
+    title_cell = ws["A1"]
+    title_cell.value = sheet.title
+    title_cell.fill = dark_blue
+    title_cell.font = Font(color="FFFFFF", bold=True, size=14)
+    title_cell.alignment = Alignment(horizontal="center", vertical="center")
+
+    for r in range(2, 6):
+        for c in range(1, 17):
+            cell = ws.cell(row=r, column=c)
+            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+    for row, first, last, text in _info_cells(sheet):
+        ws.merge_cells(start_row=row, start_column=first, end_row=row, end_column=last)
+        ws.cell(row=row, column=first).value = text
+
+    header_row = 5
+    for idx_col, header in enumerate(HEADERS, start=1):
+        cell = ws.cell(row=header_row, column=idx_col, value=header)
+        cell.fill = PatternFill(fill_type="solid", fgColor="1F4E79")
+        cell.font = white_bold
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+
+    data_start = header_row + 1
+    currency_cols = {13, 14, 15, 16}
+    for r_off, row_vals in enumerate(sheet.rows):
+        r = data_start + r_off
+        for c_off, val in enumerate(row_vals, start=1):
+            cell = ws.cell(row=r, column=c_off, value=val)
+            if isinstance(val, datetime.date):
+                cell.number_format = "DD.MM.YYYY"
+                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+            elif isinstance(val, (int, float)):
+                if c_off == 1:
+                    cell.number_format = "0"
+                elif c_off in currency_cols:
+                    cell.number_format = "€#,##0.00"
+                else:
+                    cell.number_format = "#,##0.00"
+                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+            else:
+                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+    last_data_row = data_start + len(sheet.rows) - 1
+    total_start = last_data_row + 1
+
+    # total lines for each cost column
+    deco_total = ws.cell(row=total_start, column=15, value=f"=SUM(O{data_start}:O{last_data_row})")
+    deco_total.font = Font(bold=True)
+    deco_total.number_format = "€#,##0.00"
+    deco_total.alignment = Alignment(horizontal="center", vertical="center")
+
+    prod_total = ws.cell(row=total_start, column=16, value=f"=SUM(P{data_start}:P{last_data_row})")
+    prod_total.font = Font(bold=True)
+    prod_total.number_format = "€#,##0.00"
+    prod_total.alignment = Alignment(horizontal="center", vertical="center")
+
+    chirie_total = ws.cell(row=total_start, column=14, value=f"=SUM(N{data_start}:N{last_data_row})")
+    chirie_total.font = Font(bold=True)
+    chirie_total.number_format = "€#,##0.00"
+    chirie_total.alignment = Alignment(horizontal="center", vertical="center")
+
+    grand_row = total_start + 1
+    # move the total label one column to the right so it sits next to the
+    # computed sum value
+    lbl = ws.cell(row=grand_row, column=15, value="Total")
+    # do not merge the label cell so it occupies a single box
+    lbl.font = Font(bold=True)
+    lbl.alignment = Alignment(horizontal="center", vertical="center")
+    val = ws.cell(
+        row=grand_row,
+        column=16,
+        value=f"=SUM(N{data_start}:N{last_data_row})+SUM(O{data_start}:O{last_data_row})+SUM(P{data_start}:P{last_data_row})",
+    )
+    val.font = Font(bold=True)
+    val.number_format = "€#,##0.00"
+    val.alignment = Alignment(horizontal="center", vertical="center")
+
+    thin = Side(border_style="thin")
+    border = Border(top=thin, bottom=thin, left=thin, right=thin)
+
+    last_total_row = grand_row
+    for r in range(1, last_total_row + 1):
+        for c in range(1, 17):
+            cell = ws.cell(row=r, column=c)
+            if cell.value is not None or cell.coordinate in ws.merged_cells:
+                cell.border = border
+
+    # apply a thicker border only to the "Total" label and final sum cells
+    thick = Side(border_style="thick")
+    start_col, end_col = 15, 16
+    for c in range(start_col, end_col + 1):
+        cell = ws.cell(row=grand_row, column=c)
+        left = thick if c == start_col else thin
+        right = thick if c == end_col else thin
+        cell.border = Border(top=thick, bottom=thick, left=left, right=right)
+
+    extra_height_needed = False
+    for col_idx in range(1, 17):
+        max_len = 0
+        start_row = 2 if col_idx == 1 else 1
+        for row in range(start_row, last_total_row + 1):
+            cell = ws.cell(row=row, column=col_idx)
+            if cell.value is not None:
+                max_len = max(max_len, len(str(cell.value)))
+        width = min(max_len + 2, 25)
+        if width > 20:
+            width = 20
+            extra_height_needed = True
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+    data_height = 35 if extra_height_needed else 30
+    for r in range(data_start, last_data_row + 1):
+        ws.row_dimensions[r].height = data_height
+    for r in range(last_data_row + 1, last_total_row + 1):
+        ws.row_dimensions[r].height = 22 if not extra_height_needed else 26
+
+    for r in range(1, header_row + 1):
+        ws.row_dimensions[r].height = 32 if extra_height_needed else 30
+
+    wb.save(target)
+
+
+def _column_widths(sheet: BackupSheet, totals) -> tuple[list, bool]:
+    """Return the widths of columns A:P and whether rows need extra height.
+
+    Mirrors :func:`render_openpyxl`: the longest text of every column (the
+    title excluded) plus 2, capped at 20.
+    """
+    longest = [0] * 16
+    values = [(first, text) for _, first, _, text in _info_cells(sheet)]
+    values += list(enumerate(HEADERS, start=1))
+    for row in sheet.rows:
+        values += [(c, v) for c, v in enumerate(row, start=1) if v is not None]
+    values += totals
+    for col, value in values:
+        longest[col - 1] = max(longest[col - 1], len(str(value)))
+
+    widths = []
+    extra_height_needed = False
+    for max_len in longest:
+        width = min(max_len + 2, 25)
+        if width > 20:
+            width = 20
+            extra_height_needed = True
+        widths.append(width)
+    return widths, extra_height_needed
+
+
+def render_xlsxwriter(sheet: BackupSheet, target) -> None:
+    """Write *sheet* to *target* with ``xlsxwriter`` in one streaming pass.
+
+    The visible output matches :func:`render_openpyxl`; every format is
+    built once and rows are written top to bottom in ``constant_memory``
+    mode.
+    """
+    import xlsxwriter
+
+    wb = xlsxwriter.Workbook(target, {"constant_memory": True})
+    ws = wb.add_worksheet("Backup")
+
+    center = {"align": "center", "valign": "vcenter"}
+    cell = {**center, "text_wrap": True, "border": 1}
+    euro = "€#,##0.00"
+    fmt_title = wb.add_format({
+        **center, "bold": True, "font_size": 14, "font_color": "#FFFFFF",
+        "bg_color": "#305496", "border": 1,
+    })
+    fmt_info = wb.add_format(cell)
+    fmt_empty = wb.add_format({**center, "text_wrap": True})
+    fmt_header = wb.add_format({
+        **center, "bold": True, "font_color": "#FFFFFF", "bg_color": "#1F4E79",
+        "border": 1,
+    })
+    fmt_date = wb.add_format({**cell, "num_format": "DD.MM.YYYY"})
+    fmt_nr = wb.add_format({**cell, "num_format": "0"})
+    fmt_money = wb.add_format({**cell, "num_format": euro})
+    fmt_number = wb.add_format({**cell, "num_format": "#,##0.00"})
+    fmt_total = wb.add_format({**center, "bold": True, "num_format": euro, "border": 1})
+    fmt_label = wb.add_format({
+        **center, "bold": True, "top": 5, "bottom": 5, "left": 5, "right": 1,
+    })
+    fmt_grand = wb.add_format({
+        **center, "bold": True, "num_format": euro,
+        "top": 5, "bottom": 5, "left": 1, "right": 5,
+    })
+    currency_cols = {13, 14, 15, 16}
+    number_fmts = [
+        fmt_nr if c == 1 else fmt_money if c in currency_cols else fmt_number
+        for c in range(1, 17)
+    ]
+
+    data_start = 6
+    last_data_row = data_start + len(sheet.rows) - 1
+    total_row = last_data_row + 1
+    grand_row = total_row + 1
+    sums = {}
+    for col, letter in ((14, "N"), (15, "O"), (16, "P")):
+        total = 0.0
+        for row in sheet.rows:
+            if isinstance(row[col - 1], (int, float)):
+                total += row[col - 1]
+        sums[col] = (f"=SUM({letter}{data_start}:{letter}{last_data_row})", total)
+    grand = (
+        f"=SUM(N{data_start}:N{last_data_row})+SUM(O{data_start}:O{last_data_row})"
+        f"+SUM(P{data_start}:P{last_data_row})",
+        sums[14][1] + sums[15][1] + sums[16][1],
+    )
+    totals = [(c, sums[c][0]) for c in (14, 15, 16)] + [(15, "Total"), (16, grand[0])]
+    widths, extra_height_needed = _column_widths(sheet, totals)
+    for idx, width in enumerate(widths):
+        # ``openpyxl`` stores the width as given while ``set_column`` adds
+        # the cell padding; 7 pixels per character store exactly ``width``
+        ws.set_column_pixels(idx, idx, width * 7)
+
+    top_height = 32 if extra_height_needed else 30
+    ws.set_row(0, top_height)
+    ws.merge_range(0, 0, 0, 15, sheet.title, fmt_title)
+
+    info = {}
+    for row, first, last, text in _info_cells(sheet):
+        info.setdefault(row, []).append((first, last, text))
+    for row in (2, 3, 4):
+        ws.set_row(row - 1, top_height)
+        used = set()
+        for first, last, text in info.get(row, []):
+            ws.merge_range(row - 1, first - 1, row - 1, last - 1, text, fmt_info)
+            used.update(range(first, last + 1))
+        for col in range(1, 17):
+            if col not in used:
+                ws.write_blank(row - 1, col - 1, None, fmt_empty)
+
+    ws.set_row(4, top_height)
+    ws.write_row(4, 0, HEADERS, fmt_header)
+
+    data_height = 35 if extra_height_needed else 30
+    for r_off, row_vals in enumerate(sheet.rows):
+        r = data_start - 1 + r_off
+        ws.set_row(r, data_height)
+        for c_off, val in enumerate(row_vals):
+            if val is None:
+                ws.write_blank(r, c_off, None, fmt_empty)
+            elif isinstance(val, datetime.date):
+                ws.write_datetime(r, c_off, val, fmt_date)
+            elif isinstance(val, (int, float)):
+                ws.write_number(r, c_off, val, number_fmts[c_off])
+            else:
+                ws.write(r, c_off, val, fmt_info)
+
+    total_height = 26 if extra_height_needed else 22
+    ws.set_row(total_row - 1, total_height)
+    for col in (14, 15, 16):
+        formula, value = sums[col]
+        ws.write_formula(total_row - 1, col - 1, formula, fmt_total, value)
+    ws.set_row(grand_row - 1, total_height)
+    ws.write(grand_row - 1, 14, "Total", fmt_label)
+    ws.write_formula(grand_row - 1, 15, grand[0], fmt_grand, grand[1])
+
+    wb.close()
+
+
+RENDERERS = {"openpyxl": render_openpyxl, "xlsxwriter": render_xlsxwriter}
+
+# About 8x faster than ``openpyxl`` on a 500-line backup
+# (see ``benchmarks/bench_backup.py``)
+DEFAULT_ENGINE = "xlsxwriter"
+
+
+def render_sheet(sheet: BackupSheet, target, engine: str = DEFAULT_ENGINE) -> None:
+    """Write *sheet* to *target* with the renderer named *engine*."""
+    RENDERERS[engine](sheet, target)
+
+
+def _render_job(sheet: BackupSheet, directory, engine: str):
+    """Worker: write *sheet* under *directory*, or return its bytes if ``None``."""
+    if directory is None:
+        buf = io.BytesIO()
+        render_sheet(sheet, buf, engine)
+        return buf.getvalue()
+    path = os.path.join(directory, sheet.path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        render_sheet(sheet, path, engine)
+    except BaseException:
+        # do not leave a truncated workbook behind
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return None
+
+
+@dataclass
+class BackupResult:
+    """Outcome of :func:`render_all`: written paths and ``(path, error)`` pairs.
+
+    :func:`export_backups` also sets *location*, the month directory or zip.
+    """
+
+    written: list = field(default_factory=list)
+    failed: list = field(default_factory=list)
+    location: str = ""
+
+
+def render_all(
+    sheets,
+    directory=None,
+    archive=None,
+    engine: str = DEFAULT_ENGINE,
+    workers=None,
+    progress=None,
+) -> BackupResult:
+    """Render *sheets* into *directory* or into the zip file *archive*.
+
+    Files are rendered by up to *workers* processes (default: one per core)
+    and *progress* is called as ``progress(done, total, path)`` in this
+    process after each file.  A file that fails is reported in
+    :attr:`BackupResult.failed` without stopping the others.
+
+    When the job running this is cancelled (:func:`jobs.cancel_requested`)
+    the files not started are dropped, the archive or the files written so
+    far are deleted and :class:`jobs.Cancelled` is raised.
+    """
+    sheets = list(sheets)
+    if (directory is None) == (archive is None):
+        raise ValueError("exactly one of directory and archive is required")
+    result = BackupResult()
+    total = len(sheets)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, total)
+    target = None if archive is not None else directory
+
+    zf = None
+    if archive is not None:
+        # xlsx files are already compressed
+        zf = zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED)
+
+    def finished(sheet, data=None, error=None):
+        if error is not None:
+            result.failed.append((sheet.path, f"{type(error).__name__}: {error}"))
+        elif zf is not None:
+            zf.writestr(sheet.path.replace(os.sep, "/"), data)
+            result.written.append(sheet.path)
+        else:
+            result.written.append(os.path.join(directory, sheet.path))
+        if progress:
+            progress(len(result.written) + len(result.failed), total, sheet.path)
+
+    def check_cancel():
+        if jobs.cancel_requested():
+            raise jobs.Cancelled(f"Anulat după {len(result.written)} din {total} fișiere")
+
+    cancelled = False
+    started = []
+    try:
+        pool = None
+        if workers > 1 and total >= PARALLEL_MIN_FILES:
+            try:
+                # ``spawn`` keeps the database threads of the UI process out
+                # of the workers
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, NotImplementedError):
+                pool = None
+
+        if pool is None:
+            for sheet in sheets:
+                check_cancel()
+                started.append(sheet)
+                try:
+                    data = _render_job(sheet, target, engine)
+                except Exception as exc:
+                    finished(sheet, error=exc)
+                else:
+                    finished(sheet, data)
+        else:
+            with pool:
+                futures = {
+                    pool.submit(_render_job, sheet, target, engine): sheet
+                    for sheet in sheets
+                }
+                for future in as_completed(futures):
+                    sheet = futures[future]
+                    try:
+                        data = future.result()
+                    except Exception as exc:
+                        finished(sheet, error=exc)
+                    else:
+                        finished(sheet, data)
+                    if jobs.cancel_requested():
+                        # leaving ``with`` would wait for every queued file
+                        pool.shutdown(cancel_futures=True)
+                        started = [futures[f] for f in futures if not f.cancelled()]
+                        check_cancel()
+    except jobs.Cancelled:
+        cancelled = True
+        raise
+    finally:
+        if zf is not None:
+            zf.close()
+        if cancelled:
+            if zf is not None:
+                paths = [archive]
+            else:
+                paths = [os.path.join(directory, sheet.path) for sheet in started]
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    return result
+
+
+def export_backups(
+    month: int,
+    year: int,
+    directory: str,
+    client_id=None,
+    firma_id=None,
+    campaign=None,
+    archive: bool = False,
+    workers=None,
+    progress=None,
+) -> BackupResult:
+    """Render the backups of *month* into a folder (or ``.zip``) in *directory*.
+
+    *progress* is called as ``progress(file, rows)`` after each file.
+    Raises :class:`reports.data.NoData` when nothing was rented.
+    """
+    import db
+
+    cur = db.read_connection(db.conn, TABLES).cursor()
+    folder, sheets = month_backups(cur, month, year, client_id, firma_id, campaign)
+    month_dir = os.path.join(directory, folder)
+    if archive:
+        target = {"archive": month_dir + ".zip"}
+    else:
+        os.makedirs(month_dir, exist_ok=True)
+        target = {"directory": month_dir}
+
+    rows = {sheet.path: len(sheet.rows) for sheet in sheets}
+
+    def done(count, total, path):
+        if progress:
+            progress(path, rows[path])
+
+    result = render_all(sheets, workers=workers, progress=done, **target)
+    result.location = next(iter(target.values()))
+    return result
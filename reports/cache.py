@@ -0,0 +1,182 @@
+"""Cache of finished report workbooks keyed on the data they were built from.
+
+A key combines the report name, its parameters and :func:`db.data_version`
+of the tables the report reads, so any committed write to those tables
+makes the old entries unreachable instead of having to invalidate them.
+
+Entries live in two tiers: an in-memory LRU bounded by entry count and
+bytes, and a directory on disk capped at :data:`DISK_BYTES` where the least
+recently used files are deleted first.  The disk tier survives restarts;
+both are safe to share between threads.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Bump when the layout of a cached report changes so old files are ignored
+CACHE_FORMAT = 1
+
+MEMORY_ITEMS = 8
+MEMORY_BYTES = 64 * 1024 * 1024
+DISK_BYTES = int(os.environ.get("REPORT_CACHE_MB", "200")) * 1024 * 1024
+
+_SUFFIX = ".xlsx"
+
+
+def cache_dir() -> str:
+    """Return the directory of the on-disk tier."""
+    return os.environ.get("REPORT_CACHE_DIR") or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "report_cache"
+    )
+
+
+def cache_key(report: str, params: dict, version: str | None) -> str | None:
+    """Return the key of *report* built with *params* on data *version*.
+
+    ``None`` when the data version is unknown: such a report is not cached.
+    """
+    if version is None:
+        return None
+    payload = json.dumps(
+        [CACHE_FORMAT, report, params, version], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """Two-tier LRU cache of report bytes."""
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_items: int = MEMORY_ITEMS,
+        max_bytes: int = MEMORY_BYTES,
+        disk_bytes: int = DISK_BYTES,
+    ):
+        self.directory = directory or cache_dir()
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str | None) -> bytes | None:
+        """Return the bytes stored under *key* or ``None``."""
+        if key is None:
+            return None
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            os.utime(path)
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str | None, data: bytes) -> None:
+        """Store *data* under *key* in both tiers."""
+        if key is None:
+            return
+        self._remember(key, data)
+        if len(data) > self.disk_bytes:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, self._path(key))
+            self._trim_disk()
+        except OSError as exc:
+            logging.warning("Cannot write the report cache: %s", exc)
+
+    def clear(self) -> None:
+        """Drop every entry from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        for _, _, path in self._disk_entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= len(old)
+            self._memory[key] = data
+            self._memory_size += len(data)
+            while (
+                len(self._memory) > self.max_items
+                or self._memory_size > self.max_bytes
+            ):
+                _, dropped = self._memory.popitem(last=False)
+                self._memory_size -= len(dropped)
+
+    def _disk_entries(self) -> list[tuple[float, int, str]]:
+        """Return ``(mtime, size, path)`` of the files, oldest first."""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        return entries
+
+    def _trim_disk(self) -> None:
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+_default: ReportCache | None = None
+
+
+def report_cache() -> ReportCache:
+    """Return the cache shared by the report exports."""
+    global _default
+    if _default is None:
+        _default = ReportCache()
+    return _default
+
+
+def report_key(report: str, params: dict, tables) -> str | None:
+    """Return the cache key of *report* for the current version of *tables*."""
+    import db
+
+    return cache_key(report, params, db.data_version(tables))
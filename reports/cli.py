@@ -0,0 +1,171 @@
+"""Generate the Excel reports without the desktop interface.
+
+Each command writes its report into ``--out`` (created if missing) using the
+same modules as the dialogs, and never imports Tk, so the month-end batch
+can run from cron or the Windows task scheduler::
+
+    python -m reports.cli sales --year 2024 --out rapoarte
+    python -m reports.cli decor --year 2024 --out rapoarte
+    python -m reports.cli vendor --year 2024 --month 5 --out rapoarte
+    python -m reports.cli backups --year 2024 --month 5 --archive --out rapoarte
+    python -m reports.cli available --start 2024-06-01 --end 2024-06-30 --out rapoarte
+
+``backups`` without ``--client``/``--firma``/``--campaign`` generates the
+backups of every client, like "Export Toți".  The exit status is 0 when the
+report was written, 1 when there was nothing to export and 2 when some
+backups failed.
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import sys
+
+from reports.data import NoData
+
+EXIT_NO_DATA = 1
+EXIT_FAILED = 2
+
+
+class PartialFailure(Exception):
+    """Raised when some of the files of a report could not be written."""
+
+
+def _date(value: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date (YYYY-MM-DD): {value}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    today = datetime.date.today()
+    parser = argparse.ArgumentParser(
+        prog="python -m reports.cli", description=__doc__.splitlines()[0]
+    )
+    sub = parser.add_subparsers(dest="report", required=True)
+
+    def add(name, help, month=False):
+        cmd = sub.add_parser(name, help=help)
+        cmd.add_argument("--out", required=True, help="output directory")
+        cmd.add_argument("--year", type=int, default=today.year)
+        if month:
+            cmd.add_argument("--month", type=int, default=today.month, choices=range(1, 13))
+        return cmd
+
+    add("sales", "yearly sales report")
+    add("decor", "yearly decorations report")
+    add("vendor", "monthly report per seller", month=True)
+    backups = add("backups", "billing backups of a month", month=True)
+    backups.add_argument("--client", type=int, dest="client_id")
+    backups.add_argument("--firma", type=int, dest="firma_id")
+    backups.add_argument("--campaign")
+    backups.add_argument("--archive", action="store_true", help="write a single .zip")
+    backups.add_argument("--workers", type=int, help="rendering processes")
+
+    available = sub.add_parser("available", help="available locations, one sheet per group")
+    available.add_argument("--out", required=True, help="output directory")
+    available.add_argument("--grup", default="Toate")
+    available.add_argument("--status", default="Toate")
+    available.add_argument("--search", default="")
+    available.add_argument("--start", type=_date, help="period start; omit to ignore dates")
+    available.add_argument("--end", type=_date)
+    return parser
+
+
+def _log_progress(sheet, rows):
+    logging.info("%s: %d rows", sheet, rows)
+
+
+def run_sales(args, progress=None) -> list[str]:
+    from reports.sales import export_sales
+
+    path = os.path.join(args.out, f"Raport vanzari {args.year}.xlsx")
+    return export_sales(args.year, path, progress)
+
+
+def run_decor(args, progress=None) -> list[str]:
+    from reports.decor import export_decor
+
+    path = os.path.join(args.out, f"Raport decorari {args.year}.xlsx")
+    return export_decor(args.year, path, progress)
+
+
+def run_vendor(args, progress=None) -> list[str]:
+    from reports.vendor import export_vendor
+
+    path = os.path.join(args.out, f"Raport vanzatori {args.year}-{args.month:02d}.xlsx")
+    return export_vendor(args.year, args.month, path, progress)
+
+
+def run_backups(args, progress=None) -> list[str]:
+    from reports.backup import export_backups
+
+    result = export_backups(
+        args.month,
+        args.year,
+        args.out,
+        args.client_id,
+        args.firma_id,
+        args.campaign,
+        archive=args.archive,
+        workers=args.workers,
+        progress=progress,
+    )
+    for path, error in result.failed:
+        logging.error("%s: %s", path, error)
+    if result.failed:
+        raise PartialFailure(
+            f"{len(result.failed)} of {len(result.failed) + len(result.written)} "
+            "backups failed"
+        )
+    return [result.location]
+
+
+def run_available(args, progress=None) -> list[str]:
+    from reports.availability import export_available
+
+    if (args.start is None) != (args.end is None):
+        raise SystemExit("--start and --end must be given together")
+    path = os.path.join(args.out, "Locatii disponibile.xlsx")
+    return export_available(
+        path,
+        args.grup,
+        args.status,
+        args.search,
+        args.start is None,
+        args.start,
+        args.end,
+        progress=progress,
+    )
+
+
+COMMANDS = {
+    "sales": run_sales,
+    "decor": run_decor,
+    "vendor": run_vendor,
+    "backups": run_backups,
+    "available": run_available,
+}
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    os.makedirs(args.out, exist_ok=True)
+    try:
+        written = COMMANDS[args.report](args, _log_progress)
+    except NoData as exc:
+        print(exc, file=sys.stderr)
+        return EXIT_NO_DATA
+    except PartialFailure as exc:
+        print(exc, file=sys.stderr)
+        return EXIT_FAILED
+    for path in written:
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Queries behind the Excel reports.
+
+Every function selects only the columns its report uses and pushes the
+period, seller and county filters into indexed SQL predicates, so the data
+transferred grows with the reported period instead of the whole history.
+Results are read in chunks of :data:`REPORT_CHUNKSIZE` rows.
+"""
+
+import datetime
+
+import pandas as pd
+
+# Rows fetched per round trip when reading report data.
+REPORT_CHUNKSIZE = 5000
+
+
+class NoData(Exception):
+    """Raised when a report has nothing to export; the message is for the user."""
+
+
+def read_frame(sql: str, params=None, parse_dates=None, chunksize=REPORT_CHUNKSIZE):
+    """Return the result of *sql* as one DataFrame read in chunks."""
+    import db
+
+    result = db.read_sql_query(
+        sql, params=params, parse_dates=parse_dates, chunksize=chunksize
+    )
+    # ``read_sql_query`` returns an iterator of chunks, except for the MySQL
+    # fallback without SQLAlchemy which always fetches a single frame
+    if isinstance(result, pd.DataFrame):
+        return result
+    chunks = list(result)
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _month_bounds(year: int, month: int) -> tuple[str, str]:
+    """Return the first day of the month and of the following month."""
+    start = datetime.date(year, month, 1)
+    following = datetime.date(year + month // 12, month % 12 + 1, 1)
+    return start.isoformat(), following.isoformat()
+
+
+# Tables read by the sales report; a write to any of them invalidates its cache
+SALES_TABLES = ("locatii", "rezervari", "decorari")
+
+
+def sales_locations() -> pd.DataFrame:
+    """Return the inventory listed by the sales report."""
+    return read_frame(
+        """
+        SELECT id, city, county, address, type, size, sqm, illumination,
+               ratecard, pret_vanzare, grup, status, is_mobile, parent_id
+          FROM locatii
+         ORDER BY county, city, id
+        """,
+    )
+
+
+def sales_rentals(year: int) -> pd.DataFrame:
+    """Return the paid rentals overlapping *year*, oldest first.
+
+    Base records of mobile prisms are skipped; their rented units are
+    listed instead.
+    """
+    return read_frame(
+        """
+        SELECT l.id, l.is_mobile, l.parent_id,
+               r.client, r.data_start, r.data_end, r.suma
+          FROM rezervari r
+          JOIN locatii l ON r.loc_id = l.id
+         WHERE r.suma IS NOT NULL AND r.suma > 0
+           AND r.data_start <= ? AND r.data_end >= ?
+           AND NOT (COALESCE(l.is_mobile, 0) = 1 AND l.parent_id IS NULL)
+         ORDER BY r.data_start
+        """,
+        params=[f"{year}-12-31", f"{year}-01-01"],
+        parse_dates=["data_start", "data_end"],
+    )
+
+
+def sales_month_stats(year: int) -> pd.DataFrame:
+    """Return the sold days and revenue of *year* from ``loc_month_stats``.
+
+    One row per rented location and month; ``base_id`` is the prism a
+    mobile unit belongs to (the location itself otherwise).  Mobile prism
+    bases are skipped like in :func:`sales_rentals`.
+    """
+    return read_frame(
+        """
+        SELECT s.loc_id, COALESCE(l.parent_id, s.loc_id) AS base_id,
+               s.month, s.sold_days, s.revenue
+          FROM loc_month_stats s
+          JOIN locatii l ON l.id = s.loc_id
+         WHERE s.year = ? AND s.sold_days > 0
+           AND NOT (COALESCE(l.is_mobile, 0) = 1 AND l.parent_id IS NULL)
+        """,
+        params=[year],
+    )
+
+
+# Location columns :func:`month_totals` can group by
+GROUP_COLUMNS = ("grup", "county", "city")
+
+
+def month_totals(year: int, by: str = "grup") -> pd.DataFrame:
+    """Return occupancy, revenue and costs of *year* per *by* and month."""
+    if by not in GROUP_COLUMNS:
+        raise ValueError(f"cannot group by {by!r}")
+    return read_frame(
+        f"""
+        SELECT l.{by} AS {by}, s.month,
+               COUNT(DISTINCT s.loc_id) AS locations,
+               SUM(s.sold_days) AS sold_days,
+               SUM(s.reserved_days) AS reserved_days,
+               SUM(s.revenue) AS revenue,
+               SUM(s.decor_cost) AS decor_cost,
+               SUM(s.prod_cost) AS prod_cost
+          FROM loc_month_stats s
+          JOIN locatii l ON l.id = s.loc_id
+         WHERE s.year = ?
+         GROUP BY l.{by}, s.month
+         ORDER BY l.{by}, s.month
+        """,
+        params=[year],
+    )
+
+
+def vendor_sellers() -> pd.DataFrame:
+    """Return the sellers with the counties (``comune``) they cover."""
+    return read_frame("SELECT username, comune FROM users WHERE role='seller'")
+
+
+def vendor_rentals(year: int, month: int, sellers=None, counties=None) -> pd.DataFrame:
+    """Return the rentals created in the given month.
+
+    Only contracts starting on or after their creation date are returned.
+    *sellers* and *counties* restrict the result to the given creators and
+    location counties.
+    """
+    start, following = _month_bounds(year, month)
+    sql = """
+        SELECT r.created_by, r.created_on, r.client, r.suma, r.data_start, r.data_end,
+               l.city, l.county, l.address
+          FROM rezervari r
+          JOIN locatii l ON r.loc_id = l.id
+         WHERE r.suma IS NOT NULL AND r.suma > 0
+           AND r.created_on >= ? AND r.created_on < ?
+           AND r.data_start >= r.created_on
+    """
+    params = [start, following]
+    if sellers is not None:
+        sellers = list(sellers)
+        if not sellers:
+            sellers = [""]
+        sql += f" AND r.created_by IN ({', '.join(['?'] * len(sellers))})"
+        params += sellers
+    if counties:
+        counties = list(counties)
+        sql += f" AND l.county IN ({', '.join(['?'] * len(counties))})"
+        params += counties
+    # the order the rentals were written, whatever index serves the filter
+    sql += " ORDER BY r.id"
+    return read_frame(
+        sql, params=params, parse_dates=["created_on", "data_start", "data_end"]
+    )
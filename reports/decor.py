@@ -0,0 +1,50 @@
+"""Yearly report of the decorations recorded in ``decorari``."""
+
+import pandas as pd
+
+from reports.data import NoData, read_frame
+
+COLUMNS = {
+    "data": "Data",
+    "city": "Oraș",
+    "county": "Județ",
+    "address": "Adresă",
+    "code": "Cod",
+    "decor_cost": "Cost Decor",
+    "prod_cost": "Cost Producție",
+    "created_by": "Adăugat de",
+}
+
+
+def decor_rows(year: int) -> pd.DataFrame:
+    """Return the decorations of *year*; raises :class:`NoData` if none."""
+    df = read_frame(
+        """
+        SELECT d.data, l.city, l.county, l.address, l.code,
+               d.decor_cost, d.prod_cost, d.created_by
+          FROM decorari d
+          JOIN locatii l ON d.loc_id = l.id
+         WHERE d.data BETWEEN ? AND ?
+         ORDER BY d.data
+        """,
+        params=[f"{year}-01-01", f"{year}-12-31"],
+        parse_dates=["data"],
+    )
+    if df.empty:
+        raise NoData("Nu există decorări pentru anul selectat.")
+    return df
+
+
+def write_decor_report(df: pd.DataFrame, path: str, progress=None) -> None:
+    """Write the rows returned by :func:`decor_rows` to *path*."""
+    df = df.rename(columns=COLUMNS)
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name="Decorări")
+    if progress:
+        progress("Decorări", len(df))
+
+
+def export_decor(year: int, path: str, progress=None) -> list[str]:
+    """Build the decorations report of *year* into *path*."""
+    write_decor_report(decor_rows(year), path, progress)
+    return [path]
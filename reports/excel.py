@@ -0,0 +1,196 @@
+"""Streaming Excel writer shared by the location and offer exports.
+
+:class:`ExcelExport` opens an xlsxwriter workbook in ``constant_memory``
+mode, where each row is flushed to a temporary file as soon as the next one
+starts, so memory does not grow with the number of exported locations.
+Rows go out with ``write_row`` over the runs of columns sharing a format,
+column widths are tracked while streaming and every format is created once
+per workbook.
+"""
+
+from dataclasses import dataclass
+
+import pandas as pd
+import xlsxwriter
+
+MAPS_URL = "https://www.google.com/maps/search/?api=1&query={}"
+
+_CELL = {"align": "center", "valign": "vcenter", "border": 1}
+
+STYLES = {
+    "text": _CELL,
+    "money": {**_CELL, "num_format": "€#,##0.00"},
+    "percent": {**_CELL, "num_format": "0.00%"},
+    "link": {**_CELL, "font_color": "blue", "underline": True},
+    "header": {
+        **_CELL,
+        "bold": True,
+        "bg_color": "#4F81BD",
+        "font_color": "white",
+    },
+    "title": {"bold": True, "font_size": 14, "align": "center", "valign": "vcenter"},
+}
+
+# Kinds of columns written as hyperlinks showing ``Column.label``
+LINK_KINDS = ("maps", "url")
+
+
+@dataclass(frozen=True)
+class Column:
+    """One exported column.
+
+    *kind* is ``text``, ``money``, ``percent``, ``maps`` (GPS coordinates
+    linked to Google Maps) or ``url`` (a web address).  Link columns show
+    *label* instead of the address.
+    """
+
+    header: str
+    kind: str = "text"
+    label: str = ""
+
+
+def link_url(kind: str, value) -> str | None:
+    """Return the hyperlink for *value* in a link column, ``None`` if empty."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if kind == "maps":
+        return MAPS_URL.format(value)
+    if not value.lower().startswith(("http://", "https://")):
+        value = "https://" + value
+    return value
+
+
+def _money_width(value) -> int:
+    try:
+        amount = float(value or 0)
+    except (TypeError, ValueError):
+        amount = 0.0
+    return len(f"€{amount:,.2f}")
+
+
+def _missing(value) -> bool:
+    return value is None or (pd.api.types.is_scalar(value) and pd.isna(value))
+
+
+class StreamSheet:
+    """Worksheet written strictly top to bottom, one row at a time."""
+
+    def __init__(self, export: "ExcelExport", name: str, columns, title=None):
+        self.export = export
+        self.columns = [c if isinstance(c, Column) else Column(c) for c in columns]
+        self.worksheet = export.workbook.add_worksheet(name)
+        self.row = 0
+        self._widths = [
+            max(len(c.header), len(c.label)) for c in self.columns
+        ]
+        self._text_fmt = export.format("text")
+        self._link_fmt = export.format("link")
+        self._links = [
+            (idx, col) for idx, col in enumerate(self.columns) if col.kind in LINK_KINDS
+        ]
+        self._money = [
+            idx for idx, col in enumerate(self.columns) if col.kind == "money"
+        ]
+        self._plain = [
+            idx
+            for idx, col in enumerate(self.columns)
+            if col.kind not in LINK_KINDS and col.kind != "money"
+        ]
+        # Consecutive non-link columns sharing a format are written with a
+        # single ``write_row`` call
+        self._runs = []
+        for idx, col in enumerate(self.columns):
+            if col.kind in LINK_KINDS:
+                continue
+            fmt = export.format(col.kind)
+            if self._runs and self._runs[-1][1] == idx and self._runs[-1][2] is fmt:
+                start, _, _ = self._runs.pop()
+            else:
+                start = idx
+            self._runs.append((start, idx + 1, fmt))
+
+        last_col = len(self.columns) - 1
+        if title:
+            if last_col > 0:
+                self.worksheet.merge_range(
+                    0, 0, 0, last_col, title, export.format("title")
+                )
+            else:
+                self.worksheet.write(0, 0, title, export.format("title"))
+            self.row = 1
+        self.worksheet.write_row(
+            self.row, 0, [c.header for c in self.columns], export.format("header")
+        )
+        self.row += 1
+
+    def write_row(self, values) -> None:
+        """Append one data row; missing values (``None``/``NaN``/``NA``) stay empty."""
+        values = ["" if _missing(v) else v for v in values]
+        ws, row = self.worksheet, self.row
+        for start, end, fmt in self._runs:
+            ws.write_row(row, start, values[start:end], fmt)
+        for idx, col in self._links:
+            url = link_url(col.kind, values[idx])
+            if url:
+                ws.write_url(row, idx, url, self._link_fmt, string=col.label)
+            else:
+                ws.write(row, idx, "", self._text_fmt)
+
+        widths = self._widths
+        for idx in self._plain:
+            width = len(str(values[idx]))
+            if width > widths[idx]:
+                widths[idx] = width
+        for idx in self._money:
+            width = _money_width(values[idx])
+            if width > widths[idx]:
+                widths[idx] = width
+        self.row += 1
+
+    def write_rows(self, rows) -> None:
+        for values in rows:
+            self.write_row(values)
+
+    def write_frame(self, df) -> None:
+        """Append the rows of DataFrame *df*, whose columns match the sheet."""
+        self.write_rows(df.itertuples(index=False, name=None))
+
+    def close(self) -> None:
+        """Apply the column widths collected while streaming."""
+        for idx, width in enumerate(self._widths):
+            self.worksheet.set_column(idx, idx, width + 2)
+
+
+class ExcelExport:
+    """Constant-memory xlsx workbook; use as a context manager."""
+
+    def __init__(self, path: str):
+        self.workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self._formats = {}
+        self._sheets = []
+
+    def format(self, style: str):
+        """Return the cached workbook format for *style* (see :data:`STYLES`)."""
+        fmt = self._formats.get(style)
+        if fmt is None:
+            fmt = self._formats[style] = self.workbook.add_format(STYLES[style])
+        return fmt
+
+    def add_sheet(self, name: str, columns, title=None) -> StreamSheet:
+        """Add a sheet with a header row and an optional merged *title* row."""
+        sheet = StreamSheet(self, name[:31], columns, title)
+        self._sheets.append(sheet)
+        return sheet
+
+    def close(self) -> None:
+        for sheet in self._sheets:
+            sheet.close()
+        self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,121 @@
+"""Split rentals across the months of a year.
+
+:func:`prorate_year` turns arrays of rental starts, ends and monthly prices
+into ``rentals × 12`` matrices of sold days, fractions of month and revenue
+in one NumPy pass.  The sales report derives the "Total" sheet and the
+twelve month sheets from the same result.  :func:`contract_months` gives the
+length of contracts spanning any number of years, used by the vendor report.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+def _to_days(values) -> np.ndarray:
+    """Return *values* as a ``datetime64[D]`` array, ``NaT`` when missing."""
+    stamps = pd.to_datetime(pd.Series(values), errors="coerce")
+    return stamps.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+
+
+@dataclass
+class YearProrate:
+    """Overlap of every rental with every month of :attr:`year`.
+
+    All matrices have one row per rental, in input order, and one column
+    per month.  ``first_day``/``last_day`` hold the overlapping period and
+    are ``NaT`` where a rental does not touch the month.
+    """
+
+    year: int
+    month_days: np.ndarray
+    days: np.ndarray
+    fractions: np.ndarray
+    revenue: np.ndarray
+    first_day: np.ndarray
+    last_day: np.ndarray
+
+    def long_format(self, **columns) -> pd.DataFrame:
+        """Return one row per rental and month with a non-empty overlap.
+
+        Extra keyword arguments are per-rental arrays copied to the result,
+        e.g. ``long_format(id=ids, client=clients)``.  Rows are ordered by
+        rental then month.
+        """
+        rows, cols = np.nonzero(self.days)
+        data = {
+            "row": rows,
+            "month": cols + 1,
+            "days": self.days[rows, cols],
+            "fraction": self.fractions[rows, cols],
+            "revenue": self.revenue[rows, cols],
+            "first_day": self.first_day[rows, cols],
+            "last_day": self.last_day[rows, cols],
+        }
+        for name, values in columns.items():
+            data[name] = np.asarray(values)[rows]
+        return pd.DataFrame(data)
+
+
+def prorate_year(starts, ends, prices, year: int) -> YearProrate:
+    """Return the monthly overlap of rentals with *year*.
+
+    *starts* and *ends* are inclusive dates (anything ``pandas.to_datetime``
+    accepts) and *prices* the monthly price of each rental.  The revenue of
+    a month is the price times the fraction of the month that was sold.
+    """
+    starts = _to_days(starts)[:, None]
+    ends = _to_days(ends)[:, None]
+    prices = np.asarray(prices, dtype=float).reshape(-1, 1)
+
+    months = np.arange(f"{year}-01", f"{year + 1}-01", dtype="datetime64[M]")
+    month_start = months.astype("datetime64[D]")[None, :]
+    month_end = (months + 1).astype("datetime64[D]")[None, :] - 1
+    month_days = (month_end - month_start).astype(np.int64)[0] + 1
+
+    first = np.maximum(starts, month_start)
+    last = np.minimum(ends, month_end)
+    span = (last - first).astype(np.int64)
+    # ``NaT`` dates turn into the smallest int64, so they count as no overlap
+    days = np.where(np.isnat(first) | np.isnat(last), 0, np.clip(span + 1, 0, None))
+    empty = days == 0
+    first = np.where(empty, np.datetime64("NaT"), first)
+    last = np.where(empty, np.datetime64("NaT"), last)
+
+    fractions = days / month_days
+    return YearProrate(
+        year=year,
+        month_days=month_days,
+        days=days,
+        fractions=fractions,
+        revenue=fractions * prices,
+        first_day=first,
+        last_day=last,
+    )
+
+
+def contract_months(starts, ends) -> np.ndarray:
+    """Return the length of each contract in (fractional) calendar months.
+
+    A contract counts one for every full month it covers plus the sold
+    fraction of its first and last month, e.g. 15.01 → 10.03 of a leap year
+    is ``17/31 + 1 + 10/31``.  Contracts ending before they start count 0.
+    """
+    starts = _to_days(starts)
+    ends = _to_days(ends)
+    first_month = starts.astype("datetime64[M]")
+    last_month = ends.astype("datetime64[M]")
+    first_day = first_month.astype("datetime64[D]")
+    last_day = last_month.astype("datetime64[D]")
+    first_dim = ((first_month + 1).astype("datetime64[D]") - first_day).astype(np.int64)
+    last_dim = ((last_month + 1).astype("datetime64[D]") - last_day).astype(np.int64)
+    start_day = (starts - first_day).astype(np.int64) + 1
+    end_day = (ends - last_day).astype(np.int64) + 1
+
+    between = (last_month - first_month).astype(np.int64) - 1
+    same_month = (end_day - start_day + 1) / first_dim
+    spanning = (first_dim - start_day + 1) / first_dim + end_day / last_dim + between
+    months = np.where(first_month == last_month, same_month, spanning)
+    valid = ~(np.isnat(starts) | np.isnat(ends)) & (ends >= starts)
+    return np.where(valid, months, 0.0)
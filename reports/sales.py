@@ -0,0 +1,653 @@
+"""Yearly sales report: a "Total" sheet and one sheet per month.
+
+:func:`prepare_sales_report` loads the data (or finds the finished workbook
+in :mod:`reports.cache`) and :func:`write_sales_report` writes it, so the
+desktop dialog and :mod:`reports.cli` produce the same file.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import Border, Side
+
+from reports.cache import report_cache, report_key
+from reports.data import (
+    SALES_TABLES,
+    NoData,
+    sales_locations,
+    sales_month_stats,
+    sales_rentals,
+)
+from reports.prorate import prorate_year
+
+
+def year_sold_share(sold_months, is_mobile) -> pd.Series:
+    """Return the share of the year sold: months over 12, or over 20 × 12 for mobile bases.
+
+    *is_mobile* is taken by truthiness, as the report always did: a missing
+    value read as ``NaN`` counts as mobile, ``None`` and 0 do not.
+    """
+    mobile = pd.Series(is_mobile).astype(bool).to_numpy()
+    return sold_months / np.where(mobile, 20 * 12, 12)
+
+
+@dataclass
+class SalesReport:
+    """Input of the sales report of *year*, or its cached workbook."""
+
+    year: int
+    key: str | None
+    locations: pd.DataFrame | None = None
+    cached: bytes | None = None
+
+
+def prepare_sales_report(year: int) -> SalesReport:
+    """Refresh the derived data and load what the report of *year* needs.
+
+    Raises :class:`NoData` when there are no locations to report.
+    """
+    import db
+
+    db.update_statusuri_din_rezervari()
+    db.refresh_loc_month_stats()
+
+    # Un raport identic (același an, aceleași date) se servește din cache
+    key = report_key("sales", {"year": year}, SALES_TABLES)
+    cached = report_cache().get(key)
+    if cached is not None:
+        return SalesReport(year, key, cached=cached)
+
+    df_loc_all = sales_locations()
+    if df_loc_all.empty or (
+        (df_loc_all["is_mobile"] == 1) & (df_loc_all["parent_id"].isna())
+    ).all():
+        raise NoData("Nu există locații în baza de date.")
+    return SalesReport(year, key, locations=df_loc_all)
+
+
+def write_sales_report(report: SalesReport, path: str, progress=None) -> None:
+    """Write *report* prepared by :func:`prepare_sales_report` to *path*.
+
+    *progress* is called as ``progress(sheet, rows)`` after each sheet.
+    """
+    if report.cached is not None:
+        with open(path, "wb") as fh:
+            fh.write(report.cached)
+        return
+
+    year = report.year
+    df_loc_all = report.locations
+    # ``df_loc`` is used for the monthly sheets where the base record for mobile
+    # prisms would only duplicate the actual rented units.  Keep the full
+    # dataframe separate so the "Total" sheet can include mobile bases as well.
+    df_loc = df_loc_all[
+        ~((df_loc_all["is_mobile"] == 1) & (df_loc_all["parent_id"].isna()))
+    ]
+
+    df_total_base = df_loc_all[df_loc_all["parent_id"].isna()].copy()
+
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        wb = writer.book
+        stats_ranges = {}
+        hdr_fmt = wb.add_format(
+            {
+                "bold": True,
+                "bg_color": "#4F81BD",
+                "font_color": "white",
+                "align": "center",
+                "valign": "vcenter",
+                "border": 1,
+            }
+        )
+        text_fmt = wb.add_format({"align": "center", "valign": "vcenter", "border": 1})
+        money_fmt = wb.add_format(
+            {
+                "num_format": "€#,##0.00",
+                "align": "center",
+                "valign": "vcenter",
+                "border": 1,
+            }
+        )
+        sold_text_fmt = wb.add_format(
+            {"align": "center", "valign": "vcenter", "border": 1, "bg_color": "#D9E1F2"}
+        )
+        sold_money_fmt = wb.add_format(
+            {
+                "num_format": "€#,##0.00",
+                "align": "center",
+                "valign": "vcenter",
+                "border": 1,
+                "bg_color": "#D9E1F2",
+            }
+        )
+        percent_fmt = wb.add_format(
+            {"num_format": "0.00%", "align": "center", "valign": "vcenter", "border": 1}
+        )
+
+        stat_lbl_fmt = wb.add_format(
+            {
+                "bold": True,
+                "bg_color": "white",
+                "font_size": 14,
+                "align": "center",
+                "valign": "vcenter",
+                "border": 1,
+            }
+        )
+        stat_money_fmt = wb.add_format(
+            {
+                "num_format": "€#,##0.00",
+                "bold": True,
+                "bg_color": "white",
+                "font_size": 14,
+                "align": "center",
+                "valign": "vcenter",
+                "border": 1,
+            }
+        )
+        stat_money_pos_fmt = wb.add_format(
+            {
+                "num_format": "€#,##0.00",
+                "bold": True,
+                "bg_color": "white",
+                "font_size": 14,
+                "font_color": "green",
+                "align": "center",
+                "valign": "vcenter",
+                "border": 1,
+            }
+        )
+        stat_money_neg_fmt = wb.add_format(
+            {
+                "num_format": "€#,##0.00",
+                "bold": True,
+                "bg_color": "white",
+                "font_size": 14,
+                "font_color": "red",
+                "align": "center",
+                "valign": "vcenter",
+                "border": 1,
+            }
+        )
+        stat_percent_fmt = wb.add_format(
+            {
+                "num_format": "0.00%",
+                "bold": True,
+                "bg_color": "white",
+                "font_size": 14,
+                "align": "center",
+                "valign": "vcenter",
+                "border": 1,
+            }
+        )
+        stat_int_fmt = wb.add_format(
+            {
+                "bold": True,
+                "bg_color": "white",
+                "font_size": 14,
+                "align": "center",
+                "valign": "vcenter",
+                "border": 1,
+            }
+        )
+
+        money_cols = {
+            "Ratecard/month",
+            "PRET DE VANZARE",
+            "PRET DE INCHIRIERE",
+            "SUMĂ AN",
+        }
+
+        def write_sheet(name, df_sheet):
+            df_sheet = df_sheet.copy()
+            df_sheet["data_start"] = pd.to_datetime(df_sheet["data_start"], errors="coerce")
+            df_sheet["data_end"] = pd.to_datetime(df_sheet["data_end"], errors="coerce")
+            df_sheet["Perioada"] = ""
+            mask = df_sheet["data_start"].notna() & df_sheet["data_end"].notna()
+            if mask.any():
+                df_sheet.loc[mask, "Perioada"] = (
+                    df_sheet.loc[mask, "data_start"].dt.strftime("%d.%m.%Y")
+                    + " → "
+                    + df_sheet.loc[mask, "data_end"].dt.strftime("%d.%m.%Y")
+                )
+            df_sheet = df_sheet[
+                [
+                    "city",
+                    "county",
+                    "address",
+                    "type",
+                    "size",
+                    "sqm",
+                    "illumination",
+                    "ratecard",
+                    "pret_vanzare",
+                    "suma",
+                    "client",
+                    "Perioada",
+                    "status",
+                ]
+            ]
+            df_sheet.columns = [
+                "City",
+                "County",
+                "Address",
+                "Type",
+                "Size",
+                "SQM",
+                "Illum",
+                "Ratecard/month",
+                "PRET DE VANZARE",
+                "PRET DE INCHIRIERE",
+                "Client",
+                "Perioada",
+                "status",
+            ]
+            df_sheet.insert(0, "Nr", range(1, len(df_sheet) + 1))
+
+            ws = wb.add_worksheet(name)
+            writer.sheets[name] = ws
+
+            for col_idx, col_name in enumerate(df_sheet.columns[:-1]):
+                ws.write(0, col_idx, col_name, hdr_fmt)
+
+            for row_idx, row in enumerate(df_sheet.itertuples(index=False), start=1):
+                sold = row.status == "Închiriat"
+                for col_idx, value in enumerate(row[:-1]):
+                    col_name = df_sheet.columns[col_idx]
+                    if pd.isna(value):
+                        value = ""
+                    if col_name in money_cols:
+                        fmt = sold_money_fmt if sold else money_fmt
+                    else:
+                        fmt = sold_text_fmt if sold else text_fmt
+                    ws.write(row_idx, col_idx, value, fmt)
+
+            for idx, col_name in enumerate(df_sheet.columns[:-1]):
+                if col_name in money_cols:
+                    vals = pd.to_numeric(df_sheet[col_name], errors="coerce").fillna(0)
+                    formatted = [f"€{v:,.2f}" for v in vals]
+                    max_len = max(len(col_name), *(len(v) for v in formatted))
+                else:
+                    max_len = max(
+                        len(col_name), df_sheet[col_name].astype(str).map(len).max()
+                    )
+                ws.set_column(idx, idx, max_len + 2)
+
+            sold_mask = df_sheet["status"] == "Închiriat"
+            pct_sold = sold_mask.mean()
+            pct_free = 1 - pct_sold
+            count_sold = int(sold_mask.sum())
+            count_free = int(len(df_sheet) - count_sold)
+            sale_total = (
+                pd.to_numeric(df_sheet["PRET DE VANZARE"], errors="coerce")
+                .fillna(0)
+                .sum()
+            )
+            sold_income = (
+                pd.to_numeric(
+                    df_sheet.loc[sold_mask, "PRET DE INCHIRIERE"], errors="coerce"
+                )
+                .fillna(0)
+                .sum()
+            )
+            # Value of the unsold locations based on their sale price
+            sale_free = (
+                pd.to_numeric(
+                    df_sheet.loc[~sold_mask, "PRET DE VANZARE"], errors="coerce"
+                )
+                .fillna(0)
+                .sum()
+            )
+
+            # shift the monthly totals block one column to the left by
+            # ignoring the final "status" column when computing the end index
+            stats_end = len(df_sheet.columns) - 2
+            value_col = max(stats_end - 2, 0)
+            merge_end = value_col - 1
+            merge_start = max(merge_end - 3, 0)
+            start = len(df_sheet) + 2
+            ws.merge_range(start, merge_start, start, merge_end, "Locații vândute", stat_lbl_fmt)
+            ws.merge_range(
+                start,
+                value_col,
+                start,
+                stats_end,
+                f"{count_sold} ({pct_sold:.2%})",
+                stat_int_fmt,
+            )
+            ws.merge_range(
+                start + 1, merge_start, start + 1, merge_end, "Locații nevândute", stat_lbl_fmt
+            )
+            ws.merge_range(
+                start + 1,
+                value_col,
+                start + 1,
+                stats_end,
+                f"{count_free} ({pct_free:.2%})",
+                stat_int_fmt,
+            )
+            ws.merge_range(
+                start + 2, merge_start, start + 2, merge_end, "Preț vânzare total", stat_lbl_fmt
+            )
+            ws.merge_range(
+                start + 2,
+                value_col,
+                start + 2,
+                stats_end,
+                sale_total,
+                stat_money_fmt,
+            )
+            pct_sale_sold = sold_income / sale_total if sale_total else 0
+            pct_sale_free = sale_free / sale_total if sale_total else 0
+            ws.merge_range(
+                start + 3, merge_start, start + 3, merge_end, "Sumă locații vândute", stat_lbl_fmt
+            )
+            ws.merge_range(
+                start + 3,
+                value_col,
+                start + 3,
+                stats_end,
+                f"€{sold_income:,.2f} ({pct_sale_sold:.2%})",
+                stat_money_pos_fmt,
+            )
+            ws.merge_range(
+                start + 4,
+                merge_start,
+                start + 4,
+                merge_end,
+                "Sumă locații nevândute",
+                stat_lbl_fmt,
+            )
+            ws.merge_range(
+                start + 4,
+                value_col,
+                start + 4,
+                stats_end,
+                f"€{sale_free:,.2f} ({pct_sale_free:.2%})",
+                stat_money_neg_fmt,
+            )
+            stats_ranges[name] = (start, start + 4, merge_start, stats_end)
+            if progress:
+                progress(name, len(df_sheet))
+            # The "Raport sume vândute/nevândute" statistic is no longer shown
+            # in the monthly sheets as it was not considered relevant.
+
+        df_rez = sales_rentals(year)
+        df_rez = df_rez[~((df_rez["is_mobile"] == 1) & (df_rez["parent_id"].isna()))]
+
+        df_all = df_loc[
+            [
+                "id",
+                "city",
+                "county",
+                "address",
+                "type",
+                "size",
+                "sqm",
+                "illumination",
+                "ratecard",
+                "pret_vanzare",
+                "grup",
+                "status",
+                "is_mobile",
+                "parent_id",
+            ]
+        ].copy()
+        df_base = df_total_base.copy()
+
+        # Repartizăm fiecare închiriere pe lunile anului; toate foile derivă
+        # din aceeași matrice locație × lună
+        prorated = prorate_year(
+            df_rez["data_start"], df_rez["data_end"], df_rez["suma"], year
+        )
+        # Totalurile anuale vin din agregatele lunare ``loc_month_stats``
+        df_stats = sales_month_stats(year)
+        months = df_stats["month"].astype(int).to_numpy()
+        agg = pd.DataFrame(
+            {
+                "days": df_stats["sold_days"],
+                "months": df_stats["sold_days"] / prorated.month_days[months - 1],
+                "val_real": df_stats["revenue"],
+            }
+        ).groupby(df_stats["base_id"].astype(int).to_numpy()).sum()
+
+        units_sold = df_stats.groupby("base_id")["loc_id"].nunique()
+
+        # Sheet summarizing the entire year
+        df_total = df_base.copy()
+        df_total["Sold Days"] = df_total["id"].map(agg["days"]).fillna(0)
+        df_total["Sold Months"] = df_total["id"].map(agg["months"]).fillna(0)
+        df_total["Units Sold"] = (
+            df_total["id"].map(units_sold).fillna(0).astype(int)
+        )
+        df_total["pret_vanzare"] = pd.to_numeric(
+            df_total["pret_vanzare"], errors="coerce"
+        ).fillna(0)
+        df_total["Total Sum"] = df_total["id"].map(agg["val_real"]).fillna(0)
+        mob_mask = df_total["is_mobile"] == 1
+        df_total.loc[mob_mask & (df_total["Units Sold"] > 0), "address"] = (
+            df_total.loc[mob_mask & (df_total["Units Sold"] > 0), "address"]
+            + " "
+            + df_total.loc[mob_mask & (df_total["Units Sold"] > 0), "Units Sold"].astype(str)
+            + "X"
+        )
+        df_total = df_total.drop(columns="Units Sold")
+        df_total["% Year Sold"] = year_sold_share(
+            df_total["Sold Months"], df_total["is_mobile"]
+        )
+        grp_order = (
+            df_total.groupby("grup")["pret_vanzare"]
+            .max()
+            .sort_values(ascending=False)
+            .index
+        )
+        order_map = {g: i for i, g in enumerate(grp_order)}
+        df_total["__grp"] = df_total["grup"].map(order_map)
+        df_total = df_total.sort_values(
+            ["__grp", "pret_vanzare"], ascending=[True, False]
+        ).drop(columns="__grp")
+
+        def write_total_sheet(df_sheet):
+            df_sheet = df_sheet[
+                [
+                    "city",
+                    "county",
+                    "address",
+                    "type",
+                    "size",
+                    "sqm",
+                    "illumination",
+                    "ratecard",
+                    "pret_vanzare",
+                    "Sold Months",
+                    "% Year Sold",
+                    "Total Sum",
+                ]
+            ].copy()
+            df_sheet.columns = [
+                "City",
+                "County",
+                "Address",
+                "Type",
+                "Size",
+                "SQM",
+                "Illum",
+                "Ratecard/month",
+                "PRET DE VANZARE",
+                "Luni vândută",
+                "% An vândut",
+                "SUMĂ AN",
+            ]
+            df_sheet.insert(0, "Nr", range(1, len(df_sheet) + 1))
+            ws = wb.add_worksheet("Total")
+            writer.sheets["Total"] = ws
+            for col_idx, col_name in enumerate(df_sheet.columns):
+                ws.write(0, col_idx, col_name, hdr_fmt)
+            for row_idx, row in enumerate(df_sheet.itertuples(index=False), start=1):
+                for col_idx, value in enumerate(row):
+                    col_name = df_sheet.columns[col_idx]
+                    if col_name in {"PRET DE VANZARE", "SUMĂ AN"}:
+                        fmt = money_fmt
+                    else:
+                        fmt = text_fmt
+                    if col_name == "% An vândut":
+                        ws.write(row_idx, col_idx, value, percent_fmt)
+                    else:
+                        ws.write(row_idx, col_idx, value, fmt)
+            for idx, col in enumerate(df_sheet.columns):
+                if col in {"PRET DE VANZARE", "SUMĂ AN"}:
+                    vals = pd.to_numeric(df_sheet[col], errors="coerce").fillna(0)
+                    formatted = [f"€{v:,.2f}" for v in vals]
+                    width = max(len(col), *(len(v) for v in formatted)) + 2
+                else:
+                    width = max(len(col), df_sheet[col].astype(str).map(len).max()) + 2
+                ws.set_column(idx, idx, width)
+            pct_months_sold = (
+                pd.to_numeric(df_sheet["Luni vândută"], errors="coerce").fillna(0).sum()
+                / (len(df_sheet) * 12)
+            )
+            pct_months_free = 1 - pct_months_sold
+            sale_total = (
+                pd.to_numeric(df_sheet["PRET DE VANZARE"], errors="coerce").fillna(0) * 12
+            ).sum()
+            sold_income = (
+                pd.to_numeric(df_sheet["SUMĂ AN"], errors="coerce").fillna(0).sum()
+            )
+            sale_free = sale_total - sold_income
+            pct_sale_sold = sold_income / sale_total if sale_total else 0
+            pct_sale_free = sale_free / sale_total if sale_total else 0
+
+            stats_end = len(df_sheet.columns) - 1
+            value_col = max(stats_end - 2, 0)
+            merge_end = value_col - 1
+            merge_start = max(merge_end - 3, 0)
+            start = len(df_sheet) + 2
+            ws.merge_range(
+                start,
+                merge_start,
+                start,
+                merge_end,
+                f"Locații vândute în anul {year}",
+                stat_lbl_fmt,
+            )
+            ws.merge_range(
+                start,
+                value_col,
+                start,
+                stats_end,
+                pct_months_sold,
+                stat_percent_fmt,
+            )
+            ws.merge_range(
+                start + 1, merge_start, start + 1, merge_end, "Locații nevândute", stat_lbl_fmt
+            )
+            ws.merge_range(
+                start + 1,
+                value_col,
+                start + 1,
+                stats_end,
+                pct_months_free,
+                stat_percent_fmt,
+            )
+            ws.merge_range(
+                start + 2, merge_start, start + 2, merge_end, "Preț vânzare total", stat_lbl_fmt
+            )
+            ws.merge_range(
+                start + 2,
+                value_col,
+                start + 2,
+                stats_end,
+                sale_total,
+                stat_money_fmt,
+            )
+            ws.merge_range(
+                start + 3, merge_start, start + 3, merge_end, "Sumă locații vândute", stat_lbl_fmt
+            )
+            ws.merge_range(
+                start + 3,
+                value_col,
+                start + 3,
+                stats_end,
+                f"€{sold_income:,.2f} ({pct_sale_sold:.2%})",
+                stat_money_pos_fmt,
+            )
+            ws.merge_range(
+                start + 4, merge_start, start + 4, merge_end, "Sumă locații nevândute", stat_lbl_fmt
+            )
+            ws.merge_range(
+                start + 4,
+                value_col,
+                start + 4,
+                stats_end,
+                f"€{sale_free:,.2f} ({pct_sale_free:.2%})",
+                stat_money_neg_fmt,
+            )
+            stats_ranges["Total"] = (start, start + 4, merge_start, stats_end)
+            if progress:
+                progress("Total", len(df_sheet))
+
+        write_total_sheet(df_total)
+
+        monthly = (
+            prorated.long_format(id=df_rez["id"], client=df_rez["client"])
+            .groupby(["month", "id"], sort=False)
+            .agg(
+                client=("client", "first"),
+                data_start=("first_day", "min"),
+                data_end=("last_day", "max"),
+                suma=("revenue", "sum"),
+            )
+            .reset_index()
+        )
+
+        for month in range(1, 13):
+            start_m = pd.Timestamp(year, month, 1)
+            grouped = monthly[monthly["month"] == month].drop(columns="month")
+            df_month = df_all.merge(grouped, on="id", how="left")
+            df_month["status"] = np.where(
+                df_month["client"].notna(), "Închiriat", "Disponibil"
+            )
+            df_month["pret_vanzare"] = pd.to_numeric(
+                df_month["pret_vanzare"], errors="coerce"
+            ).fillna(0)
+            grp_order = (
+                df_month.groupby("grup")["pret_vanzare"]
+                .max()
+                .sort_values(ascending=False)
+                .index
+            )
+            order_map = {g: i for i, g in enumerate(grp_order)}
+            df_month["__grp"] = df_month["grup"].map(order_map)
+            df_month = df_month.sort_values(
+                ["__grp", "pret_vanzare"], ascending=[True, False]
+            ).drop(columns="__grp")
+            name = start_m.strftime("%B")
+            write_sheet(name, df_month)
+
+    wb = load_workbook(path)
+    thin = Side(style="thin")
+    thick = Side(style="thick")
+    for sheet_name, (r1, r2, c1, c2) in stats_ranges.items():
+        ws = wb[sheet_name]
+        start_row, end_row = r1 + 1, r2 + 1
+        start_col, end_col = c1 + 1, c2 + 1
+        for r in range(start_row, end_row + 1):
+            for c in range(start_col, end_col + 1):
+                cell = ws.cell(row=r, column=c)
+                border = cell.border
+                left = thick if c == start_col else border.left
+                right = thick if c == end_col else border.right
+                top = thick if r == start_row else border.top
+                bottom = thick if r == end_row else border.bottom
+                cell.border = Border(left=left, right=right, top=top, bottom=bottom)
+    wb.save(path)
+    with open(path, "rb") as fh:
+        report_cache().put(report.key, fh.read())
+
+
+def export_sales(year: int, path: str, progress=None) -> list[str]:
+    """Build the sales report of *year* into *path*; return the files written."""
+    write_sales_report(prepare_sales_report(year), path, progress)
+    return [path]
@@ -0,0 +1,164 @@
+"""Monthly report of the rentals created by each seller.
+
+Every seller gets a sheet with the rentals created in the month in the
+counties listed in ``users.comune`` (all counties when none are set).
+"""
+
+import calendar
+import datetime
+
+import pandas as pd
+
+from reports.data import NoData, vendor_rentals, vendor_sellers
+from reports.prorate import contract_months
+
+
+def vendor_report_data(year: int, month: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Return ``(sellers, rentals)`` of the report; raises :class:`NoData`."""
+    report_date = datetime.date(year, month, 1)
+
+    users = vendor_sellers()
+    if users.empty:
+        raise NoData("Nu există vânzători.")
+
+    # Județele pot fi filtrate în SQL doar când toți vânzătorii au județe
+    # configurate; altfel cine nu are vede toate închirierile proprii
+    comune = users["comune"].fillna("").str.split(",")
+    counties = None
+    if comune.map(lambda c: any(c)).all():
+        counties = sorted({c for row in comune for c in row if c})
+    df = vendor_rentals(year, month, users["username"], counties)
+
+    if df.empty:
+        raise NoData("Nu există închirieri.")
+
+    # ``vendor_rentals`` filtrează deja perioada; filtrul rămâne ca
+    # garanție pentru datele citite fără SQL
+    month_end = datetime.date(year, month, calendar.monthrange(year, month)[1])
+    df = df[
+        (df["created_on"].dt.date >= report_date)
+        & (df["created_on"].dt.date <= month_end)
+        & (df["data_start"] >= df["created_on"])
+    ]
+
+    if df.empty:
+        raise NoData("Nu există închirieri active în perioada aleasă.")
+    return users, df
+
+
+def write_vendor_report(
+    users: pd.DataFrame, df: pd.DataFrame, path: str, progress=None
+) -> None:
+    """Write the data returned by :func:`vendor_report_data` to *path*.
+
+    *progress* is called as ``progress(sheet, rows)`` after each seller.
+    """
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        wb = writer.book
+        hdr_fmt = wb.add_format(
+            {
+                "bold": True,
+                "bg_color": "#4F81BD",
+                "font_color": "white",
+                "align": "center",
+            }
+        )
+        money_fmt = wb.add_format({"num_format": "€#,##0.00", "align": "center"})
+        center_fmt = wb.add_format({"align": "center"})
+
+        # Calculăm o singură dată, pentru toate închirierile, durata în luni
+        df = df.assign(
+            Luni=contract_months(df["data_start"], df["data_end"]),
+            **{
+                "Chirie/lună": df["suma"],
+                "Perioadă": df["data_start"].dt.strftime("%Y-%m-%d")
+                + " → "
+                + df["data_end"].dt.strftime("%Y-%m-%d"),
+                "__order": range(len(df)),
+            },
+        )
+        df["Valoare"] = df["suma"] * df["Luni"]
+
+        # Fiecare vânzător vede doar județele din ``comune``; fără județe
+        # configurate vede toate închirierile create de el
+        allowed = users.assign(
+            county=users["comune"].fillna("").str.split(",")
+        ).explode("county")
+        allowed = allowed[["username", "county"]].drop_duplicates()
+        all_counties = allowed.groupby("username")["county"].transform(
+            lambda c: (c == "").all()
+        )
+        by_county = df.merge(
+            allowed[~all_counties & (allowed["county"] != "")],
+            left_on=["created_by", "county"],
+            right_on=["username", "county"],
+        )
+        by_seller = df.merge(
+            allowed.loc[all_counties, ["username"]],
+            left_on="created_by",
+            right_on="username",
+        )
+        per_seller = dict(
+            tuple(
+                pd.concat([by_county, by_seller])
+                .sort_values("__order")
+                .groupby("username", sort=False)
+            )
+        )
+
+        for uname in users["username"]:
+            sub = per_seller.get(uname)
+            if sub is None or sub.empty:
+                continue
+
+            df_det = sub[
+                [
+                    "city",
+                    "county",
+                    "address",
+                    "client",
+                    "Perioadă",
+                    "Luni",
+                    "Chirie/lună",
+                    "Valoare",
+                ]
+            ].copy()
+            df_det.columns = [
+                "Oraș",
+                "Județ",
+                "Adresă",
+                "Client",
+                "Perioadă",
+                "Luni",
+                "Chirie/lună",
+                "Valoare",
+            ]
+            df_det.insert(0, "Nr.crt", range(1, len(df_det) + 1))
+
+            sheet = uname[:31]
+            df_det.to_excel(writer, sheet_name=sheet, index=False, startrow=0)
+
+            ws = writer.sheets[sheet]
+            for col_idx, col in enumerate(df_det.columns):
+                width = max(len(str(col)), df_det[col].astype(str).map(len).max()) + 2
+                fmt = money_fmt if col in {"Chirie/lună", "Valoare"} else center_fmt
+                ws.set_column(col_idx, col_idx, width, fmt)
+                ws.write(0, col_idx, col, hdr_fmt)
+
+            total_row = len(df_det) + 1
+            ws.write(total_row, df_det.columns.get_loc("Client"), "Total", hdr_fmt)
+            ws.write(
+                total_row,
+                df_det.columns.get_loc("Valoare"),
+                df_det["Valoare"].sum(),
+                money_fmt,
+            )
+            if progress:
+                progress(sheet, len(df_det))
+
+
+def export_vendor(year: int, month: int, path: str, progress=None) -> list[str]:
+    """Build the seller report of *month* of *year* into *path*."""
+    users, df = vendor_report_data(year, month)
+    write_vendor_report(users, df, path, progress)
+    return [path]
@@ -0,0 +1,249 @@
+"""Monthly occupancy and revenue per location (``loc_month_stats``).
+
+The table holds one row per ``(loc_id, year, month)`` with the days sold
+(rentals with a price), the days only reserved, the prorated revenue and the
+decoration and production costs recorded in ``decorari``.
+
+Triggers on ``rezervari`` and ``decorari`` queue the touched locations in
+``loc_month_dirty``; :func:`process_dirty` recomputes only those locations.
+:func:`refresh` with no ids rebuilds the whole table.  The queue carries a
+sequence number per location so a change committed by another client while
+a refresh runs is not lost.
+"""
+
+import calendar
+import datetime
+import logging
+
+STATS_TABLE = "loc_month_stats"
+DIRTY_TABLE = "loc_month_dirty"
+
+# Tables whose rows feed the aggregates, with the triggers watching them
+SOURCE_TABLES = ("rezervari", "decorari")
+
+COLUMNS = [
+    "loc_id",
+    "year",
+    "month",
+    "sold_days",
+    "reserved_days",
+    "revenue",
+    "decor_cost",
+    "prod_cost",
+]
+
+# Locations refreshed per query, below the placeholder limit of SQLite
+_CHUNK = 500
+
+
+def create_schema(cur, mysql: bool) -> bool:
+    """Create the tables and triggers; return ``False`` if triggers failed.
+
+    Without triggers (e.g. a MySQL user lacking the privilege while binary
+    logging is on) the caller has to rebuild the table after writes.
+    """
+    if mysql:
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+                loc_id INT NOT NULL,
+                year INT NOT NULL,
+                month INT NOT NULL,
+                sold_days INT NOT NULL DEFAULT 0,
+                reserved_days INT NOT NULL DEFAULT 0,
+                revenue DOUBLE NOT NULL DEFAULT 0,
+                decor_cost DOUBLE NOT NULL DEFAULT 0,
+                prod_cost DOUBLE NOT NULL DEFAULT 0,
+                PRIMARY KEY (loc_id, year, month),
+                KEY idx_loc_month_stats_period (year, month)
+            )
+            """
+        )
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {DIRTY_TABLE} (
+                loc_id INT PRIMARY KEY,
+                seq INT NOT NULL DEFAULT 0
+            )
+            """
+        )
+    else:
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+                loc_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                month INTEGER NOT NULL,
+                sold_days INTEGER NOT NULL DEFAULT 0,
+                reserved_days INTEGER NOT NULL DEFAULT 0,
+                revenue REAL NOT NULL DEFAULT 0,
+                decor_cost REAL NOT NULL DEFAULT 0,
+                prod_cost REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (loc_id, year, month)
+            )
+            """
+        )
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_loc_month_stats_period "
+            f"ON {STATS_TABLE}(year, month)"
+        )
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {DIRTY_TABLE} (
+                loc_id INTEGER PRIMARY KEY,
+                seq INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+
+    try:
+        _create_triggers(cur, mysql)
+    except Exception as exc:
+        logging.warning(
+            "Cannot create the %s triggers, the table is rebuilt after each "
+            "change instead: %s", STATS_TABLE, exc,
+        )
+        return False
+    return True
+
+
+def _create_triggers(cur, mysql: bool) -> None:
+    existing = set()
+    if mysql:
+        cur.execute(
+            "SELECT TRIGGER_NAME FROM information_schema.TRIGGERS "
+            "WHERE TRIGGER_SCHEMA = DATABASE()"
+        )
+        existing = {row[0] for row in cur.fetchall()}
+    events = {"ins": ("INSERT", ["NEW"]), "upd": ("UPDATE", ["OLD", "NEW"]), "del": ("DELETE", ["OLD"])}
+    for table in SOURCE_TABLES:
+        for suffix, (event, rows) in events.items():
+            name = f"{STATS_TABLE}_{table}_{suffix}"
+            values = ", ".join(f"({row}.loc_id, 1)" for row in rows)
+            if mysql:
+                if name in existing:
+                    continue
+                cur.execute(
+                    f"CREATE TRIGGER {name} AFTER {event} ON {table} FOR EACH ROW "
+                    f"INSERT INTO {DIRTY_TABLE} (loc_id, seq) VALUES {values} "
+                    f"ON DUPLICATE KEY UPDATE seq = seq + 1"
+                )
+            else:
+                cur.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table} "
+                    f"BEGIN INSERT INTO {DIRTY_TABLE} (loc_id, seq) VALUES {values} "
+                    f"ON CONFLICT(loc_id) DO UPDATE SET seq = seq + 1; END"
+                )
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def month_spans(start: datetime.date, end: datetime.date):
+    """Yield ``(year, month, days, month_days)`` for every month of [start, end]."""
+    first = start.replace(day=1)
+    while first <= end:
+        month_days = calendar.monthrange(first.year, first.month)[1]
+        last = first.replace(day=month_days)
+        days = (min(end, last) - max(start, first)).days + 1
+        yield first.year, first.month, days, month_days
+        first = last + datetime.timedelta(days=1)
+
+
+def aggregate(rentals, decorations) -> dict:
+    """Return ``{(loc_id, year, month): [sold, reserved, revenue, decor, prod]}``.
+
+    *rentals* yields ``(loc_id, data_start, data_end, suma)``; a rental with
+    a positive ``suma`` is sold, otherwise it only reserves the location.
+    Its revenue is ``suma`` prorated by the days of each month.
+    *decorations* yields ``(loc_id, data, decor_cost, prod_cost)``.
+    """
+    totals = {}
+    for loc_id, ds, de, suma in rentals:
+        start, end = _as_date(ds), _as_date(de)
+        if loc_id is None or start is None or end is None:
+            continue
+        price = float(suma or 0)
+        for year, month, days, month_days in month_spans(start, end):
+            row = totals.setdefault((loc_id, year, month), [0, 0, 0.0, 0.0, 0.0])
+            if price > 0:
+                row[0] += days
+                row[2] += price * days / month_days
+            else:
+                row[1] += days
+    for loc_id, day, decor, prod in decorations:
+        day = _as_date(day)
+        if loc_id is None or day is None:
+            continue
+        row = totals.setdefault((loc_id, day.year, day.month), [0, 0, 0.0, 0.0, 0.0])
+        row[3] += float(decor or 0)
+        row[4] += float(prod or 0)
+    return totals
+
+
+def refresh(cur, loc_ids=None) -> int:
+    """Recompute the rows of *loc_ids* (all locations if ``None``).
+
+    Returns the number of rows written; the caller commits.
+    """
+    if loc_ids is None:
+        cur.execute(f"DELETE FROM {STATS_TABLE}")
+        chunks = [("", [])]
+    else:
+        loc_ids = sorted({int(i) for i in loc_ids if i is not None})
+        chunks = []
+        for pos in range(0, len(loc_ids), _CHUNK):
+            ids = loc_ids[pos:pos + _CHUNK]
+            marks = ", ".join("?" * len(ids))
+            cur.execute(f"DELETE FROM {STATS_TABLE} WHERE loc_id IN ({marks})", ids)
+            chunks.append((f" WHERE loc_id IN ({marks})", ids))
+
+    written = 0
+    for where, ids in chunks:
+        rentals = cur.execute(
+            f"SELECT loc_id, data_start, data_end, suma FROM rezervari{where}", ids
+        ).fetchall()
+        decorations = cur.execute(
+            f"SELECT loc_id, data, decor_cost, prod_cost FROM decorari{where}", ids
+        ).fetchall()
+        rows = [
+            (*key, *values)
+            for key, values in aggregate(rentals, decorations).items()
+        ]
+        if rows:
+            cur.executemany(
+                f"INSERT INTO {STATS_TABLE} ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows,
+            )
+            written += len(rows)
+    return written
+
+
+def process_dirty(cur) -> int:
+    """Refresh the locations queued by the triggers; return how many."""
+    queued = cur.execute(f"SELECT loc_id, seq FROM {DIRTY_TABLE}").fetchall()
+    if not queued:
+        return 0
+    refresh(cur, [loc_id for loc_id, _ in queued])
+    # a location changed again meanwhile keeps its (higher) sequence number
+    cur.executemany(
+        f"DELETE FROM {DIRTY_TABLE} WHERE loc_id=? AND seq=?",
+        [tuple(row) for row in queued],
+    )
+    return len(queued)
+
+
+def is_empty(cur) -> bool:
+    """Return ``True`` when the aggregates were never built but could be."""
+    if cur.execute(f"SELECT 1 FROM {STATS_TABLE} LIMIT 1").fetchone():
+        return False
+    return cur.execute("SELECT 1 FROM rezervari LIMIT 1").fetchone() is not None
@@ -100,3 +100,15 @@ def test_ensure_index_mysql(monkeypatch):
     monkeypatch.setattr(db, "cursor", wrapper.cursor())
     db.ensure_index("foo", "idx", "data")
     assert any("CREATE INDEX idx ON foo(data(255))" in sql for sql in executed)
+
+
+def test_login_warm_up_and_verify(monkeypatch):
+    import UI.login_window as login_window
+
+    monkeypatch.setattr(db, "update_statusuri_din_rezervari", lambda *a, **k: None)
+    monkeypatch.setattr(db, "check_login", lambda u, p: {"username": u} if p == "ok" else None)
+    state = login_window.start_warm_up()
+    assert state["ready"].wait(5)
+    assert state["error"] is None
+    assert login_window._verify(state, "ana", "ok") == {"username": "ana"}
+    assert login_window._verify(state, "ana", "bad") is None
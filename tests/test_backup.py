@@ -0,0 +1,121 @@
+import datetime
+import threading
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+
+import jobs
+from reports.backup import plan_backups, render_all
+
+START = datetime.date(2023, 5, 1)
+END = datetime.date(2023, 5, 31)
+
+
+def _row(firm, client, campaign, ds="2023-05-11", de="2023-06-30"):
+    return (
+        client, "RO1", "AddrC", firm, "FCUI", "AddrF", campaign,
+        "City", "Addr", "CODE", "F1", "Billboard", "5x3", 15,
+        ds, de, 310.0, 10.0, 1, 0.0, 0.0,
+    )
+
+
+def test_plan_backups_groups_files():
+    sheets = plan_backups(
+        [_row("F", "C", "X"), _row("F", "C", "X", ds="2023-04-01"), _row(None, "C", None)],
+        START,
+        END,
+    )
+    assert [s.path.replace("\\", "/") for s in sheets] == [
+        "F/BKP F x C - X - May.xlsx",
+        "FaraFirma/BKP FaraFirma x C - C - May.xlsx",
+    ]
+    first = sheets[0]
+    assert first.period == (datetime.date(2023, 4, 1), datetime.date(2023, 6, 30))
+    assert [r[0] for r in first.rows] == [1, 2]
+    assert first.rows[0][8] == datetime.date(2023, 5, 11)
+    assert first.rows[0][13] == pytest.approx(210.0)
+
+
+def test_render_all_isolates_failures_and_writes_archive(tmp_path):
+    sheets = plan_backups(
+        [_row(f"F{i}", "C", "X") for i in range(5)], START, END
+    )
+    sheets[2].rows[0][2] = {"not", "a", "cell"}
+    seen = []
+
+    result = render_all(
+        sheets,
+        archive=tmp_path / "bkp.zip",
+        workers=2,
+        progress=lambda done, total, path: seen.append((done, total)),
+    )
+
+    assert len(result.written) == 4
+    assert [path for path, _ in result.failed] == [sheets[2].path]
+    assert sorted(seen) == [(i, 5) for i in range(1, 6)]
+    with zipfile.ZipFile(tmp_path / "bkp.zip") as zf:
+        names = zf.namelist()
+        assert len(names) == 4 and "F0/BKP F0 x C - X - May.xlsx" in names
+        zf.extract("F0/BKP F0 x C - X - May.xlsx", tmp_path)
+    ws = load_workbook(tmp_path / "F0" / "BKP F0 x C - X - May.xlsx").active
+    assert ws["A1"].value == "BKP F0 x C - X - May"
+    assert ws["B6"].value == "City"
+
+
+def test_render_all_to_directory(tmp_path):
+    sheets = plan_backups([_row("F", "C", "X")], START, END)
+    result = render_all(sheets, directory=tmp_path)
+    assert result.failed == []
+    assert (tmp_path / "F" / "BKP F x C - X - May.xlsx").exists()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cancelled_render_removes_its_output(monkeypatch, tmp_path, workers):
+    sheets = plan_backups([_row(f"F{i}", "C", "X") for i in range(6)], START, END)
+    cancel = threading.Event()
+    monkeypatch.setattr(jobs, "_cancel", cancel)
+    seen = []
+
+    def progress(done, total, path):
+        seen.append(path)
+        cancel.set()
+
+    with pytest.raises(jobs.Cancelled):
+        render_all(sheets, archive=tmp_path / "bkp.zip", workers=workers, progress=progress)
+    assert not (tmp_path / "bkp.zip").exists()
+
+    cancel.clear()
+    seen.clear()
+    with pytest.raises(jobs.Cancelled):
+        render_all(sheets, directory=tmp_path, workers=workers, progress=progress)
+    assert 1 <= len(seen) < len(sheets)
+    assert not list(tmp_path.rglob("*.xlsx"))
+
+
+def test_renderers_write_the_same_workbook(tmp_path):
+    from reports.backup import RENDERERS, render_sheet
+
+    rows = [_row("F", "C", "X"), _row("F", "C", "X", ds="2023-04-20")]
+    rows[1] = rows[1][:10] + (None,) + rows[1][11:]
+    sheet = plan_backups(rows, START, END)[0]
+
+    dumps = []
+    for engine in RENDERERS:
+        render_sheet(sheet, tmp_path / f"{engine}.xlsx", engine)
+        ws = load_workbook(tmp_path / f"{engine}.xlsx").active
+        cells = [
+            (c.coordinate, c.value, c.number_format, bool(c.font.b),
+             c.alignment.horizontal, bool(c.alignment.wrap_text),
+             c.border.top.style, c.border.right.style)
+            for row in ws.iter_rows() for c in row
+            if c.value is not None or c.has_style
+        ]
+        widths = {}
+        for dim in ws.column_dimensions.values():
+            for col in range(dim.min, dim.max + 1):
+                widths[col] = dim.width
+        heights = {r: d.height for r, d in ws.row_dimensions.items() if d.height}
+        dumps.append((cells, widths, heights, sorted(map(str, ws.merged_cells.ranges))))
+
+    assert dumps[0] == dumps[1]
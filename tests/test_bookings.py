@@ -0,0 +1,128 @@
+import random
+import sqlite3
+import datetime
+
+import bookings
+import db
+
+
+def _rows():
+    rng = random.Random(7)
+    rows = []
+    day0 = datetime.date(2030, 1, 1)
+    for rid in range(1, 301):
+        start = day0 + datetime.timedelta(days=rng.randrange(200))
+        end = start + datetime.timedelta(days=rng.randrange(40))
+        suma = rng.choice([None, 0.0, 250.0])
+        rows.append(
+            (rid, rng.randrange(1, 8), f"C{rid}", start.isoformat(), end.isoformat(),
+             suma, "ana", None)
+        )
+    return rows
+
+
+def test_queries_match_a_scan():
+    rows = _rows()
+    index = bookings.BookingIndex(rows)
+    assert len(index) == len(rows)
+    all_b = [bookings.Booking(*r) for r in rows]
+
+    for loc_id in range(1, 9):
+        mine = sorted(
+            (b for b in all_b if b.loc_id == loc_id), key=lambda b: (b.data_start, b.id)
+        )
+        assert index.bookings(loc_id) == mine
+        for offset in range(0, 260, 9):
+            day = (datetime.date(2030, 1, 1) + datetime.timedelta(days=offset)).isoformat()
+            for rented in (None, True, False):
+                pick = [b for b in mine if bookings._matches(b, rented)]
+                covering = [b for b in pick if b.data_start <= day <= b.data_end]
+                assert index.covering(loc_id, day, rented) == max(
+                    covering, key=lambda b: (b.data_start, b.id), default=None
+                )
+                later = [b for b in pick if b.data_start > day]
+                assert index.next_after(loc_id, day, rented) == (later[0] if later else None)
+                ended = [b for b in pick if b.data_end < day]
+                assert index.previous_before(loc_id, day, rented) == max(
+                    ended, key=lambda b: (b.data_start, b.id), default=None
+                )
+                end = (datetime.date.fromisoformat(day) + datetime.timedelta(days=12)).isoformat()
+                assert index.overlapping(loc_id, day, end, rented) == [
+                    b for b in pick if b.data_end >= day and b.data_start <= end
+                ]
+
+
+def test_find_returns_the_newest_exact_period():
+    index = bookings.BookingIndex(
+        [
+            (1, 5, "A", "2030-01-01", "2030-01-10", 100.0, None, None),
+            (2, 5, "B", "2030-01-01", "2030-01-10", None, None, None),
+            (3, 5, "C", "2030-01-01", "2030-01-12", 100.0, None, None),
+        ]
+    )
+    assert index.find(5, "2030-01-01", "2030-01-10").id == 2
+    assert index.find(5, datetime.date(2030, 1, 1), "2030-01-10", rented=True).id == 1
+    assert index.find(5, "2030-01-02", "2030-01-10") is None
+    assert index.find(6, "2030-01-01", "2030-01-10") is None
+
+
+def test_scoped_commit_patches_the_index(monkeypatch):
+    test_conn = db._ConnWrapper(sqlite3.connect(":memory:"), False)
+    monkeypatch.setattr(db, "conn", test_conn)
+    monkeypatch.setattr(db, "cursor", test_conn.cursor())
+    monkeypatch.setattr(db, "_location_cache", None)
+    monkeypatch.setattr(bookings, "_index", None)
+    db.init_db()
+    cur = test_conn.cursor()
+    cur.execute("INSERT INTO locatii (city, county, address) VALUES ('P', 'Prahova', 'A')")
+    test_conn.commit()
+
+    index = bookings.get_index()
+    assert index.bookings(1) == []
+    cur.execute(
+        "INSERT INTO rezervari (loc_id, client, data_start, data_end, suma) "
+        "VALUES (1, 'X', '2030-01-01', '2030-01-05', 10.0)"
+    )
+    test_conn.commit(loc_ids=[1])
+
+    assert bookings._index is index
+    assert index.version == db.data_version(("rezervari",))
+    assert [b.client for b in index.bookings(1)] == ["X"]
+    assert bookings.get_index() is index
+
+
+def _versioned(version, rows):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE rezervari (id INTEGER PRIMARY KEY, loc_id INTEGER, client TEXT,
+                                data_start TEXT, data_end TEXT, suma REAL,
+                                created_by TEXT, campaign TEXT);
+        CREATE TABLE data_versions (tbl TEXT PRIMARY KEY, version INTEGER, updated_on REAL);
+        """
+    )
+    conn.execute("INSERT INTO data_versions VALUES ('rezervari', ?, 0)", (version,))
+    conn.executemany(
+        "INSERT INTO rezervari (loc_id, client, data_start, data_end) VALUES (?, ?, ?, ?)", rows
+    )
+    return conn
+
+
+def test_lagging_replica_is_not_cached_as_current(monkeypatch):
+    old = [(1, "A", "2030-01-01", "2030-01-05")]
+    new = old + [(1, "B", "2030-02-01", "2030-02-05")]
+    primary, replica = _versioned(2, new), _versioned(1, old)
+    monkeypatch.setattr(db, "conn", db._ConnWrapper(primary, False))
+    monkeypatch.setattr(db, "read_connection", lambda fallback=None, tables=None: replica)
+    monkeypatch.setattr(bookings, "_index", None)
+
+    index = bookings.get_index()
+    assert [b.client for b in index.bookings(1)] == ["A"]
+    assert index.version != db.data_version(("rezervari",))
+
+    replica.execute(
+        "INSERT INTO rezervari (loc_id, client, data_start, data_end) "
+        "VALUES (1, 'B', '2030-02-01', '2030-02-05')"
+    )
+    replica.execute("UPDATE data_versions SET version=2")
+    assert [b.client for b in bookings.get_index().bookings(1)] == ["A", "B"]
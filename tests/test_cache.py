@@ -0,0 +1,38 @@
+import os
+
+from reports.cache import ReportCache, cache_key
+
+
+def test_cache_key_depends_on_params_and_version():
+    key = cache_key("sales", {"year": 2024}, "v1")
+    assert key == cache_key("sales", {"year": 2024}, "v1")
+    assert key != cache_key("sales", {"year": 2025}, "v1")
+    assert key != cache_key("sales", {"year": 2024}, "v2")
+    assert cache_key("sales", {"year": 2024}, None) is None
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = ReportCache(str(tmp_path), max_items=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")
+    assert list(cache._memory) == ["a", "c"]
+    # the evicted entry is still served from disk
+    assert cache.get("b") == b"2"
+    assert cache.get(None) is None
+
+
+def test_disk_tier_is_capped_and_survives_restarts(tmp_path):
+    cache = ReportCache(str(tmp_path), disk_bytes=10)
+    cache.put("old", b"12345")
+    os.utime(tmp_path / "old.xlsx", (1, 1))
+    cache.put("new", b"67890")
+    cache.put("third", b"abc")
+    assert sorted(os.listdir(tmp_path)) == ["new.xlsx", "third.xlsx"]
+
+    fresh = ReportCache(str(tmp_path))
+    assert fresh.get("new") == b"67890"
+    assert fresh.get("old") is None
+    fresh.clear()
+    assert os.listdir(tmp_path) == []
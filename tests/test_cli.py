@@ -0,0 +1,75 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pandas as pd
+
+import db
+from reports import cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cli_runs_without_tk(tmp_path):
+    code = (
+        "import sys; from reports import cli; "
+        f"rc = cli.main(['decor', '--year', '1900', '--out', {str(tmp_path)!r}]); "
+        "assert 'tkinter' not in sys.modules; sys.exit(rc)"
+    )
+    # the child works on a copy; the tracked database stays untouched
+    db_copy = tmp_path / "locatii.db"
+    shutil.copy(os.path.join(ROOT, "locatii.db"), db_copy)
+    env = {k: v for k, v in os.environ.items() if not k.startswith("MYSQL_")}
+    env["LOCATII_DB_PATH"] = str(db_copy)
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    assert proc.returncode == cli.EXIT_NO_DATA, proc.stderr
+    assert "Nu există decorări" in proc.stderr
+
+
+def test_cli_writes_available_locations(monkeypatch, tmp_path, capsys):
+    df = pd.DataFrame({
+        "id": [1, 2], "city": ["Iasi", "Cluj"], "county": ["IS", "CJ"],
+        "address": ["A", "B"], "type": ["Billboard"] * 2, "gps": [None, None],
+        "photo_link": [None, None], "size": ["4x3"] * 2, "sqm": [12.0, 12.0],
+        "illumination": ["Da", "Nu"], "ratecard": [100, 200],
+        "decoration_cost": [10, 10], "data_start": pd.to_datetime([None, None]),
+        "data_end": pd.to_datetime([None, None]), "grup": ["G1", "G2"],
+        "status": ["Disponibil"] * 2,
+    })
+    monkeypatch.setattr(db, "read_sql_query", lambda sql, params=None, **k: df.copy())
+
+    out = tmp_path / "rapoarte"
+    assert cli.main(["available", "--out", str(out)]) == 0
+    path = out / "Locatii disponibile.xlsx"
+    assert capsys.readouterr().out.strip() == str(path)
+    assert list(pd.read_excel(path, sheet_name=None)) == ["G1", "G2"]
+
+
+def test_cli_backups_of_all_clients(monkeypatch, tmp_path):
+    row = (
+        "Cli", "RO1", "AddrC", "Firma", "FCUI", "AddrF", "Camp",
+        "City", "Addr", "CODE", "F1", "Billboard", "5x3", 15,
+        "2023-05-01", "2023-05-31", 100.0, 10.0, 1, None, None, 1, 1,
+    )
+
+    class DummyCursor:
+        def execute(self, sql, params=()):
+            return self
+
+        def fetchall(self):
+            return [row]
+
+        def fetchone(self):
+            return (0.0, 0.0)
+
+    class DummyConn:
+        def cursor(self):
+            return DummyCursor()
+
+    monkeypatch.setattr(db, "conn", DummyConn())
+    args = ["backups", "--year", "2023", "--month", "5", "--archive"]
+    assert cli.main(args + ["--out", str(tmp_path)]) == 0
+    assert (tmp_path / "BKP May 2023.zip").exists()
@@ -0,0 +1,69 @@
+import sqlite3
+
+import clients
+
+
+def _database():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE clienti (id INTEGER PRIMARY KEY, nume TEXT UNIQUE NOT NULL,
+                              tip TEXT DEFAULT 'direct', contact TEXT, email TEXT,
+                              phone TEXT, cui TEXT, adresa TEXT, observatii TEXT,
+                              primary_contact_id INTEGER, search_key TEXT);
+        CREATE TABLE client_contacts (id INTEGER PRIMARY KEY, client_id INTEGER,
+                                      nume TEXT, rol TEXT, email TEXT, phone TEXT);
+        INSERT INTO clienti (id, nume, contact, email) VALUES
+            (1, 'Ștefănescu SRL', 'Vechi', 'vechi@x.ro'),
+            (2, 'Alfa Media', NULL, NULL),
+            (3, 'Beta 100%', 'Ion', 'ion@beta.ro');
+        INSERT INTO client_contacts (id, client_id, nume, email, phone) VALUES
+            (10, 1, 'Maria Pop', NULL, '0722'),
+            (11, 1, 'Dan', 'dan@x.ro', NULL),
+            (12, 2, 'Ana', 'ana@alfa.ro', '0733');
+        """
+    )
+    return conn
+
+
+def test_normalize():
+    assert clients.normalize("  Ștefănescu   SRL ") == "stefanescu srl"
+    assert clients.normalize(None) == ""
+
+
+def test_refresh_updates_only_changed_rows():
+    conn = _database()
+    cur = conn.cursor()
+    assert clients.refresh(cur) == 3
+    assert cur.execute(
+        "SELECT id, primary_contact_id, search_key FROM clienti ORDER BY id"
+    ).fetchall() == [
+        (1, 10, "stefanescu srl\nmaria pop\nvechi@x.ro"),
+        (2, 12, "alfa media\nana\nana@alfa.ro"),
+        (3, None, "beta 100%\nion\nion@beta.ro"),
+    ]
+    assert clients.refresh(cur) == 0
+
+    cur.execute("DELETE FROM client_contacts WHERE id=10")
+    assert clients.refresh(cur) == 1
+    assert cur.execute("SELECT primary_contact_id FROM clienti WHERE id=1").fetchone() == (11,)
+
+
+def test_search_pages_and_matches_contacts():
+    conn = _database()
+    cur = conn.cursor()
+    clients.refresh(cur)
+
+    rows, total = clients.search(cur)
+    assert total == 3
+    assert [r[1] for r in rows] == ["Alfa Media", "Beta 100%", "Ștefănescu SRL"]
+    assert rows[2][3:6] == ("Maria Pop", "vechi@x.ro", "0722")
+
+    assert [r[0] for r in clients.search(cur, "STEFANESCU")[0]] == [1]
+    assert [r[0] for r in clients.search(cur, "ana@")[0]] == [2]
+    assert [r[0] for r in clients.search(cur, "100%")[0]] == [3]
+    assert clients.search(cur, "_") == ([], 0)
+
+    rows, total = clients.search(cur, "", page=1, page_size=2)
+    assert total == 3
+    assert [r[0] for r in rows] == [1]
@@ -1,4 +1,5 @@
 import os
+import datetime
 import sqlite3
 import importlib
 
@@ -191,3 +192,382 @@ def test_update_and_delete_contact():
     db.conn = old_conn
     db.cursor = old_cursor
 
+
+def test_read_connection_respects_own_writes(monkeypatch):
+    class Raw:
+        def cursor(self, **kwargs):
+            return self
+
+        def execute(self, sql, params=()):
+            self.sql = sql
+
+        def fetchall(self):
+            return [(1,)]
+
+    replica = Raw()
+    monkeypatch.setattr(db, "conn", db._ConnWrapper(Raw(), True))
+    monkeypatch.setattr(db, "_replica_params", lambda: {"host": "replica"})
+    monkeypatch.setattr(db, "_replica_connection", lambda: replica)
+    monkeypatch.setattr(db, "_replica_lagging", lambda versions: False)
+    monkeypatch.setattr(db, "_replica_state", dict(db._replica_state, down_until=0.0))
+    monkeypatch.setattr(db, "_written_versions", {"rezervari": 5})
+
+    monkeypatch.setattr(db, "_fetch_versions", lambda raw: {"rezervari": (4, 0.0)})
+    assert db.read_connection(tables=("rezervari",)) is db.conn
+    assert db.read_connection(tables=("locatii",)) is not db.conn
+
+    monkeypatch.setattr(db, "_fetch_versions", lambda raw: {"rezervari": (5, 0.0)})
+    cur = db.read_connection(tables=("rezervari",)).cursor()
+    cur.execute("SELECT id FROM rezervari WHERE id=?", (1,))
+    assert replica.sql == "SELECT id FROM rezervari WHERE id=%s"
+    assert cur.fetchall() == [(1,)]
+
+
+def test_replica_versions_are_reused_between_reads(monkeypatch):
+    fetched = []
+
+    def fetch(raw):
+        fetched.append(raw)
+        return {"rezervari": (5, 0.0)}
+
+    monkeypatch.setattr(db, "conn", db._ConnWrapper(sqlite3.connect(":memory:"), True))
+    monkeypatch.setattr(db, "_replica_params", lambda: {"host": "replica"})
+    monkeypatch.setattr(db, "_replica_connection", lambda: "replica")
+    monkeypatch.setattr(db, "_replica_lagging", lambda versions: False)
+    monkeypatch.setattr(
+        db, "_replica_state", dict(db._replica_state, down_until=0.0, versions=None)
+    )
+    monkeypatch.setattr(db, "_written_versions", {"rezervari": 5})
+    monkeypatch.setattr(db, "_fetch_versions", fetch)
+
+    assert db._replica_for(("rezervari",)) == "replica"
+    assert db._replica_for(("rezervari",)) == "replica"
+    assert len(fetched) == 1
+    # a newer write of this process is checked against fresh versions
+    db._written_versions["rezervari"] = 6
+    assert db._replica_for(("rezervari",)) is None
+    assert len(fetched) == 2
+
+
+def test_chunked_reads_use_the_replica_and_retry_on_the_primary(monkeypatch):
+    import pandas as pd
+
+    monkeypatch.setattr(db, "conn", db._ConnWrapper(sqlite3.connect(":memory:"), True))
+    monkeypatch.setattr(db, "_replica_for", lambda tables: "replica")
+    monkeypatch.setattr(db, "_replica_failed", lambda exc: None)
+    state = {"broken": False}
+
+    def read(pd_, sql, params, kwargs, replica=None):
+        assert kwargs["chunksize"] == 10
+        if replica is None:
+            return iter([pd.DataFrame({"src": ["primary"]})])
+
+        def chunks():
+            yield pd.DataFrame({"src": ["replica"]})
+            if state["broken"]:
+                raise ConnectionError("replica lost")
+            yield pd.DataFrame({"src": ["replica"]})
+
+        return chunks()
+
+    monkeypatch.setattr(db, "_read_mysql", read)
+    frames = list(db.read_sql_query("SELECT 1 FROM rezervari", chunksize=10))
+    assert [f["src"][0] for f in frames] == ["replica", "replica"]
+
+    state["broken"] = True
+    frames = list(db.read_sql_query("SELECT 1 FROM rezervari", chunksize=10))
+    assert [f["src"][0] for f in frames] == ["primary"]
+
+
+def test_read_cursor_falls_back_to_primary(monkeypatch):
+    class Broken:
+        def cursor(self, **kwargs):
+            raise RuntimeError("replica down")
+
+    state = dict(db._replica_state, conn=Broken())
+    monkeypatch.setattr(db, "_replica_state", state)
+    primary = sqlite3.connect(":memory:")
+    cur = db._ReadConnection(Broken(), primary).cursor()
+    assert cur.execute("SELECT 1").fetchone() == (1,)
+    assert state["conn"] is None
+    assert state["down_until"] > 0
+
+
+def test_mark_dirty_tracks_changed_tables(monkeypatch):
+    class Cur:
+        rowcount = 0
+
+    monkeypatch.setattr(db, "_dirty_tables", set())
+    db._mark_dirty("UPDATE locatii SET status=%s", Cur())
+    Cur.rowcount = 2
+    db._mark_dirty("SELECT * FROM clienti", Cur())
+    db._mark_dirty("INSERT INTO rezervari (loc_id) VALUES (%s)", Cur())
+    assert db._dirty_tables == {"rezervari"}
+
+
+def test_data_version_changes_with_written_tables(monkeypatch):
+    raw = sqlite3.connect(":memory:")
+    raw.execute(
+        "CREATE TABLE data_versions (tbl TEXT PRIMARY KEY, version INTEGER, updated_on REAL)"
+    )
+    raw.execute("CREATE TABLE rezervari (id INTEGER PRIMARY KEY)")
+    monkeypatch.setattr(db, "conn", db._ConnWrapper(raw, False))
+    monkeypatch.setattr(db, "_versions_ready", True)
+    monkeypatch.setattr(db, "_dirty_tables", set())
+
+    before = db.data_version(["rezervari", "locatii"])
+    locatii = db.data_version(["locatii"])
+    db.conn.cursor().execute("INSERT INTO rezervari (id) VALUES (1)")
+    db._bump_versions(raw, False)
+
+    assert db.data_version(["rezervari", "locatii"]) != before
+    assert db.data_version(["locatii"]) == locatii
+    assert raw.execute("SELECT version FROM data_versions").fetchall() == [(1,)]
+
+
+def test_location_cache_rows_are_compact(monkeypatch):
+    raw = sqlite3.connect(":memory:")
+    raw.executescript(
+        """
+        CREATE TABLE locatii (id INTEGER PRIMARY KEY, city TEXT, county TEXT,
+                              observatii TEXT, photo_link TEXT);
+        INSERT INTO locatii VALUES (1, 'Ploiesti', 'Prahova', 'note', 'http://p/1');
+        INSERT INTO locatii VALUES (2, 'Ploiesti', 'Prahova', NULL, NULL);
+        """
+    )
+    monkeypatch.setattr(db, "conn", db._ConnWrapper(raw, False))
+    monkeypatch.setattr(db, "_location_cache", None)
+    monkeypatch.setattr(db, "_location_by_id", {})
+
+    first, second = db.get_location_cache()
+    assert isinstance(first, db.LocationRow)
+    assert db.get_location_cache() is db.get_location_cache()
+    assert first._values == (1, "Ploiesti", "Prahova")
+    assert first["city"] is second["city"]
+    assert "observatii" in first and first._lazy is None
+
+    assert first.get("photo_link") == "http://p/1"
+    assert first._lazy == ("note", "http://p/1")
+    assert first.get("missing", "-") == "-"
+    # a lookup reads nothing until a lazy column is asked for
+    second = db.get_location_by_id(2)
+    assert second is db.get_location_by_id(2)
+    assert second.get("city") == "Ploiesti" and second._lazy is None
+    assert db.get_location_by_id(2) == {
+        "id": 2,
+        "city": "Ploiesti",
+        "county": "Prahova",
+        "observatii": None,
+        "photo_link": None,
+    }
+    assert db.get_location_by_id(3) is None
+
+
+def test_commit_refreshes_client_search(monkeypatch):
+    test_conn = db._ConnWrapper(sqlite3.connect(":memory:"), False)
+    monkeypatch.setattr(db, "conn", test_conn)
+    monkeypatch.setattr(db, "cursor", test_conn.cursor())
+    monkeypatch.setattr(db, "update_statusuri_din_rezervari", lambda ttl=300, loc_ids=None: None)
+    monkeypatch.setattr(db, "refresh_location_cache", lambda loc_ids=None: None)
+    db.init_clienti_table()
+    db.init_client_contacts_table()
+    cur = db.conn.cursor()
+    cur.execute("INSERT INTO clienti (nume) VALUES ('Gamma Ăpă')")
+    cid = cur.lastrowid
+    db.add_client_contact(cid, "Ion", "", "ion@gamma.ro", "")
+
+    row = cur.execute(
+        "SELECT primary_contact_id, search_key FROM clienti WHERE id=?", (cid,)
+    ).fetchone()
+    assert row[0] == db.get_client_contacts(cid)[0]["id"]
+    assert row[1] == "gamma apa\nion\nion@gamma.ro"
+
+
+def test_commit_recomputes_only_the_written_clients(monkeypatch):
+    test_conn = db._ConnWrapper(sqlite3.connect(":memory:"), False)
+    monkeypatch.setattr(db, "conn", test_conn)
+    monkeypatch.setattr(db, "cursor", test_conn.cursor())
+    monkeypatch.setattr(db, "update_statusuri_din_rezervari", lambda ttl=300, loc_ids=None: None)
+    monkeypatch.setattr(db, "refresh_location_cache", lambda loc_ids=None: None)
+    monkeypatch.setattr(db, "_client_writes", set())
+    db.init_clienti_table()
+    db.init_client_contacts_table()
+    cur = db.conn.cursor()
+    cur.execute("INSERT INTO clienti (nume) VALUES ('Alfa')")
+    alfa = cur.lastrowid
+    cur.execute("INSERT INTO clienti (nume) VALUES ('Beta')")
+    db.conn.commit()
+    db.add_client_contact(alfa, "Ion", "", "ion@alfa.ro", "")
+    db.add_client_contact(alfa, "Dan", "", "dan@alfa.ro", "")
+    ion, dan = [c["id"] for c in db.get_client_contacts(alfa)]
+
+    def keys():
+        return dict(cur.execute("SELECT nume, search_key FROM clienti").fetchall())
+
+    # a stale row no commit wrote stays as it is
+    test_conn._conn.execute("UPDATE clienti SET search_key='vechi' WHERE nume='Beta'")
+    db.update_client_contact(ion, "Ioan", "", "ioan@alfa.ro", "")
+    assert keys() == {"Alfa": "alfa\nioan\nioan@alfa.ro", "Beta": "vechi"}
+    db.delete_client_contact(ion)
+    assert keys()["Alfa"] == "alfa\ndan\ndan@alfa.ro"
+    assert cur.execute(
+        "SELECT primary_contact_id FROM clienti WHERE id=?", (alfa,)
+    ).fetchone() == (dan,)
+    assert keys()["Beta"] == "vechi"
+
+    # a write that names no row falls back to the full pass
+    cur.execute("UPDATE clienti SET observatii='x' WHERE nume='Beta'")
+    db.conn.commit()
+    assert keys()["Beta"] == "beta\n\n"
+
+
+def _rent_db(monkeypatch):
+    test_conn = db._ConnWrapper(sqlite3.connect(":memory:"), False)
+    monkeypatch.setattr(db, "conn", test_conn)
+    monkeypatch.setattr(db, "cursor", test_conn.cursor())
+    monkeypatch.setattr(db, "_location_cache", None)
+    monkeypatch.setattr(db.directory, "_directory", None)
+    db.init_db()
+    cur = test_conn.cursor()
+    cur.executemany(
+        "INSERT INTO locatii (city, county, address, grup, is_mobile) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("Ploiesti", "Prahova", "Str. A", "Fix", 0),
+            ("Ploiesti", "Prahova", "Str. B", "Fix", 0),
+            ("Ploiesti", "Prahova", "Prisma", "Mobil", 1),
+        ],
+    )
+    test_conn.commit()
+    return cur
+
+
+def test_bulk_rent_writes_everything_at_once(monkeypatch):
+    cur = _rent_db(monkeypatch)
+    today = datetime.date.today()
+    end = today + datetime.timedelta(days=10)
+    rented = db.bulk_rent(
+        [1, 3], "Acme", today, end, 500.0, decor_cost=50.0,
+        address="Piata Unirii", gps="44.9, 26.0", user="ana",
+    )
+
+    unit = rented[1]
+    assert rented[0] == 1 and unit not in (1, 2, 3)
+    assert cur.execute(
+        "SELECT loc_id, suma, created_by FROM rezervari ORDER BY loc_id"
+    ).fetchall() == [(1, 500.0, "ana"), (3, 0.0, "ana"), (unit, 500.0, "ana")]
+    assert cur.execute(
+        "SELECT d.loc_id, r.loc_id FROM decorari d JOIN rezervari r ON r.id = d.rez_id"
+    ).fetchall() == [(1, 1), (unit, unit)]
+    assert db.get_location_by_id(unit)["parent_id"] == 3
+    assert db.get_location_by_id(unit)["address"] == "Piata Unirii"
+    assert db.get_location_by_id(1)["status"] == "Închiriat"
+    assert db.get_location_by_id(2)["status"] == "Disponibil"
+
+
+def test_bulk_rent_rejects_the_whole_set(monkeypatch):
+    cur = _rent_db(monkeypatch)
+    today = datetime.date.today()
+    db.bulk_rent([2], "Acme", today, today, 100.0)
+    before = cur.execute("SELECT COUNT(*) FROM rezervari").fetchone()[0]
+
+    for ids, kwargs, title in (
+        ([1, 2], {}, "Perioadă ocupată"),
+        ([1, 3], {}, "Lipsește adresa"),
+    ):
+        try:
+            db.bulk_rent(ids, "Beta", today, today, 100.0, **kwargs)
+        except db.RentalError as exc:
+            assert exc.title == title
+        else:
+            assert False, "Expected RentalError"
+    assert cur.execute("SELECT COUNT(*) FROM rezervari").fetchone()[0] == before
+    assert cur.execute("SELECT COUNT(*) FROM clienti WHERE nume='Beta'").fetchone()[0] == 0
+
+
+def test_failed_bulk_rent_leaves_no_pending_writes(monkeypatch):
+    cur = _rent_db(monkeypatch)
+    cur.execute("INSERT INTO clienti (nume, tip) VALUES ('Agentie', 'agency')")
+    db.conn.commit()
+    monkeypatch.setattr(db, "_client_writes", set())
+    before = db.data_version(("firme", "clienti"))
+    today = datetime.date.today()
+    try:
+        db.bulk_rent([1], "Agentie", today, today, 10.0, firma="Firma Noua")
+    except db.RentalError as exc:
+        assert exc.title == "Lipsește campania"
+    else:
+        assert False, "Expected RentalError"
+
+    assert db._dirty_tables == set() and db._client_writes == set()
+    db.conn.commit()
+    assert db.data_version(("firme", "clienti")) == before
+
+
+def test_bulk_rent_locks_the_mobile_location_before_counting(monkeypatch):
+    cur = _rent_db(monkeypatch)
+    today = datetime.date.today()
+    for i in range(db.MAX_MOBILE_UNITS - 1):
+        db.bulk_rent([3], f"C{i}", today, today, 10.0, address=f"A{i}", gps="1, 2")
+    statements = []
+    db.conn._conn.set_trace_callback(statements.append)
+    unit = db.bulk_rent(
+        [3], "Ultim", today, today, 10.0, decor_cost=5.0, address="Z", gps="1, 2"
+    )[0]
+    db.conn._conn.set_trace_callback(None)
+
+    base = next(i for i, sql in enumerate(statements) if sql.startswith("SELECT id, city"))
+    count = next(i for i, sql in enumerate(statements) if "COUNT(*)" in sql)
+    assert base < count
+    assert not any("MAX(id)" in sql for sql in statements)
+    assert cur.execute(
+        "SELECT r.loc_id FROM decorari d JOIN rezervari r ON r.id = d.rez_id"
+    ).fetchall() == [(unit,)]
+    try:
+        db.bulk_rent([3], "Prea mult", today, today, 10.0, address="Y", gps="1, 2")
+    except db.RentalError as exc:
+        assert exc.title == "Limită depășită" and exc.loc_ids == [3]
+    else:
+        assert False, "Expected RentalError"
+
+
+def test_find_conflicts_checks_the_set_in_one_pass(monkeypatch):
+    cur = _rent_db(monkeypatch)
+    cur.executemany(
+        "INSERT INTO rezervari (loc_id, client, data_start, data_end, suma) VALUES (?, ?, ?, ?, ?)",
+        [
+            (1, "A", "2030-01-01", "2030-01-10", None),
+            (2, "B", "2030-01-05", "2030-01-20", 300.0),
+            (3, "C", "2030-01-01", "2030-01-31", 0.0),
+            (2, "D", "2030-02-01", "2030-02-10", 300.0),
+        ],
+    )
+    db.conn.commit()
+
+    found = db.find_conflicts([1, 2, 3], datetime.date(2030, 1, 10), "2030-01-15")
+    assert [(r["loc_id"], r["client"]) for r in found] == [(1, "A"), (2, "B")]
+    rid = found[1]["id"]
+    assert db.find_conflicts([2], "2030-01-01", "2030-01-31", exclude=[rid]) == []
+
+    db.find_conflicts([1], "2030-03-01", "2030-03-02", for_update=True)
+    assert db.conn.in_transaction
+    db.conn.rollback()
+
+
+def test_init_db_on_a_fresh_database_does_not_refresh_missing_tables(
+    monkeypatch, caplog
+):
+    import bookings
+
+    fresh = db._ConnWrapper(sqlite3.connect(":memory:"), False)
+    monkeypatch.setattr(db, "conn", fresh)
+    monkeypatch.setattr(db, "cursor", fresh.cursor())
+    monkeypatch.setattr(db, "_location_cache", None)
+    monkeypatch.setattr(db, "_location_by_id", {})
+    monkeypatch.setattr(bookings, "_index", None)
+    monkeypatch.setattr(db, "_stats_ready", False)
+
+    with caplog.at_level("WARNING"):
+        db.init_db()
+
+    assert not [r for r in caplog.records if "Failed" in r.getMessage()]
+    assert db._schema_ready
@@ -1,14 +1,21 @@
 import pandas as pd
+import pytest
 import UI.dialogs as dialogs
 import db
+from reports import cache
 
 
 def test_export_sales_report_year_no_reservations(monkeypatch, tmp_path):
     # Avoid database and UI interactions
     monkeypatch.setattr(db, "update_statusuri_din_rezervari", lambda: None)
     monkeypatch.setattr(dialogs, "choose_report_year", lambda parent=None: 2030)
+    monkeypatch.setattr(cache, "_default", cache.ReportCache(str(tmp_path / "cache")))
 
     def dummy_read_sql_query(sql, params=None, **kwargs):
+        if "FROM loc_month_stats" in sql:
+            return pd.DataFrame(
+                columns=["loc_id", "base_id", "month", "sold_days", "revenue"]
+            )
         if "FROM locatii" in sql:
             return pd.DataFrame({
                 "id": [1],
@@ -58,6 +65,17 @@ def test_export_sales_report_year_no_reservations(monkeypatch, tmp_path):
     assert (tmp_path / "out.xlsx").exists()
     assert saved.get("info")
 
+    # unchanged data: the second export is copied from the cache
+    first = (tmp_path / "out.xlsx").read_bytes()
+    (tmp_path / "out.xlsx").unlink()
+
+    def no_query(*args, **kwargs):
+        raise AssertionError("report rebuilt")
+
+    monkeypatch.setattr(db, "read_sql_query", no_query)
+    dialogs.export_sales_report()
+    assert (tmp_path / "out.xlsx").read_bytes() == first
+
 
 def test_export_client_backup(monkeypatch, tmp_path):
     row = (
@@ -105,7 +123,7 @@ def test_export_client_backup(monkeypatch, tmp_path):
             return DummyCursor()
 
     dummy = DummyConn()
-    monkeypatch.setattr(dialogs, "conn", dummy)
+    monkeypatch.setattr(db, "conn", dummy)
 
     monkeypatch.setattr(dialogs.filedialog, "askdirectory", lambda **k: str(tmp_path))
     saved = {}
@@ -191,7 +209,7 @@ def test_export_all_backups(monkeypatch, tmp_path):
             return DummyCursor()
 
     dummy = DummyConn()
-    monkeypatch.setattr(dialogs, "conn", dummy)
+    monkeypatch.setattr(db, "conn", dummy)
 
     monkeypatch.setattr(dialogs.filedialog, "askdirectory", lambda **k: str(tmp_path))
     saved = {}
@@ -263,3 +281,160 @@ def test_vendor_report_created_in_month(monkeypatch, tmp_path):
     dialogs.export_vendor_report(month=7, year=year)
     assert "Nu există" in saved.get("info")[1]
 
+
+def test_export_available_excel_writes_sheet_per_group(monkeypatch, tmp_path):
+    import openpyxl
+
+    def dummy_read_sql_query(sql, params=None, **kwargs):
+        return pd.DataFrame({
+            "id": [1, 2, 3],
+            "city": ["Iasi", "Cluj", "Arad"],
+            "county": ["IS", "CJ", "AR"],
+            "address": ["Str. A", "Str. B", "Str. C"],
+            "type": ["Billboard"] * 3,
+            "gps": ["47.1,27.5", None, ""],
+            "photo_link": ["foto.ro/a", "", None],
+            "size": ["4x3"] * 3,
+            "sqm": [12.0, float("nan"), 18.0],
+            "illumination": ["Da", "Nu", "Da"],
+            "ratecard": [1234.5, 300, None],
+            "decoration_cost": [100, 100, 100],
+            "data_start": pd.to_datetime([None, None, None]),
+            "data_end": pd.to_datetime([None, None, None]),
+            "grup": ["G1", "G1", None],
+            "status": ["Disponibil"] * 3,
+        })
+
+    out = tmp_path / "locatii.xlsx"
+    monkeypatch.setattr(db, "read_sql_query", dummy_read_sql_query)
+    monkeypatch.setattr(dialogs.filedialog, "asksaveasfilename", lambda **k: str(out))
+    monkeypatch.setattr(dialogs.messagebox, "showinfo", lambda *a, **k: None)
+
+    dialogs.export_available_excel("Toate", "Toate", "", True, None, None)
+
+    wb = openpyxl.load_workbook(out)
+    assert wb.sheetnames == ["G1"]
+    ws = wb["G1"]
+    assert ws["A1"].value == "Locații G1"
+    assert ws["A2"].value == "Nr" and ws["M2"].value == "Availability"
+    assert [c.value for c in ws[3]][:4] == [1, "Iasi", "IS", "Str. A"]
+    assert ws["F3"].hyperlink.target.endswith("query=47.1,27.5")
+    assert ws["G3"].hyperlink.target == "https://foto.ro/a"
+    assert ws["F4"].hyperlink is None and ws["I4"].value is None
+    assert ws["K3"].number_format == "€#,##0.00"
+    assert ws.column_dimensions["K"].width >= len("€1,234.50") + 2
+
+
+def test_cancel_reservation_deletes_decorations_written_by_others(monkeypatch):
+    import sqlite3
+
+    import bookings
+
+    test_conn = db._ConnWrapper(sqlite3.connect(":memory:"), False)
+    monkeypatch.setattr(db, "conn", test_conn)
+    monkeypatch.setattr(db, "cursor", test_conn.cursor())
+    monkeypatch.setattr(db, "_location_cache", None)
+    monkeypatch.setattr(bookings, "_index", None)
+    monkeypatch.setattr(dialogs, "conn", test_conn)
+    monkeypatch.setattr(dialogs.messagebox, "askyesno", lambda *a, **k: True)
+    db.init_db()
+    cur = test_conn.cursor()
+    cur.executemany(
+        "INSERT INTO locatii (city, county, address) VALUES ('P', 'Prahova', ?)",
+        [("A",), ("B",)],
+    )
+    test_conn.commit()
+    bookings.get_index()
+
+    # scrise de alt client: indexul din memorie nu le știe încă
+    raw = test_conn._conn
+    raw.executemany(
+        "INSERT INTO rezervari (id, loc_id, client, data_start, data_end, suma) "
+        "VALUES (?, ?, 'X', '2030-01-01', '2030-01-10', 10.0)",
+        [(7, 1), (8, 2)],
+    )
+    raw.executemany(
+        "INSERT INTO decorari (loc_id, rez_id, data) VALUES (?, ?, '2030-01-01')",
+        [(1, 7), (2, 8)],
+    )
+    raw.commit()
+
+    dialogs.cancel_reservation(None, 1, lambda: None)
+
+    assert cur.execute("SELECT rez_id FROM decorari").fetchall() == [(8,)]
+    assert cur.execute("SELECT id FROM rezervari").fetchall() == [(8,)]
+
+
+class _Widget:
+    """Stand-in for the Tk widgets of a dialog, keeping the button commands."""
+
+    commands = []
+
+    def __init__(self, *args, command=None, **kwargs):
+        self.value = ""
+        if command is not None:
+            self.commands.append(command)
+
+    def insert(self, index, text):
+        self.value = text
+
+    def get(self):
+        return self.value
+
+    def set_date(self, value):
+        self.value = value
+
+    def get_date(self):
+        return self.value
+
+    def __getattr__(self, name):
+        return lambda *a, **k: None
+
+
+def test_failed_edit_leaves_no_pending_writes(monkeypatch):
+    import sqlite3
+    import types
+
+    test_conn = db._ConnWrapper(sqlite3.connect(":memory:"), False)
+    monkeypatch.setattr(db, "conn", test_conn)
+    monkeypatch.setattr(db, "cursor", test_conn.cursor())
+    monkeypatch.setattr(db, "_location_cache", None)
+    monkeypatch.setattr(dialogs, "conn", test_conn)
+    monkeypatch.setattr(_Widget, "commands", [])
+    monkeypatch.setattr(dialogs, "tk", types.SimpleNamespace(Toplevel=_Widget))
+    monkeypatch.setattr(
+        dialogs, "ttk", types.SimpleNamespace(Label=_Widget, Entry=_Widget, Button=_Widget)
+    )
+    monkeypatch.setattr(dialogs, "DatePicker", _Widget)
+    db.init_db()
+    cur = test_conn.cursor()
+    cur.executemany(
+        "INSERT INTO locatii (city, county, address) VALUES ('P', 'Prahova', ?)",
+        [("A",), ("B",)],
+    )
+    cur.executemany(
+        "INSERT INTO rezervari (id, loc_id, client, data_start, data_end, suma) "
+        "VALUES (?, ?, 'X', '2030-01-01', '2030-01-10', ?)",
+        [(1, 1, 10.0), (2, 2, 0)],
+    )
+    cur.execute(
+        "CREATE TRIGGER no_parent BEFORE UPDATE ON rezervari WHEN OLD.loc_id = 2 "
+        "BEGIN SELECT RAISE(ABORT, 'blocat'); END"
+    )
+    test_conn.commit()
+    version = db.data_version(("rezervari",))
+
+    dialogs.open_edit_rent_window(
+        None, 1, lambda: None, parent=(2, "2030-01-01", "2030-01-10")
+    )
+    save = _Widget.commands[-1]
+    with pytest.raises(sqlite3.DatabaseError):
+        save()
+
+    assert not db._dirty_tables
+    assert not db._client_writes
+    test_conn.commit()
+    assert db.data_version(("rezervari",)) == version
+    assert cur.execute("SELECT data_start FROM rezervari WHERE id=1").fetchone() == (
+        "2030-01-01",
+    )
@@ -0,0 +1,82 @@
+import sqlite3
+
+import db
+import directory
+
+
+def _database():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE clienti (id INTEGER PRIMARY KEY, nume TEXT UNIQUE NOT NULL,
+                              tip TEXT DEFAULT 'direct');
+        CREATE TABLE firme (id INTEGER PRIMARY KEY, nume TEXT UNIQUE NOT NULL);
+        INSERT INTO clienti (nume, tip) VALUES ('Alfa Media', 'agency'),
+            ('alpha shop', NULL), ('Beta', 'direct'), ('Alb', 'direct');
+        INSERT INTO firme (nume) VALUES ('Focus Media SRL'), ('Focus Outdoor');
+        """
+    )
+    return conn
+
+
+def test_lookup_and_prefix_search():
+    d = directory.load(_database().cursor(), version="v1")
+    assert d.version == "v1"
+    assert d.client_names == ["Alb", "Alfa Media", "alpha shop", "Beta"]
+    assert d.client(" Alfa Media ") == (1, "agency")
+    assert d.client("alpha shop") == (2, "direct")
+    assert d.client("Gamma") is None
+    assert d.search_clients("al") == ["Alb", "Alfa Media", "alpha shop"]
+    assert d.search_clients("AL", limit=2) == ["Alb", "Alfa Media"]
+    assert d.search_clients("") == d.client_names
+    assert d.search_clients("z") == []
+    assert d.firm_id("Focus Outdoor") == 2
+    assert d.search_firms("focus m") == ["Focus Media SRL"]
+
+
+def test_ensure_inserts_without_committing():
+    conn = _database()
+    cur = conn.cursor()
+    d = directory.load(cur)
+    assert d.ensure_client(cur, "Beta") == (3, "direct")
+    assert d.ensure_firm(cur, "  ") is None
+    assert d.ensure_firm(cur, "Focus Media SRL") == 1
+
+    client_id, tip = d.ensure_client(cur, "Gamma ")
+    firm_id = d.ensure_firm(cur, "Nou SRL")
+    assert (client_id, tip, firm_id) == (5, "direct", 3)
+    assert conn.in_transaction
+    conn.rollback()
+    assert cur.execute("SELECT COUNT(*) FROM clienti").fetchone() == (4,)
+    assert cur.execute("SELECT COUNT(*) FROM firme").fetchone() == (2,)
+
+
+def _versioned(clients_version):
+    conn = _database()
+    conn.executescript(
+        """
+        CREATE TABLE data_versions (tbl TEXT PRIMARY KEY, version INTEGER, updated_on REAL);
+        INSERT INTO data_versions VALUES ('firme', 1, 0);
+        """
+    )
+    conn.execute("INSERT INTO data_versions VALUES ('clienti', ?, 0)", (clients_version,))
+    return conn
+
+
+def test_lagging_replica_is_not_cached_as_current(monkeypatch):
+    primary, replica = _versioned(2), _versioned(1)
+    primary.execute("INSERT INTO clienti (nume) VALUES ('Nou')")
+    monkeypatch.setattr(db, "conn", db._ConnWrapper(primary, False))
+    monkeypatch.setattr(db, "read_connection", lambda fallback=None, tables=None: replica)
+    monkeypatch.setattr(directory, "_directory", None)
+
+    d = directory.get_directory()
+    assert d.client("Nou") is None
+    assert d.version == db.data_version(("clienti", "firme"), replica.cursor())
+    assert d.version != db.data_version(("clienti", "firme"))
+
+    # the replica caught up: the next lookup reloads
+    replica.execute("INSERT INTO clienti (nume) VALUES ('Nou')")
+    replica.execute("UPDATE data_versions SET version=2 WHERE tbl='clienti'")
+    assert directory.get_directory().client("Nou") == (5, "direct")
+    assert directory.get_directory() is directory.get_directory()
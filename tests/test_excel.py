@@ -0,0 +1,16 @@
+import openpyxl
+import pandas as pd
+
+from reports.excel import ExcelExport
+
+
+def test_stream_sheet_leaves_missing_values_empty(tmp_path):
+    out = tmp_path / "na.xlsx"
+    with ExcelExport(str(out)) as export:
+        sheet = export.add_sheet("S", ["A", "B", "C", "D"])
+        sheet.write_row([pd.NA, None, float("nan"), pd.NaT])
+        sheet.write_row(["x", 1, 2.5, "y"])
+
+    ws = openpyxl.load_workbook(out)["S"]
+    assert [c.value for c in ws[2]] == [None, None, None, None]
+    assert [c.value for c in ws[3]] == ["x", 1, 2.5, "y"]
@@ -0,0 +1,53 @@
+import pytest
+
+import geo
+
+
+def test_parse_gps_formats():
+    assert geo.parse_gps("44.48641121551933, 26.07749070745824") == (
+        44.48641121551933,
+        26.07749070745824,
+    )
+    assert geo.parse_gps("44.4864 26.0774") == (44.4864, 26.0774)
+    assert geo.parse_gps(
+        "https://www.google.com/maps/@44.4301,26.1025,17z"
+    ) == (44.4301, 26.1025)
+    assert geo.parse_gps("https://www.google.com/maps/search/?api=1&query=44.43,26.10") == (
+        44.43,
+        26.10,
+    )
+    for text in (None, "", "-", "Str. Lunga 12, 3", "0.0, 0.0", "95.1, 26.2"):
+        assert geo.parse_gps(text) is None
+
+
+def test_within_orders_by_distance():
+    index = geo.build(
+        [
+            {"id": 1, "gps": "44.4268, 26.1025"},  # Piața Unirii
+            {"id": 2, "gps": "44.4355, 26.1025"},  # ~1 km north
+            {"id": 3, "gps": "44.4268, 26.1650"},  # ~5 km east
+            {"id": 4, "gps": "45.6427, 25.5887"},  # Brașov
+            {"id": 5, "gps": ""},
+        ]
+    )
+    assert len(index) == 4
+    found = index.within(44.4268, 26.1025, 6)
+    assert [i for i, _ in found] == [1, 2, 3]
+    assert found[1][1] == pytest.approx(0.97, abs=0.02)
+    assert [i for i, _ in index.near_location(1, 2)] == [2]
+    assert index.near_location(5, 2) == []
+    # a radius wider than the grid scans every point
+    assert [i for i, _ in index.within(44.4268, 26.1025, 500)] == [1, 2, 3, 4]
+
+
+def test_nearby_ids_appends_neighbours():
+    index = geo.build(
+        [
+            {"id": 1, "gps": "44.4268, 26.1025"},
+            {"id": 2, "gps": "44.4355, 26.1025"},
+            {"id": 3, "gps": "44.4268, 26.1650"},
+            {"id": 4, "gps": "44.4280, 26.1640"},
+        ]
+    )
+    assert geo.nearby_ids([3, 1], 1.5, index) == [3, 1, 4, 2]
+    assert geo.nearby_ids([1], 0.5, index) == [1]
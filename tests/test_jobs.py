@@ -0,0 +1,105 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import jobs
+from reports.data import NoData
+
+
+def write_sheets(count, progress=None):
+    for i in range(count):
+        progress(f"Foaie {i}", 10)
+    return [f"{count}.xlsx"]
+
+
+def nothing(progress=None):
+    raise NoData("Nu există date.")
+
+
+def sleep(seconds, progress=None):
+    time.sleep(seconds)
+    return []
+
+
+def stubborn(path, pid_file, progress=None):
+    """Write part of *path*, then ignore the cancel like a report in a pool."""
+    pool = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+    pool.submit(time.sleep, 60)
+    with open(pid_file, "w") as fh:
+        fh.write(" ".join(str(pid) for pid in pool._processes))
+    with open(path, "w") as fh:
+        fh.write("parțial")
+    progress("Foaie 0", 1)
+    time.sleep(60)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as fh:
+            return fh.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def test_jobs_report_progress_and_result():
+    manager = jobs.JobManager(max_running=1)
+    done = []
+    job = manager.submit("Raport", "tests.test_jobs:write_sheets", {"count": 3}, done.append)
+    empty = manager.submit("Gol", "tests.test_jobs:nothing")
+    assert empty.status == jobs.QUEUED
+    manager.wait(0.02)
+
+    assert done == [job]
+    assert (job.status, job.result, job.sheets, job.rows) == (jobs.DONE, ["3.xlsx"], 3, 30)
+    assert (empty.status, empty.error) == (jobs.NO_DATA, "Nu există date.")
+
+
+def test_cancel_running_and_queued_jobs():
+    manager = jobs.JobManager(max_running=1, cancel_grace=0)
+    slow = manager.submit("Lent", "tests.test_jobs:sleep", {"seconds": 30})
+    queued = manager.submit("Următor", "tests.test_jobs:sleep", {"seconds": 30})
+    assert manager.cancel(queued.id)
+    assert manager.cancel(slow.id)
+    assert manager.poll() == []
+    assert [job.status for job in manager.jobs] == [jobs.CANCELLED, jobs.CANCELLED]
+    assert not manager.cancel(slow.id)
+    manager.shutdown()
+    assert slow._process is None
+
+
+def test_run_job_reports_errors():
+    messages = []
+    jobs.run_job("tests.test_jobs:write_sheets", {"count": "x"}, messages.append)
+    assert messages[0][0] == jobs.FAILED and "TypeError" in messages[0][1]
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="process groups are POSIX only")
+def test_cancel_kills_the_workers_and_removes_the_output(tmp_path):
+    manager = jobs.JobManager(cancel_grace=0.2)
+    out, pid_file = tmp_path / "raport.xlsx", tmp_path / "pids"
+    job = manager.submit(
+        "Lent", "tests.test_jobs:stubborn", {"path": str(out), "pid_file": str(pid_file)}
+    )
+    deadline = time.time() + 30
+    while not job.sheets and time.time() < deadline:
+        manager.poll()
+        time.sleep(0.05)
+    workers = [int(pid) for pid in pid_file.read_text().split()]
+    assert workers and out.exists()
+
+    assert manager.cancel(job.id)
+    assert job.status == jobs.CANCELLED
+    while job._process is not None and time.time() < deadline:
+        manager.poll()
+        time.sleep(0.05)
+    assert job._process is None
+    assert not out.exists()
+    time.sleep(0.2)
+    assert not any(_alive(pid) for pid in workers)
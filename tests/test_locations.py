@@ -0,0 +1,67 @@
+import locations
+
+
+def _row(id, county, city, grup="A", status="Disponibil", address="", parent_id=None):
+    return {
+        "id": id,
+        "county": county,
+        "city": city,
+        "grup": grup,
+        "status": status,
+        "address": address,
+        "parent_id": parent_id,
+    }
+
+
+ROWS = [
+    _row(1, "Prahova", "Ploiesti", address="Bd. Republicii"),
+    _row(2, "Bucuresti Sectorul 2", "Bucuresti", grup="B", status="Rezervat"),
+    _row(3, "Brasov", "Brasov"),
+    _row(4, "Bucuresti Sectorul 1", "Bucuresti", address="Calea Victoriei"),
+    _row(5, "Ilfov", "Voluntari", status="Expirat", parent_id=4),
+    _row(6, None, None, grup=None),
+    _row(7, "Ilfov", "Otopeni", status="Închiriat"),
+]
+
+
+def _ids(rows):
+    return [r["id"] for r in rows]
+
+
+def test_select_sorts_by_county_priority():
+    snap = locations.LocationSnapshot(ROWS)
+    # expired sub-faces are hidden, unknown counties go last
+    assert _ids(snap.select()) == [4, 2, 7, 1, 6, 3]
+    assert _ids(snap.select("Toate", "Toate", "")) == [4, 2, 7, 1, 6, 3]
+
+
+def test_select_filters_group_status_and_text():
+    snap = locations.LocationSnapshot(ROWS)
+    assert _ids(snap.select(grup="B")) == [2]
+    assert _ids(snap.select(status="Disponibil")) == [4, 1, 6, 3]
+    assert _ids(snap.select(grup="A", term=" VICTORIEI ")) == [4]
+    assert _ids(snap.select(term="ilfov")) == [7]
+    assert snap.select(grup="Nou") == []
+    assert snap.mask(status="Expirat").tolist() == [False] * 7
+
+
+def test_empty_snapshot():
+    snap = locations.LocationSnapshot([])
+    assert len(snap) == 0
+    assert snap.select(grup="A", term="x") == []
+
+
+def test_result_memo_is_a_bounded_lru():
+    memo = locations.ResultMemo(max_items=2)
+    memo.put(("v1", "A"), [1])
+    memo.put(("v1", "B"), [2])
+    assert memo.get(("v1", "A")) == [1]
+    memo.put(("v1", "C"), [3])
+    # "B" was the least recently used entry
+    assert memo.get(("v1", "B")) is None
+    assert memo.get(("v2", "A")) is None
+    assert len(memo) == 2
+
+    memo.put(None, [4])
+    assert memo.get(None) is None
+    assert len(memo) == 2
@@ -0,0 +1,197 @@
+import sqlite3
+
+import pytest
+
+migrate = pytest.importorskip("migrate_to_mysql")
+
+
+class FakeMySQLCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self._result = list(self.conn.rows) if sql.startswith("SELECT") else []
+
+    def executemany(self, sql, rows):
+        if self.conn.fail_after is not None and len(self.conn.pending) + len(
+            self.conn.rows
+        ) >= self.conn.fail_after:
+            raise RuntimeError("connection lost")
+        self.conn.pending.extend(rows)
+
+    def fetchmany(self, size):
+        chunk, self._result = self._result[:size], self._result[size:]
+        return chunk
+
+
+class FakeMySQLConn:
+    def __init__(self, fail_after=None):
+        self.rows = []
+        self.pending = []
+        self.fail_after = fail_after
+
+    def cursor(self):
+        return FakeMySQLCursor(self)
+
+    def commit(self):
+        self.rows.extend(self.pending)
+        self.pending = []
+
+
+def _source(n):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE locatii (id INTEGER PRIMARY KEY, city TEXT, sqm REAL)")
+    conn.executemany(
+        "INSERT INTO locatii (id, city, sqm) VALUES (?, ?, ?)",
+        [(i, f"Oras {i}", float(i)) for i in range(1, n + 1)],
+    )
+    return conn
+
+
+def test_copy_table_resumes_from_checkpoint(tmp_path):
+    src = _source(10)
+    columns = ["id", "city", "sqm"]
+    path = str(tmp_path / "checkpoint.json")
+
+    dst = FakeMySQLConn(fail_after=4)
+    with pytest.raises(RuntimeError):
+        migrate.copy_table(src, dst, "locatii", columns, migrate.Checkpoint(path), 3)
+    assert len(dst.rows) == 6
+
+    # a new run reads the progress saved by the interrupted one
+    checkpoint = migrate.Checkpoint(path)
+    assert checkpoint.last_rowid("locatii") == 6
+    assert not checkpoint.done("locatii")
+
+    dst.fail_after = None
+    copied = migrate.copy_table(src, dst, "locatii", columns, checkpoint, 3)
+    assert copied == 4
+    assert [r[0] for r in dst.rows] == list(range(1, 11))
+    assert migrate.Checkpoint(path).done("locatii")
+
+    ok, _ = migrate.verify_table(src, dst, "locatii", columns)
+    assert ok
+
+    dst.rows[4] = (5, "Alt oras", 5.0)
+    ok, message = migrate.verify_table(src, dst, "locatii", columns)
+    assert not ok and "checksum" in message
+
+
+def test_checksum_ignores_order_and_numeric_type():
+    class Rows(FakeMySQLCursor):
+        def __init__(self, rows):
+            self._rows = rows
+
+        def execute(self, sql, params=None):
+            self._result = list(self._rows)
+
+    a = migrate.table_checksum(Rows([(1, "a", 2), (2, "b", None)]), "SELECT")
+    b = migrate.table_checksum(Rows([(2, "b", None), (1, "a", 2.0)]), "SELECT")
+    assert a == b
+    assert a[0] == 2
+
+
+def test_tsv_field_escapes_load_data_specials():
+    assert migrate.tsv_field(None) == "\\N"
+    assert migrate.tsv_field(True) == "1"
+    assert migrate.tsv_field(2.5) == "2.5"
+    assert migrate.tsv_field("a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+    assert migrate.tsv_field("Fața A") == "Fața A"
+
+
+def test_bulk_copy_falls_back_to_multirow_and_restores_indexes(tmp_path):
+    statements = []
+
+    class BulkCursor(FakeMySQLCursor):
+        def execute(self, sql, params=None):
+            statements.append(sql)
+            if sql.startswith("LOAD DATA"):
+                raise migrate.mysql.connector.Error(errno=3948)
+            if sql.startswith("SHOW INDEX"):
+                dropped = any(s.startswith("ALTER TABLE") and "DROP" in s for s in statements)
+                rebuilt = any(s.startswith("ALTER TABLE") and "ADD" in s for s in statements)
+                self._result = (
+                    [] if dropped and not rebuilt
+                    else [("locatii__staging", 1, "idx_city", 1, "city", "A", 0, 20)]
+                )
+            elif sql.startswith("REPLACE"):
+                values = [tuple(params[i:i + 3]) for i in range(0, len(params), 3)]
+                self.conn.pending.extend(values)
+            else:
+                self._result = []
+
+        def fetchall(self):
+            return self._result
+
+    class BulkConn(FakeMySQLConn):
+        def cursor(self):
+            return BulkCursor(self)
+
+    src = _source(5)
+    dst = BulkConn()
+    checkpoint = migrate.Checkpoint(str(tmp_path / "checkpoint.json"))
+    copied = migrate.bulk_copy_table(src, dst, "locatii", ["id", "city", "sqm"], checkpoint, 2)
+
+    assert copied == 5
+    assert len(dst.rows) == 5
+    assert sum(s.startswith("REPLACE") for s in statements) == 3
+    assert "ALTER TABLE locatii__staging DROP INDEX `idx_city`" in statements
+    assert "ALTER TABLE locatii__staging ADD INDEX `idx_city` (`city`(20))" in statements
+    assert checkpoint.done("locatii")
+
+
+def test_add_missing_columns_alters_an_older_mysql_table():
+    src = sqlite3.connect(":memory:")
+    src.execute(
+        "CREATE TABLE rezervari (id INTEGER PRIMARY KEY, client TEXT, "
+        "created_on TEXT, decor_cost REAL, prod_cost REAL)"
+    )
+    executed = []
+
+    class Cur:
+        def execute(self, sql, params=None):
+            executed.append(sql)
+
+        def fetchall(self):
+            return [("id",), ("client",)]
+
+    class Conn:
+        def cursor(self):
+            return Cur()
+
+    added = migrate.add_missing_columns(src, Conn(), "rezervari")
+    assert added == ["created_on", "decor_cost", "prod_cost"]
+    assert executed[-1] == (
+        "ALTER TABLE rezervari ADD COLUMN `created_on` TEXT, "
+        "ADD COLUMN `decor_cost` DOUBLE, ADD COLUMN `prod_cost` DOUBLE"
+    )
+    assert migrate.add_missing_columns(src, Conn(), "missing") == []
+
+
+def test_swap_in_bumps_the_versions_of_the_swapped_tables():
+    executed = []
+
+    class Cur:
+        def execute(self, sql, params=None):
+            executed.append(sql)
+
+        def executemany(self, sql, rows):
+            executed.append((sql, [table for table, _ in rows]))
+
+    class Conn:
+        def cursor(self):
+            return Cur()
+
+        def commit(self):
+            executed.append("COMMIT")
+
+    migrate.swap_in(Conn(), {"locatii": ["id", "city"], "rezervari": ["id"]})
+
+    commit = executed.index("COMMIT")
+    bumps = [e for e in executed[:commit] if isinstance(e, tuple)]
+    assert len(bumps) == 1
+    sql, tables = bumps[0]
+    assert sql.startswith("INSERT INTO data_versions")
+    assert "version=version+1" in sql
+    assert tables == ["locatii", "rezervari"]
@@ -0,0 +1,108 @@
+import datetime
+import sqlite3
+
+import pytest
+
+import db
+import occupancy
+
+D = datetime.date
+ORIGIN = D(2024, 1, 1)
+
+
+def _index(rows, days=366):
+    return occupancy.OccupancyIndex(rows, ORIGIN, days)
+
+
+def test_free_for_period_and_unknown_locations():
+    index = _index(
+        [(1, "2024-03-01", "2024-03-10"), (2, "2024-02-01", "2024-02-28"), (3, None, None)]
+    )
+    assert index.free_for_period(D(2024, 3, 5), D(2024, 3, 20)).tolist() == [2]
+    assert index.free_for_period(D(2024, 3, 11), D(2024, 3, 20), [1, 2, 9]).tolist() == [
+        1,
+        2,
+        9,
+    ]
+    assert index.free_for_period(D(2024, 2, 28), D(2024, 3, 1), [1, 2, 9]).tolist() == [9]
+
+
+def test_free_at_least_and_earliest_free():
+    index = _index(
+        [
+            (1, "2024-03-01", "2024-03-10"),
+            (1, "2024-03-15", "2024-03-31"),
+            (2, "2023-12-01", "2024-03-03"),
+        ]
+    )
+    ids, best = index.longest_free(D(2024, 3, 1), D(2024, 3, 31))
+    assert dict(zip(ids.tolist(), best.tolist())) == {1: 4, 2: 28}
+    assert index.free_at_least(D(2024, 3, 1), D(2024, 3, 31), 5, [1, 2]).tolist() == [2]
+
+    found = index.earliest_free(D(2024, 3, 1), days=7, loc_ids=[1, 2, 5])
+    assert found == {1: D(2024, 4, 1), 2: D(2024, 3, 4), 5: D(2024, 3, 1)}
+    assert index.earliest_free(D(2024, 3, 1), 7, D(2024, 3, 20), [1]) == {1: None}
+
+
+def test_busy_bounds_and_horizon():
+    index = _index([(1, "2024-03-05", "2024-03-07"), (1, "2024-03-20", "2024-04-30")])
+    ids, first, last = index.busy_bounds(D(2024, 3, 1), D(2024, 3, 31), [1, 2])
+    assert ids.tolist() == [1, 2]
+    assert first == [D(2024, 3, 5), None]
+    assert last == [D(2024, 3, 31), None]
+    with pytest.raises(ValueError):
+        index.busy_bounds(D(2023, 12, 1), D(2024, 1, 5))
+
+    origin, days = occupancy.horizon(D(2024, 6, 1), start=D(2020, 1, 1))
+    assert origin == D(2020, 1, 1)
+    assert origin + datetime.timedelta(days=days - 1) == D(2026, 6, 1)
+
+
+def test_build_reads_the_horizon():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE rezervari (id INTEGER PRIMARY KEY, loc_id INTEGER,
+                                data_start TEXT, data_end TEXT);
+        INSERT INTO rezervari (loc_id, data_start, data_end) VALUES
+            (1, '2024-02-01', '2024-02-10'),
+            (2, '2020-01-01', '2020-12-31');
+        """
+    )
+    index = occupancy.build(conn.cursor(), ORIGIN, 366, version="v1")
+    assert index.loc_ids.tolist() == [1]
+    assert index.version == "v1"
+    assert index.free_for_period(D(2024, 2, 10), D(2024, 2, 11), [1, 2]).tolist() == [2]
+
+
+def test_lagging_replica_is_not_cached_as_current(monkeypatch):
+    def database(version, rows):
+        conn = sqlite3.connect(":memory:")
+        conn.executescript(
+            """
+            CREATE TABLE rezervari (id INTEGER PRIMARY KEY, loc_id INTEGER,
+                                    data_start TEXT, data_end TEXT);
+            CREATE TABLE data_versions (tbl TEXT PRIMARY KEY, version INTEGER,
+                                        updated_on REAL);
+            """
+        )
+        conn.execute("INSERT INTO data_versions VALUES ('rezervari', ?, 0)", (version,))
+        conn.executemany(
+            "INSERT INTO rezervari (loc_id, data_start, data_end) VALUES (?, ?, ?)", rows
+        )
+        return conn
+
+    today = D.today()
+    busy = [(1, today.isoformat(), today.isoformat())]
+    primary, replica = database(2, busy), database(1, [])
+    monkeypatch.setattr(db, "conn", db._ConnWrapper(primary, False))
+    monkeypatch.setattr(db, "read_connection", lambda fallback=None, tables=None: replica)
+    monkeypatch.setattr(occupancy, "_index", None)
+
+    assert occupancy.get_index().free_for_period(today, today, [1]).tolist() == [1]
+
+    replica.executemany(
+        "INSERT INTO rezervari (loc_id, data_start, data_end) VALUES (?, ?, ?)", busy
+    )
+    replica.execute("UPDATE data_versions SET version=2")
+    assert occupancy.get_index().free_for_period(today, today, [1]).tolist() == []
@@ -0,0 +1,157 @@
+import sqlite3
+
+import db
+import offline
+
+
+def _remote():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE locatii (id INTEGER PRIMARY KEY AUTOINCREMENT, city TEXT,"
+        " address TEXT, status TEXT DEFAULT 'Disponibil')"
+    )
+    conn.execute(
+        "CREATE TABLE rezervari (id INTEGER PRIMARY KEY AUTOINCREMENT, loc_id INTEGER,"
+        " client TEXT, data_start TEXT, data_end TEXT, suma REAL)"
+    )
+    conn.execute("INSERT INTO locatii (city, address) VALUES ('Iasi', 'Str. A')")
+    conn.execute("INSERT INTO locatii (city, address) VALUES ('Cluj', 'Str. B')")
+    conn.commit()
+    return conn
+
+
+def _write(local, sql, params):
+    cur = local.cursor()
+    entry = offline.capture(cur, sql, params)
+    cur.execute(sql, params)
+    offline.record(cur, entry, cur.lastrowid)
+    local.commit()
+    return cur.lastrowid
+
+
+def test_replay_remaps_ids_and_detects_conflicts():
+    remote = _remote()
+    local = sqlite3.connect(":memory:")
+    assert offline.sync_replica(remote, local, mysql=False)
+    offline.prepare_replica(local)
+
+    new_loc = _write(local, "INSERT INTO locatii (city, address) VALUES (?, ?)", ("Arad", "Str. C"))
+    assert new_loc > offline.LOCAL_ID_BASE
+    insert_rez = (
+        "INSERT INTO rezervari (loc_id, client, data_start, data_end) VALUES (?, ?, ?, ?)"
+    )
+    _write(local, insert_rez, (new_loc, "X", "2025-01-01", "2025-01-31"))
+    _write(local, insert_rez, (1, "Y", "2025-03-01", "2025-03-31"))
+    _write(local, "UPDATE locatii SET address=? WHERE id=?", ("Str. A2", 1))
+    _write(local, "UPDATE locatii SET address=? WHERE id=?", ("Str. B2", 2))
+    assert offline.pending_count(local) == 5
+
+    # meanwhile other users keep working online
+    remote.execute(insert_rez, (1, "Z", "2025-03-15", "2025-04-15"))
+    remote.execute("UPDATE locatii SET address='Str. B9' WHERE id=2")
+    remote.execute("UPDATE locatii SET status='Rezervat' WHERE id=1")
+    remote.commit()
+
+    summary = offline.replay(local, remote, paramstyle="qmark")
+    assert summary["applied"] == 3
+    assert len(summary["conflicts"]) == 2
+    assert offline.pending_count(local) == 0
+    assert len(offline.conflicts(local)) == 2
+
+    arad = remote.execute("SELECT id FROM locatii WHERE city='Arad'").fetchone()[0]
+    assert arad < offline.LOCAL_ID_BASE
+    assert remote.execute(
+        "SELECT client FROM rezervari WHERE loc_id=?", (arad,)
+    ).fetchone() == ("X",)
+    assert remote.execute("SELECT address FROM locatii WHERE id=1").fetchone() == ("Str. A2",)
+    assert remote.execute("SELECT address FROM locatii WHERE id=2").fetchone() == ("Str. B9",)
+    assert remote.execute("SELECT COUNT(*) FROM rezervari WHERE client='Y'").fetchone()[0] == 0
+
+    # the replica can be refreshed again once the outbox is empty
+    assert offline.sync_replica(remote, local, mysql=False)
+    assert local.execute("SELECT COUNT(*) FROM locatii").fetchone()[0] == 3
+
+
+def test_replay_ignores_zero_fee_rows_of_mobile_locations():
+    remote = _remote()
+    local = sqlite3.connect(":memory:")
+    offline.sync_replica(remote, local, mysql=False)
+    offline.prepare_replica(local)
+    insert_rez = (
+        "INSERT INTO rezervari (loc_id, client, data_start, data_end, suma) "
+        "VALUES (?, ?, ?, ?, ?)"
+    )
+    _write(local, insert_rez, (1, "X", "2025-03-01", "2025-03-31", 0.0))
+    _write(local, insert_rez, (2, "X", "2025-03-01", "2025-03-31", 100.0))
+
+    # another unit of location 1 and a zero-fee row on location 2 meanwhile
+    remote.execute(insert_rez, (1, "Z", "2025-03-10", "2025-04-10", 0.0))
+    remote.execute(insert_rez, (2, "Z", "2025-03-10", "2025-04-10", 0.0))
+    remote.commit()
+
+    summary = offline.replay(local, remote, paramstyle="qmark")
+    assert summary == {"applied": 2, "conflicts": []}
+    assert remote.execute("SELECT COUNT(*) FROM rezervari WHERE client='X'").fetchone()[0] == 2
+
+
+def test_replay_skips_statements_already_applied():
+    remote = _remote()
+    local = sqlite3.connect(":memory:")
+    offline.sync_replica(remote, local, mysql=False)
+    offline.prepare_replica(local)
+    _write(local, "INSERT INTO locatii (city) VALUES (?)", ("Deva",))
+
+    token = local.execute("SELECT token FROM _outbox").fetchone()[0]
+    # simulate a replay interrupted after the server commit
+    remote.execute("CREATE TABLE outbox_applied (token TEXT PRIMARY KEY, remote_id INTEGER, applied_on TEXT)")
+    remote.execute("INSERT INTO outbox_applied (token, remote_id) VALUES (?, 7)", (token,))
+    remote.commit()
+
+    summary = offline.replay(local, remote, paramstyle="qmark")
+    assert summary == {"applied": 1, "conflicts": []}
+    assert remote.execute("SELECT COUNT(*) FROM locatii WHERE city='Deva'").fetchone()[0] == 0
+
+
+def test_cursor_wrapper_queues_writes_in_replica_mode(monkeypatch):
+    local = sqlite3.connect(":memory:")
+    local.execute("CREATE TABLE locatii (id INTEGER PRIMARY KEY AUTOINCREMENT, city TEXT)")
+    offline.prepare_replica(local)
+    cur = db._ConnWrapper(local, False).cursor()
+
+    monkeypatch.setattr(db, "_replica_mode", True)
+    cur.execute("INSERT INTO locatii (city) VALUES (?)", ("Iasi",))
+    cur.execute("SELECT * FROM locatii")
+    monkeypatch.setattr(db, "_record_writes", False)
+    cur.execute("UPDATE locatii SET city='Cluj'")
+
+    assert offline.pending_count(local) == 1
+
+
+USERS = (
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, password TEXT,"
+    " role TEXT, comune TEXT)"
+)
+
+
+def test_replica_keeps_only_remembered_logins():
+    remote = _remote()
+    remote.execute(USERS)
+    remote.execute("INSERT INTO users VALUES (1, 'ana', 'server-hash', 'admin', '')")
+    remote.commit()
+    local = sqlite3.connect(":memory:")
+    # a replica made before logins were remembered holds every account
+    local.execute(USERS)
+    local.execute("INSERT INTO users VALUES (1, 'ana', 'server-hash', 'admin', '')")
+    local.commit()
+
+    offline.prepare_replica(local)
+    assert offline.sync_replica(remote, local, mysql=False)
+    assert local.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+
+    for role, pw in (("admin", "pw"), ("seller", "pw2")):
+        offline.remember_login(local, {"username": "ana", "role": role}, db._hash_password(pw))
+    rows = local.execute("SELECT username, password, role FROM users").fetchall()
+    assert [(u, r) for u, _, r in rows] == [("ana", "seller")]
+    assert db._verify_password(rows[0][1], "pw2")
+    offline.prepare_replica(local)
+    assert local.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
@@ -0,0 +1,37 @@
+import numpy as np
+
+from reports.prorate import prorate_year
+
+
+def test_prorate_year_splits_rentals_by_month():
+    result = prorate_year(
+        ["2024-01-15", "2023-12-01", None],
+        ["2024-03-10", "2024-01-31", "2024-02-01"],
+        [310, 100, 5],
+        2024,
+    )
+    assert result.month_days[1] == 29
+    assert result.days[0, :4].tolist() == [17, 29, 10, 0]
+    assert result.days[1].sum() == 31
+    assert result.days[2].sum() == 0
+    assert np.allclose(result.revenue[0, :3], [310 * 17 / 31, 310, 310 * 10 / 31])
+    assert np.isnat(result.first_day[0, 3])
+    assert str(result.first_day[0, 1]) == "2024-02-01"
+
+    long = result.long_format(id=[7, 8, 9])
+    assert long["id"].tolist() == [7, 7, 7, 8]
+    assert long["month"].tolist() == [1, 2, 3, 1]
+    assert np.isclose(long["revenue"].sum(), result.revenue.sum())
+
+
+def test_contract_months_spans_years():
+    from reports.prorate import contract_months
+
+    months = contract_months(
+        ["2024-01-15", "2024-02-01", "2024-12-20", "2024-05-10"],
+        ["2024-03-10", "2024-02-29", "2026-01-05", "2024-05-01"],
+    )
+    assert np.allclose(
+        months,
+        [17 / 31 + 1 + 10 / 31, 1.0, 12 / 31 + 12 + 5 / 31, 0.0],
+    )
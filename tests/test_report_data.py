@@ -0,0 +1,68 @@
+import sqlite3
+
+import pandas as pd
+
+import db
+from reports import data
+
+
+def _database(monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE locatii (id INTEGER PRIMARY KEY, city TEXT, county TEXT,
+                              address TEXT, is_mobile INTEGER, parent_id INTEGER);
+        CREATE TABLE rezervari (id INTEGER PRIMARY KEY, loc_id INTEGER, client TEXT,
+                                data_start TEXT, data_end TEXT, suma REAL,
+                                created_by TEXT, created_on TEXT);
+        INSERT INTO locatii VALUES (1, 'Iasi', 'Iasi', 'Str. A', 0, NULL);
+        INSERT INTO locatii VALUES (2, 'Cluj', 'Cluj', 'Str. B', NULL, NULL);
+        INSERT INTO locatii VALUES (3, 'Arad', 'Arad', 'Prisma', 1, NULL);
+        INSERT INTO locatii VALUES (4, 'Arad', 'Arad', 'Prisma 1', 1, 3);
+        INSERT INTO rezervari VALUES (1, 1, 'A', '2024-03-01', '2024-03-31', 100, 'ana', '2024-02-10');
+        INSERT INTO rezervari VALUES (2, 2, 'B', '2023-12-01', '2024-01-31', 50, 'ion', '2024-02-20');
+        INSERT INTO rezervari VALUES (3, 3, 'C', '2024-05-01', '2024-05-31', 70, 'ana', '2024-02-11');
+        INSERT INTO rezervari VALUES (4, 4, 'C', '2024-05-01', '2024-05-31', 70, 'ana', '2024-03-01');
+        INSERT INTO rezervari VALUES (5, 1, 'D', '2023-01-01', '2023-01-31', 80, 'ana', '2024-02-12');
+        INSERT INTO rezervari VALUES (6, 2, 'E', '2024-02-01', '2024-02-29', 0, 'ion', '2024-02-01');
+        """
+    )
+    calls = []
+
+    def fake_read(sql, params=None, **kwargs):
+        calls.append(kwargs)
+        return pd.read_sql_query(sql, conn, params=params, **kwargs)
+
+    monkeypatch.setattr(db, "read_sql_query", fake_read)
+    fake_read.conn = conn
+    return calls
+
+
+def test_sales_rentals_filters_year_and_mobile_bases(monkeypatch):
+    calls = _database(monkeypatch)
+    df = data.sales_rentals(2024)
+    assert df["id"].tolist() == [2, 1, 4]
+    assert calls[0]["chunksize"] == data.REPORT_CHUNKSIZE
+    assert str(df["data_start"].dtype).startswith("datetime64")
+
+
+def test_vendor_rentals_filters_month_sellers_and_counties(monkeypatch):
+    _database(monkeypatch)
+    df = data.vendor_rentals(2024, 2, ["ana", "ion"])
+    # B and D start before they were created
+    assert sorted(df["client"]) == ["A", "C"]
+    assert data.vendor_rentals(2024, 2, ["ana"], ["Iasi"])["client"].tolist() == ["A"]
+    assert data.vendor_rentals(2024, 2, []).empty
+    assert data.vendor_rentals(2024, 12, ["ana"]).empty
+
+
+
+def test_vendor_rentals_keep_the_order_they_were_written(monkeypatch):
+    _database(monkeypatch)
+    conn = db.read_sql_query.conn
+    conn.execute("CREATE INDEX idx_created ON rezervari (created_on)")
+    conn.execute(
+        "INSERT INTO rezervari VALUES "
+        "(7, 1, 'F', '2024-04-01', '2024-04-30', 90, 'ana', '2024-02-05')"
+    )
+    assert data.vendor_rentals(2024, 2, ["ana"])["client"].tolist() == ["A", "C", "F"]
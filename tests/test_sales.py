@@ -0,0 +1,50 @@
+import datetime
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+import db
+from reports import cache, sales
+from reports.sales import year_sold_share
+
+
+def test_year_sold_share_keeps_the_truthiness_of_is_mobile():
+    months = pd.Series([6.0, 6.0, 6.0, 6.0])
+    # read from the database as float: NULL becomes NaN, which counts as mobile
+    share = year_sold_share(months, pd.Series([1.0, 0.0, np.nan, 2.0]))
+    assert share.tolist() == [6 / 240, 6 / 12, 6 / 240, 6 / 240]
+    # read as objects: NULL stays None, which does not
+    share = year_sold_share(months, pd.Series([1, 0, None, 0], dtype=object))
+    assert share.tolist() == [6 / 240, 6 / 12, 6 / 12, 6 / 12]
+
+
+def test_unchanged_data_serves_the_report_from_cache(monkeypatch, tmp_path):
+    test_conn = db._ConnWrapper(sqlite3.connect(":memory:"), False)
+    monkeypatch.setattr(db, "conn", test_conn)
+    monkeypatch.setattr(db, "cursor", test_conn.cursor())
+    monkeypatch.setattr(db, "_location_cache", None)
+    monkeypatch.setattr(cache, "_default", cache.ReportCache(str(tmp_path / "cache")))
+    db.init_db()
+    today = datetime.date.today()
+    cur = test_conn.cursor()
+    cur.executemany(
+        "INSERT INTO locatii (city, county, address, is_mobile) VALUES (?, ?, ?, 0)",
+        [("Ploiesti", "Prahova", "Str. A"), ("Ploiesti", "Prahova", "Str. B")],
+    )
+    cur.execute(
+        "INSERT INTO rezervari (loc_id, client, data_start, data_end, suma) "
+        "VALUES (1, 'X', ?, ?, 100.0)",
+        (today.replace(day=1).isoformat(), (today + datetime.timedelta(days=30)).isoformat()),
+    )
+    test_conn.commit()
+
+    # the status refresh runs on every prepare, not only after the TTL
+    monkeypatch.setattr(db, "_status_timestamp", 0)
+    report = sales.prepare_sales_report(today.year)
+    assert report.cached is None
+    sales.write_sales_report(report, str(tmp_path / "a.xlsx"))
+    for _ in range(2):
+        monkeypatch.setattr(db, "_status_timestamp", 0)
+        again = sales.prepare_sales_report(today.year)
+        assert again.key == report.key and again.cached is not None
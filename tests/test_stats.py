@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+
+import stats
+
+
+def _database():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE rezervari (id INTEGER PRIMARY KEY, loc_id INTEGER,
+                                data_start TEXT, data_end TEXT, suma REAL);
+        CREATE TABLE decorari (id INTEGER PRIMARY KEY, loc_id INTEGER, rez_id INTEGER,
+                               data TEXT, decor_cost REAL, prod_cost REAL);
+        """
+    )
+    assert stats.create_schema(conn.cursor(), mysql=False)
+    return conn
+
+
+def _rows(conn):
+    return {
+        row[:3]: row[3:]
+        for row in conn.execute(f"SELECT {', '.join(stats.COLUMNS)} FROM loc_month_stats")
+    }
+
+
+def test_aggregate_splits_rentals_by_month():
+    totals = stats.aggregate(
+        [(1, "2024-01-20", "2024-02-10", 310), (1, "2024-02-01", "2024-02-05", None)],
+        [(1, "2024-02-03", 100, 20), (2, "2023-12-31", None, 5)],
+    )
+    assert totals[(1, 2024, 1)] == [12, 0, pytest.approx(120.0), 0.0, 0.0]
+    assert totals[(1, 2024, 2)] == [10, 5, pytest.approx(310 * 10 / 29), 100.0, 20.0]
+    assert totals[(2, 2023, 12)] == [0, 0, 0.0, 0.0, 5.0]
+
+
+def test_triggers_queue_changed_locations():
+    conn = _database()
+    cur = conn.cursor()
+    cur.execute("INSERT INTO rezervari VALUES (1, 7, '2024-03-01', '2024-03-31', 100)")
+    cur.execute("INSERT INTO decorari VALUES (1, 8, NULL, '2024-03-02', 50, 10)")
+    assert stats.process_dirty(cur) == 2
+    assert _rows(conn) == {
+        (7, 2024, 3): (31, 0, 100.0, 0.0, 0.0),
+        (8, 2024, 3): (0, 0, 0.0, 50.0, 10.0),
+    }
+    assert stats.process_dirty(cur) == 0
+
+    # moving a rental refreshes both the old and the new location
+    cur.execute("UPDATE rezervari SET loc_id=8, data_end='2024-04-15' WHERE id=1")
+    assert stats.process_dirty(cur) == 2
+    assert _rows(conn) == {
+        (8, 2024, 3): (31, 0, 100.0, 50.0, 10.0),
+        (8, 2024, 4): (15, 0, 50.0, 0.0, 0.0),
+    }
+
+    cur.execute("DELETE FROM rezervari")
+    cur.execute("DELETE FROM decorari")
+    stats.process_dirty(cur)
+    assert _rows(conn) == {}
+
+
+def test_changes_during_refresh_stay_queued():
+    conn = _database()
+    cur = conn.cursor()
+    cur.execute("INSERT INTO rezervari VALUES (1, 7, '2024-03-01', '2024-03-31', 100)")
+    queued = cur.execute("SELECT loc_id, seq FROM loc_month_dirty").fetchall()
+    cur.execute("UPDATE rezervari SET suma=200 WHERE id=1")
+    cur.executemany("DELETE FROM loc_month_dirty WHERE loc_id=? AND seq=?", queued)
+    assert cur.execute("SELECT loc_id FROM loc_month_dirty").fetchall() == [(7,)]
+
+
+def test_refresh_rebuilds_everything():
+    conn = _database()
+    cur = conn.cursor()
+    cur.execute("INSERT INTO rezervari VALUES (1, 7, '2024-12-20', '2025-01-10', 310)")
+    cur.execute("INSERT INTO loc_month_stats (loc_id, year, month) VALUES (99, 2020, 1)")
+    assert stats.refresh(cur) == 2
+    assert set(_rows(conn)) == {(7, 2024, 12), (7, 2025, 1)}